@@ -23,6 +23,12 @@ try:
 except ImportError:
     SCIPY_AVAILABLE = False
 
+# リサンプリングエンジン・列指向ストア・分位点スケッチ（evals-v3 と共用）
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "evals-v3" / "scripts"))
+import resampling
+import results_store
+from quantile_sketch import QUANTILES, SketchSet, quantile_label
+
 
 @dataclass
 class TrialResult:
@@ -35,10 +41,52 @@ class TrialResult:
     duration_seconds: float
     code_grade: dict
     model_grade: dict
+    input_tokens: Optional[int] = None
+    output_tokens: Optional[int] = None
+    estimated_cost_usd: Optional[float] = None
+
+
+def trial_from_data(data: dict) -> TrialResult:
+    """結果 JSON の内容から TrialResult を作成"""
+    # total_cost_usd は estimated_cost_usd がないときだけ使う（0 はそのまま使う）
+    cost = data.get("estimated_cost_usd")
+    return TrialResult(
+        trial_id=data.get("trial_id", 0),
+        dimension=data.get("dimension", "unknown"),
+        task_id=data.get("task_id", "unknown"),
+        success=data.get("success", False),
+        score=data.get("score", 0.0),
+        duration_seconds=data.get("duration_seconds", 0.0),
+        code_grade=data.get("code_grade", {}),
+        model_grade=data.get("model_grade", {}),
+        input_tokens=data.get("input_tokens"),
+        output_tokens=data.get("output_tokens"),
+        estimated_cost_usd=data.get("total_cost_usd") if cost is None else cost
+    )
+
+
+def sketch_trials(results: List[TrialResult]) -> SketchSet:
+    """所要時間・トークン数・コストの分位点スケッチ（記録のないメトリクスは空）"""
+    sketches = SketchSet()
+    for r in results:
+        sketches.add("duration_seconds", r.duration_seconds)
+        sketches.add("input_tokens", r.input_tokens)
+        sketches.add("output_tokens", r.output_tokens)
+        sketches.add("estimated_cost_usd", r.estimated_cost_usd)
+    return sketches
+
+
+def load_results(results_dir: str, use_store: bool = True) -> List[TrialResult]:
+    """結果ファイルを読み込む
+
+    ingest-results.py で作成したストア（<results_dir>/.results-store.npz）が最新なら、
+    JSON を 1 件ずつ読む代わりにストアに保存した元の JSON を使う。
+    """
+    store = results_store.open_store(results_dir, verify_flat=True) if use_store else None
+    if store is not None:
+        rows = (store.columns["source"] == "v2").nonzero()[0]
+        return [trial_from_data(store.record(i)) for i in rows.tolist()]
 
-
-def load_results(results_dir: str) -> List[TrialResult]:
-    """結果ファイルを読み込む"""
     results = []
     results_path = Path(results_dir)
 
@@ -47,17 +95,7 @@ def load_results(results_dir: str) -> List[TrialResult]:
             with open(json_file, 'r', encoding='utf-8') as f:
                 data = json.load(f)
 
-            result = TrialResult(
-                trial_id=data.get("trial_id", 0),
-                dimension=data.get("dimension", "unknown"),
-                task_id=data.get("task_id", "unknown"),
-                success=data.get("success", False),
-                score=data.get("score", 0.0),
-                duration_seconds=data.get("duration_seconds", 0.0),
-                code_grade=data.get("code_grade", {}),
-                model_grade=data.get("model_grade", {})
-            )
-            results.append(result)
+            results.append(trial_from_data(data))
         except Exception as e:
             print(f"Warning: Failed to load {json_file}: {e}", file=sys.stderr)
 
@@ -214,16 +252,24 @@ def calculate_p_value(group1: List[float], group2: List[float]) -> float:
     return p_value
 
 
-def generate_report(results: List[TrialResult], comparison_results: Optional[List[TrialResult]] = None) -> dict:
+def generate_report(results: List[TrialResult], comparison_results: Optional[List[TrialResult]] = None,
+                    method: str = "ttest", n_resamples: int = resampling.DEFAULT_RESAMPLES,
+                    seed: int = resampling.DEFAULT_SEED) -> dict:
     """
     統計レポートを生成
+
+    method: 比較の p 値の算出方法（ttest / bootstrap / permutation）
+
+    summary / by_dimension / by_task の "percentiles" は DDSketch による p50/p90/p99。
+    "sketches" にはそのスケッチ自体を保存し、複数 run のレポートを merge_report_sketches で結合できる。
     """
     report = {
         "summary": {},
         "by_dimension": {},
         "by_task": {},
         "pass_metrics": {},
-        "comparison": None
+        "comparison": None,
+        "sketches": {"summary": {}, "by_dimension": {}, "by_task": {}}
     }
 
     # 全体サマリー
@@ -241,6 +287,9 @@ def generate_report(results: List[TrialResult], comparison_results: Optional[Lis
         "mean_duration_seconds": mean_duration,
         "duration_95_ci": [dur_ci_low, dur_ci_high]
     }
+    sketches = sketch_trials(results)
+    report["summary"]["percentiles"] = sketches.percentiles()
+    report["sketches"]["summary"] = sketches.to_dict()
 
     # pass@k, pass^k メトリクス
     for k in [1, 3, 5]:
@@ -256,12 +305,15 @@ def generate_report(results: List[TrialResult], comparison_results: Optional[Lis
 
         mean, ci_low, ci_high = calculate_confidence_interval(dim_scores)
 
+        sketches = sketch_trials(dim_results)
         report["by_dimension"][dim] = {
             "trials": len(dim_results),
             "success_rate": sum(1 for r in dim_results if r.success) / len(dim_results) if dim_results else 0,
             "mean_score": mean,
-            "score_95_ci": [ci_low, ci_high]
+            "score_95_ci": [ci_low, ci_high],
+            "percentiles": sketches.percentiles()
         }
+        report["sketches"]["by_dimension"][dim] = sketches.to_dict()
 
     # タスク別分析
     tasks = set(r.task_id for r in results)
@@ -271,12 +323,15 @@ def generate_report(results: List[TrialResult], comparison_results: Optional[Lis
 
         mean, ci_low, ci_high = calculate_confidence_interval(task_scores)
 
+        sketches = sketch_trials(task_results)
         report["by_task"][task] = {
             "trials": len(task_results),
             "success_rate": sum(1 for r in task_results if r.success) / len(task_results) if task_results else 0,
             "mean_score": mean,
-            "score_95_ci": [ci_low, ci_high]
+            "score_95_ci": [ci_low, ci_high],
+            "percentiles": sketches.percentiles()
         }
+        report["sketches"]["by_task"][task] = sketches.to_dict()
 
     # 比較分析（オプション）
     if comparison_results:
@@ -284,9 +339,14 @@ def generate_report(results: List[TrialResult], comparison_results: Optional[Lis
         scores2 = [r.score for r in comparison_results]
 
         cohens_d = calculate_cohens_d(scores1, scores2)
-        p_value = calculate_p_value(scores1, scores2)
+        resampled = None
+        if method != "ttest":
+            resampled = resampling.resample_independent(scores1, scores2, method=method,
+                                                        n_resamples=n_resamples, seed=seed)
+        p_value = resampled.p_value if resampled else calculate_p_value(scores1, scores2)
 
         report["comparison"] = {
+            "method": method if resampled else "ttest",
             "group1_n": len(scores1),
             "group2_n": len(scores2),
             "group1_mean": sum(scores1) / len(scores1) if scores1 else 0,
@@ -296,10 +356,34 @@ def generate_report(results: List[TrialResult], comparison_results: Optional[Lis
             "p_value": p_value,
             "significant": p_value < 0.05
         }
+        if resampled:
+            report["comparison"]["n_resamples"] = resampled.n_resamples
+            report["comparison"]["diff_95_ci"] = [resampled.ci_lower, resampled.ci_upper]
 
     return report
 
 
+def merge_report_sketches(reports: List[dict]) -> dict:
+    """複数 run のレポート（generate_report の JSON）のスケッチを結合して分位点を再計算
+
+    Returns:
+        {"summary": {メトリクス: 分位点}, "by_dimension": {...}, "by_task": {...}}
+    """
+    merged = {"summary": SketchSet.merged([SketchSet.from_dict(r.get("sketches", {}).get("summary", {}))
+                                           for r in reports]),
+              "by_dimension": {}, "by_task": {}}
+    for section in ("by_dimension", "by_task"):
+        for report in reports:
+            for key, data in report.get("sketches", {}).get(section, {}).items():
+                merged[section].setdefault(key, SketchSet(metrics=())).merge(SketchSet.from_dict(data))
+
+    return {
+        "summary": merged["summary"].percentiles(),
+        "by_dimension": {k: v.percentiles() for k, v in merged["by_dimension"].items()},
+        "by_task": {k: v.percentiles() for k, v in merged["by_task"].items()},
+    }
+
+
 def check_saturation(results: List[TrialResult], threshold: float = 1.0) -> dict:
     """
     飽和検出: 100%に達したメトリクスを検出
@@ -343,15 +427,35 @@ def check_saturation(results: List[TrialResult], threshold: float = 1.0) -> dict
 
 def main():
     parser = argparse.ArgumentParser(description="Statistical Analysis for Evals v2")
-    parser.add_argument("--results-dir", required=True, help="結果ディレクトリ")
+    parser.add_argument("--results-dir", help="結果ディレクトリ")
     parser.add_argument("--comparison-dir", help="比較対象の結果ディレクトリ（オプション）")
     parser.add_argument("--output", help="レポート出力先 (JSON)")
     parser.add_argument("--format", choices=["json", "markdown"], default="json", help="出力フォーマット")
+    parser.add_argument("--method", choices=["ttest", *resampling.METHODS], default="ttest",
+                        help="比較の p 値の算出方法")
+    parser.add_argument("--resamples", type=int, default=resampling.DEFAULT_RESAMPLES, help="リサンプル数")
+    parser.add_argument("--seed", type=int, default=resampling.DEFAULT_SEED, help="リサンプリングの乱数シード")
+    parser.add_argument("--no-store", action="store_true",
+                        help=f"{results_store.STORE_FILE} を使わず JSON を読み込む")
+    parser.add_argument("--merge-reports", nargs="+", metavar="REPORT",
+                        help="保存済みレポート（JSON）のスケッチを結合して分位点を出力")
 
     args = parser.parse_args()
 
+    # 複数 run のレポートの分位点を結合（結果の再読み込みは不要）
+    if args.merge_reports:
+        reports = []
+        for path in args.merge_reports:
+            with open(path, 'r', encoding='utf-8') as f:
+                reports.append(json.load(f))
+        print(json.dumps(merge_report_sketches(reports), indent=2, ensure_ascii=False))
+        return
+
+    if not args.results_dir:
+        parser.error("--results-dir か --merge-reports を指定してください")
+
     # 結果を読み込む
-    results = load_results(args.results_dir)
+    results = load_results(args.results_dir, use_store=not args.no_store)
 
     if not results:
         print("Error: No results found", file=sys.stderr)
@@ -360,10 +464,11 @@ def main():
     # 比較対象を読み込む（オプション）
     comparison_results = None
     if args.comparison_dir:
-        comparison_results = load_results(args.comparison_dir)
+        comparison_results = load_results(args.comparison_dir, use_store=not args.no_store)
 
     # レポート生成
-    report = generate_report(results, comparison_results)
+    report = generate_report(results, comparison_results, method=args.method,
+                             n_resamples=args.resamples, seed=args.seed)
 
     # 飽和検出
     report["saturation"] = check_saturation(results)
@@ -395,6 +500,16 @@ def format_as_markdown(report: dict) -> str:
     lines.append(f"- 平均所要時間: {s['mean_duration_seconds']:.1f}s")
     lines.append("")
 
+    # 分位点（DDSketch）
+    if s.get("percentiles"):
+        labels = [quantile_label(q) for q in QUANTILES]
+        lines.append("## 分位点\n")
+        lines.append("| メトリクス | n | " + " | ".join(labels) + " |")
+        lines.append("|------------|---|" + "|".join("-----" for _ in labels) + "|")
+        for metric, p in s["percentiles"].items():
+            lines.append(f"| {metric} | {p['count']} | " + " | ".join(f"{p[l]:.4g}" for l in labels) + " |")
+        lines.append("")
+
     # pass@k メトリクス
     if report["pass_metrics"]:
         lines.append("## pass@k / pass^k メトリクス\n")
@@ -411,7 +526,9 @@ def format_as_markdown(report: dict) -> str:
         lines.append(f"- グループ1 平均: {c['group1_mean']:.2f} (n={c['group1_n']})")
         lines.append(f"- グループ2 平均: {c['group2_mean']:.2f} (n={c['group2_n']})")
         lines.append(f"- Cohen's d: {c['cohens_d']:.3f} ({c['effect_size']})")
-        lines.append(f"- p値: {c['p_value']:.4f}")
+        lines.append(f"- p値: {c['p_value']:.4f} ({c['method']})")
+        if "diff_95_ci" in c:
+            lines.append(f"- 平均差 95% CI: [{c['diff_95_ci'][0]:.2f}, {c['diff_95_ci'][1]:.2f}]")
         lines.append(f"- 有意差: {'あり' if c['significant'] else 'なし'}")
         lines.append("")
 
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+batch-grader.py - 複数トライアルの一括グレーダー
+
+1 プロセスで results ルート配下（<task>/<mode>/iter-N）の全トライアルを
+ワーカープールで採点し、1 トライアル 1 行の JSON（JSON Lines）を逐次出力する。
+試行ごとに Python を起動し直すコスト（インタプリタ起動・anthropic の import）を避ける。
+コードベース採点も code-grader.py をプロセス内で呼ぶ（code-grader.sh と同じ結果）。
+
+使用法:
+  python batch-grader.py <results_root> [--jobs N] [--write] [--no-llm]
+  find ... -name 'iter-*' | python batch-grader.py --stdin [--write]
+
+出力（1 行 1 トライアル）:
+  {"trial_dir": ..., "task": ..., "mode": ..., "iteration": ...,
+   "code_grading": {...}, "model_grading": {...}}
+
+--write を指定すると各トライアルに grading-result.json を書き出す
+（run-statistical-eval.sh と同じ形式）。run の列指向ストア（.results-store.npz）は削除する。
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+import importlib.util
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
+
+GRADERS_DIR = Path(__file__).resolve().parent
+
+ITER_DIR_PATTERN = re.compile(r"^iter-(\d+)$")
+
+
+def _load_grader(module_name: str, file_name: str):
+    """グレーダーをモジュールとして読み込む（ファイル名にハイフンを含むため）"""
+    spec = importlib.util.spec_from_file_location(module_name, GRADERS_DIR / file_name)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+code_grader = _load_grader("code_grader", "code-grader.py")
+model_grader = _load_grader("model_grader", "model-grader.py")
+
+# 列指向ストア（scripts/results_store.py）。--write で採点し直したら古いストアを消す
+sys.path.insert(0, str(GRADERS_DIR.parent / "scripts"))
+import results_store
+
+
+def find_trial_dirs(results_root: Path) -> List[Path]:
+    """results_root/<task>/<mode>/iter-N を列挙（タスク・モード・N 順）"""
+    trials = []
+
+    with os.scandir(results_root) as task_entries:
+        task_dirs = sorted(e.path for e in task_entries
+                           if e.is_dir() and not e.name.startswith('.'))
+
+    for task_dir in task_dirs:
+        with os.scandir(task_dir) as mode_entries:
+            mode_dirs = sorted(e.path for e in mode_entries
+                               if e.is_dir() and not e.name.startswith('.'))
+        for mode_dir in mode_dirs:
+            with os.scandir(mode_dir) as iter_entries:
+                iters = [(int(m.group(1)), e.path) for e in iter_entries
+                         if e.is_dir() and (m := ITER_DIR_PATTERN.match(e.name))]
+            trials.extend(Path(path) for _, path in sorted(iters))
+
+    return trials
+
+
+def read_trial_dirs(lines: Iterable[str]) -> Iterator[Path]:
+    """標準入力などから 1 行 1 ディレクトリで読み込む"""
+    for line in lines:
+        line = line.strip()
+        if line:
+            yield Path(line)
+
+
+def describe_trial(trial_dir: Path) -> dict:
+    """パスからタスク ID・モード・イテレーション番号を取り出す"""
+    match = ITER_DIR_PATTERN.match(trial_dir.name)
+    return {
+        "trial_dir": str(trial_dir),
+        "task": trial_dir.parent.parent.name if match else None,
+        "mode": trial_dir.parent.name if match else None,
+        "iteration": int(match.group(1)) if match else None,
+    }
+
+
+def run_code_grader(trial_dir: Path) -> dict:
+    """コードベース採点（code-grader.sh --json の出力 + タスクの success_criteria 判定）"""
+    return code_grader.grade_project(str(trial_dir), task_id=describe_trial(trial_dir)["task"])
+
+
+def grade_trial(trial_dir: Path, use_llm: bool = False, concurrency: int = 1,
+                timeout: Optional[float] = model_grader.DEFAULT_TIMEOUT_SECONDS,
+                client=None, cache=None, write: bool = False) -> dict:
+    """1 トライアルを採点（write=True なら grading-result.json も書き出す）"""
+    record = describe_trial(trial_dir)
+
+    code_grading = run_code_grader(trial_dir)
+    model_grading = model_grader.run_grading(
+        trial_dir, use_llm=use_llm, concurrency=concurrency,
+        timeout=timeout, client=client, cache=cache
+    )
+
+    record["code_grading"] = code_grading
+    record["model_grading"] = model_grading
+
+    if write:
+        grading_result = {
+            "timestamp": datetime.now().astimezone().isoformat(timespec="seconds"),
+            "project_dir": str(trial_dir),
+            "code_grading": code_grading,
+            "model_grading": model_grading,
+        }
+        # 集計側が書き込み途中のファイルを読まないよう、一時ファイル経由で置き換える
+        tmp_path = trial_dir / "grading-result.json.tmp"
+        tmp_path.write_text(json.dumps(grading_result, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        os.replace(tmp_path, trial_dir / "grading-result.json")
+
+    return record
+
+
+def grade_trials(trial_dirs: Iterable[Path], jobs: int, **kwargs) -> Iterator[dict]:
+    """ワーカープールで採点し、完了した順に結果を返す"""
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = {executor.submit(grade_trial, d, **kwargs): d for d in trial_dirs}
+        for future in as_completed(futures):
+            trial_dir = futures[future]
+            try:
+                yield future.result()
+            except Exception as e:
+                record = describe_trial(trial_dir)
+                record["error"] = str(e)
+                yield record
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch grader for evals v3 trial directories")
+    parser.add_argument("results_root", type=Path, nargs="?", default=None,
+                       help="Run directory containing <task>/<mode>/iter-N")
+    parser.add_argument("--stdin", action="store_true",
+                       help="Read trial directories from stdin (one per line)")
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 4,
+                       help="Number of worker threads (default: CPU count)")
+    parser.add_argument("--write", action="store_true",
+                       help="Write grading-result.json into each trial directory")
+    parser.add_argument("--no-llm", action="store_true",
+                       help="Use mock evaluation instead of LLM")
+    parser.add_argument("--concurrency", type=int, default=1,
+                       help="Max concurrent LLM requests per trial")
+    parser.add_argument("--timeout", type=float, default=model_grader.DEFAULT_TIMEOUT_SECONDS,
+                       help="Per-request LLM timeout in seconds")
+    parser.add_argument("--cache-dir", type=Path, default=model_grader.DEFAULT_CACHE_DIR,
+                       help="Grading cache directory")
+    parser.add_argument("--no-cache", action="store_true",
+                       help="Disable the grading cache")
+
+    args = parser.parse_args()
+
+    if args.stdin == (args.results_root is not None):
+        parser.error("specify either <results_root> or --stdin")
+    if args.jobs < 1:
+        parser.error("--jobs must be >= 1")
+
+    if args.stdin:
+        trial_dirs = list(read_trial_dirs(sys.stdin))
+    else:
+        if not args.results_root.is_dir():
+            print(f"Error: Results directory not found: {args.results_root}", file=sys.stderr)
+            sys.exit(1)
+        trial_dirs = find_trial_dirs(args.results_root)
+
+    use_llm = not args.no_llm
+    client = None
+    if use_llm and model_grader.HAS_ANTHROPIC and os.environ.get("ANTHROPIC_API_KEY"):
+        client = model_grader.create_client()
+
+    if args.write:
+        # ストアは ingest-results.py で作り直す
+        run_dirs = {trial_dir.parent.parent.parent for trial_dir in trial_dirs
+                    if describe_trial(trial_dir)["iteration"] is not None}
+        for run_dir in run_dirs:
+            results_store.remove_store(run_dir)
+
+    cache = None if args.no_cache else model_grader.GradingCache(args.cache_dir)
+    failed = 0
+    try:
+        for record in grade_trials(trial_dirs, args.jobs, use_llm=use_llm,
+                                   concurrency=args.concurrency, timeout=args.timeout,
+                                   client=client, cache=cache, write=args.write):
+            if "error" in record:
+                failed += 1
+                print(f"Warning: grading failed for {record['trial_dir']}: {record['error']}",
+                      file=sys.stderr)
+            print(json.dumps(record, ensure_ascii=False), flush=True)
+    finally:
+        if cache is not None:
+            cache.close()
+
+    print(f"Graded {len(trial_dirs) - failed}/{len(trial_dirs)} trials", file=sys.stderr)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+code-grader.py - コードベースグレーダー（Python 版）
+
+code-grader.sh と同じ採点を 1 プロセス内で行う。
+採点ルールと重みはタスク YAML（tasks/vague-prompts.yaml の graders.code_based）から
+読み込み、rule_engine.py で 1 回だけコンパイルする。
+Plans.md は 1 回だけ読み込んで全ルールを 1 パスで適用し、
+プロジェクトツリーも os.scandir で 1 回だけ走査する。
+--json の出力は code-grader.sh とバイト単位で一致する（--task 指定時を除く）。
+
+使用法:
+  python code-grader.py <project_dir> [--json]
+  python code-grader.py <project_dir> --task VP-01 [--tasks-file <yaml>]
+
+モジュールとして:
+  result = grade_project(project_dir)  # code-grader.sh --json の出力を json.loads したものと同じ
+  result = grade_project(project_dir, task_id="VP-01")  # success_criteria の判定を追加
+"""
+
+import os
+import sys
+import json
+import argparse
+from pathlib import Path
+from typing import Optional
+
+# ルールエンジン（同じディレクトリの rule_engine.py）
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import rule_engine
+
+DEFAULT_TASKS_FILE = Path(__file__).resolve().parent.parent / "tasks" / "vague-prompts.yaml"
+
+
+def grade_project(project_dir, task_id: Optional[str] = None,
+                  tasks_file: Path = DEFAULT_TASKS_FILE) -> dict:
+    """全グレーダーを実行し、code-grader.sh --json と同じ構造の結果を返す
+
+    task_id を指定すると、そのタスクの success_criteria の判定結果を
+    "success_criteria" として追加する（タスクが YAML にない場合は追加しない）。
+    """
+    if not os.path.isdir(project_dir):
+        raise FileNotFoundError(f"Project directory not found: {project_dir}")
+
+    rules, tasks = rule_engine.load_task_file(tasks_file)
+    values = rules.evaluate(project_dir)
+    result = rules.score(values)
+
+    task = tasks.get(task_id) if task_id else None
+    if task is not None and task.get("success_criteria"):
+        result["success_criteria"] = rules.check_criteria(values, task["success_criteria"])
+
+    result["project_dir"] = str(project_dir)
+    return result
+
+
+def format_json(result: dict) -> str:
+    """code-grader.sh --json と同じレイアウトの JSON 文字列"""
+    lines = ["{", '  "graders": {']
+    entries = []
+    for name, grader in result["graders"].items():
+        fields = ", ".join(f'"{key}": {value}' for key, value in grader.items())
+        entries.append(f'    "{name}": {{{fields}}}')
+    lines.append(",\n".join(entries))
+    lines.append("  },")
+    lines.append(f'  "weighted_score": {result["weighted_score"]:.2f},')
+    lines.append(f'  "max_score": {result["max_score"]:.2f},')
+    lines.append(f'  "normalized_score": {result["normalized_score"]:.1f},')
+    if "success_criteria" in result:
+        lines.append(f'  "success_criteria": {json.dumps(result["success_criteria"], ensure_ascii=False)},')
+    lines.append(f'  "project_dir": {json.dumps(result["project_dir"], ensure_ascii=False)}')
+    lines.append("}")
+    return "\n".join(lines)
+
+
+def format_text(result: dict) -> str:
+    """code-grader.sh のテキスト出力と同じ表"""
+    graders = result["graders"]
+    lines = [
+        "=== Code-Based Grader Results ===",
+        "",
+        f"Project: {result['project_dir']}",
+        "",
+        "| Grader                  | Value | Weight |",
+        "|-------------------------|-------|--------|",
+    ]
+    for name, grader in graders.items():
+        if "score" in grader:
+            # 区間スコアのグレーダーはスコアを表示し、生の値を併記
+            label = name.replace("_count", "_score")
+            lines.append(f"| {label:<23} | {grader['score']:5d} | {grader['weight']:6.1f} |"
+                         f" (raw lines: {grader['value']})")
+        else:
+            lines.append(f"| {name:<23} | {grader['value']:5d} | {grader['weight']:6.1f} |")
+    lines.append("")
+    lines.append(f"Weighted Score: {result['weighted_score']:.2f} / {result['max_score']:.2f}")
+    lines.append(f"Normalized Score: {result['normalized_score']:.1f} / 100")
+    if "success_criteria" in result:
+        criteria = result["success_criteria"]
+        lines.append("")
+        lines.append(f"Success Criteria: {'PASS' if criteria['pass'] else 'FAIL'}")
+        for key, check in criteria["checks"].items():
+            lines.append(f"  {key}: {check['status']} (expected: {check['expected']}, value: {check.get('value', '-')})")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Code-based grader for evals v3")
+    parser.add_argument("project_dir", nargs="?", default=".",
+                       help="Project directory to grade (default: .)")
+    parser.add_argument("--json", action="store_true",
+                       help="Output in JSON format")
+    parser.add_argument("--task", default=None,
+                       help="Task ID whose success_criteria should be checked (e.g. VP-01)")
+    parser.add_argument("--tasks-file", type=Path, default=DEFAULT_TASKS_FILE,
+                       help="Task YAML with graders.code_based rules")
+
+    args = parser.parse_args()
+
+    try:
+        result = grade_project(args.project_dir, args.task, args.tasks_file)
+    except FileNotFoundError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print(format_json(result) if args.json else format_text(result))
+
+
+if __name__ == "__main__":
+    main()
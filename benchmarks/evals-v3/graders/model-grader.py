@@ -7,17 +7,26 @@ Anthropic Evals ガイドライン準拠: 校正可能、参照解との比較
 
 使用法:
   python model-grader.py <project_dir> [--reference <ref_file>] [--json]
+  python model-grader.py <project_dir> --concurrency 5 --timeout 30
+  python model-grader.py <project_dir> [--cache-dir <dir> | --no-cache]
 
 必要環境変数:
   ANTHROPIC_API_KEY: Anthropic API キー
+  ANTHROPIC_BASE_URL: （任意）Messages API のエンドポイント（ローカルのフェイクサーバー等）
 """
 
 import os
 import sys
 import json
 import re
+import time
+import hashlib
+import sqlite3
 import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Dict, Optional
 
 # Anthropic SDK のインポート（なければスキップ）
 try:
@@ -27,6 +36,21 @@ except ImportError:
     HAS_ANTHROPIC = False
 
 
+# 評価に使用するモデル（高速・低コスト）
+DEFAULT_MODEL = "claude-3-5-haiku-20241022"
+
+# モック評価のキャッシュキーに使う識別子（mock_evaluate のロジック変更時に更新）
+MOCK_MODEL_ID = "mock-heuristic-v1"
+
+# 1 リクエストあたりのタイムアウト（秒）
+DEFAULT_TIMEOUT_SECONDS = 30.0
+
+# 採点キャッシュの設定
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent.parent / ".cache" / "model-grader"
+DEFAULT_CACHE_MAX_ENTRIES = 100_000
+DEFAULT_CACHE_MAX_AGE_DAYS = 30
+
+
 # グレーダー定義
 GRADERS = {
     "plan_quality": {
@@ -180,37 +204,184 @@ def extract_score_from_response(text: str) -> int:
     return 3
 
 
-def evaluate_with_llm(content: str, grader_name: str, grader_config: dict) -> int:
-    """LLM でグレーディングを実行"""
+def create_client():
+    """Anthropic クライアントを生成（SDK または API キーがなければ None）
+
+    ANTHROPIC_BASE_URL が設定されていれば SDK がそのエンドポイントを使用する。
+    """
     if not HAS_ANTHROPIC:
         print("Warning: anthropic SDK not installed. Using mock score.", file=sys.stderr)
-        return 3  # デフォルトスコア
+        return None
 
     api_key = os.environ.get("ANTHROPIC_API_KEY")
     if not api_key:
         print("Warning: ANTHROPIC_API_KEY not set. Using mock score.", file=sys.stderr)
-        return 3
+        return None
+
+    return anthropic.Anthropic(api_key=api_key)
 
-    client = anthropic.Anthropic(api_key=api_key)
 
+def request_llm_score(content: str, grader_config: dict, client,
+                      timeout: Optional[float] = None) -> int:
+    """LLM に 1 回問い合わせてスコア（1-5）を返す。失敗時は例外を送出する"""
     prompt = grader_config["prompt"].format(content=content)
 
-    try:
-        response = client.messages.create(
-            model="claude-3-5-haiku-20241022",  # 高速・低コスト
-            max_tokens=10,
-            messages=[{"role": "user", "content": prompt}]
-        )
+    request = {
+        "model": DEFAULT_MODEL,
+        "max_tokens": 10,
+        "messages": [{"role": "user", "content": prompt}]
+    }
+    if timeout is not None:
+        request["timeout"] = timeout
+
+    response = client.messages.create(**request)
+
+    # レスポンスからスコアを正規表現で抽出
+    text = response.content[0].text.strip()
+    score = extract_score_from_response(text)
+    return max(1, min(5, score))  # 1-5 に制限
+
+
+def evaluate_with_llm(content: str, grader_name: str, grader_config: dict,
+                      client=None, timeout: Optional[float] = None) -> int:
+    """LLM でグレーディングを実行
 
-        # レスポンスからスコアを正規表現で抽出
-        text = response.content[0].text.strip()
-        score = extract_score_from_response(text)
-        return max(1, min(5, score))  # 1-5 に制限
+    client を渡すと共有クライアントを使う（並列実行時）。
+    省略時は呼び出しごとにクライアントを生成する。
+    """
+    if client is None:
+        client = create_client()
+        if client is None:
+            return 3  # デフォルトスコア
+
+    try:
+        return request_llm_score(content, grader_config, client, timeout)
     except Exception as e:
         print(f"Warning: LLM evaluation failed for {grader_name}: {e}", file=sys.stderr)
         return 3
 
 
+def evaluate_graders_with_llm(content: str, client, graders: Optional[Dict[str, dict]] = None,
+                              max_concurrency: int = len(GRADERS),
+                              timeout: Optional[float] = DEFAULT_TIMEOUT_SECONDS) -> Dict[str, Optional[int]]:
+    """グレーダーのプロンプトを共有クライアントで送信（max_concurrency > 1 なら同時に）
+
+    graders: 評価するグレーダー（省略時は GRADERS 全体）
+    max_concurrency: 同時リクエスト数の上限
+    timeout: 1 リクエストあたりのタイムアウト（秒）
+
+    Returns:
+        {grader_name: score}（graders と同じ順序）。失敗したグレーダーは None
+    """
+    if graders is None:
+        graders = GRADERS
+
+    def score_one(name: str, config: dict) -> Optional[int]:
+        try:
+            return request_llm_score(content, config, client, timeout)
+        except Exception as e:
+            print(f"Warning: LLM evaluation failed for {name}: {e}", file=sys.stderr)
+            return None
+
+    workers = max(1, min(max_concurrency, len(graders)))
+    if workers == 1:
+        return {name: score_one(name, config) for name, config in graders.items()}
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            name: executor.submit(score_one, name, config)
+            for name, config in graders.items()
+        }
+        return {name: future.result() for name, future in futures.items()}
+
+
+class GradingCache:
+    """採点結果のコンテンツアドレス型キャッシュ（SQLite）
+
+    キーは Plans.md の内容・グレーダー名・プロンプトテンプレート・モデル ID の
+    ハッシュ。max_age_days を超えたエントリと、max_entries を超えた分の
+    最終アクセスが古いエントリを削除する。
+    """
+
+    def __init__(self, cache_dir: Path, max_entries: int = DEFAULT_CACHE_MAX_ENTRIES,
+                 max_age_days: float = DEFAULT_CACHE_MAX_AGE_DAYS):
+        self.cache_dir = Path(cache_dir)
+        self.max_entries = max_entries
+        self.max_age_days = max_age_days
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            str(self.cache_dir / "grading-cache.sqlite3"),
+            timeout=30, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS scores ("
+            " key TEXT PRIMARY KEY,"
+            " score INTEGER NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_scores_accessed ON scores (accessed_at)")
+        self._conn.commit()
+        self.evict()
+
+    @staticmethod
+    def make_key(content: str, grader_name: str, prompt_template: str, model_id: str) -> str:
+        """キャッシュキー（SHA-256）を算出"""
+        digest = hashlib.sha256()
+        for part in (content, grader_name, prompt_template, model_id):
+            encoded = part.encode("utf-8")
+            digest.update(len(encoded).to_bytes(8, "big"))
+            digest.update(encoded)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[int]:
+        """キャッシュ済みスコアを返す（なければ None）"""
+        with self._lock:
+            row = self._conn.execute("SELECT score FROM scores WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute("UPDATE scores SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            return row[0]
+
+    def put(self, key: str, score: int):
+        """スコアを保存"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO scores (key, score, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, score, now, now)
+            )
+            self._conn.commit()
+
+    def evict(self):
+        """期限切れ・上限超過のエントリを削除"""
+        with self._lock:
+            cutoff = time.time() - self.max_age_days * 86400
+            self._conn.execute("DELETE FROM scores WHERE created_at < ?", (cutoff,))
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM scores").fetchone()
+            overflow = count - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM scores WHERE key IN"
+                    " (SELECT key FROM scores ORDER BY accessed_at ASC LIMIT ?)",
+                    (overflow,)
+                )
+            self._conn.commit()
+
+    def close(self):
+        """接続を閉じる"""
+        with self._lock:
+            self._conn.close()
+
+
 def mock_evaluate(content: str, grader_name: str) -> int:
     """モック評価（API キーがない場合のフォールバック）"""
     # 簡易的なヒューリスティック
@@ -244,8 +415,16 @@ def mock_evaluate(content: str, grader_name: str) -> int:
     return max(1, min(5, score))
 
 
-def run_grading(project_dir: Path, reference_path: Path = None, use_llm: bool = True) -> dict:
-    """グレーディングを実行"""
+def run_grading(project_dir: Path, reference_path: Path = None, use_llm: bool = True,
+                concurrency: int = 1, timeout: Optional[float] = DEFAULT_TIMEOUT_SECONDS,
+                client=None, cache: Optional[GradingCache] = None) -> dict:
+    """グレーディングを実行
+
+    concurrency: LLM 評価の同時リクエスト数（1 なら逐次実行）
+    timeout: LLM 1 リクエストあたりのタイムアウト（秒）
+    client: 共有する Anthropic クライアント（省略時は必要に応じて生成）
+    cache: 採点キャッシュ（None なら毎回評価）
+    """
     content = read_plans_md(project_dir)
     reference = read_reference_solution(reference_path) if reference_path else ""
 
@@ -270,12 +449,42 @@ def run_grading(project_dir: Path, reference_path: Path = None, use_llm: bool =
         results["normalized_score"] = round((results["weighted_score"] / results["max_score"]) * 100, 1)
         return results
 
-    # 各グレーダーを実行
-    for name, config in GRADERS.items():
-        if use_llm and HAS_ANTHROPIC and os.environ.get("ANTHROPIC_API_KEY"):
-            score = evaluate_with_llm(content, name, config)
+    use_llm = use_llm and (client is not None or (HAS_ANTHROPIC and bool(os.environ.get("ANTHROPIC_API_KEY"))))
+    model_id = DEFAULT_MODEL if use_llm else MOCK_MODEL_ID
+
+    # キャッシュ済みのスコアを取得
+    scores = {}
+    cache_keys = {}
+    if cache is not None:
+        for name, config in GRADERS.items():
+            cache_keys[name] = GradingCache.make_key(content, name, config["prompt"], model_id)
+            cached = cache.get(cache_keys[name])
+            if cached is not None:
+                scores[name] = cached
+
+    pending = {name: config for name, config in GRADERS.items() if name not in scores}
+
+    if pending:
+        if use_llm:
+            # LLM 評価はクライアントを 1 つだけ生成して全グレーダーで共有
+            if client is None:
+                client = create_client()
+            fresh = evaluate_graders_with_llm(content, client, pending, concurrency, timeout)
         else:
-            score = mock_evaluate(content, name)
+            fresh = {name: mock_evaluate(content, name) for name in pending}
+
+        for name, score in fresh.items():
+            if score is None:
+                # 失敗時のデフォルトスコアはキャッシュしない
+                scores[name] = 3
+                continue
+            scores[name] = score
+            if cache is not None:
+                cache.put(cache_keys[name], score)
+
+    # 各グレーダーの結果を集計
+    for name, config in GRADERS.items():
+        score = scores[name]
 
         results["graders"][name] = {
             "score": score,
@@ -319,14 +528,33 @@ def main():
                        help="Output in JSON format")
     parser.add_argument("--no-llm", action="store_true",
                        help="Use mock evaluation instead of LLM")
+    parser.add_argument("--concurrency", type=int, default=1,
+                       help=f"Max concurrent LLM requests (1 = sequential, max {len(GRADERS)})")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT_SECONDS,
+                       help=f"Per-request LLM timeout in seconds (default: {DEFAULT_TIMEOUT_SECONDS:g})")
+    parser.add_argument("--cache-dir", type=Path, default=DEFAULT_CACHE_DIR,
+                       help=f"Grading cache directory (default: {DEFAULT_CACHE_DIR})")
+    parser.add_argument("--no-cache", action="store_true",
+                       help="Disable the grading cache")
 
     args = parser.parse_args()
 
-    results = run_grading(
-        project_dir=args.project_dir,
-        reference_path=args.reference,
-        use_llm=not args.no_llm
-    )
+    if args.concurrency < 1:
+        parser.error("--concurrency must be >= 1")
+
+    cache = None if args.no_cache else GradingCache(args.cache_dir)
+    try:
+        results = run_grading(
+            project_dir=args.project_dir,
+            reference_path=args.reference,
+            use_llm=not args.no_llm,
+            concurrency=args.concurrency,
+            timeout=args.timeout,
+            cache=cache
+        )
+    finally:
+        if cache is not None:
+            cache.close()
 
     print_results(results, "json" if args.json else "text")
 
@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+rule_engine.py - 宣言的なコードベース採点ルールのエンジン
+
+タスク YAML の graders.code_based（ルールと重み）と graders.criteria
+（success_criteria のキー → グレーダー）を読み込み、1 回だけコンパイルする。
+ファイルごとに 1 回読み込み、そのファイルを対象とする全ルールを 1 パスで評価する。
+
+ルールの種類:
+  count: exists    ファイルが存在すれば 1
+  count: newlines  改行の数（wc -l）
+  count: lines     pattern / keywords にマッチした行数（grep -c）
+  count: any       1 行でもマッチすれば 1（grep -q）
+  files:           プロジェクトツリー内の該当ファイル数（find）
+
+keywords はルールをまたいで 1 つのキーワード照合器にまとめるため、
+キーワードのルールを追加してもファイルの走査回数は増えない。
+
+使用例:
+  rules = load_rules(Path("tasks/vague-prompts.yaml"))
+  values = rules.evaluate(project_dir)
+  result = rules.score(values)
+"""
+
+import os
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import yaml
+
+
+LINE_COUNT_MODES = ("lines", "any")
+FILE_COUNT_MODES = ("exists", "newlines") + LINE_COUNT_MODES
+
+# success_criteria の比較式（">= 1" など）
+CRITERION_PATTERN = re.compile(r"^\s*(>=|<=|==|>|<)\s*(\d+)\s*$")
+
+
+@dataclass
+class Rule:
+    """1 つのグレーダー定義"""
+    name: str
+    count: str  # FILE_COUNT_MODES のいずれか、または "files"
+    file: Optional[str] = None
+    pattern: Optional[re.Pattern] = None
+    keywords: Tuple[str, ...] = ()
+    ignore_case: bool = False
+    suffixes: Tuple[str, ...] = ()
+    exclude: Tuple[str, ...] = ()
+    weight: Optional[float] = None  # None なら採点に使わない（success_criteria 専用）
+    cap: Optional[int] = None
+    scale: float = 1.0
+    bands: List[Tuple[int, Optional[int], int]] = field(default_factory=list)  # (下限, 上限, スコア)
+
+    def band_score(self, value: int) -> int:
+        """scoring の区間から値をスコアに変換"""
+        for low, high, score in self.bands:
+            if value >= low and (high is None or value <= high):
+                return score
+        return 0
+
+    @property
+    def max_value(self) -> int:
+        """スコア計算上の最大値"""
+        if self.bands:
+            return max(score for _, _, score in self.bands)
+        if self.count in ("exists", "any"):
+            return 1
+        return self.cap
+
+
+class KeywordMatcher:
+    """複数ルールのキーワードをまとめた照合器
+
+    全キーワードを長い順に並べた先読みの選択（(?=(k1|k2|...))）を 1 つにコンパイルし、
+    各位置で最長一致したキーワードから、その接頭辞になっているキーワードのルールも含めて
+    マッチしたルールを求める（同じ位置で一致し得るのは最長一致の接頭辞だけなので取りこぼさない）。
+    """
+
+    def __init__(self, keywords_by_rule: Dict[str, Sequence[str]], ignore_case: bool = False):
+        self.ignore_case = ignore_case
+        rules_by_keyword: Dict[str, Set[str]] = {}
+        for rule_name, keywords in keywords_by_rule.items():
+            for keyword in keywords:
+                key = keyword.lower() if ignore_case else keyword
+                rules_by_keyword.setdefault(key, set()).add(rule_name)
+
+        keywords = sorted(rules_by_keyword, key=len, reverse=True)
+        self.rules_at: Dict[str, frozenset] = {
+            keyword: frozenset().union(*(rules_by_keyword[k] for k in keywords if keyword.startswith(k)))
+            for keyword in keywords
+        }
+        self.regex = re.compile("(?=(" + "|".join(map(re.escape, keywords)) + "))") if keywords else None
+
+    def match(self, line: str) -> Set[str]:
+        """行にキーワードが含まれるルール名の集合"""
+        if self.regex is None:
+            return set()
+        if self.ignore_case:
+            line = line.lower()
+        matched: Set[str] = set()
+        for m in self.regex.finditer(line):
+            matched |= self.rules_at[m.group(1)]
+        return matched
+
+
+class CompiledRules:
+    """コンパイル済みのルール集合"""
+
+    def __init__(self, rules: List[Rule], criteria: Dict[str, str]):
+        self.rules = rules
+        self.criteria = criteria
+        self.by_name = {rule.name: rule for rule in rules}
+
+        for key, rule_name in criteria.items():
+            if rule_name not in self.by_name:
+                raise ValueError(f"criteria '{key}' refers to unknown grader: {rule_name}")
+
+        # 対象ファイルごとにルールをまとめ、キーワードは照合器に集約
+        self.file_rules: Dict[str, List[Rule]] = {}
+        for rule in rules:
+            if rule.file is not None:
+                self.file_rules.setdefault(rule.file, []).append(rule)
+        self.matchers: Dict[str, List[KeywordMatcher]] = {}
+        for file_name, file_rules in self.file_rules.items():
+            matchers = []
+            for ignore_case in (False, True):
+                keywords = {r.name: r.keywords for r in file_rules
+                            if r.keywords and r.ignore_case == ignore_case}
+                if keywords:
+                    matchers.append(KeywordMatcher(keywords, ignore_case))
+            self.matchers[file_name] = matchers
+
+        self.tree_rules = [rule for rule in rules if rule.count == "files"]
+        self.scored = [rule for rule in rules if rule.weight is not None]
+
+    def _evaluate_file(self, project_dir: Path, file_name: str, values: Dict[str, int]):
+        """1 ファイルを 1 回読み込み、そのファイルの全ルールを評価"""
+        rules = self.file_rules[file_name]
+        path = project_dir / file_name
+        if not path.is_file():
+            return
+
+        for rule in rules:
+            if rule.count == "exists":
+                values[rule.name] = 1
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return
+
+        for rule in rules:
+            if rule.count == "newlines":
+                values[rule.name] = data.count(b"\n")
+
+        line_rules = [r for r in rules if r.count in LINE_COUNT_MODES]
+        if not line_rules:
+            return
+
+        # grep と同じく、末尾の改行の後は行として数えない
+        lines = data.decode("utf-8", errors="surrogateescape").split("\n")
+        if lines and lines[-1] == "":
+            lines.pop()
+
+        pattern_rules = [r for r in line_rules if r.pattern is not None]
+        matchers = self.matchers[file_name]
+        for line in lines:
+            matched: Set[str] = set()
+            for matcher in matchers:
+                matched |= matcher.match(line)
+            for rule in pattern_rules:
+                if rule.pattern.search(line):
+                    matched.add(rule.name)
+            for name in matched:
+                values[name] += 1
+
+        for rule in line_rules:
+            if rule.count == "any":
+                values[rule.name] = min(values[rule.name], 1)
+
+    def _evaluate_tree(self, project_dir: Path, values: Dict[str, int]):
+        """プロジェクトツリーを 1 回走査し、files ルールを評価
+
+        find と同じく名前の末尾（suffixes）で判定し、exclude は "./..." 形式の
+        相対パス全体に対する部分一致で除外する。シンボリックリンク先はたどらない。
+        """
+        stack = [(str(project_dir), ".")]
+        while stack:
+            dir_path, rel_dir = stack.pop()
+            try:
+                with os.scandir(dir_path) as entries:
+                    for entry in entries:
+                        rel_path = f"{rel_dir}/{entry.name}"
+                        for rule in self.tree_rules:
+                            if (entry.name.endswith(rule.suffixes)
+                                    and not any(s in rel_path for s in rule.exclude)):
+                                values[rule.name] += 1
+                        try:
+                            is_dir = entry.is_dir(follow_symlinks=False)
+                        except OSError:
+                            is_dir = False
+                        if is_dir:
+                            stack.append((entry.path, rel_path))
+            except OSError:
+                continue
+
+    def evaluate(self, project_dir) -> Dict[str, int]:
+        """全ルールの値（グレーダー名 → 値）を計算"""
+        project_dir = Path(project_dir)
+        values = {rule.name: 0 for rule in self.rules}
+        for file_name in self.file_rules:
+            self._evaluate_file(project_dir, file_name, values)
+        if self.tree_rules:
+            self._evaluate_tree(project_dir, values)
+        return values
+
+    def score(self, values: Dict[str, int]) -> dict:
+        """重み付きスコアを計算（code-grader.sh と同じ演算順序・丸め）"""
+        weighted = 0.0
+        max_score = 0.0
+        graders = {}
+        for rule in self.scored:
+            value = values[rule.name]
+            if rule.bands:
+                effective = rule.band_score(value)
+                graders[rule.name] = {"value": value, "score": effective, "weight": rule.weight}
+            else:
+                effective = value if rule.cap is None else min(value, rule.cap)
+                graders[rule.name] = {"value": value, "weight": rule.weight}
+            weighted += effective * rule.weight * rule.scale
+            max_score += rule.max_value * rule.weight * rule.scale
+
+        # シェル版は小数 2 桁に丸めた文字列から正規化スコアを計算する
+        weighted = float(f"{weighted:.2f}")
+        max_score = float(f"{max_score:.2f}")
+        return {
+            "graders": graders,
+            "weighted_score": weighted,
+            "max_score": max_score,
+            "normalized_score": float(f"{(weighted / max_score) * 100:.1f}") if max_score else 0.0,
+        }
+
+    def check_criteria(self, values: Dict[str, int], success_criteria: Dict[str, object]) -> dict:
+        """タスクの success_criteria を判定
+
+        true は「値 >= 1」、false は「値 == 0」、">= N" などは比較式として扱う。
+        criteria に対応するグレーダーがないキーは判定せず skip とする。
+        """
+        checks = {}
+        for key, expected in success_criteria.items():
+            rule_name = self.criteria.get(key)
+            if rule_name is None:
+                checks[key] = {"status": "skip", "expected": expected}
+                continue
+            value = values[rule_name]
+            checks[key] = {"status": "pass" if _satisfies(value, expected) else "fail",
+                           "expected": expected, "value": value}
+        evaluated = [c for c in checks.values() if c["status"] != "skip"]
+        return {"pass": all(c["status"] == "pass" for c in evaluated), "checks": checks}
+
+
+def _satisfies(value: int, expected) -> bool:
+    if expected is True:
+        return value >= 1
+    if expected is False:
+        return value == 0
+    if isinstance(expected, int):
+        return value == expected
+    m = CRITERION_PATTERN.match(str(expected))
+    if not m:
+        raise ValueError(f"Unsupported success criterion: {expected!r}")
+    op, threshold = m.group(1), int(m.group(2))
+    return {">=": value >= threshold, "<=": value <= threshold, "==": value == threshold,
+            ">": value > threshold, "<": value < threshold}[op]
+
+
+def _parse_bands(scoring: Dict[str, int]) -> List[Tuple[int, Optional[int], int]]:
+    """scoring（"0" / "1-20" / "101+" → スコア）を区間に変換"""
+    bands = []
+    for key, score in scoring.items():
+        key = str(key)
+        if key.endswith("+"):
+            bands.append((int(key[:-1]), None, int(score)))
+        elif "-" in key:
+            low, high = key.split("-", 1)
+            bands.append((int(low), int(high), int(score)))
+        else:
+            bands.append((int(key), int(key), int(score)))
+    return bands
+
+
+def compile_rule(spec: dict) -> Rule:
+    """YAML の 1 グレーダー定義を Rule にコンパイル"""
+    name = spec.get("name")
+    if not name:
+        raise ValueError(f"grader without name: {spec}")
+
+    files = spec.get("files")
+    if files is not None:
+        count = "files"
+    else:
+        count = spec.get("count")
+        if count is None:
+            count = "lines" if ("pattern" in spec or "keywords" in spec) else None
+        if count not in FILE_COUNT_MODES:
+            raise ValueError(f"grader '{name}': unknown count: {count}")
+        if count in LINE_COUNT_MODES and not ("pattern" in spec or "keywords" in spec):
+            raise ValueError(f"grader '{name}': count '{count}' needs pattern or keywords")
+        if "file" not in spec:
+            raise ValueError(f"grader '{name}': file is required")
+
+    weight = spec.get("weight")
+    cap = spec.get("max")
+    bands = _parse_bands(spec["scoring"]) if "scoring" in spec else []
+    if weight is not None and count in ("lines", "newlines", "files") and cap is None and not bands:
+        raise ValueError(f"grader '{name}': scored counts need max or scoring")
+
+    return Rule(
+        name=name,
+        count=count,
+        file=spec.get("file") if files is None else None,
+        pattern=re.compile(spec["pattern"]) if "pattern" in spec else None,
+        keywords=tuple(spec.get("keywords", ())),
+        ignore_case=bool(spec.get("ignore_case", False)),
+        suffixes=tuple(files.get("suffixes", ())) if files else (),
+        exclude=tuple(files.get("exclude", ())) if files else (),
+        weight=float(weight) if weight is not None else None,
+        cap=cap,
+        scale=float(spec.get("scale", 1.0)),
+        bands=bands,
+    )
+
+
+def compile_rules(data: dict) -> CompiledRules:
+    """タスク YAML（読み込み済み）の graders セクションをコンパイル"""
+    graders = (data or {}).get("graders", {})
+    specs = graders.get("code_based")
+    if not specs:
+        raise ValueError("graders.code_based is not defined")
+    return CompiledRules([compile_rule(spec) for spec in specs], dict(graders.get("criteria") or {}))
+
+
+_CACHE: Dict[str, Tuple[int, CompiledRules, dict]] = {}
+
+
+def load_task_file(yaml_path: Path) -> Tuple[CompiledRules, dict]:
+    """タスク YAML を読み込み、(コンパイル済みルール, タスク ID → タスク定義) を返す
+
+    同じプロセス内では mtime が変わらない限りコンパイル結果を再利用する。
+    """
+    key = str(Path(yaml_path).resolve())
+    mtime = os.stat(key).st_mtime_ns
+    cached = _CACHE.get(key)
+    if cached is not None and cached[0] == mtime:
+        return cached[1], cached[2]
+
+    with open(key, "r", encoding="utf-8") as f:
+        data = yaml.safe_load(f)
+    rules = compile_rules(data)
+    tasks = {task["id"]: task for task in data.get("tasks", []) if "id" in task}
+    _CACHE[key] = (mtime, rules, tasks)
+    return rules, tasks
+
+
+def load_rules(yaml_path: Path) -> CompiledRules:
+    """タスク YAML のルールだけを読み込む"""
+    return load_task_file(yaml_path)[0]
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+test-batch-grader.py - Batch Grader Unit Tests
+
+Usage: python test-batch-grader.py
+
+Exit codes:
+    0: All tests passed
+    1: One or more tests failed
+"""
+
+from __future__ import annotations
+
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+import subprocess
+from pathlib import Path
+
+# batch_grader をインポート（ハイフンをアンダースコアに変換）
+import importlib.util
+grader_path: Path = Path(__file__).parent.parent / "batch-grader.py"
+spec = importlib.util.spec_from_file_location("batch_grader", grader_path)
+if spec is None or spec.loader is None:
+    raise ImportError(f"Cannot load module from {grader_path}")
+batch_grader = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(batch_grader)
+
+FIXTURES: Path = Path(__file__).parent / "fixtures"
+
+
+def make_run_dir(root: Path, iterations: int = 2) -> Path:
+    """<task>/<mode>/iter-N 構造のテスト用 run ディレクトリを作成"""
+    run_dir: Path = root / "run"
+    for task in ["VP-01", "VP-02"]:
+        for mode in ["with-plugin", "no-plugin"]:
+            for i in range(1, iterations + 1):
+                trial: Path = run_dir / task / mode / f"iter-{i}"
+                (trial / "src").mkdir(parents=True)
+                (trial / "src" / "index.ts").write_text("export {}\n", encoding="utf-8")
+                if mode == "with-plugin":
+                    shutil.copy(FIXTURES / "comprehensive-plans.md", trial / "Plans.md")
+    return run_dir
+
+
+class TestFindTrialDirs(unittest.TestCase):
+    """find_trial_dirs のユニットテスト"""
+
+    def test_numeric_order(self) -> None:
+        """iter-10 は iter-2 の後に並ぶ"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            run_dir: Path = make_run_dir(Path(tmpdir), iterations=10)
+            trials: list = batch_grader.find_trial_dirs(run_dir)
+
+            self.assertEqual(len(trials), 40)
+            names: list = [t.name for t in trials[:10]]
+            self.assertEqual(names, [f"iter-{i}" for i in range(1, 11)])
+
+    def test_ignores_non_trial_entries(self) -> None:
+        """summary.json や隠しディレクトリは無視"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            run_dir: Path = make_run_dir(Path(tmpdir), iterations=1)
+            (run_dir / "summary.json").write_text("{}", encoding="utf-8")
+            (run_dir / ".index").mkdir()
+            (run_dir / "VP-01" / "with-plugin" / "notes").mkdir()
+
+            self.assertEqual(len(batch_grader.find_trial_dirs(run_dir)), 4)
+
+
+class TestGradeTrial(unittest.TestCase):
+    """grade_trial のユニットテスト"""
+
+    def test_record_fields(self) -> None:
+        """パスからタスク・モード・イテレーションを取り出す"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            run_dir: Path = make_run_dir(Path(tmpdir), iterations=1)
+            trial: Path = run_dir / "VP-02" / "with-plugin" / "iter-1"
+            record: dict = batch_grader.grade_trial(trial)
+
+            self.assertEqual(record["task"], "VP-02")
+            self.assertEqual(record["mode"], "with-plugin")
+            self.assertEqual(record["iteration"], 1)
+            self.assertTrue(record["model_grading"]["has_plans_md"])
+            self.assertEqual(record["code_grading"]["graders"]["plans_exists"]["value"], 1)
+
+    def test_write_grading_result(self) -> None:
+        """--write 相当で grading-result.json を書き出す"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            run_dir: Path = make_run_dir(Path(tmpdir), iterations=1)
+            trial: Path = run_dir / "VP-01" / "no-plugin" / "iter-1"
+            batch_grader.grade_trial(trial, write=True)
+
+            data: dict = json.loads((trial / "grading-result.json").read_text(encoding="utf-8"))
+            self.assertEqual(set(data), {"timestamp", "project_dir", "code_grading", "model_grading"})
+            self.assertFalse(data["model_grading"]["has_plans_md"])
+
+
+class TestBatchCli(unittest.TestCase):
+    """CLI（JSON Lines 出力）のテスト"""
+
+    def _run(self, args: list, stdin: str = "") -> subprocess.CompletedProcess:
+        return subprocess.run(
+            [sys.executable, str(grader_path), *args, "--no-llm", "--no-cache"],
+            input=stdin, capture_output=True, text=True
+        )
+
+    def test_results_root(self) -> None:
+        """results ルートを指定すると全トライアルを 1 行ずつ出力"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            run_dir: Path = make_run_dir(Path(tmpdir))
+            proc = self._run([str(run_dir), "--jobs", "4"])
+
+            self.assertEqual(proc.returncode, 0, proc.stderr)
+            records: list = [json.loads(line) for line in proc.stdout.splitlines()]
+            self.assertEqual(len(records), 8)
+            self.assertEqual({r["task"] for r in records}, {"VP-01", "VP-02"})
+
+    def test_stdin(self) -> None:
+        """標準入力からディレクトリ一覧を受け取る"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            run_dir: Path = make_run_dir(Path(tmpdir))
+            trials: list = [str(run_dir / "VP-01" / mode / "iter-1") for mode in ["with-plugin", "no-plugin"]]
+            proc = self._run(["--stdin", "--write"], stdin="\n".join(trials) + "\n")
+
+            self.assertEqual(proc.returncode, 0, proc.stderr)
+            self.assertEqual(len(proc.stdout.splitlines()), 2)
+            for trial in trials:
+                self.assertTrue((Path(trial) / "grading-result.json").exists())
+
+    def test_missing_dir_reported(self) -> None:
+        """存在しないディレクトリはエラー行として出力し、終了コード 1"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            proc = self._run(["--stdin"], stdin=str(Path(tmpdir) / "missing" / "iter-1") + "\n")
+
+            self.assertEqual(proc.returncode, 1)
+            self.assertIn("error", json.loads(proc.stdout.splitlines()[0]))
+
+
+if __name__ == "__main__":
+    # テスト実行
+    loader = unittest.TestLoader()
+    suite = loader.loadTestsFromModule(sys.modules[__name__])
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    # 終了コード
+    sys.exit(0 if result.wasSuccessful() else 1)
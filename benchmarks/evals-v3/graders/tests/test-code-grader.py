@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+test-code-grader.py - Python Code Grader Unit Tests
+
+code-grader.py の出力が code-grader.sh とバイト単位で一致することを確認する。
+
+Usage: python test-code-grader.py
+
+Exit codes:
+    0: All tests passed
+    1: One or more tests failed
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+import subprocess
+from pathlib import Path
+
+# code_grader をインポート（ハイフンをアンダースコアに変換）
+import importlib.util
+grader_path: Path = Path(__file__).parent.parent / "code-grader.py"
+spec = importlib.util.spec_from_file_location("code_grader", grader_path)
+if spec is None or spec.loader is None:
+    raise ImportError(f"Cannot load module from {grader_path}")
+code_grader = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(code_grader)
+rule_engine = code_grader.rule_engine
+
+SHELL_GRADER: Path = Path(__file__).parent.parent / "code-grader.sh"
+FIXTURES: Path = Path(__file__).parent / "fixtures"
+
+
+def run_shell_grader(project_dir: Path, *args: str) -> str:
+    proc = subprocess.run([str(SHELL_GRADER), str(project_dir), *args],
+                          capture_output=True, text=True, check=True)
+    return proc.stdout
+
+
+def run_python_grader(project_dir: Path, *args: str) -> str:
+    proc = subprocess.run([sys.executable, str(grader_path), str(project_dir), *args],
+                          capture_output=True, text=True, check=True)
+    return proc.stdout
+
+
+def make_tree(root: Path) -> Path:
+    """find の数え方の境界を含むプロジェクトツリーを作成"""
+    files: list = [
+        "src/index.ts", "src/a/b.js", "src/a/b.test.ts", "src/a/c.spec.js",
+        "node_modules/pkg/index.js", "node_modules/pkg/test/x.test.js",
+        "src/node_modules/y.ts", "x.spec.d/z.ts", ".hidden/h.ts", ".test.ts", "README.md",
+    ]
+    for rel in files:
+        path: Path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("", encoding="utf-8")
+    (root / "dir.ts").mkdir()
+    os.symlink(root / "src", root / "link")
+    (root / "Plans.md").write_text(
+        "## Phase 1\n| Test Case | x |\n| GET | /a |\nどうする？\n実際にはこうです\nno newline",
+        encoding="utf-8")
+    return root
+
+
+class TestShellParity(unittest.TestCase):
+    """code-grader.sh との出力一致"""
+
+    def assert_parity(self, project_dir: Path) -> None:
+        for args in (["--json"], []):
+            self.assertEqual(run_python_grader(project_dir, *args),
+                             run_shell_grader(project_dir, *args), f"{project_dir} {args}")
+
+    def test_fixtures(self) -> None:
+        """fixtures の Plans.md ごとに一致"""
+        for fixture in sorted(FIXTURES.glob("*.md")):
+            with tempfile.TemporaryDirectory() as tmpdir:
+                if fixture.stat().st_size > 0:
+                    shutil.copy(fixture, Path(tmpdir) / "Plans.md")
+                self.assert_parity(Path(tmpdir))
+
+    def test_project_tree(self) -> None:
+        """テストファイル・実装ファイルの数え方が一致"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            self.assert_parity(make_tree(Path(tmpdir)))
+
+    def test_plans_md_is_directory(self) -> None:
+        """Plans.md がディレクトリなら存在しない扱い"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            (Path(tmpdir) / "Plans.md").mkdir()
+            self.assert_parity(Path(tmpdir))
+
+
+class TestGradeProject(unittest.TestCase):
+    """grade_project のユニットテスト"""
+
+    def test_matches_parsed_shell_json(self) -> None:
+        """戻り値は code-grader.sh --json を json.loads したものと同じ"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root: Path = make_tree(Path(tmpdir))
+            expected: dict = json.loads(run_shell_grader(root, "--json"))
+            self.assertEqual(code_grader.grade_project(str(root)), expected)
+
+    def test_counts(self) -> None:
+        """node_modules 内のテストファイルは数え、実装ファイルからは除外"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            rules = rule_engine.load_rules(code_grader.DEFAULT_TASKS_FILE)
+            values: dict = rules.evaluate(make_tree(Path(tmpdir)))
+            self.assertEqual(values["test_files_created"], 4)
+            self.assertEqual(values["impl_files_created"], 4)
+
+    def test_missing_dir(self) -> None:
+        """存在しないディレクトリはエラー"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with self.assertRaises(FileNotFoundError):
+                code_grader.grade_project(str(Path(tmpdir) / "missing"))
+
+
+class TestRuleEngine(unittest.TestCase):
+    """rule_engine のユニットテスト"""
+
+    def test_keyword_matcher_overlapping(self) -> None:
+        """同じ位置から始まる短いキーワードのルールも検出"""
+        matcher = rule_engine.KeywordMatcher({"short": ["どう"], "long": ["どうする"], "other": ["する"]})
+        self.assertEqual(matcher.match("これをどうするか"), {"short", "long", "other"})
+        self.assertEqual(matcher.match("どうかな"), {"short"})
+        self.assertEqual(matcher.match("なし"), set())
+
+        ci = rule_engine.KeywordMatcher({"test": ["Test"]}, ignore_case=True)
+        self.assertEqual(ci.match("unit TEST"), {"test"})
+
+    def test_yaml_rules(self) -> None:
+        """YAML から新しいグレーダーを追加でき、採点対象は weight のあるものだけ"""
+        data: dict = {"graders": {
+            "code_based": [
+                {"name": "plans_exists", "file": "Plans.md", "count": "exists", "weight": 1.0},
+                {"name": "todo_lines", "file": "Plans.md", "keywords": ["TODO", "FIXME"],
+                 "weight": 1.0, "max": 2},
+                {"name": "heading", "file": "Plans.md", "count": "any", "pattern": "^# "},
+            ],
+            "criteria": {"has_heading": "heading", "todos": "todo_lines"},
+        }}
+        rules = rule_engine.compile_rules(data)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            (Path(tmpdir) / "Plans.md").write_text("# Plan\nTODO a\nTODO FIXME b\nTODO c\n",
+                                                   encoding="utf-8")
+            values: dict = rules.evaluate(tmpdir)
+
+        self.assertEqual(values, {"plans_exists": 1, "todo_lines": 3, "heading": 1})
+        result: dict = rules.score(values)
+        self.assertEqual(list(result["graders"]), ["plans_exists", "todo_lines"])
+        self.assertEqual((result["weighted_score"], result["max_score"]), (3.0, 3.0))
+
+        criteria: dict = rules.check_criteria(values, {"has_heading": True, "todos": ">= 4",
+                                                       "unknown": True})
+        self.assertFalse(criteria["pass"])
+        self.assertEqual({k: c["status"] for k, c in criteria["checks"].items()},
+                         {"has_heading": "pass", "todos": "fail", "unknown": "skip"})
+
+    def test_invalid_rules(self) -> None:
+        """不正な定義はコンパイル時にエラー"""
+        with self.assertRaises(ValueError):
+            rule_engine.compile_rules({"graders": {"code_based": [{"name": "x", "file": "a", "count": "bogus"}]}})
+        with self.assertRaises(ValueError):
+            rule_engine.compile_rules({"graders": {
+                "code_based": [{"name": "x", "file": "a", "count": "exists"}],
+                "criteria": {"y": "missing"}}})
+
+    def test_task_success_criteria(self) -> None:
+        """--task 指定時は success_criteria の判定を追加"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            shutil.copy(FIXTURES / "comprehensive-plans.md", Path(tmpdir) / "Plans.md")
+            result: dict = code_grader.grade_project(tmpdir, task_id="VP-01")
+            self.assertIn("success_criteria", result)
+            self.assertEqual(set(result["success_criteria"]["checks"]),
+                             {"plans_exists", "requirements_clarified", "security_markers"})
+
+            untracked: dict = code_grader.grade_project(tmpdir, task_id="XX-99")
+            self.assertNotIn("success_criteria", untracked)
+
+
+if __name__ == "__main__":
+    # テスト実行
+    loader = unittest.TestLoader()
+    suite = loader.loadTestsFromModule(sys.modules[__name__])
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    # 終了コード
+    sys.exit(0 if result.wasSuccessful() else 1)
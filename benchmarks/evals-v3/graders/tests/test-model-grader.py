@@ -12,8 +12,12 @@ Exit codes:
 from __future__ import annotations
 
 import sys
+import json
+import time
+import threading
 import unittest
 import tempfile
+from http.server import BaseHTTPRequestHandler, HTTPServer
 from pathlib import Path
 
 # グレーダーのパスを追加
@@ -211,6 +215,230 @@ class TestGraderWeights(unittest.TestCase):
             self.assertIn("{content}", config["prompt"], f"Grader '{name}' prompt should contain {{content}} placeholder")
 
 
+class FakeMessages:
+    """messages.create を模倣し、同時実行数を記録するフェイク"""
+
+    def __init__(self, score_text: str = "4", delay: float = 0.2) -> None:
+        self.score_text: str = score_text
+        self.delay: float = delay
+        self.lock = threading.Lock()
+        self.in_flight: int = 0
+        self.max_in_flight: int = 0
+        self.calls: list = []
+
+    def create(self, **kwargs):
+        with self.lock:
+            self.calls.append(kwargs)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        threading.Event().wait(self.delay)
+        with self.lock:
+            self.in_flight -= 1
+
+        class _Text:
+            text = self.score_text
+
+        class _Response:
+            content = [_Text()]
+
+        return _Response()
+
+
+class FakeClient:
+    """anthropic.Anthropic の代わりに使う共有クライアント"""
+
+    def __init__(self, messages: FakeMessages) -> None:
+        self.messages: FakeMessages = messages
+
+
+class FakeMessagesHandler(BaseHTTPRequestHandler):
+    """ローカルのフェイク Messages API エンドポイント"""
+
+    def do_POST(self) -> None:
+        length: int = int(self.headers.get("Content-Length", 0))
+        body: dict = json.loads(self.rfile.read(length))
+        self.server.requests.append(body)
+        payload: bytes = json.dumps({
+            "id": "msg_fake",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model", ""),
+            "content": [{"type": "text", "text": "Score: 5"}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": {"input_tokens": 1, "output_tokens": 1}
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+class TestConcurrentGrading(unittest.TestCase):
+    """並列グレーディングモードのテスト"""
+
+    PLANS: str = "# Plans\n## フェーズ 1\n- テストケース設計\n"
+
+    def _write_plans(self, tmpdir: str) -> Path:
+        (Path(tmpdir) / "Plans.md").write_text(self.PLANS, encoding="utf-8")
+        return Path(tmpdir)
+
+    def test_all_graders_in_flight_at_once(self) -> None:
+        """concurrency=5 で全グレーダーが同時に送信される"""
+        messages = FakeMessages()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            results: dict = model_grader.run_grading(
+                self._write_plans(tmpdir), concurrency=len(model_grader.GRADERS),
+                client=FakeClient(messages)
+            )
+
+        self.assertEqual(len(messages.calls), len(model_grader.GRADERS))
+        self.assertEqual(messages.max_in_flight, len(model_grader.GRADERS))
+        self.assertEqual(results["normalized_score"], 80.0)
+
+    def test_concurrency_limit(self) -> None:
+        """同時リクエスト数が上限を超えない"""
+        messages = FakeMessages(delay=0.05)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            model_grader.run_grading(self._write_plans(tmpdir), concurrency=2,
+                                     client=FakeClient(messages))
+
+        self.assertLessEqual(messages.max_in_flight, 2)
+
+    def test_timeout_passed_per_request(self) -> None:
+        """タイムアウトが各リクエストに渡される"""
+        messages = FakeMessages(delay=0)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            model_grader.run_grading(self._write_plans(tmpdir), concurrency=3,
+                                     timeout=7.5, client=FakeClient(messages))
+
+        self.assertTrue(all(call["timeout"] == 7.5 for call in messages.calls))
+
+    def test_output_matches_sequential(self) -> None:
+        """並列・逐次で出力が同一"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            project: Path = self._write_plans(tmpdir)
+            sequential: dict = model_grader.run_grading(
+                project, concurrency=1, client=FakeClient(FakeMessages(delay=0)))
+            concurrent: dict = model_grader.run_grading(
+                project, concurrency=5, client=FakeClient(FakeMessages(delay=0)))
+
+        self.assertEqual(sequential, concurrent)
+        self.assertEqual(list(concurrent["graders"]), list(model_grader.GRADERS))
+
+    @unittest.skipUnless(model_grader.HAS_ANTHROPIC, "anthropic SDK not installed")
+    def test_fake_messages_endpoint(self) -> None:
+        """ローカルのフェイク Messages エンドポイントに対して SDK 経由で評価"""
+        server = HTTPServer(("127.0.0.1", 0), FakeMessagesHandler)
+        server.requests = []
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            client = model_grader.anthropic.Anthropic(
+                api_key="test-key", base_url=f"http://127.0.0.1:{server.server_port}")
+            with tempfile.TemporaryDirectory() as tmpdir:
+                results: dict = model_grader.run_grading(
+                    self._write_plans(tmpdir), concurrency=5, timeout=5, client=client)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.assertEqual(len(server.requests), len(model_grader.GRADERS))
+        self.assertEqual(results["normalized_score"], MAX_NORMALIZED_SCORE)
+
+
+class FailingMessages(FakeMessages):
+    """常に失敗する messages.create"""
+
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        raise RuntimeError("connection refused")
+
+
+class TestGradingCache(unittest.TestCase):
+    """GradingCache のテスト"""
+
+    PLANS: str = "# Plans\n## フェーズ 1\n- テストケース設計\n"
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.project: Path = Path(self.tmp.name) / "project"
+        self.project.mkdir()
+        (self.project / "Plans.md").write_text(self.PLANS, encoding="utf-8")
+        self.cache = model_grader.GradingCache(Path(self.tmp.name) / "cache")
+
+    def tearDown(self) -> None:
+        self.cache.close()
+        self.tmp.cleanup()
+
+    def test_llm_scores_cached(self) -> None:
+        """2 回目の評価では API を呼ばない"""
+        first = FakeMessages(delay=0)
+        second = FakeMessages(score_text="1", delay=0)
+        r1: dict = model_grader.run_grading(self.project, client=FakeClient(first), cache=self.cache)
+        r2: dict = model_grader.run_grading(self.project, client=FakeClient(second), cache=self.cache)
+
+        self.assertEqual(len(first.calls), len(model_grader.GRADERS))
+        self.assertEqual(len(second.calls), 0)
+        self.assertEqual(r1, r2)
+        self.assertEqual(self.cache.hits, len(model_grader.GRADERS))
+
+    def test_mock_scores_cached(self) -> None:
+        """モック評価の結果もキャッシュされ、同じ出力になる"""
+        uncached: dict = model_grader.run_grading(self.project, use_llm=False)
+        model_grader.run_grading(self.project, use_llm=False, cache=self.cache)
+        cached: dict = model_grader.run_grading(self.project, use_llm=False, cache=self.cache)
+
+        self.assertEqual(uncached, cached)
+        self.assertEqual(self.cache.hits, len(model_grader.GRADERS))
+
+    def test_failures_not_cached(self) -> None:
+        """API 失敗時のデフォルトスコアはキャッシュしない"""
+        results: dict = model_grader.run_grading(
+            self.project, client=FakeClient(FailingMessages()), cache=self.cache)
+        self.assertTrue(all(g["score"] == DEFAULT_SCORE for g in results["graders"].values()))
+
+        retry = FakeMessages(delay=0)
+        model_grader.run_grading(self.project, client=FakeClient(retry), cache=self.cache)
+        self.assertEqual(len(retry.calls), len(model_grader.GRADERS))
+
+    def test_key_components(self) -> None:
+        """内容・グレーダー・プロンプト・モデルのいずれかが違えば別キー"""
+        base: str = model_grader.GradingCache.make_key("c", "g", "p", "m")
+        self.assertEqual(base, model_grader.GradingCache.make_key("c", "g", "p", "m"))
+        self.assertNotEqual(base, model_grader.GradingCache.make_key("c2", "g", "p", "m"))
+        self.assertNotEqual(base, model_grader.GradingCache.make_key("c", "g2", "p", "m"))
+        self.assertNotEqual(base, model_grader.GradingCache.make_key("c", "g", "p2", "m"))
+        self.assertNotEqual(base, model_grader.GradingCache.make_key("c", "g", "p", "m2"))
+
+    def test_size_eviction(self) -> None:
+        """上限を超えると最終アクセスが古いものから削除"""
+        cache = model_grader.GradingCache(Path(self.tmp.name) / "small", max_entries=2)
+        try:
+            cache.put("a", 1)
+            cache.put("b", 2)
+            cache.put("c", 3)
+            cache.get("a")
+            cache.evict()
+            self.assertIsNone(cache.get("b"))
+            self.assertEqual(cache.get("a"), 1)
+            self.assertEqual(cache.get("c"), 3)
+        finally:
+            cache.close()
+
+    def test_age_eviction(self) -> None:
+        """max_age_days を超えたエントリは削除"""
+        self.cache.put("old", 4)
+        self.cache.max_age_days = 0
+        time.sleep(0.01)
+        self.cache.evict()
+        self.assertIsNone(self.cache.get("old"))
+
+
 if __name__ == "__main__":
     # テスト実行
     loader = unittest.TestLoader()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+bench-statistics-engine.py - 統計エンジンのベンチマーク
+
+合成トライアルを生成し、statistical-analysis.py の純 Python 版
+（タスクごとに calculate_statistics）と NumPy ベクトル版
+（calculate_statistics_vectorized）の実行時間を比較する。
+両者の結果が一致することも確認する。
+
+使用法:
+  python bench-statistics-engine.py
+  python bench-statistics-engine.py --tasks 100 --iterations 100 --repeat 5
+
+出力:
+  コンソール: 条件ごとの実行時間と高速化率
+"""
+
+import sys
+import time
+import random
+import argparse
+import importlib.util
+from pathlib import Path
+
+# statistical-analysis.py をモジュールとして読み込む（ファイル名にハイフンを含むため）
+_spec = importlib.util.spec_from_file_location(
+    "statistical_analysis", Path(__file__).resolve().parent / "statistical-analysis.py")
+sa = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(sa)
+
+
+def generate_trials(n_tasks: int, n_iterations: int, seed: int) -> dict:
+    """合成トライアル（タスク × イテレーション × 2 モード）を生成"""
+    rng = random.Random(seed)
+    all_trials = {}
+    for t in range(n_tasks):
+        effect = rng.uniform(-5, 20)
+        trials = []
+        for i in range(1, n_iterations + 1):
+            base = rng.uniform(10, 70)
+            trials.append(sa.TrialResult(i, "with-plugin", rng.random() < 0.7, 0.0, 0.0,
+                                         base + effect + rng.gauss(0, 8)))
+            # 5% のイテレーションは no-plugin を欠損させる
+            if rng.random() >= 0.05:
+                trials.append(sa.TrialResult(i, "no-plugin", rng.random() < 0.3, 0.0, 0.0,
+                                             base + rng.gauss(0, 8)))
+        all_trials[f"T-{t:04d}"] = trials
+    return all_trials
+
+
+def best_of(fn, repeat: int) -> float:
+    """repeat 回実行した最短時間（秒）"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def max_abs_diff(a: dict, b: dict) -> float:
+    """2 つの結果の数値フィールドの最大差分"""
+    fields = ["wp_mean", "wp_std", "np_mean", "np_std", "diff_mean", "diff_std",
+              "t_statistic", "p_value", "ci_lower", "ci_upper", "cohens_d",
+              "pass_at_3_wp", "pass_at_3_np"]
+    return max(
+        abs(getattr(a[task_id], f) - getattr(b[task_id], f))
+        for task_id in a for f in fields
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pure-Python vs NumPy statistics engines")
+    parser.add_argument("--tasks", type=int, nargs="+", default=[10, 50, 100],
+                       help="Task counts to benchmark")
+    parser.add_argument("--iterations", type=int, default=100,
+                       help="Iterations per task (default: 100)")
+    parser.add_argument("--repeat", type=int, default=3,
+                       help="Repetitions per measurement (best is reported)")
+    parser.add_argument("--seed", type=int, default=42,
+                       help="Random seed")
+
+    args = parser.parse_args()
+
+    if not sa.HAS_NUMPY:
+        print("Error: numpy is required for this benchmark", file=sys.stderr)
+        sys.exit(1)
+
+    print("=== Statistics Engine Benchmark ===")
+    print(f"scipy: {sa.HAS_SCIPY}")
+    print()
+    print("| Tasks | Trials | Python (ms) | NumPy (ms) | Speedup | Max |diff| |")
+    print("|-------|--------|-------------|------------|---------|------------|")
+
+    for n_tasks in args.tasks:
+        all_trials = generate_trials(n_tasks, args.iterations, args.seed)
+        n_trials = sum(len(t) for t in all_trials.values())
+
+        python_time = best_of(lambda: sa.calculate_all_statistics(all_trials, use_numpy=False), args.repeat)
+        numpy_time = best_of(lambda: sa.calculate_statistics_vectorized(all_trials), args.repeat)
+
+        python_results, _ = sa.calculate_all_statistics(all_trials, use_numpy=False)
+        numpy_results, _ = sa.calculate_statistics_vectorized(all_trials)
+
+        print(f"| {n_tasks:>5} | {n_trials:>6} | {python_time * 1000:>11.1f} | "
+              f"{numpy_time * 1000:>10.1f} | {python_time / numpy_time:>6.1f}x | "
+              f"{max_abs_diff(python_results, numpy_results):>10.2e} |")
+
+
+if __name__ == "__main__":
+    main()
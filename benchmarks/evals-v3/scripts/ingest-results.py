@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+ingest-results.py - 評価結果を列指向ストアにまとめる
+
+結果ディレクトリ内のトライアルを読み込み、<dir>/.results-store.npz（results_store.py）に
+書き出す。以降の集計（statistical-analysis.py の v2/v3、benchmark-report.py）は
+JSON を 1 件ずつ読む代わりにストアを memmap で開く。
+
+対象:
+  - statistical の run: <run>/<task>/<mode>/iter-N/grading-result.json
+  - フラットな結果: <dir>/*.json（v3 の VP-01_no-plugin_1_<ts>.json、v2、benchmarks/results）
+
+statistical の run は完了したもの（journal.jsonl の最後が run_end、
+journal がなければ summary.json がある）だけを対象にする。
+ソースファイルの件数・最大 mtime・合計サイズが前回の ingest と同じならスキップする。
+
+使用法:
+  python ingest-results.py <results_dir> [<results_dir> ...]
+  python ingest-results.py --all results/statistical     # 配下の全 run
+  python ingest-results.py <run_dir> --force --include-unfinished
+
+出力:
+  コンソール: ディレクトリごとの結果（ingested / up to date / skipped）
+"""
+
+import os
+import sys
+import json
+import argparse
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+
+# statistical-analysis.py をモジュールとして読み込む（ファイル名にハイフンを含むため）
+_spec = importlib.util.spec_from_file_location("statistical_analysis", SCRIPTS_DIR / "statistical-analysis.py")
+sa = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(sa)
+
+# 列指向ストア（同じディレクトリの results_store.py。パスは statistical-analysis.py が追加済み）
+import results_store
+
+
+def run_finished(results_dir: Path) -> bool:
+    """statistical の run が完了しているか"""
+    journal = results_dir / "journal.jsonl"
+    try:
+        with open(journal, "rb") as f:
+            lines = [line for line in f.read().splitlines() if line.strip()]
+    except FileNotFoundError:
+        return (results_dir / "summary.json").is_file()
+    try:
+        return bool(lines) and json.loads(lines[-1]).get("event") == "run_end"
+    except json.JSONDecodeError:
+        return False
+
+
+def list_sources(results_dir: Path) -> Tuple[List[Tuple[str, str, int, str]], List[str]]:
+    """(grading-result.json の一覧, フラットな結果 JSON の一覧)"""
+    grading = [item for item in sa.scan_grading_files(results_dir) if os.path.isfile(item[3])]
+    return grading, results_store.flat_result_files(results_dir)
+
+
+def _read_json(path: str) -> Optional[dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"Warning: Failed to load {path}: {e}", file=sys.stderr)
+        return None
+
+
+def statistical_row(run_id: str, task_id: str, mode: str, iteration: int,
+                    path: str, results_dir: Path, data: dict) -> dict:
+    """grading-result.json の 1 行（スコアは statistical-analysis.py と同じ計算）"""
+    trial = sa.trial_from_grading(data, iteration, mode)
+    return {
+        "run_id": run_id,
+        "source": "v3-statistical",
+        "path": os.path.relpath(path, results_dir),
+        "task": task_id,
+        "mode": mode,
+        "timestamp": data.get("timestamp", ""),
+        "iteration": iteration,
+        "passed": trial.plans_exists,
+        "code_score": trial.code_score,
+        "model_score": trial.model_score,
+        "score": trial.normalized_score,
+    }
+
+
+def _scorecard_mode(data: dict) -> str:
+    """benchmark-report.py の scorecard_mode と同じ判定（どちらでもなければ空）"""
+    version = data.get("version", "")
+    if "with-plugin" in version or data.get("with_plugin", False):
+        return "with-plugin"
+    if "no-plugin" in version or not data.get("with_plugin", True):
+        return "no-plugin"
+    return ""
+
+
+def _estimated_cost(data: dict) -> Optional[float]:
+    """benchmark-report.py の estimated_cost と同じ（0 はそのまま使う）"""
+    cost = data.get("estimated_cost_usd")
+    return data.get("total_cost_usd") if cost is None else cost
+
+
+def flat_row(run_id: str, path: str, data: dict) -> Optional[dict]:
+    """フラットな結果 JSON の 1 行（形式を判別できなければ None）"""
+    row = {"run_id": run_id, "path": os.path.basename(path), "record": data,
+           "duration_seconds": data.get("duration_seconds")}
+
+    if "dimension" in data or "trial_id" in data:
+        row.update(source="v2", task=data.get("task_id", "unknown"),
+                   dimension=data.get("dimension", "unknown"), trial_id=data.get("trial_id", 0),
+                   passed=data.get("success", False), score=data.get("score", 0.0))
+    elif "task_id" in data and "mode" in data:
+        grade = data.get("grade") or {}
+        row.update(source="v3-flat", task=data["task_id"], mode=data["mode"],
+                   iteration=data.get("iteration"), timestamp=data.get("timestamp", ""),
+                   exit_code=data.get("exit_code"), passed=grade.get("plans_exists"),
+                   score=grade.get("score"))
+    elif "task" in data:
+        grade = data.get("grade") or {}
+        row.update(source="scorecard", task=data["task"], mode=_scorecard_mode(data),
+                   iteration=data.get("iteration", 1), timestamp=data.get("timestamp", ""),
+                   exit_code=data.get("exit_code", -1),
+                   passed=grade.get("pass", False) if grade else None,
+                   score=grade.get("score"),
+                   cost_usd=_estimated_cost(data),
+                   input_tokens=data.get("input_tokens", 0), output_tokens=data.get("output_tokens", 0))
+    else:
+        return None
+    return row
+
+
+def ingest_dir(results_dir: Path, workers: int = sa.DEFAULT_LOAD_WORKERS,
+               force: bool = False, include_unfinished: bool = False) -> Tuple[str, Optional[dict]]:
+    """1 ディレクトリをストアにまとめる
+
+    Returns:
+        (状態 "ingested" / "up to date" / "unfinished" / "empty", ストアのメタ情報)
+    """
+    results_dir = Path(results_dir)
+    grading, flat = list_sources(results_dir)
+    if not grading and not flat:
+        return "empty", None
+    if grading and not include_unfinished and not run_finished(results_dir):
+        return "unfinished", None
+
+    current = results_store.fingerprint([item[3] for item in grading] + flat)
+    existing = results_store.open_store(results_dir)
+    if not force and existing is not None and existing.meta.get("fingerprint") == current:
+        return "up to date", existing.meta
+
+    run_id = results_dir.resolve().name
+    paths = [item[3] for item in grading] + flat
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        loaded = list(executor.map(_read_json, paths))
+
+    rows = []
+    sources: Dict[str, int] = {}
+    skipped = 0
+    for (task_id, mode, iteration, path), data in zip(grading, loaded):
+        if data is None:
+            skipped += 1
+            continue
+        rows.append(statistical_row(run_id, task_id, mode, iteration, path, results_dir, data))
+    for path, data in zip(flat, loaded[len(grading):]):
+        row = flat_row(run_id, path, data) if isinstance(data, dict) else None
+        if row is None:
+            skipped += 1
+            continue
+        rows.append(row)
+    for row in rows:
+        sources[row["source"]] = sources.get(row["source"], 0) + 1
+
+    summary = _read_json(str(results_dir / "summary.json")) if (results_dir / "summary.json").is_file() else None
+    meta = {
+        "run_id": run_id,
+        "sources": sources,
+        "skipped": skipped,
+        "fingerprint": current,
+        "flat_fingerprint": results_store.fingerprint(flat),
+        # 結果のないタスクディレクトリも集計側で警告できるように残す
+        "task_dirs": [task_id for task_id, _ in sa.list_task_dirs(results_dir)] if grading else [],
+        "summary": summary,
+    }
+    store = results_store.build_store(rows, meta)
+    results_store.write_store(store, results_store.store_path(results_dir))
+    return "ingested", store.meta
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compact eval results into a columnar store")
+    parser.add_argument("results_dirs", type=Path, nargs="+",
+                       help="Result directories (a statistical run or a directory of *.json)")
+    parser.add_argument("--all", action="store_true",
+                       help="Treat each argument as a root and ingest it and every subdirectory")
+    parser.add_argument("--force", action="store_true",
+                       help="Rebuild stores even if the sources are unchanged")
+    parser.add_argument("--include-unfinished", action="store_true",
+                       help="Also ingest statistical runs without a run_end journal event")
+    parser.add_argument("--workers", type=int, default=sa.DEFAULT_LOAD_WORKERS,
+                       help=f"Threads for reading result files (default: {sa.DEFAULT_LOAD_WORKERS})")
+
+    args = parser.parse_args()
+
+    if not results_store.HAS_NUMPY:
+        print("Error: NumPy is required to build the results store", file=sys.stderr)
+        sys.exit(1)
+
+    targets: List[Path] = []
+    for results_dir in args.results_dirs:
+        if not results_dir.is_dir():
+            print(f"Error: Results directory not found: {results_dir}", file=sys.stderr)
+            sys.exit(1)
+        targets.append(results_dir)
+        if args.all:
+            targets.extend(Path(path) for _, path in sa.list_task_dirs(results_dir))
+
+    for results_dir in targets:
+        status, meta = ingest_dir(results_dir, args.workers, args.force, args.include_unfinished)
+        if status == "empty":
+            if not args.all:
+                print(f"{results_dir}: no results")
+            continue
+        if meta is None:
+            print(f"{results_dir}: skipped ({status})")
+            continue
+        sources = ", ".join(f"{n} {source}" for source, n in sorted(meta["sources"].items()))
+        print(f"{results_dir}: {status} ({meta['n_rows']} rows: {sources or 'none'})")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,19 +2,135 @@
 """
 parse-tasks-yaml.py - YAML タスク定義のパーサー
 
+YAML のパース結果は JSON スナップショット（タスクカタログ）としてキャッシュし、
+YAML の mtime・サイズ（一致しなければ内容の SHA-256）が変わらない限り再利用する。
+パースには libyaml の CSafeLoader を使う（なければ SafeLoader）。
+
 使用法:
   python3 parse-tasks-yaml.py <yaml_file> [--ids | --prompts | --commands | --full]
+  python3 parse-tasks-yaml.py <yaml_file> --task <id> --field <field>
+  python3 parse-tasks-yaml.py <yaml_file> --export-env    # シェルで eval する
+  python3 parse-tasks-yaml.py <yaml_file> --export-json
 
 出力形式:
-  --ids:      タスクIDのみ（改行区切り）
-  --prompts:  "ID|prompt" 形式
-  --commands: "ID|command" 形式
-  --full:     "ID|prompt|command" 形式（デフォルト）
+  --ids:         タスクIDのみ（改行区切り）
+  --prompts:     "ID|prompt" 形式
+  --commands:    "ID|command" 形式
+  --full:        "ID|prompt|command" 形式（デフォルト）
+  --export-env:  TASK_IDS / TASK_PROMPTS / TASK_ANSWERS / TASK_CRITERIA の bash 代入文
+                 （呼び出し側で declare -A TASK_PROMPTS TASK_ANSWERS TASK_CRITERIA しておく）
+  --export-json: 全タスクの id / name / prompt / answers / success_criteria
 """
 
+import os
 import sys
-import yaml
+import json
+import shlex
+import hashlib
 import argparse
+from pathlib import Path
+
+import yaml
+
+# libyaml があれば C 実装のローダーを使う
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# タスクカタログのキャッシュ
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent.parent / ".cache" / "task-catalog"
+CATALOG_VERSION = 1
+
+
+def parse_yaml(content: bytes):
+    """YAML をパースし、JSON で表せる値にそろえる
+
+    日付は文字列、文字列以外のキーは文字列になる（スナップショットを経由した値と同じ形にし、
+    キャッシュの有無・--no-cache で結果が変わらないようにする）。
+    """
+    return json.loads(json.dumps(yaml.load(content, Loader=YAML_LOADER), default=str))
+
+
+def load_catalog(yaml_file: Path, cache_dir: Path = DEFAULT_CACHE_DIR, use_cache: bool = True):
+    """YAML を読み込む（キャッシュが有効ならスナップショットを再利用）
+
+    スナップショットは YAML の絶対パスごとに 1 ファイル。mtime とサイズが一致すれば
+    YAML を読まずに返し、一致しなければ内容のハッシュを比較して、変わっていれば再パースする。
+    """
+    yaml_file = Path(yaml_file).resolve()
+    if not use_cache:
+        return parse_yaml(yaml_file.read_bytes())
+
+    st = os.stat(yaml_file)
+    snapshot_path = cache_dir / (hashlib.sha1(str(yaml_file).encode("utf-8")).hexdigest()[:16] + ".json")
+
+    snapshot = None
+    try:
+        with open(snapshot_path, "r", encoding="utf-8") as f:
+            snapshot = json.load(f)
+        if snapshot.get("version") != CATALOG_VERSION or snapshot.get("source") != str(yaml_file):
+            snapshot = None
+    except (OSError, ValueError):
+        snapshot = None
+
+    if snapshot is not None and snapshot["mtime_ns"] == st.st_mtime_ns and snapshot["size"] == st.st_size:
+        return snapshot["data"]
+
+    content = yaml_file.read_bytes()
+    digest = hashlib.sha256(content).hexdigest()
+    if snapshot is not None and snapshot["sha256"] == digest:
+        data = snapshot["data"]
+    else:
+        data = parse_yaml(content)
+
+    snapshot = {
+        "version": CATALOG_VERSION,
+        "source": str(yaml_file),
+        "mtime_ns": st.st_mtime_ns,
+        "size": st.st_size,
+        "sha256": digest,
+        "data": data,
+    }
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = snapshot_path.with_name(f"{snapshot_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, ensure_ascii=False, default=str)
+        os.replace(tmp_path, snapshot_path)
+    except OSError as e:
+        # キャッシュに書けなくても結果は返す
+        print(f"Warning: failed to write task catalog cache: {e}", file=sys.stderr)
+
+    return data
+
+
+def task_answers(task: dict) -> str:
+    """シミュレートする回答（"回答1|回答2|..." 形式）"""
+    return "|".join(str(a) for a in task.get("simulated_answers", []))
+
+
+def export_tasks(tasks: list) -> list:
+    """--export-json の各タスク"""
+    return [
+        {
+            "id": task.get("id", ""),
+            "name": task.get("name", ""),
+            "prompt": task.get("prompt", ""),
+            "answers": [str(a) for a in task.get("simulated_answers", [])],
+            "success_criteria": task.get("success_criteria", {}),
+        }
+        for task in tasks
+    ]
+
+
+def export_env(tasks: list) -> str:
+    """--export-env の bash 代入文"""
+    lines = ["TASK_IDS=(" + " ".join(shlex.quote(task.get("id", "")) for task in tasks) + ")"]
+    for task in tasks:
+        key = shlex.quote(task.get("id", ""))
+        lines.append(f"TASK_PROMPTS[{key}]={shlex.quote(str(task.get('prompt', '')))}")
+        lines.append(f"TASK_ANSWERS[{key}]={shlex.quote(task_answers(task))}")
+        criteria = json.dumps(task.get("success_criteria", {}), ensure_ascii=False, sort_keys=True)
+        lines.append(f"TASK_CRITERIA[{key}]={shlex.quote(criteria)}")
+    return "\n".join(lines)
 
 
 def main():
@@ -26,18 +142,34 @@ def main():
     parser.add_argument("--full", action="store_true", help="Output ID|prompt|command (default)")
     parser.add_argument("--task", help="Get specific task by ID")
     parser.add_argument("--field", help="Get specific field for --task")
+    parser.add_argument("--export-env", action="store_true",
+                        help="Output bash assignments for all tasks (for eval)")
+    parser.add_argument("--export-json", action="store_true",
+                        help="Output all tasks as JSON")
+    parser.add_argument("--cache-dir", type=Path, default=DEFAULT_CACHE_DIR,
+                        help="Task catalog cache directory")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Always parse the YAML file")
 
     args = parser.parse_args()
 
     try:
-        with open(args.yaml_file, 'r', encoding='utf-8') as f:
-            data = yaml.safe_load(f)
+        data = load_catalog(args.yaml_file, args.cache_dir, use_cache=not args.no_cache)
     except Exception as e:
         print(f"Error reading YAML: {e}", file=sys.stderr)
         sys.exit(1)
 
     tasks = data.get('tasks', [])
 
+    # 全タスクを 1 回で出力
+    if args.export_env:
+        print(export_env(tasks))
+        return
+
+    if args.export_json:
+        print(json.dumps({"tasks": export_tasks(tasks)}, indent=2, ensure_ascii=False))
+        return
+
     # 特定タスクの特定フィールドを取得
     if args.task and args.field:
         for task in tasks:
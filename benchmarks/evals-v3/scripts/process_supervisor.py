@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+process_supervisor.py - トライアルの子プロセス監視
+
+子プロセスを新しいプロセスグループで起動し、出力（stdout + stderr）をファイルに書きながら
+終了を待つ。1 秒ごとのポーリングではなく、出力と終了（待機スレッドの os.wait4 から
+起こされるパイプ）を selectors で待つので、所要時間はミリ秒単位で正確になる。
+
+  - タイムアウト: プロセスグループ全体に SIGTERM、kill_grace 秒たっても終わらなければ SIGKILL
+  - 正常終了後: 同じグループに残った孫プロセス（バックグラウンドのツール等）を SIGKILL で片付ける
+
+run-statistical-eval.sh からは CLI として、trial-profiler.py からはライブラリとして使う。
+
+使用法:
+  echo "$prompt" | python process_supervisor.py --output claude-output.txt --timing timing.json \\
+      --timeout 180 -- claude -p --dangerously-skip-permissions
+
+  from process_supervisor import supervise
+  run = supervise(["claude", "-p"], "claude-output.txt", timeout=180)
+  run.duration_ms, run.timed_out, run.exit_code
+
+終了コード: 子プロセスの終了コード（シグナルで終了した場合は 128 + シグナル番号）
+"""
+
+import os
+import sys
+import json
+import time
+import signal
+import argparse
+import selectors
+import threading
+import subprocess
+from dataclasses import dataclass, asdict
+from typing import Callable, Dict, List, Optional
+
+# SIGTERM から SIGKILL までの猶予（秒）
+DEFAULT_KILL_GRACE = 5.0
+# 孫プロセスを片付けたあと、パイプの EOF を待つ上限（秒）
+DRAIN_TIMEOUT = 1.0
+
+READ_SIZE = 65536
+
+
+@dataclass
+class SupervisedRun:
+    """監視した子プロセスの結果（時間はミリ秒）"""
+    exit_code: Optional[int]  # シグナルで終了した場合は None
+    signal: Optional[int]
+    timed_out: bool
+    killed: bool  # SIGTERM で終わらず SIGKILL した
+    orphans_killed: bool  # 終了後にグループに残ったプロセスを片付けた
+    duration_ms: float  # 起動から終了（wait4 が返る）まで
+    time_to_first_output_ms: Optional[float]
+    rusage: Dict[str, float]
+
+    @property
+    def shell_exit_code(self) -> int:
+        return self.exit_code if self.exit_code is not None else 128 + self.signal
+
+
+def rusage_dict(rusage) -> dict:
+    """os.wait4 の rusage（ru_maxrss は Linux では KiB、macOS ではバイト）"""
+    max_rss_kb = rusage.ru_maxrss // 1024 if sys.platform == "darwin" else rusage.ru_maxrss
+    return {
+        "max_rss_kb": int(max_rss_kb),
+        "user_cpu_ms": round(rusage.ru_utime * 1000, 1),
+        "system_cpu_ms": round(rusage.ru_stime * 1000, 1),
+    }
+
+
+def _killpg(pgid: int, sig: int) -> bool:
+    """プロセスグループにシグナルを送る（グループがもう空なら False）"""
+    try:
+        os.killpg(pgid, sig)
+        return True
+    except (ProcessLookupError, PermissionError):
+        return False
+
+
+def supervise(command: List[str], output_file: str, timeout: float,
+              kill_grace: float = DEFAULT_KILL_GRACE, env: Optional[dict] = None,
+              on_event: Optional[Callable[[str, dict], None]] = None) -> SupervisedRun:
+    """子プロセスを実行して終了まで監視する
+
+    stdin はこのプロセスのものを引き継ぐ。on_event(name, fields) には
+    "process_start" / "first_output" / "timeout" / "kill" を、起きた時点で通知する。
+    """
+    notify = on_event or (lambda name, fields: None)
+
+    start_mono = time.monotonic()
+    notify("process_start", {"command": command})
+    proc = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                            env=env, start_new_session=True)
+    pgid = proc.pid
+
+    # 終了待ちスレッド: wait4 が返ったらパイプに書いてメインループを起こす
+    wake_r, wake_w = os.pipe()
+    exit_info = {}
+
+    def waiter():
+        _, status, rusage = os.wait4(proc.pid, 0)
+        exit_info.update(end=time.monotonic(), status=status, rusage=rusage)
+        os.write(wake_w, b"x")
+
+    threading.Thread(target=waiter, daemon=True).start()
+
+    first_output_ms = None
+    timed_out = killed = orphans_killed = False
+    deadline = start_mono + timeout
+    kill_deadline = None
+    drain_deadline = None
+    sel = selectors.DefaultSelector()
+    sel.register(proc.stdout, selectors.EVENT_READ)
+    sel.register(wake_r, selectors.EVENT_READ)
+    try:
+        with open(output_file, "wb") as out:
+            while sel.get_map():
+                now = time.monotonic()
+                if drain_deadline is not None:
+                    if now >= drain_deadline:
+                        break  # 別セッションに逃げた孫プロセスがパイプを持っている
+                    wait = drain_deadline - now
+                elif kill_deadline is not None:
+                    if now >= kill_deadline:
+                        _killpg(pgid, signal.SIGKILL)
+                        killed = True
+                        notify("kill", {"signal": signal.SIGKILL})
+                        kill_deadline = None
+                        continue
+                    wait = kill_deadline - now
+                elif not timed_out:
+                    if now >= deadline:
+                        timed_out = True
+                        notify("timeout", {"timeout_seconds": timeout})
+                        _killpg(pgid, signal.SIGTERM)
+                        kill_deadline = now + kill_grace
+                        continue
+                    wait = deadline - now
+                else:
+                    wait = None  # SIGKILL 済み、終了を待つだけ
+
+                for key, _ in sel.select(wait):
+                    if key.fileobj is proc.stdout:
+                        chunk = os.read(proc.stdout.fileno(), READ_SIZE)
+                        if not chunk:
+                            sel.unregister(proc.stdout)
+                            continue
+                        if first_output_ms is None:
+                            first_output_ms = round((time.monotonic() - start_mono) * 1000, 1)
+                            notify("first_output", {"elapsed_ms": first_output_ms})
+                        out.write(chunk)
+                        out.flush()
+                    else:
+                        sel.unregister(wake_r)
+                        # 子プロセスは終了済み。グループに残ったプロセスを片付けてから出力を読み切る
+                        orphans_killed = _killpg(pgid, signal.SIGKILL)
+                        kill_deadline = None
+                        drain_deadline = time.monotonic() + DRAIN_TIMEOUT
+
+            if timed_out:
+                out.write(f"TIMEOUT after {timeout:g}s\n".encode("utf-8"))
+    finally:
+        sel.close()
+        proc.stdout.close()
+        if not exit_info:
+            # 例外で抜けた場合も子プロセスを残さない
+            _killpg(pgid, signal.SIGKILL)
+        os.close(wake_r)
+
+    returncode = os.waitstatus_to_exitcode(exit_info["status"])
+    os.close(wake_w)
+    return SupervisedRun(
+        exit_code=returncode if returncode >= 0 else None,
+        signal=-returncode if returncode < 0 else None,
+        timed_out=timed_out,
+        killed=killed,
+        orphans_killed=orphans_killed,
+        duration_ms=round((exit_info["end"] - start_mono) * 1000, 1),
+        time_to_first_output_ms=first_output_ms,
+        rusage=rusage_dict(exit_info["rusage"]),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a trial command with an exact timeout and process-group cleanup")
+    parser.add_argument("--output", required=True, help="File for the combined stdout/stderr of the command")
+    parser.add_argument("--timeout", type=float, default=180, help="Seconds before the process group is terminated")
+    parser.add_argument("--kill-grace", type=float, default=DEFAULT_KILL_GRACE,
+                        help=f"Seconds between SIGTERM and SIGKILL (default: {DEFAULT_KILL_GRACE:g})")
+    parser.add_argument("--timing", default=None, help="Write the timing and exit status as JSON")
+    parser.add_argument("command", nargs=argparse.REMAINDER, help="Command to run (after --)")
+
+    args = parser.parse_args()
+    command = args.command[1:] if args.command[:1] == ["--"] else args.command
+    if not command:
+        parser.error("no command given")
+
+    # 監視プロセス自身が SIGTERM で止められても、finally で子プロセスのグループを片付ける
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(128 + signum))
+    try:
+        run = supervise(command, args.output, args.timeout, args.kill_grace)
+    except FileNotFoundError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(127)
+
+    if args.timing:
+        with open(args.timing, "w", encoding="utf-8") as f:
+            json.dump(asdict(run), f, indent=2)
+    sys.exit(run.shell_exit_code)
+
+
+if __name__ == "__main__":
+    main()
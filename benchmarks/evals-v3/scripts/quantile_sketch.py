@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+quantile_sketch.py - マージ可能なストリーミング分位点スケッチ（DDSketch）
+
+所要時間・トークン数・コストの p50/p90/p99 を、生の値を保持せずに算出する。
+値は対数スケールのバケット（幅 gamma = (1 + α) / (1 - α)）に数えるだけなので、
+どの分位点も相対誤差 α 以内で返る。バケットは足し合わせるだけでマージできるため、
+run ごとのスケッチを JSON（to_dict）で保存しておき、あとから複数 run を結合できる。
+
+  - DDSketch:  1 系列のスケッチ（add / merge / quantile / to_dict / from_dict）
+  - SketchSet: メトリクス名 → DDSketch（SKETCH_METRICS をまとめて扱う）
+
+使用例:
+  from quantile_sketch import SketchSet
+  sketches = SketchSet()
+  sketches.add("duration_seconds", 12.3)
+  sketches.percentiles()   # {"duration_seconds": {"count": 1, "p50": ..., "p90": ..., "p99": ...}}
+  merged = SketchSet.merged([SketchSet.from_dict(d) for d in saved])
+"""
+
+import math
+from typing import Dict, Iterable, List, Optional, Sequence
+
+DEFAULT_RELATIVE_ACCURACY = 0.01
+# 1 方向あたりのバケット数の上限（超えたら最小側のバケットをまとめる）
+DEFAULT_MAX_BINS = 2048
+
+QUANTILES = (0.5, 0.9, 0.99)
+SKETCH_METRICS = ("duration_seconds", "input_tokens", "output_tokens", "estimated_cost_usd")
+
+
+def quantile_label(q: float) -> str:
+    """0.9 → "p90", 0.999 → "p99.9" """
+    return f"p{q * 100:g}"
+
+
+class DDSketch:
+    """相対誤差保証付きの分位点スケッチ
+
+    正の値・負の値はそれぞれ対数バケット（インデックス → 件数）に、0 は zero_count に数える。
+    """
+
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY,
+                 max_bins: int = DEFAULT_MAX_BINS):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError(f"relative_accuracy must be in (0, 1): {relative_accuracy}")
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.positive: Dict[int, float] = {}
+        self.negative: Dict[int, float] = {}
+        self.zero_count = 0.0
+        self.count = 0.0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def __len__(self) -> int:
+        return int(self.count)
+
+    def _index(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _bin_value(self, index: int) -> float:
+        """バケットの代表値（相対誤差が最小になる点）"""
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    def _collapse(self, bins: Dict[int, float]):
+        """バケット数が上限を超えたら、最小側（0 に近い側）のバケットをまとめる"""
+        if len(bins) <= self.max_bins:
+            return
+        indices = sorted(bins)
+        excess = indices[:len(indices) - self.max_bins + 1]
+        bins[excess[-1]] += sum(bins.pop(i) for i in excess[:-1])
+
+    def add(self, value: float, weight: float = 1.0):
+        """値を 1 件（weight 件）追加（NaN・±inf は数えない）"""
+        if weight <= 0 or value is None or not math.isfinite(value):
+            return
+        if value > 0:
+            index = self._index(value)
+            self.positive[index] = self.positive.get(index, 0.0) + weight
+            self._collapse(self.positive)
+        elif value < 0:
+            index = self._index(-value)
+            self.negative[index] = self.negative.get(index, 0.0) + weight
+            self._collapse(self.negative)
+        else:
+            self.zero_count += weight
+        self.count += weight
+        self.sum += value * weight
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: "DDSketch"):
+        """他のスケッチを足し合わせる（相対誤差が同じもの同士のみ）"""
+        if not math.isclose(self.gamma, other.gamma):
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        if not other.count:
+            return
+        for bins, other_bins in ((self.positive, other.positive), (self.negative, other.negative)):
+            for index, n in other_bins.items():
+                bins[index] = bins.get(index, 0.0) + n
+            self._collapse(bins)
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """q 分位点（0 ≤ q ≤ 1、空なら None）"""
+        if not 0 <= q <= 1:
+            raise ValueError(f"quantile must be in [0, 1]: {q}")
+        if not self.count:
+            return None
+        if q == 0:
+            return self.min
+        if q == 1:
+            return self.max
+
+        rank = q * (self.count - 1)
+        seen = 0.0
+        # 小さい順: 負（絶対値の大きい順）→ 0 → 正
+        for index in sorted(self.negative, reverse=True):
+            seen += self.negative[index]
+            if seen > rank:
+                return max(-self._bin_value(index), self.min)
+        seen += self.zero_count
+        if seen > rank:
+            return 0.0
+        for index in sorted(self.positive):
+            seen += self.positive[index]
+            if seen > rank:
+                return min(self._bin_value(index), self.max)
+        return self.max
+
+    def percentiles(self, quantiles: Sequence[float] = QUANTILES) -> dict:
+        """{"count", "mean", "p50", ...}"""
+        result = {"count": int(self.count), "mean": self.sum / self.count if self.count else None}
+        for q in quantiles:
+            result[quantile_label(q)] = self.quantile(q)
+        return result
+
+    def to_dict(self) -> dict:
+        """JSON で保存できる形式（バケットは [インデックス, 件数] の組）"""
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "zero_count": self.zero_count,
+            "positive": sorted([i, n] for i, n in self.positive.items()),
+            "negative": sorted([i, n] for i, n in self.negative.items()),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict, max_bins: int = DEFAULT_MAX_BINS) -> "DDSketch":
+        sketch = cls(data.get("relative_accuracy", DEFAULT_RELATIVE_ACCURACY), max_bins)
+        sketch.positive = {int(i): float(n) for i, n in data.get("positive", [])}
+        sketch.negative = {int(i): float(n) for i, n in data.get("negative", [])}
+        sketch.zero_count = float(data.get("zero_count", 0.0))
+        sketch.count = float(data.get("count", 0.0))
+        sketch.sum = float(data.get("sum", 0.0))
+        if sketch.count:
+            sketch.min = float(data["min"])
+            sketch.max = float(data["max"])
+        return sketch
+
+
+class SketchSet:
+    """メトリクス名 → DDSketch"""
+
+    def __init__(self, metrics: Iterable[str] = SKETCH_METRICS,
+                 relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self.sketches: Dict[str, DDSketch] = {m: DDSketch(relative_accuracy) for m in metrics}
+
+    def add(self, metric: str, value):
+        """数値なら追加（None・bool・文字列などは無視）"""
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            if metric not in self.sketches:
+                self.sketches[metric] = DDSketch(self.relative_accuracy)
+            self.sketches[metric].add(float(value))
+
+    def merge(self, other: "SketchSet"):
+        for metric, sketch in other.sketches.items():
+            if metric not in self.sketches:
+                self.sketches[metric] = DDSketch(sketch.relative_accuracy)
+            self.sketches[metric].merge(sketch)
+
+    def percentiles(self, quantiles: Sequence[float] = QUANTILES) -> Dict[str, dict]:
+        """値のあるメトリクスごとの分位点"""
+        return {metric: sketch.percentiles(quantiles)
+                for metric, sketch in self.sketches.items() if sketch.count}
+
+    def to_dict(self) -> Dict[str, dict]:
+        return {metric: sketch.to_dict() for metric, sketch in self.sketches.items() if sketch.count}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, dict]) -> "SketchSet":
+        sketch_set = cls(metrics=())
+        for metric, sketch in data.items():
+            sketch_set.sketches[metric] = DDSketch.from_dict(sketch)
+        return sketch_set
+
+    @classmethod
+    def merged(cls, sketch_sets: List["SketchSet"]) -> "SketchSet":
+        """複数 run のスケッチを 1 つに結合"""
+        result = cls(metrics=())
+        for sketch_set in sketch_sets:
+            result.merge(sketch_set)
+        return result
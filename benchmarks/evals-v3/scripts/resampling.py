@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+resampling.py - ブートストラップ / 並べ替え検定エンジン
+
+小標本・非正規なスコア分布向けに、scipy に依存しない CI と p 値を算出する。
+NumPy があればリサンプルを行列演算でまとめて計算し、なければ純 Python で計算する。
+タスクごとの乱数系列はシードとタスク ID から決まるため、ワーカー数に関係なく再現可能。
+
+対応（paired）:
+  - bootstrap:   差分の平均をブートストラップ。CI はパーセンタイル法、
+                 p 値は帰無仮説（平均 0）へシフトした分布から算出
+  - permutation: 差分の符号をランダムに反転する並べ替え検定
+                 （CI はブートストラップのパーセンタイル法）
+
+独立 2 群（independent）:
+  - bootstrap:   各群を独立に復元抽出した平均差
+  - permutation: 群ラベルの並べ替え
+
+使用例:
+  from resampling import resample_paired
+  results = resample_paired({"VP-01": diffs}, method="bootstrap", n_resamples=10000, seed=0)
+"""
+
+import math
+import random
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+
+METHODS = ("bootstrap", "permutation")
+
+DEFAULT_RESAMPLES = 10000
+DEFAULT_SEED = 0
+DEFAULT_CONFIDENCE = 0.95
+
+# 1 度に生成するリサンプル数（メモリ使用量の上限: CHUNK_SIZE × n）
+CHUNK_SIZE = 2000
+
+
+@dataclass
+class ResamplingResult:
+    """リサンプリングによる検定結果"""
+    method: str
+    observed: float  # 観測された平均（差）
+    p_value: float
+    ci_lower: float
+    ci_upper: float
+    n_resamples: int
+
+
+def task_seed(seed: int, task_id: str) -> List[int]:
+    """シードとタスク ID から乱数系列のエントロピーを作る"""
+    return [seed, zlib.crc32(task_id.encode("utf-8"))]
+
+
+def _p_value(extreme: int, n_resamples: int) -> float:
+    """(極端な件数 + 1) / (リサンプル数 + 1)（0 にならない推定）"""
+    return (extreme + 1) / (n_resamples + 1)
+
+
+def _percentile(sorted_values: Sequence[float], q: float) -> float:
+    """線形補間のパーセンタイル（numpy.percentile のデフォルトと同じ）"""
+    pos = (len(sorted_values) - 1) * q
+    lo = math.floor(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+def _chunks(n_resamples: int) -> List[int]:
+    return [min(CHUNK_SIZE, n_resamples - start) for start in range(0, n_resamples, CHUNK_SIZE)]
+
+
+# === 対応のあるデータ ===
+
+def _paired_numpy(diffs: Sequence[float], method: str, n_resamples: int,
+                  confidence: float, entropy: List[int]) -> ResamplingResult:
+    rng = numpy.random.default_rng(entropy)
+    x = numpy.asarray(diffs, dtype=float)
+    n = len(x)
+    observed = float(x.mean())
+
+    boot_means = numpy.empty(n_resamples)
+    extreme = 0
+    offset = 0
+    for size in _chunks(n_resamples):
+        idx = rng.integers(0, n, size=(size, n))
+        boot_means[offset:offset + size] = x[idx].mean(axis=1)
+        if method == "permutation":
+            signs = rng.choice((-1.0, 1.0), size=(size, n))
+            perm_means = (signs * x).mean(axis=1)
+            extreme += int((numpy.abs(perm_means) >= abs(observed) - 1e-12).sum())
+        offset += size
+
+    if method == "bootstrap":
+        # 帰無仮説（平均 0）にシフトした分布で両側 p 値
+        extreme = int((numpy.abs(boot_means - observed) >= abs(observed) - 1e-12).sum())
+
+    alpha = 1 - confidence
+    ci_lower, ci_upper = numpy.percentile(boot_means, [100 * alpha / 2, 100 * (1 - alpha / 2)])
+    return ResamplingResult(method, observed, _p_value(extreme, n_resamples),
+                            float(ci_lower), float(ci_upper), n_resamples)
+
+
+def _paired_python(diffs: Sequence[float], method: str, n_resamples: int,
+                   confidence: float, entropy: List[int]) -> ResamplingResult:
+    rng = random.Random(f"{entropy[0]}:{entropy[1]}")
+    x = list(diffs)
+    n = len(x)
+    observed = sum(x) / n
+
+    boot_means = []
+    extreme = 0
+    for _ in range(n_resamples):
+        boot_means.append(sum(rng.choice(x) for _ in range(n)) / n)
+        if method == "permutation":
+            perm_mean = sum(d if rng.random() < 0.5 else -d for d in x) / n
+            if abs(perm_mean) >= abs(observed) - 1e-12:
+                extreme += 1
+
+    if method == "bootstrap":
+        extreme = sum(1 for m in boot_means if abs(m - observed) >= abs(observed) - 1e-12)
+
+    boot_means.sort()
+    alpha = 1 - confidence
+    return ResamplingResult(method, observed, _p_value(extreme, n_resamples),
+                            _percentile(boot_means, alpha / 2),
+                            _percentile(boot_means, 1 - alpha / 2), n_resamples)
+
+
+def resample_paired_one(task_id: str, diffs: Sequence[float], method: str = "bootstrap",
+                        n_resamples: int = DEFAULT_RESAMPLES, seed: int = DEFAULT_SEED,
+                        confidence: float = DEFAULT_CONFIDENCE) -> ResamplingResult:
+    """1 タスク分の対応のある差分をリサンプリング"""
+    if method not in METHODS:
+        raise ValueError(f"Unknown resampling method: {method}")
+    if len(diffs) < 2:
+        raise ValueError(f"Not enough paired trials: {len(diffs)}")
+
+    engine = _paired_numpy if HAS_NUMPY else _paired_python
+    return engine(diffs, method, n_resamples, confidence, task_seed(seed, task_id))
+
+
+def _resample_paired_star(args: Tuple) -> ResamplingResult:
+    return resample_paired_one(*args)
+
+
+def resample_paired(diffs_by_task: Dict[str, Sequence[float]], method: str = "bootstrap",
+                    n_resamples: int = DEFAULT_RESAMPLES, seed: int = DEFAULT_SEED,
+                    confidence: float = DEFAULT_CONFIDENCE,
+                    workers: int = 1) -> Dict[str, ResamplingResult]:
+    """全タスクの対応のある差分をリサンプリング
+
+    workers > 1 ならタスクをプロセスプールに分散する。結果はワーカー数に依存しない。
+    """
+    jobs = [(task_id, list(diffs), method, n_resamples, seed, confidence)
+            for task_id, diffs in diffs_by_task.items()]
+
+    if workers <= 1 or len(jobs) <= 1:
+        return {job[0]: _resample_paired_star(job) for job in jobs}
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+        return {job[0]: result for job, result in zip(jobs, executor.map(_resample_paired_star, jobs))}
+
+
+# === 独立 2 群 ===
+
+def _independent_numpy(group1: Sequence[float], group2: Sequence[float], method: str,
+                       n_resamples: int, confidence: float, entropy: List[int]) -> ResamplingResult:
+    rng = numpy.random.default_rng(entropy)
+    a = numpy.asarray(group1, dtype=float)
+    b = numpy.asarray(group2, dtype=float)
+    n1, n2 = len(a), len(b)
+    observed = float(a.mean() - b.mean())
+    pooled = numpy.concatenate([a, b])
+
+    boot_diffs = numpy.empty(n_resamples)
+    extreme = 0
+    offset = 0
+    for size in _chunks(n_resamples):
+        boot_a = a[rng.integers(0, n1, size=(size, n1))].mean(axis=1)
+        boot_b = b[rng.integers(0, n2, size=(size, n2))].mean(axis=1)
+        boot_diffs[offset:offset + size] = boot_a - boot_b
+        if method == "permutation":
+            shuffled = rng.permuted(numpy.broadcast_to(pooled, (size, n1 + n2)), axis=1)
+            perm_diffs = shuffled[:, :n1].mean(axis=1) - shuffled[:, n1:].mean(axis=1)
+            extreme += int((numpy.abs(perm_diffs) >= abs(observed) - 1e-12).sum())
+        offset += size
+
+    if method == "bootstrap":
+        extreme = int((numpy.abs(boot_diffs - observed) >= abs(observed) - 1e-12).sum())
+
+    alpha = 1 - confidence
+    ci_lower, ci_upper = numpy.percentile(boot_diffs, [100 * alpha / 2, 100 * (1 - alpha / 2)])
+    return ResamplingResult(method, observed, _p_value(extreme, n_resamples),
+                            float(ci_lower), float(ci_upper), n_resamples)
+
+
+def _independent_python(group1: Sequence[float], group2: Sequence[float], method: str,
+                        n_resamples: int, confidence: float, entropy: List[int]) -> ResamplingResult:
+    rng = random.Random(f"{entropy[0]}:{entropy[1]}")
+    a, b = list(group1), list(group2)
+    n1, n2 = len(a), len(b)
+    observed = sum(a) / n1 - sum(b) / n2
+    pooled = a + b
+
+    boot_diffs = []
+    extreme = 0
+    for _ in range(n_resamples):
+        boot_diffs.append(sum(rng.choice(a) for _ in range(n1)) / n1
+                          - sum(rng.choice(b) for _ in range(n2)) / n2)
+        if method == "permutation":
+            shuffled = pooled[:]
+            rng.shuffle(shuffled)
+            perm_diff = sum(shuffled[:n1]) / n1 - sum(shuffled[n1:]) / n2
+            if abs(perm_diff) >= abs(observed) - 1e-12:
+                extreme += 1
+
+    if method == "bootstrap":
+        extreme = sum(1 for d in boot_diffs if abs(d - observed) >= abs(observed) - 1e-12)
+
+    boot_diffs.sort()
+    alpha = 1 - confidence
+    return ResamplingResult(method, observed, _p_value(extreme, n_resamples),
+                            _percentile(boot_diffs, alpha / 2),
+                            _percentile(boot_diffs, 1 - alpha / 2), n_resamples)
+
+
+def resample_independent(group1: Sequence[float], group2: Sequence[float],
+                         method: str = "bootstrap", n_resamples: int = DEFAULT_RESAMPLES,
+                         seed: int = DEFAULT_SEED, confidence: float = DEFAULT_CONFIDENCE,
+                         label: str = "comparison") -> Optional[ResamplingResult]:
+    """独立 2 群の平均差をリサンプリング（どちらかが 2 件未満なら None）"""
+    if method not in METHODS:
+        raise ValueError(f"Unknown resampling method: {method}")
+    if len(group1) < 2 or len(group2) < 2:
+        return None
+
+    engine = _independent_numpy if HAS_NUMPY else _independent_python
+    return engine(group1, group2, method, n_resamples, confidence, task_seed(seed, label))
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+results_store.py - 評価結果の列指向ストア
+
+1 つの結果ディレクトリ（statistical の run、フラットな *.json 置き場）の全トライアルを
+非圧縮の NumPy .npz（<dir>/.results-store.npz）1 ファイルにまとめる。
+列ごとに固定幅の配列として保存し、読み込み時は zip 内の各 .npy をそのまま
+numpy.memmap で開くため、ファイル数やサイズに関係なくほぼ一定時間で開ける。
+書き出しは ingest-results.py、読み込みは statistical-analysis.py（v2/v3）と
+benchmark-report.py が行う。NumPy が必要（なければ呼び出し側は従来の読み込みを使う）。
+
+スキーマ（SCHEMA_VERSION = 1）:
+  文字列:   run_id, source, path, task, mode, dimension, timestamp
+  整数:     iteration, trial_id, exit_code（不明は -1）, input_tokens, output_tokens
+  真偽:     passed（1 / 0、不明は -1）
+  浮動小数: code_score, model_score, score, duration_seconds, cost_usd（不明は NaN）
+  record:   元の JSON（UTF-8 を連結した record_data と境界の record_offsets。
+            statistical の run では空）
+
+source:
+  v3-statistical: <run>/<task>/<mode>/iter-N/grading-result.json（score はコード 60% + モデル 40%）
+  v3-flat:        evals-v3/results/VP-01_no-plugin_1_<ts>.json
+  v2:             evals-v2 の結果 *.json
+  scorecard:      benchmarks/results/*.json（benchmark-report.py の入力）
+
+使用例:
+  from results_store import open_store, load_history
+  store = open_store(run_dir)          # 列は store.columns["score"] など
+  history = load_history(results_root) # 配下の全 run を連結
+"""
+
+import os
+import sys
+import json
+import math
+import struct
+import zipfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+try:
+    import numpy
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+
+STORE_FILE = ".results-store.npz"
+SCHEMA_VERSION = 1
+
+# (列名, 種別)。種別は str / int / bool / float
+SCHEMA = (
+    ("run_id", "str"),
+    ("source", "str"),
+    ("path", "str"),
+    ("task", "str"),
+    ("mode", "str"),
+    ("dimension", "str"),
+    ("timestamp", "str"),
+    ("iteration", "int"),
+    ("trial_id", "int"),
+    ("exit_code", "int"),
+    ("input_tokens", "int"),
+    ("output_tokens", "int"),
+    ("passed", "bool"),
+    ("code_score", "float"),
+    ("model_score", "float"),
+    ("score", "float"),
+    ("duration_seconds", "float"),
+    ("cost_usd", "float"),
+)
+
+_DTYPES = {"int": "<i8", "bool": "i1", "float": "<f8"}
+_MISSING = {"str": "", "int": -1, "bool": -1, "float": math.nan}
+
+# フラットな結果として読まないファイル
+EXCLUDED_PREFIXES = ("scorecard", "report", "summary")
+
+# zip のローカルファイルヘッダ（固定長部分）
+_ZIP_LOCAL_HEADER = struct.Struct("<4s5H3L2H")
+
+
+def store_path(results_dir) -> Path:
+    """結果ディレクトリのストアのパス"""
+    return Path(results_dir) / STORE_FILE
+
+
+def flat_result_files(results_dir) -> List[str]:
+    """results_dir 直下の結果 JSON（名前順）"""
+    with os.scandir(results_dir) as entries:
+        return sorted(e.path for e in entries
+                      if e.is_file() and e.name.endswith(".json")
+                      and not e.name.startswith(EXCLUDED_PREFIXES))
+
+
+def fingerprint(paths: Iterable[str]) -> dict:
+    """ソースファイルの件数・最大 mtime・合計サイズ"""
+    stats = [os.stat(p) for p in paths]
+    return {
+        "files": len(stats),
+        "mtime_ns": max((st.st_mtime_ns for st in stats), default=0),
+        "size": sum(st.st_size for st in stats),
+    }
+
+
+def _require_numpy():
+    if not HAS_NUMPY:
+        raise RuntimeError("NumPy is required for the results store")
+
+
+class ResultsStore:
+    """列指向のトライアル表
+
+    columns: 列名 → 1 次元配列（open_store で開いたものは読み取り専用の memmap）
+    meta:    ingest 時のメタ情報（run_id, sources, fingerprint など）
+    """
+
+    def __init__(self, columns: Dict[str, Any], record_data, record_offsets, meta: dict):
+        self.columns = columns
+        self.record_data = record_data
+        self.record_offsets = record_offsets
+        self.meta = meta
+
+    def __len__(self) -> int:
+        return len(self.columns["run_id"])
+
+    def record(self, i: int) -> Optional[dict]:
+        """i 行目の元の JSON（保存していなければ None）"""
+        start, end = int(self.record_offsets[i]), int(self.record_offsets[i + 1])
+        if start == end:
+            return None
+        return json.loads(bytes(self.record_data[start:end]).decode("utf-8"))
+
+    def rows(self, indices: Optional[Iterable[int]] = None) -> Iterator[dict]:
+        """行を dict として返す（欠損値はそのまま）"""
+        names = [name for name, _ in SCHEMA]
+        lists = {name: self.columns[name].tolist() for name in names}
+        for i in (range(len(self)) if indices is None else indices):
+            yield {name: lists[name][i] for name in names}
+
+    @classmethod
+    def concat(cls, stores: List["ResultsStore"]) -> "ResultsStore":
+        """複数のストアを 1 つに連結（メタ情報は run_id → meta）"""
+        _require_numpy()
+        if not stores:
+            return build_store([], {})
+        columns = {name: numpy.concatenate([s.columns[name] for s in stores]) for name, _ in SCHEMA}
+        record_data = numpy.concatenate([numpy.asarray(s.record_data) for s in stores])
+        offsets = [numpy.zeros(1, dtype="<i8")]
+        base = 0
+        for s in stores:
+            offsets.append(numpy.asarray(s.record_offsets[1:]) + base)
+            base += int(s.record_offsets[-1])
+        meta = {"runs": {s.meta.get("run_id", str(i)): s.meta for i, s in enumerate(stores)}}
+        return cls(columns, record_data, numpy.concatenate(offsets), meta)
+
+
+def build_store(rows: List[dict], meta: dict) -> ResultsStore:
+    """行（SCHEMA の列名 → 値、省略時は欠損値。"record" に元の JSON）からストアを作成"""
+    _require_numpy()
+    columns = {}
+    for name, kind in SCHEMA:
+        values = [_MISSING[kind] if row.get(name) is None else row[name] for row in rows]
+        if kind == "str":
+            width = max((len(v) for v in values), default=1) or 1
+            columns[name] = numpy.array(values, dtype=f"<U{width}")
+        elif kind == "bool":
+            columns[name] = numpy.array([int(v) for v in values], dtype=_DTYPES[kind])
+        else:
+            columns[name] = numpy.array(values, dtype=_DTYPES[kind])
+
+    blobs = [b"" if row.get("record") is None
+             else json.dumps(row["record"], ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+             for row in rows]
+    record_offsets = numpy.zeros(len(rows) + 1, dtype="<i8")
+    if blobs:
+        record_offsets[1:] = numpy.cumsum([len(b) for b in blobs])
+    record_data = numpy.frombuffer(b"".join(blobs), dtype=numpy.uint8)
+
+    meta = dict(meta)
+    meta.setdefault("schema_version", SCHEMA_VERSION)
+    meta.setdefault("created_at", datetime.now(timezone.utc).isoformat(timespec="seconds"))
+    meta["n_rows"] = len(rows)
+    return ResultsStore(columns, record_data, record_offsets, meta)
+
+
+def write_store(store: ResultsStore, path: Path):
+    """ストアを非圧縮 .npz として書き出す（一時ファイル経由で置き換え）"""
+    _require_numpy()
+    path = Path(path)
+    arrays = dict(store.columns)
+    arrays["record_data"] = numpy.asarray(store.record_data, dtype=numpy.uint8)
+    arrays["record_offsets"] = numpy.asarray(store.record_offsets, dtype="<i8")
+    arrays["meta_json"] = numpy.frombuffer(
+        json.dumps(store.meta, ensure_ascii=False, default=str).encode("utf-8"), dtype=numpy.uint8)
+
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        numpy.savez(f, **arrays)
+    os.replace(tmp_path, path)
+
+
+def _mmap_members(path: Path) -> Optional[Dict[str, Any]]:
+    """zip 内の非圧縮 .npy をそれぞれ memmap で開く（開けない形式なら None）"""
+    arrays = {}
+    with open(path, "rb") as f, zipfile.ZipFile(f) as zf:
+        for info in zf.infolist():
+            if info.compress_type != zipfile.ZIP_STORED or not info.filename.endswith(".npy"):
+                return None
+            f.seek(info.header_offset)
+            header = _ZIP_LOCAL_HEADER.unpack(f.read(_ZIP_LOCAL_HEADER.size))
+            name_len, extra_len = header[-2], header[-1]
+            f.seek(info.header_offset + _ZIP_LOCAL_HEADER.size + name_len + extra_len)
+
+            version = numpy.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = numpy.lib.format.read_array_header_1_0(f)
+            elif version == (2, 0):
+                shape, fortran_order, dtype = numpy.lib.format.read_array_header_2_0(f)
+            else:
+                return None
+            if dtype.hasobject:
+                return None
+
+            name = info.filename[:-len(".npy")]
+            if math.prod(shape) == 0:
+                arrays[name] = numpy.empty(shape, dtype=dtype)
+            else:
+                arrays[name] = numpy.memmap(path, dtype=dtype, mode="r", offset=f.tell(),
+                                            shape=shape, order="F" if fortran_order else "C")
+    return arrays
+
+
+def open_store(results_dir, mmap: bool = True, verify_flat: bool = False) -> Optional[ResultsStore]:
+    """結果ディレクトリのストアを開く（ない・NumPy がない・スキーマが違えば None）
+
+    verify_flat: 直下の *.json が ingest 時から増減・更新されていれば None
+                 （結果が追記されていくフラットなディレクトリ用。stat のみで JSON は読まない）
+    """
+    if not HAS_NUMPY:
+        return None
+    path = store_path(results_dir)
+    if not path.is_file():
+        return None
+
+    arrays = _mmap_members(path) if mmap else None
+    if arrays is None:
+        with numpy.load(path, allow_pickle=False) as npz:
+            arrays = {name: npz[name] for name in npz.files}
+
+    meta = json.loads(bytes(arrays["meta_json"]).decode("utf-8"))
+    if meta.get("schema_version") != SCHEMA_VERSION:
+        print(f"Warning: ignoring {path}: schema version {meta.get('schema_version')}", file=sys.stderr)
+        return None
+
+    if verify_flat and meta.get("flat_fingerprint") != fingerprint(flat_result_files(results_dir)):
+        print(f"Warning: {path} is out of date; reading JSON results (rerun ingest-results.py)",
+              file=sys.stderr)
+        return None
+
+    columns = {name: arrays[name] for name, _ in SCHEMA}
+    return ResultsStore(columns, arrays["record_data"], arrays["record_offsets"], meta)
+
+
+def remove_store(results_dir):
+    """ストアを削除する（結果を書き換えたときに古いストアを読まないように）"""
+    try:
+        os.remove(store_path(results_dir))
+    except FileNotFoundError:
+        pass
+
+
+def load_history(results_root, include_root: bool = True) -> ResultsStore:
+    """results_root 直下の各ディレクトリ（と results_root 自身）のストアを連結
+
+    ストアのないディレクトリは含めない（ingest-results.py --all で作成する）。
+    """
+    _require_numpy()
+    root = Path(results_root)
+    with os.scandir(root) as entries:
+        dirs = sorted(e.path for e in entries if e.is_dir() and not e.name.startswith('.'))
+    if include_root:
+        dirs.insert(0, str(root))
+    stores = [store for store in (open_store(d) for d in dirs) if store is not None]
+    return ResultsStore.concat(stores)
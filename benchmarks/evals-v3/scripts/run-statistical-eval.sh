@@ -7,9 +7,16 @@
 # 使用法:
 #   ./run-statistical-eval.sh --task VP-05 --iterations 20
 #   ./run-statistical-eval.sh --all --iterations 10
+#   ./run-statistical-eval.sh --all --iterations 20 --adaptive
+#   ./run-statistical-eval.sh --all --iterations 20 --jobs 4
+#   ./run-statistical-eval.sh --all --iterations 20 --resume 2026-01-14_18-52-07
+#   ./run-statistical-eval.sh --task VP-05 --iterations 5 --profile
 #
 # 出力:
 #   results/statistical/ 以下に試行結果を保存
+#   results/statistical/<run_id>/journal.jsonl に完了したトライアルを 1 行ずつ追記
+#   各 iter-N/timing.json に Claude の所要時間（ミリ秒）・終了コード・タイムアウト
+#   --profile 時は各 iter-N/ に profile.json（trial-profiler.py の集約結果）と profile-events.jsonl
 
 set -euo pipefail
 
@@ -29,6 +36,12 @@ ITERATIONS=20
 RUN_ALL=false
 TIMEOUT_SECONDS=180
 DRY_RUN=false
+ADAPTIVE=false
+JOBS=1
+RESUME_RUN_ID=""
+MIN_EFFECT=10
+MIN_ITERATIONS=5
+PROFILE=false
 
 # === ヘルプ ===
 show_help() {
@@ -44,6 +57,16 @@ show_help() {
   --all             すべてのタスクを実行
   --iterations <n>  試行回数（デフォルト: 20）
   --timeout <sec>   タイムアウト秒数（デフォルト: 180）
+  --jobs <n>        並列に実行するトライアル数（デフォルト: 1 = 直列）
+  --adaptive        逐次検定（SPRT）で判定がついたタスクを早期停止
+                    （--iterations は上限として扱う）
+  --min-effect <n>  検出したい最小のスコア差（デフォルト: 10）
+  --min-iterations <n>
+                    早期停止する前に必要な試行回数（デフォルト: 5）
+  --resume <run_id> 中断した run を再開（grading-result.json があるトライアルはスキップ）
+                    （タスク・試行回数などのオプションは前回と同じものを指定）
+  --profile         トライアルごとにイベント（起動・最初の出力・フック・終了）と
+                    ピーク RSS・CPU 時間を記録し、profile.json に集約
   --dry-run         実際の Claude 呼び出しをスキップ
   --help            このヘルプを表示
 
@@ -75,6 +98,30 @@ while [[ $# -gt 0 ]]; do
       TIMEOUT_SECONDS="$2"
       shift 2
       ;;
+    --jobs)
+      JOBS="$2"
+      shift 2
+      ;;
+    --adaptive)
+      ADAPTIVE=true
+      shift
+      ;;
+    --min-effect)
+      MIN_EFFECT="$2"
+      shift 2
+      ;;
+    --min-iterations)
+      MIN_ITERATIONS="$2"
+      shift 2
+      ;;
+    --resume)
+      RESUME_RUN_ID="$2"
+      shift 2
+      ;;
+    --profile)
+      PROFILE=true
+      shift
+      ;;
     --dry-run)
       DRY_RUN=true
       shift
@@ -98,6 +145,17 @@ if [[ -z "$TASK_ID" && "$RUN_ALL" != "true" ]]; then
   exit 1
 fi
 
+if ! [[ "$JOBS" =~ ^[1-9][0-9]*$ ]]; then
+  echo "Error: --jobs には 1 以上の整数を指定してください"
+  exit 1
+fi
+
+# 並列実行は wait -n（bash 4.3+）を使う
+if [[ "$JOBS" -gt 1 ]] && (( BASH_VERSINFO[0] < 4 || (BASH_VERSINFO[0] == 4 && BASH_VERSINFO[1] < 3) )); then
+  echo "Error: --jobs requires bash 4.3 or newer (current: $BASH_VERSION)"
+  exit 1
+fi
+
 # Claude CLI の存在確認（早期エラー）
 if [[ "$DRY_RUN" != "true" ]]; then
   if ! command -v claude >/dev/null 2>&1; then
@@ -106,19 +164,30 @@ if [[ "$DRY_RUN" != "true" ]]; then
   fi
 fi
 
+# 逐次検定の判定結果を jq で読むため
+if [[ "$ADAPTIVE" == "true" ]] && ! command -v jq >/dev/null 2>&1; then
+  echo "Error: 'jq' is required for --adaptive but not found."
+  exit 1
+fi
+
 # プラグインディレクトリ
 PLUGIN_DIR="/Users/tachibanashuuta/Desktop/Code/CC-harness/claude-code-harness"
 
 # === YAML からタスク定義を読み込む（SSOT） ===
-# Python ヘルパーを使用して確実にパース
+# Python ヘルパーが全タスクのプロンプト・回答・成功条件を 1 回でシェル変数として出力する
+# （パース結果は .cache/task-catalog にキャッシュされ、YAML が変わらない限り再パースしない）
 # Note: 両方のコンディションで同じプロンプトを使用。差異は --plugin-dir の有無のみ
 
+TASK_IDS=()
 declare -A TASK_PROMPTS
+# タスク別の質問回答（非エンジニアの回答をシミュレート。YAML の simulated_answers）
 declare -A TASK_ANSWERS
+declare -A TASK_CRITERIA
 
 load_tasks_from_yaml() {
   local yaml_file="$1"
   local parser="$SCRIPT_DIR/parse-tasks-yaml.py"
+  local exports
 
   if ! [[ -f "$yaml_file" ]]; then
     echo "Error: YAML file not found: $yaml_file" >&2
@@ -130,26 +199,16 @@ load_tasks_from_yaml() {
     exit 1
   fi
 
-  # Python パーサーで全タスクを取得（ID|prompt 形式）
-  while IFS='|' read -r task_id prompt; do
-    if [[ -n "$task_id" ]]; then
-      TASK_PROMPTS["$task_id"]="$prompt"
-    fi
-  done < <(python3 "$parser" "$yaml_file" --prompts)
+  if ! exports=$(python3 "$parser" "$yaml_file" --export-env); then
+    echo "Error: Failed to load tasks from: $yaml_file" >&2
+    exit 1
+  fi
+  eval "$exports"
 }
 
 # YAML からタスクを読み込み
 load_tasks_from_yaml "$TASKS_FILE"
 
-# タスク別の質問回答（非エンジニアの回答をシミュレート）
-# Note: これは将来的に YAML に移動すべきだが、現状はインタラクションシミュレーション用
-declare -A TASK_ANSWERS
-TASK_ANSWERS["VP-01"]="とりあえずシンプルなやつでいい|メモリでいい、後でデータベースにできるなら|パスワードは安全に保存してほしい"
-TASK_ANSWERS["VP-02"]="まずメールだけでいい、SNSは後で|シンプル優先で|なんかモダンな感じ"
-TASK_ANSWERS["VP-03"]="エラーメッセージはよくわからない|たぶん昨日から|全部直して"
-TASK_ANSWERS["VP-04"]="src フォルダ全部|読みやすければいい|テストがあるなら動かして確認して"
-TASK_ANSWERS["VP-05"]="ユーザー情報を表示したい|とりあえず動けばいい|シンプル優先で"
-
 # === ユーティリティ関数 ===
 
 # タイムスタンプ取得
@@ -197,57 +256,184 @@ run_claude_with_print_mode() {
 
   cd "$project_dir"
 
-  # タイムアウト付きで実行（バックグラウンドプロセス + wait）
-  local pid
+  local claude_args=(-p --dangerously-skip-permissions)
   if [[ "$use_plugin" == "true" ]]; then
     # プラグイン有効
-    echo "$prompt" | claude -p --dangerously-skip-permissions --plugin-dir "$PLUGIN_DIR" > "$output_file" 2>&1 &
-    pid=$!
-  else
-    # プラグイン無効（素の Claude）
-    echo "$prompt" | claude -p --dangerously-skip-permissions > "$output_file" 2>&1 &
-    pid=$!
+    claude_args+=(--plugin-dir "$PLUGIN_DIR")
   fi
 
-  # タイムアウト監視
-  local elapsed=0
-  while kill -0 "$pid" 2>/dev/null; do
-    sleep 1
-    elapsed=$((elapsed + 1))
-    if [[ $elapsed -ge $timeout ]]; then
-      echo "TIMEOUT after ${timeout}s" >> "$output_file"
-      kill "$pid" 2>/dev/null || true
-      break
-    fi
-  done
-
-  wait "$pid" 2>/dev/null || true
+  # process_supervisor.py が終了・タイムアウトをイベントで待ち、プロセスグループごと終了させる
+  # （所要時間はミリ秒で timing.json に記録）
+  # 計測モードでは trial-profiler.py（同じ監視 + イベントを profile.json に集約）を使う
+  # （フックのイベントは scripts/run-script.js が CLAUDE_HARNESS_PROFILE_LOG に追記）
+  if [[ "$PROFILE" == "true" ]]; then
+    echo "$prompt" | python3 "$SCRIPT_DIR/trial-profiler.py" \
+      --output "$output_file" \
+      --profile "$project_dir/profile.json" \
+      --events "$project_dir/profile-events.jsonl" \
+      --timeout "$timeout" \
+      -- claude "${claude_args[@]}" || true
+  else
+    echo "$prompt" | python3 "$SCRIPT_DIR/process_supervisor.py" \
+      --output "$output_file" \
+      --timing "$project_dir/timing.json" \
+      --timeout "$timeout" \
+      -- claude "${claude_args[@]}" || true
+  fi
 
   cd - >/dev/null
 }
 
 # グレーディングを実行
+# 引数: トライアルディレクトリ（複数可）。batch-grader.py が 1 プロセスで採点し、
+# 各ディレクトリに grading-result.json を書き出す
 run_grading() {
-  local project_dir="$1"
-  local result_file="$2"
+  # モデルベースグレーダーはモック使用
+  printf '%s\n' "$@" | python3 "$GRADERS_DIR/batch-grader.py" --stdin --write --no-llm > /dev/null
+}
 
-  # コードベースグレーダー
-  local code_result
-  code_result=$("$GRADERS_DIR/code-grader.sh" "$project_dir" --json)
+# 逐次検定の判定（1 行の JSON）を出力
+# 引数: タスク ID
+sequential_check() {
+  python3 "$SCRIPT_DIR/statistical-analysis.py" "$RUN_DIR" \
+    --sequential-check "$1" \
+    --min-effect "$MIN_EFFECT" \
+    --min-pairs "$MIN_ITERATIONS" \
+    --max-pairs "$ITERATIONS" 2>/dev/null
+}
 
-  # モデルベースグレーダー（モック使用）
-  local model_result
-  model_result=$(python3 "$GRADERS_DIR/model-grader.py" "$project_dir" --no-llm --json)
+# 逐次検定を行い、判定がついたタスクを TASK_STOPPED に記録
+# 引数: タスク ID。戻り値: 0 = 停止、1 = 継続
+check_sequential_stop() {
+  local task="$1"
+  local decision_json
 
-  # 結果を結合
-  cat > "$result_file" <<EOF
-{
-  "timestamp": "$(date -Iseconds)",
-  "project_dir": "$project_dir",
-  "code_grading": $code_result,
-  "model_grading": $model_result
+  if ! decision_json="$(sequential_check "$task")"; then
+    echo "Warning: sequential check failed for $task, continuing"
+    return 1
+  fi
+
+  TASK_STOPPING["$task"]="$decision_json"
+  if [[ "$(jq -r '.decision' <<< "$decision_json")" != "stop" ]]; then
+    return 1
+  fi
+
+  TASK_STOPPED["$task"]=true
+  echo "[sequential] Stopping $task after $(jq -r '.n_pairs' <<< "$decision_json") iterations: $(jq -r '.reason' <<< "$decision_json")"
+  return 0
 }
-EOF
+
+# イテレーション内のモード実行順
+# 奇数イテレーションは with-plugin、偶数は no-plugin を先に実行し、
+# 実行順による系統的な差（API 側の混雑・キャッシュ等）を打ち消す
+mode_order() {
+  if (( $1 % 2 == 1 )); then
+    echo "with-plugin no-plugin"
+  else
+    echo "no-plugin with-plugin"
+  fi
+}
+
+# トライアルが採点まで完了しているか（--resume 時のスキップ判定）
+# 引数: タスク ID, モード, イテレーション番号
+trial_completed() {
+  [[ -f "$RUN_DIR/$1/$2/iter-$3/grading-result.json" ]]
+}
+
+# Claude の所要時間（ミリ秒）。timing.json / profile.json がない・読めなければ（--dry-run）null
+# jq は --adaptive でしか必須にしていないため python3 で読む（ジャーナルには必ず JSON の数値か null を書く）
+# 引数: タスク ID, モード, イテレーション番号
+trial_duration_ms() {
+  local dir="$RUN_DIR/$1/$2/iter-$3"
+  local file key
+  if [[ -f "$dir/timing.json" ]]; then
+    file="$dir/timing.json"
+    key="duration_ms"
+  elif [[ -f "$dir/profile.json" ]]; then
+    file="$dir/profile.json"
+    key="wall_ms"
+  else
+    echo null
+    return
+  fi
+  python3 - "$file" "$key" <<'PY' 2>/dev/null || echo null
+import json, math, sys
+try:
+    with open(sys.argv[1], encoding="utf-8") as f:
+        value = json.load(f).get(sys.argv[2])
+except (OSError, ValueError, AttributeError):
+    value = None
+if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+    value = None
+print(json.dumps(value))
+PY
+}
+
+# ジャーナルにトライアル完了を追記（1 行 1 イベントの JSONL）
+# 1 回の write で追記するため、並列ワーカーから同時に書いても行は混ざらない
+# 引数: タスク ID, モード, イテレーション番号, 所要秒数（採点込み）
+journal_trial_done() {
+  printf '{"event":"trial_done","timestamp":"%s","task":"%s","mode":"%s","iteration":%d,"elapsed_seconds":%d,"duration_ms":%s}\n' \
+    "$(date "+%Y-%m-%dT%H:%M:%S%z")" "$1" "$2" "$3" "$4" "$(trial_duration_ms "$1" "$2" "$3")" >> "$JOURNAL_FILE"
+}
+
+# 1 トライアル（タスク × モード × イテレーション）を実行し、結果ディレクトリにコピー
+# 引数: タスク ID, モード（with-plugin / no-plugin）, イテレーション番号
+run_trial() {
+  local task="$1"
+  local mode="$2"
+  local i="$3"
+  local prompt="${TASK_PROMPTS[$task]}"
+  local result_dir="$RUN_DIR/$task/$mode/iter-$i"
+  local exec_dir="$WORK_BASE/$task/$mode/iter-$i"
+
+  echo "[$mode] $task iter-$i Starting..."
+  # 中断されたトライアルの残骸は捨てる
+  rm -rf "$result_dir"
+  mkdir -p "$result_dir" "$exec_dir"
+  init_project_dir "$exec_dir"
+
+  if [[ "$DRY_RUN" == "true" ]]; then
+    echo "[DRY RUN] Would run: $prompt ($mode)"
+    if [[ "$mode" == "with-plugin" ]]; then
+      # ダミーの Plans.md を作成
+      # （no-plugin では作成しない = 素の Claude の挙動をシミュレート）
+      echo "# Dummy Plans.md for dry run" > "$exec_dir/Plans.md"
+    fi
+  elif [[ "$mode" == "with-plugin" ]]; then
+    # --plugin-dir あり = ルール・スキルが読み込まれる
+    run_claude_with_print_mode "$exec_dir" "$prompt" "$TIMEOUT_SECONDS" "$exec_dir/claude-output.txt" "true"
+  else
+    # --plugin-dir なし = 素の Claude
+    run_claude_with_print_mode "$exec_dir" "$prompt" "$TIMEOUT_SECONDS" "$exec_dir/claude-output.txt" "false"
+  fi
+
+  # 結果をコピー（隠しファイル含む）
+  cp -r "$exec_dir"/. "$result_dir/" 2>/dev/null || true
+  echo "[$mode] $task iter-$i Done"
+}
+
+# 並列実行用: トライアルを実行・採点し、完了イベントを出力
+# 引数: タスク ID, モード, イテレーション番号
+run_trial_job() {
+  local start=$SECONDS
+
+  run_trial "$@"
+  run_grading "$RUN_DIR/$1/$2/iter-$3"
+  journal_trial_done "$1" "$2" "$3" "$((SECONDS - start))"
+  echo "[done] $1 $2 iter-$3 ($((SECONDS - start))s)"
+}
+
+# 並列実行中に完了したトライアルを反映（--adaptive 時は開始済みタスクを逐次検定）
+on_trial_finished() {
+  local task
+  [[ "$ADAPTIVE" == "true" ]] || return 0
+
+  for task in "${!TASK_STARTED[@]}"; do
+    if [[ -z "${TASK_STOPPED[$task]:-}" ]]; then
+      check_sequential_stop "$task" || true
+    fi
+  done
 }
 
 # === メイン処理 ===
@@ -255,6 +441,10 @@ EOF
 echo "=== Statistical Evaluation Runner ==="
 echo "Iterations: $ITERATIONS"
 echo "Timeout: $TIMEOUT_SECONDS sec"
+echo "Jobs: $JOBS"
+if [[ "$ADAPTIVE" == "true" ]]; then
+  echo "Adaptive: SPRT (min effect: $MIN_EFFECT, min iterations: $MIN_ITERATIONS)"
+fi
 echo ""
 
 # 一時作業ディレクトリをクリーンアップ
@@ -263,96 +453,210 @@ mkdir -p "$WORK_BASE"
 
 # タスクリストを決定
 if [[ "$RUN_ALL" == "true" ]]; then
-  TASKS=("VP-01" "VP-02" "VP-03" "VP-04" "VP-05")
+  TASKS=("${TASK_IDS[@]}")
 else
   TASKS=("$TASK_ID")
 fi
 
-# 結果ディレクトリを作成
-RUN_ID="$(timestamp)"
-RUN_DIR="$RESULTS_DIR/$RUN_ID"
-mkdir -p "$RUN_DIR"
-
-echo "Results will be saved to: $RUN_DIR"
+# 結果ディレクトリを作成（--resume 時は既存の run を使う）
+if [[ -n "$RESUME_RUN_ID" ]]; then
+  RUN_ID="$RESUME_RUN_ID"
+  RUN_DIR="$RESULTS_DIR/$RUN_ID"
+  if ! [[ -d "$RUN_DIR" ]]; then
+    echo "Error: Run not found: $RUN_DIR"
+    exit 1
+  fi
+  RESUMED=true
+  # 再開した run の列指向ストアは古くなるので消す（終了時に作り直す）
+  rm -f "$RUN_DIR/.results-store.npz"
+  echo "Resuming run: $RUN_DIR"
+else
+  RUN_ID="$(timestamp)"
+  RUN_DIR="$RESULTS_DIR/$RUN_ID"
+  mkdir -p "$RUN_DIR"
+  RESUMED=false
+  echo "Results will be saved to: $RUN_DIR"
+fi
 echo ""
 
-# 各タスクを実行
-for task in "${TASKS[@]}"; do
-  echo "=== Task: $task ==="
+# チェックポイント用ジャーナル（追記のみ）
+JOURNAL_FILE="$RUN_DIR/journal.jsonl"
+printf '{"event":"run_start","timestamp":"%s","run_id":"%s","resumed":%s,"iterations":%d,"jobs":%d,"adaptive":%s,"tasks":[%s]}\n' \
+  "$(date "+%Y-%m-%dT%H:%M:%S%z")" "$RUN_ID" "$RESUMED" "$ITERATIONS" "$JOBS" "$ADAPTIVE" \
+  "$(printf '"%s",' "${TASKS[@]}" | sed 's/,$//')" >> "$JOURNAL_FILE"
 
-  TASK_DIR="$RUN_DIR/$task"
-  mkdir -p "$TASK_DIR/with-plugin" "$TASK_DIR/no-plugin"
+# タスクごとの逐次検定の判定（--adaptive 時、最後の判定 JSON）と停止済みタスク
+declare -A TASK_STOPPING
+declare -A TASK_STOPPED
+declare -A TASK_STARTED
 
-  prompt="${TASK_PROMPTS[$task]}"
-  # Note: 両方のコンディションで同じプロンプトを使用。差異は --plugin-dir の有無のみ
-  answers="${TASK_ANSWERS[$task]}"
+for task in "${TASKS[@]}"; do
+  mkdir -p "$RUN_DIR/$task/with-plugin" "$RUN_DIR/$task/no-plugin"
+done
 
-  echo "Prompt: $prompt"
-  echo "(Same prompt for both conditions, diff is --plugin-dir)"
+# 再開時は既存の結果で逐次検定し、判定済みのタスクは実行しない
+if [[ "$RESUMED" == "true" && "$ADAPTIVE" == "true" ]]; then
+  for task in "${TASKS[@]}"; do
+    check_sequential_stop "$task" || true
+  done
   echo ""
+fi
 
-  for i in $(seq 1 "$ITERATIONS"); do
-    echo "--- Iteration $i/$ITERATIONS ---"
+if [[ "$JOBS" -le 1 ]]; then
+  # 各タスクを直列に実行
+  for task in "${TASKS[@]}"; do
+    if [[ -n "${TASK_STOPPED[$task]:-}" ]]; then
+      continue
+    fi
 
-    # with-plugin モード（--plugin-dir あり = ルール・スキルが読み込まれる）
-    echo "[with-plugin] Starting..."
-    RESULT_DIR="$TASK_DIR/with-plugin/iter-$i"
-    EXEC_DIR="$WORK_BASE/$task/with-plugin/iter-$i"
-    mkdir -p "$RESULT_DIR" "$EXEC_DIR"
-    init_project_dir "$EXEC_DIR"
+    echo "=== Task: $task ==="
 
-    if [[ "$DRY_RUN" == "true" ]]; then
-      echo "[DRY RUN] Would run: $prompt (with plugin)"
-      # ダミーの Plans.md を作成
-      echo "# Dummy Plans.md for dry run" > "$EXEC_DIR/Plans.md"
-    else
-      run_claude_with_print_mode "$EXEC_DIR" "$prompt" "$TIMEOUT_SECONDS" "$EXEC_DIR/claude-output.txt" "true"
-    fi
+    # Note: 両方のコンディションで同じプロンプトを使用。差異は --plugin-dir の有無のみ
+    echo "Prompt: ${TASK_PROMPTS[$task]}"
+    echo "(Same prompt for both conditions, diff is --plugin-dir)"
+    echo ""
 
-    # 結果をコピー（隠しファイル含む）
-    cp -r "$EXEC_DIR"/. "$RESULT_DIR/" 2>/dev/null || true
-    run_grading "$RESULT_DIR" "$RESULT_DIR/grading-result.json"
-    echo "[with-plugin] Done"
-
-    # no-plugin モード（--plugin-dir なし = 素の Claude）
-    echo "[no-plugin] Starting..."
-    RESULT_DIR="$TASK_DIR/no-plugin/iter-$i"
-    EXEC_DIR="$WORK_BASE/$task/no-plugin/iter-$i"
-    mkdir -p "$RESULT_DIR" "$EXEC_DIR"
-    init_project_dir "$EXEC_DIR"
-
-    if [[ "$DRY_RUN" == "true" ]]; then
-      echo "[DRY RUN] Would run: $prompt (no plugin)"
-      # no-plugin では Plans.md を作成しない（素の Claude の挙動をシミュレート）
-    else
-      run_claude_with_print_mode "$EXEC_DIR" "$prompt" "$TIMEOUT_SECONDS" "$EXEC_DIR/claude-output.txt" "false"
-    fi
+    for i in $(seq 1 "$ITERATIONS"); do
+      # 両モードとも完了済み（--resume）ならスキップ
+      if trial_completed "$task" with-plugin "$i" && trial_completed "$task" no-plugin "$i"; then
+        echo "--- Iteration $i/$ITERATIONS (already completed, skipping) ---"
+        continue
+      fi
+
+      echo "--- Iteration $i/$ITERATIONS ---"
+
+      declare -A elapsed=()
+      for mode in $(mode_order "$i"); do
+        if trial_completed "$task" "$mode" "$i"; then
+          continue
+        fi
+        start=$SECONDS
+        run_trial "$task" "$mode" "$i"
+        elapsed["$mode"]=$((SECONDS - start))
+      done
+
+      # 実行したモードをまとめて採点
+      trial_dirs=()
+      for mode in "${!elapsed[@]}"; do
+        trial_dirs+=("$RUN_DIR/$task/$mode/iter-$i")
+      done
+      run_grading "${trial_dirs[@]}"
+      for mode in "${!elapsed[@]}"; do
+        journal_trial_done "$task" "$mode" "$i" "${elapsed[$mode]}"
+      done
+
+      # 逐次検定: 判定がついたら残りのイテレーションをスキップ
+      if [[ "$ADAPTIVE" == "true" ]] && check_sequential_stop "$task"; then
+        echo ""
+        break
+      fi
+
+      echo ""
+    done
+  done
+else
+  # トライアル単位でワーカープールに投入（同じイテレーションの両モードは隣接させる）
+  echo "=== Scheduling ${#TASKS[@]} task(s) x $ITERATIONS iterations x 2 modes on $JOBS workers ==="
+  echo "(Same prompt for both conditions, diff is --plugin-dir)"
+  echo ""
 
-    # 結果をコピー（隠しファイル含む）
-    cp -r "$EXEC_DIR"/. "$RESULT_DIR/" 2>/dev/null || true
-    run_grading "$RESULT_DIR" "$RESULT_DIR/grading-result.json"
-    echo "[no-plugin] Done"
+  running=0
+  for task in "${TASKS[@]}"; do
+    for i in $(seq 1 "$ITERATIONS"); do
+      for mode in $(mode_order "$i"); do
+        # 完了済み（--resume）
+        if trial_completed "$task" "$mode" "$i"; then
+          continue
+        fi
+
+        # 空きワーカーを待つ
+        while (( running >= JOBS )); do
+          wait -n || true
+          running=$((running - 1))
+          on_trial_finished
+        done
+
+        # 逐次検定で停止したタスクは残りを投入しない（実行中のトライアルは完了させる）
+        if [[ -n "${TASK_STOPPED[$task]:-}" ]]; then
+          continue 3
+        fi
+
+        TASK_STARTED["$task"]=true
+        run_trial_job "$task" "$mode" "$i" &
+        running=$((running + 1))
+      done
+    done
+  done
 
-    echo ""
+  # 残りの完了を待つ
+  while (( running > 0 )); do
+    wait -n || true
+    running=$((running - 1))
+    on_trial_finished
   done
-done
+  echo ""
+fi
 
 # サマリーを作成
 echo "=== Creating Summary ==="
 SUMMARY_FILE="$RUN_DIR/summary.json"
 
+# --adaptive 時はタスクごとの停止理由を "stopping" に記録
+STOPPING_LINE=""
+if [[ "$ADAPTIVE" == "true" ]]; then
+  stopping_json=$(
+    for task in "${TASKS[@]}"; do
+      if [[ -n "${TASK_STOPPING[$task]:-}" ]]; then
+        printf '%s\n' "${TASK_STOPPING[$task]}"
+      fi
+    done | jq -cs --argjson min_effect "$MIN_EFFECT" --argjson min_iterations "$MIN_ITERATIONS" \
+      '{method: "sprt", min_effect: $min_effect, min_iterations: $min_iterations,
+        tasks: (map({key: .task_id, value: {iterations_run: .n_pairs, reason: .reason,
+                                            diff_mean: (.diff_mean * 100 | round / 100),
+                                            log_likelihood_ratio: (.log_likelihood_ratio * 1000 | round / 1000)}})
+                | from_entries)}'
+  )
+  STOPPING_LINE=$'\n  "stopping": '"$stopping_json,"
+fi
+
+# 完了トライアル数はディスク上の grading-result.json から数え直す（再開した run でも正しくなる）
+trials_completed=$(
+  for task in "${TASKS[@]}"; do
+    printf '"%s": %d, ' "$task" \
+      "$(find "$RUN_DIR/$task" -path '*/iter-*/grading-result.json' 2>/dev/null | wc -l)"
+  done | sed 's/, $//'
+)
+
+# バージョン情報（statistical-analysis.py --history でバージョンごとに比較する）
+GIT_COMMIT=$(git -C "$SCRIPT_DIR" rev-parse --short HEAD 2>/dev/null || echo "unknown")
+CLI_VERSION=$(claude --version 2>/dev/null | head -n 1 || true)
+CLI_VERSION=$(printf '%s' "${CLI_VERSION:-unknown}" | sed 's/["\\]//g')
+
 cat > "$SUMMARY_FILE" <<EOF
 {
   "run_id": "$RUN_ID",
+  "git_commit": "$GIT_COMMIT",
+  "cli_version": "$CLI_VERSION",
   "iterations": $ITERATIONS,
   "timeout_seconds": $TIMEOUT_SECONDS,
   "tasks": [$(printf '"%s",' "${TASKS[@]}" | sed 's/,$//')],
   "dry_run": $DRY_RUN,
+  "adaptive": $ADAPTIVE,$STOPPING_LINE
+  "resumed": $RESUMED,
+  "trials_completed": {$trials_completed},
   "results_dir": "$RUN_DIR"
 }
 EOF
 
+printf '{"event":"run_end","timestamp":"%s","run_id":"%s"}\n' \
+  "$(date "+%Y-%m-%dT%H:%M:%S%z")" "$RUN_ID" >> "$JOURNAL_FILE"
+
 echo "Summary saved to: $SUMMARY_FILE"
+
+# 完了した run を列指向ストアにまとめる（NumPy がなければスキップ）
+if ! python3 "$SCRIPT_DIR/ingest-results.py" "$RUN_DIR"; then
+  echo "Warning: Failed to build the results store (analysis will read JSON results)"
+fi
 echo ""
 echo "=== Evaluation Complete ==="
 echo ""
@@ -362,3 +666,6 @@ echo "     python3 $SCRIPT_DIR/statistical-analysis.py $RUN_DIR"
 echo ""
 echo "  2. Generate report:"
 echo "     python3 $SCRIPT_DIR/statistical-analysis.py $RUN_DIR --report"
+echo ""
+echo "  3. Regrade all trials (after grader changes):"
+echo "     python3 $GRADERS_DIR/batch-grader.py $RUN_DIR --write"
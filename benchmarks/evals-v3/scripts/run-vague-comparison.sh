@@ -28,8 +28,11 @@ ITERATIONS=3
 TIMESTAMP=$(date +%Y%m%d-%H%M%S)
 
 # === YAML からタスク定義を読み込む（SSOT） ===
-# Python ヘルパーを使用して確実にパース
+# Python ヘルパーが全タスクを 1 回でシェル変数として出力する（パース結果はキャッシュされる）
+TASK_IDS=()
 declare -A TASK_PROMPTS
+declare -A TASK_ANSWERS
+declare -A TASK_CRITERIA
 
 load_tasks_from_yaml() {
   local yaml_file="$1"
@@ -45,12 +48,12 @@ load_tasks_from_yaml() {
     exit 1
   fi
 
-  # Python パーサーでプロンプトを取得（ID|prompt 形式）
-  while IFS='|' read -r task_id prompt; do
-    if [[ -n "$task_id" ]]; then
-      TASK_PROMPTS["$task_id"]="$prompt"
-    fi
-  done < <(python3 "$parser" "$yaml_file" --prompts)
+  local exports
+  if ! exports=$(python3 "$parser" "$yaml_file" --export-env); then
+    echo "Error: Failed to load tasks from: $yaml_file" >&2
+    exit 1
+  fi
+  eval "$exports"
 }
 
 load_tasks_from_yaml "$TASKS_FILE"
@@ -86,7 +89,7 @@ EXAMPLES:
 TASKS (from $TASKS_FILE):
 EOF
   # YAML からタスク一覧を動的に表示
-  for task_id in "${!TASK_PROMPTS[@]}"; do
+  for task_id in "${TASK_IDS[@]}"; do
     local prompt="${TASK_PROMPTS[$task_id]}"
     # プロンプトを短縮表示（最初の30文字）
     local short_prompt="${prompt:0:30}"
@@ -331,7 +334,7 @@ analyze_results() {
   echo "========================================"
 
   # 各タスクの結果を集計（YAML から読み込んだタスク）
-  for task in "${!TASK_PROMPTS[@]}"; do
+  for task in "${TASK_IDS[@]}"; do
     local vague_prompt=$(get_vague_prompt "$task")
     [[ -z "$vague_prompt" ]] && continue
 
@@ -397,14 +400,14 @@ echo "========================================"
 echo "タイムスタンプ: $TIMESTAMP"
 
 if [[ "$ALL_TASKS" == "true" ]]; then
-  for task in "${!TASK_PROMPTS[@]}"; do
+  for task in "${TASK_IDS[@]}"; do
     run_task_comparison "$task"
   done | sort
 else
   vague_prompt=$(get_vague_prompt "$TASK_ID")
   if [[ -z "$vague_prompt" ]]; then
     echo "Error: Unknown task ID: $TASK_ID"
-    echo "Valid tasks: ${!TASK_PROMPTS[*]}"
+    echo "Valid tasks: ${TASK_IDS[*]}"
     exit 1
   fi
   run_task_comparison "$TASK_ID"
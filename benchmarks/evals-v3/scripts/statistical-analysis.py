@@ -10,16 +10,28 @@ Anthropic Evals ガイドライン準拠: pass@k, Cohen's d, 95% CI
 - scipy.stats を使用した正確な統計計算
 - 標本分散（N-1）を使用
 - 正確な t 分布臨界値
+- NumPy があれば全タスクを配列にまとめてベクトル演算（なければ純 Python）
 
 使用法:
   python statistical-analysis.py <results_dir>
   python statistical-analysis.py <results_dir> --report
   python statistical-analysis.py <results_dir> --json
+  python statistical-analysis.py <results_dir> --workers 16 --progress
+  python statistical-analysis.py <results_dir> --incremental
+  python statistical-analysis.py <results_dir> --no-store   # ingest-results.py のストアを使わない
+  python statistical-analysis.py <results_dir> --method bootstrap --resamples 10000 --seed 0 --jobs 4
+  python statistical-analysis.py <results_dir> --sequential-check VP-01 --max-pairs 20
+  python statistical-analysis.py <results_root> --history [--group-by cli_version] [--window 10]
+
+run-statistical-eval.sh --profile で記録した iter-N/profile.json があれば、モードごとの
+壁時計時間の内訳（フック / ツール / モデル）・ピーク RSS・CPU 時間も出力する。
 
 出力:
   - コンソール: 統計サマリー
   - --report: Markdown レポート
   - --json: JSON 形式
+  - --sequential-check: 逐次検定の判定（1 行の JSON）
+  - --history: run ごとの推移とバージョン間のリグレッション（--json / --report も可）
 """
 
 import os
@@ -27,9 +39,11 @@ import sys
 import json
 import math
 import argparse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Tuple, Any, Optional
-from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Tuple, Any, Optional
+from dataclasses import dataclass, asdict
 
 # scipy のインポート（なければフォールバック）
 try:
@@ -39,6 +53,58 @@ except ImportError:
     HAS_SCIPY = False
     print("Warning: scipy not installed. Using fallback statistics.", file=sys.stderr)
 
+# 比較するモード
+MODES = ("with-plugin", "no-plugin")
+
+# grading-result.json 読み込みのデフォルトスレッド数
+DEFAULT_LOAD_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# 増分集計用インデックス（run ディレクトリ直下、隠しファイルなのでタスクとして扱われない）
+STATS_INDEX_FILE = ".stats-index.json"
+STATS_INDEX_VERSION = 1
+
+# 逐次検定（SPRT）のデフォルト値
+SEQUENTIAL_ALPHA = 0.05
+SEQUENTIAL_BETA = 0.20
+DEFAULT_MIN_EFFECT = 10.0  # 検出したい最小の平均差（normalized_score のポイント）
+DEFAULT_MIN_PAIRS = 5
+
+# 複数 run の推移分析（results ルート直下のインデックスに run ごとの集計をキャッシュ）
+HISTORY_INDEX_FILE = ".history-index.json"
+HISTORY_INDEX_VERSION = 1
+HISTORY_GROUP_KEYS = ("git_commit", "cli_version")
+DEFAULT_HISTORY_WINDOW = 10  # 比較の基準にする直前の run 数
+
+# trial-profiler.py が iter-N/ に書き出すトライアルのプロファイル
+PROFILE_FILE = "profile.json"
+# 指標: (十分統計量の接頭辞, 表示名)
+HISTORY_METRICS = {
+    "diff": ("diff", "paired diff (with-plugin - no-plugin)"),
+    "with-plugin": ("wp", "with-plugin score"),
+    "no-plugin": ("np", "no-plugin score"),
+}
+
+# NumPy のインポート（なければ純 Python 実装にフォールバック）
+try:
+    import numpy
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+# リサンプリングエンジン（同じディレクトリの resampling.py）
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import resampling
+import results_store
+
+# 検定手法: (JSON での名前, レポート表記, コンソール表記)
+STATISTICAL_METHODS = {
+    "ttest": ("paired_t_test", "対応 t 検定（paired t-test）", "Paired t-test"),
+    "bootstrap": ("paired_bootstrap", "対応ブートストラップ（paired bootstrap, percentile CI）",
+                  "Paired bootstrap"),
+    "permutation": ("paired_permutation", "符号反転による並べ替え検定（paired permutation, bootstrap CI）",
+                    "Paired permutation"),
+}
+
 
 @dataclass
 class TrialResult:
@@ -98,55 +164,411 @@ class StatisticalResults:
     missing_pairs: int
 
 
-def load_trial_results(results_dir: Path) -> Dict[str, List[TrialResult]]:
-    """試行結果を読み込む"""
-    results = {}
+@dataclass
+class SequentialDecision:
+    """逐次検定の判定"""
+    task_id: str
+    n_pairs: int
+    decision: str  # "continue" or "stop"
+    reason: Optional[str]  # "effect" / "no_effect" / "max_iterations"（continue なら None）
+    diff_mean: float
+    log_likelihood_ratio: float
+    upper_bound: float  # これ以上なら効果ありで停止
+    lower_bound: float  # これ以下なら効果なしで停止
+
+
+@dataclass
+class ModeProfile:
+    """モードごとのプロファイル集計（時間はトライアルあたりの平均ミリ秒）"""
+    mode: str
+    trials: int
+    timed_out: int
+    wall_ms: float
+    time_to_first_output_ms: Optional[float]
+    hooks_ms: float
+    tools_ms: float
+    model_ms: float
+    hook_count: float
+    tool_count: float
+    cpu_ms: Optional[float]  # user + system
+    max_rss_kb: Optional[int]  # 全トライアルの最大
+
+    @property
+    def hook_share(self) -> float:
+        return self.hooks_ms / self.wall_ms if self.wall_ms else 0.0
+
+
+@dataclass
+class TaskTrend:
+    """タスクの run ごとの平均と回帰直線"""
+    task_id: str
+    n_runs: int
+    slope: float  # 1 run あたりの変化
+    intercept: float
+    latest: float
+    run_ids: List[str]
+    means: List[float]
+
+
+@dataclass
+class VersionComparison:
+    """バージョン（git_commit / cli_version）と直前の run の比較"""
+    task_id: str
+    version: str
+    runs: List[str]
+    baseline_runs: List[str]
+    n: int
+    mean: float
+    baseline_n: int
+    baseline_mean: float
+    delta: float  # mean - baseline_mean
+    t_statistic: float
+    p_value: float  # Welch の t 検定（両側）
+    regression: bool  # delta < 0 かつ p < alpha
 
-    for task_dir in results_dir.iterdir():
-        if not task_dir.is_dir() or task_dir.name.startswith('.'):
-            continue
 
-        task_id = task_dir.name
-        results[task_id] = []
+def list_task_dirs(results_dir: Path) -> List[Tuple[str, str]]:
+    """results_dir 直下のタスクディレクトリを (task_id, path) で列挙（名前順）"""
+    with os.scandir(results_dir) as entries:
+        return sorted((e.name, e.path) for e in entries if e.is_dir() and not e.name.startswith('.'))
 
-        for mode in ["with-plugin", "no-plugin"]:
-            mode_dir = task_dir / mode
-            if not mode_dir.exists():
+
+def scan_grading_files(results_dir: Path) -> Iterator[Tuple[str, str, int, str]]:
+    """results_dir/<task>/<mode>/iter-N/grading-result.json を列挙
+
+    os.scandir でディレクトリ名だけを見て辿り、iter-N の中身（src/ や
+    claude-output.txt）は列挙しない。
+
+    Yields:
+        (task_id, mode, iteration, grading_file_path)
+    """
+    for task_id, task_path in list_task_dirs(results_dir):
+        for mode in MODES:
+            mode_dir = os.path.join(task_path, mode)
+            try:
+                with os.scandir(mode_dir) as entries:
+                    iters = []
+                    for e in entries:
+                        if not e.name.startswith('iter-') or not e.is_dir():
+                            continue
+                        try:
+                            iters.append((int(e.name.split('-')[1]), e.path))
+                        except ValueError:
+                            continue
+            except FileNotFoundError:
                 continue
 
-            for iter_dir in sorted(mode_dir.iterdir()):
-                if not iter_dir.is_dir() or not iter_dir.name.startswith('iter-'):
-                    continue
+            for iteration, iter_path in sorted(iters):
+                yield task_id, mode, iteration, os.path.join(iter_path, "grading-result.json")
+
+
+def trial_from_grading(data: dict, iteration: int, mode: str) -> TrialResult:
+    """grading-result.json の内容から TrialResult を作成"""
+    code_grading = data.get("code_grading", {})
+    model_grading = data.get("model_grading", {})
+
+    plans_exists = code_grading.get("graders", {}).get("plans_exists", {}).get("value", 0) == 1
+    code_score = code_grading.get("normalized_score", 0)
+    model_score = model_grading.get("normalized_score", 0)
+
+    # 総合スコア（コード 60% + モデル 40%）
+    normalized_score = code_score * 0.6 + model_score * 0.4
+
+    return TrialResult(
+        iteration=iteration,
+        mode=mode,
+        plans_exists=plans_exists,
+        code_score=code_score,
+        model_score=model_score,
+        normalized_score=normalized_score
+    )
+
 
-                iteration = int(iter_dir.name.split('-')[1])
-                grading_file = iter_dir / "grading-result.json"
+def _read_trial(task_id: str, mode: str, iteration: int, path: str) -> Optional[TrialResult]:
+    """1 ファイルを読み込む（存在しなければ None）"""
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return None
+    return trial_from_grading(data, iteration, mode)
 
-                if not grading_file.exists():
+
+def stream_trial_results(results_dir: Path, workers: int = DEFAULT_LOAD_WORKERS,
+                         progress: Optional[Callable[[int, str, TrialResult], None]] = None
+                         ) -> Iterator[Tuple[str, TrialResult]]:
+    """試行結果をスレッドプールで読み込み、スキャン順に逐次返す
+
+    先読みは workers の数倍に制限し、全ファイルを一度に保持しない。
+
+    progress: 1 件読み込むごとに (読み込み済み件数, task_id, trial) で呼ばれる
+
+    Yields:
+        (task_id, TrialResult)
+    """
+    window = max(1, workers) * 4
+    loaded = 0
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        pending = deque()
+        scan = scan_grading_files(results_dir)
+
+        def drain(limit: int) -> Iterator[Tuple[str, TrialResult]]:
+            nonlocal loaded
+            while len(pending) > limit:
+                task_id, future = pending.popleft()
+                trial = future.result()
+                if trial is None:
                     continue
+                loaded += 1
+                if progress is not None:
+                    progress(loaded, task_id, trial)
+                yield task_id, trial
+
+        for task_id, mode, iteration, path in scan:
+            pending.append((task_id, executor.submit(_read_trial, task_id, mode, iteration, path)))
+            yield from drain(window)
+
+        yield from drain(0)
+
+
+class TaskAccumulator:
+    """タスク単位の逐次集計
+
+    トライアルを到着順に受け取り、同一イテレーションの両モードが揃った時点で
+    ペア差分の件数・和・二乗和を更新する（読み込み途中の経過表示用）。
+    最終的な統計量は trials() を calculate_statistics 等に渡して計算する。
+    """
+
+    def __init__(self, task_id: str):
+        self.task_id = task_id
+        self.by_mode: Dict[str, Dict[int, TrialResult]] = {mode: {} for mode in MODES}
+        self.n_pairs = 0
+        self.diff_sum = 0.0
+        self.diff_sumsq = 0.0
+
+    def _pair_diff(self, iteration: int) -> Optional[float]:
+        wp = self.by_mode["with-plugin"].get(iteration)
+        nop = self.by_mode["no-plugin"].get(iteration)
+        if wp is None or nop is None:
+            return None
+        return wp.normalized_score - nop.normalized_score
+
+    def add(self, trial: TrialResult):
+        """トライアルを追加（同じイテレーション・モードは上書き）"""
+        if trial.mode not in self.by_mode:
+            return
+
+        old_diff = self._pair_diff(trial.iteration)
+        if old_diff is not None:
+            self.n_pairs -= 1
+            self.diff_sum -= old_diff
+            self.diff_sumsq -= old_diff * old_diff
+
+        self.by_mode[trial.mode][trial.iteration] = trial
+
+        diff = self._pair_diff(trial.iteration)
+        if diff is not None:
+            self.n_pairs += 1
+            self.diff_sum += diff
+            self.diff_sumsq += diff * diff
+
+    @property
+    def diff_mean(self) -> float:
+        """現時点のペア差分の平均"""
+        return self.diff_sum / self.n_pairs if self.n_pairs else 0.0
+
+    def trials(self) -> List[TrialResult]:
+        """保持しているトライアル一覧"""
+        return [t for mode in MODES for _, t in sorted(self.by_mode[mode].items())]
+
+
+def accumulate_trial_results(results_dir: Path, workers: int = DEFAULT_LOAD_WORKERS,
+                             progress: Optional[Callable[[int, TaskAccumulator], None]] = None
+                             ) -> Dict[str, TaskAccumulator]:
+    """試行結果を逐次読み込み、タスクごとの TaskAccumulator に集計
+
+    progress: 1 件追加するごとに (読み込み済み件数, 更新された accumulator) で呼ばれる
+    """
+    accumulators = {task_id: TaskAccumulator(task_id) for task_id, _ in list_task_dirs(results_dir)}
+    for loaded, (task_id, trial) in enumerate(stream_trial_results(results_dir, workers), 1):
+        accumulators[task_id].add(trial)
+        if progress is not None:
+            progress(loaded, accumulators[task_id])
+    return accumulators
+
+
+def load_trial_results(results_dir: Path, workers: int = DEFAULT_LOAD_WORKERS) -> Dict[str, List[TrialResult]]:
+    """試行結果を読み込む"""
+    results: Dict[str, List[TrialResult]] = {task_id: [] for task_id, _ in list_task_dirs(results_dir)}
+    for task_id, trial in stream_trial_results(results_dir, workers):
+        results[task_id].append(trial)
+    return results
+
+
+def load_store_accumulators(results_dir: Path) -> Optional[Dict[str, TaskAccumulator]]:
+    """列指向ストア（ingest-results.py で作成）からタスクごとに集計
+
+    ストアがない・NumPy がない場合は None（呼び出し側で grading-result.json を読む）。
+    """
+    store = results_store.open_store(results_dir)
+    if store is None:
+        return None
+
+    accumulators = {task_id: TaskAccumulator(task_id) for task_id in store.meta.get("task_dirs", [])}
+    columns = store.columns
+    rows = numpy.flatnonzero(columns["source"] == "v3-statistical")
+    for task_id, mode, iteration, passed, code_score, model_score, score in zip(
+            columns["task"][rows].tolist(), columns["mode"][rows].tolist(),
+            columns["iteration"][rows].tolist(), columns["passed"][rows].tolist(),
+            columns["code_score"][rows].tolist(), columns["model_score"][rows].tolist(),
+            columns["score"][rows].tolist()):
+        if task_id not in accumulators:
+            accumulators[task_id] = TaskAccumulator(task_id)
+        accumulators[task_id].add(TrialResult(
+            iteration=iteration,
+            mode=mode,
+            plans_exists=passed == 1,
+            code_score=code_score,
+            model_score=model_score,
+            normalized_score=score
+        ))
+    return dict(sorted(accumulators.items()))
+
+
+def load_stats_index(index_path: Path) -> dict:
+    """増分集計インデックスを読み込む（なければ・形式が古ければ空）"""
+    try:
+        with open(index_path, 'r') as f:
+            index = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"version": STATS_INDEX_VERSION, "tasks": {}}
+    if index.get("version") != STATS_INDEX_VERSION:
+        return {"version": STATS_INDEX_VERSION, "tasks": {}}
+    return index
+
+
+def save_stats_index(index_path: Path, index: dict):
+    """インデックスを書き出す（一時ファイル経由で置き換え）"""
+    tmp_path = index_path.with_name(index_path.name + ".tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(index, f, separators=(",", ":"))
+    os.replace(tmp_path, index_path)
+
+
+def sufficient_statistics(acc: "TaskAccumulator") -> dict:
+    """ペアから十分統計量（件数・和・二乗和・成功数）を計算"""
+    summary = {
+        "n_pairs": 0, "missing_pairs": 0,
+        "wp_sum": 0.0, "wp_sumsq": 0.0, "np_sum": 0.0, "np_sumsq": 0.0,
+        "diff_sum": 0.0, "diff_sumsq": 0.0, "wp_success": 0, "np_success": 0,
+    }
+    wp_by_iter = acc.by_mode["with-plugin"]
+    np_by_iter = acc.by_mode["no-plugin"]
+
+    for iteration in set(wp_by_iter) | set(np_by_iter):
+        wp = wp_by_iter.get(iteration)
+        nop = np_by_iter.get(iteration)
+        if wp is None or nop is None:
+            summary["missing_pairs"] += 1
+            continue
+        diff = wp.normalized_score - nop.normalized_score
+        summary["n_pairs"] += 1
+        summary["wp_sum"] += wp.normalized_score
+        summary["wp_sumsq"] += wp.normalized_score ** 2
+        summary["np_sum"] += nop.normalized_score
+        summary["np_sumsq"] += nop.normalized_score ** 2
+        summary["diff_sum"] += diff
+        summary["diff_sumsq"] += diff * diff
+        summary["wp_success"] += int(wp.plans_exists)
+        summary["np_success"] += int(nop.plans_exists)
+
+    return summary
 
-                with open(grading_file, 'r') as f:
-                    data = json.load(f)
 
-                code_grading = data.get("code_grading", {})
-                model_grading = data.get("model_grading", {})
+def update_stats_index(results_dir: Path, workers: int = DEFAULT_LOAD_WORKERS,
+                       index_path: Optional[Path] = None) -> Tuple[Dict[str, "TaskAccumulator"], Dict[str, int]]:
+    """インデックスを使って増分集計し、インデックスを更新する
 
-                plans_exists = code_grading.get("graders", {}).get("plans_exists", {}).get("value", 0) == 1
-                code_score = code_grading.get("normalized_score", 0)
-                model_score = model_grading.get("normalized_score", 0)
+    grading-result.json は mtime とサイズが前回から変わったものだけを読み込み、
+    それ以外はインデックスに保存したスコアを使う。タスクごとに十分統計量
+    （n・和・二乗和・成功数）も保存する。
+
+    Returns:
+        (task_id → TaskAccumulator, {"new", "changed", "removed", "unchanged", "unreadable"} の件数)
+    """
+    if index_path is None:
+        index_path = Path(results_dir) / STATS_INDEX_FILE
+    index = load_stats_index(index_path)
+    old_tasks = index.get("tasks", {})
 
-                # 総合スコア（コード 60% + モデル 40%）
-                normalized_score = code_score * 0.6 + model_score * 0.4
+    counts = {"new": 0, "changed": 0, "removed": 0, "unchanged": 0, "unreadable": 0}
+    new_tasks: Dict[str, dict] = {task_id: {"trials": {mode: {} for mode in MODES}}
+                                  for task_id, _ in list_task_dirs(results_dir)}
+    to_read = []
 
-                results[task_id].append(TrialResult(
-                    iteration=iteration,
+    for task_id, mode, iteration, path in scan_grading_files(results_dir):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            continue
+        key = str(iteration)
+        old = old_tasks.get(task_id, {}).get("trials", {}).get(mode, {}).get(key)
+        if old is not None and old["mtime_ns"] == st.st_mtime_ns and old["size"] == st.st_size:
+            new_tasks[task_id]["trials"][mode][key] = old
+            counts["unchanged"] += 1
+        else:
+            to_read.append((task_id, mode, iteration, path, st, old is None))
+
+    def read(item):
+        task_id, mode, iteration, path, st, _ = item
+        try:
+            return _read_trial(task_id, mode, iteration, path)
+        except json.JSONDecodeError:
+            # 書き込み途中のファイルは次回に回す
+            return None
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        for item, trial in zip(to_read, executor.map(read, to_read)):
+            task_id, mode, iteration, _, st, is_new = item
+            if trial is None:
+                counts["unreadable"] += 1
+                continue
+            new_tasks[task_id]["trials"][mode][str(iteration)] = {
+                "mtime_ns": st.st_mtime_ns,
+                "size": st.st_size,
+                "plans_exists": trial.plans_exists,
+                "code_score": trial.code_score,
+                "model_score": trial.model_score,
+                "normalized_score": trial.normalized_score,
+            }
+            counts["new" if is_new else "changed"] += 1
+
+    indexed_before = sum(len(entries) for task in old_tasks.values()
+                         for entries in task.get("trials", {}).values())
+    counts["removed"] = max(0, indexed_before - counts["unchanged"] - counts["changed"])
+
+    accumulators: Dict[str, TaskAccumulator] = {}
+    for task_id, task in new_tasks.items():
+        acc = TaskAccumulator(task_id)
+        for mode in MODES:
+            for key, entry in task["trials"][mode].items():
+                acc.add(TrialResult(
+                    iteration=int(key),
                     mode=mode,
-                    plans_exists=plans_exists,
-                    code_score=code_score,
-                    model_score=model_score,
-                    normalized_score=normalized_score
+                    plans_exists=entry["plans_exists"],
+                    code_score=entry["code_score"],
+                    model_score=entry["model_score"],
+                    normalized_score=entry["normalized_score"]
                 ))
+        task["summary"] = sufficient_statistics(acc)
+        accumulators[task_id] = acc
 
-    return results
+    index["run_id"] = Path(results_dir).resolve().name
+    index["tasks"] = new_tasks
+    save_stats_index(index_path, index)
+
+    return accumulators, counts
 
 
 def create_paired_trials(trials: List[TrialResult]) -> Tuple[List[PairedTrial], int]:
@@ -350,6 +772,579 @@ def calculate_statistics(trials: List[TrialResult]) -> StatisticalResults:
     )
 
 
+def _pass_at_k_array(n, c, k: int):
+    """calculate_pass_at_k のベクトル版（n, c はタスクごとの配列）"""
+    n = n.astype(float)
+    c = c.astype(float)
+
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        ratio = numpy.ones_like(n)
+        for i in range(k):
+            ratio *= (n - c - i) / (n - i)
+
+    return numpy.select(
+        [n < k, c == 0, c >= n],
+        [numpy.where(c == 0, 0.0, 1.0), 0.0, 1.0],
+        default=1.0 - ratio
+    )
+
+
+def calculate_statistics_vectorized(
+        all_trials: Dict[str, List[TrialResult]]) -> Tuple[Dict[str, StatisticalResults], Dict[str, str]]:
+    """全タスクの統計量を NumPy でまとめて計算
+
+    タスクを行、イテレーションを列とする行列に並べ、欠損は NaN で表す。
+    calculate_statistics をタスクごとに呼んだ場合と同じ値を返す。
+
+    Returns:
+        (task_id → StatisticalResults, スキップしたタスク ID → 理由)
+    """
+    task_ids = list(all_trials)
+    trials = [t for task_id in task_ids for t in all_trials[task_id]]
+    count = len(trials)
+
+    if count == 0:
+        return {}, {task_id: "Not enough paired trials: 0" for task_id in task_ids}
+
+    # 各トライアルの属性を 1 次元配列に展開
+    row_idx = numpy.repeat(numpy.arange(len(task_ids)), [len(all_trials[task_id]) for task_id in task_ids])
+    modes = [t.mode for t in trials]
+    is_wp = numpy.fromiter((m == "with-plugin" for m in modes), dtype=bool, count=count)
+    is_np = numpy.fromiter((m == "no-plugin" for m in modes), dtype=bool, count=count)
+    scores = numpy.fromiter((t.normalized_score for t in trials), dtype=float, count=count)
+    plans = numpy.fromiter((t.plans_exists for t in trials), dtype=bool, count=count)
+    iterations = numpy.fromiter((t.iteration for t in trials), dtype=numpy.int64, count=count)
+    columns, col_idx = numpy.unique(iterations, return_inverse=True)
+
+    shape = (len(task_ids), len(columns))
+    wp = numpy.full(shape, numpy.nan)
+    nop = numpy.full(shape, numpy.nan)
+    wp_plans = numpy.zeros(shape, dtype=bool)
+    np_plans = numpy.zeros(shape, dtype=bool)
+
+    wp[row_idx[is_wp], col_idx[is_wp]] = scores[is_wp]
+    wp_plans[row_idx[is_wp], col_idx[is_wp]] = plans[is_wp]
+    nop[row_idx[is_np], col_idx[is_np]] = scores[is_np]
+    np_plans[row_idx[is_np], col_idx[is_np]] = plans[is_np]
+
+    # ペア（同一イテレーションで両モードあり）のマスク
+    paired = ~numpy.isnan(wp) & ~numpy.isnan(nop)
+    n = paired.sum(axis=1)
+    missing = (~numpy.isnan(wp) | ~numpy.isnan(nop)).sum(axis=1) - n
+
+    diff = wp - nop
+
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        def masked_mean_var(x):
+            x = numpy.where(paired, x, 0.0)
+            mean = x.sum(axis=1) / n
+            dev = numpy.where(paired, x - mean[:, None], 0.0)
+            var = (dev * dev).sum(axis=1) / (n - 1)  # 標本分散: N-1
+            return mean, var
+
+        wp_mean, wp_var = masked_mean_var(wp)
+        np_mean, np_var = masked_mean_var(nop)
+        diff_mean, diff_var = masked_mean_var(diff)
+
+        wp_std = numpy.sqrt(wp_var)
+        np_std = numpy.sqrt(np_var)
+        diff_std = numpy.sqrt(diff_var)
+
+        # 対応 t 検定（paired_t_test と同じくゼロ除算防止に 0.001 を使用）
+        t_std = numpy.where(diff_var > 0, diff_std, 0.001)
+        se = t_std / numpy.sqrt(n)
+        t_stat = numpy.where(se > 0, diff_mean / se, 0.0)
+        cohens_d = diff_mean / t_std
+
+    df = n - 1
+    valid = n >= 2
+
+    if HAS_SCIPY:
+        safe_df = numpy.maximum(df, 1)
+        p_value = 2 * (1 - scipy_stats.t.cdf(numpy.abs(t_stat), safe_df))
+        t_critical = scipy_stats.t.ppf(0.975, safe_df)
+    else:
+        p_value = numpy.array([fallback_t_test_p_value(t, d) for t, d in zip(t_stat, df)])
+        t_critical = numpy.array([fallback_t_critical(d) for d in df])
+
+    ci_lower = diff_mean - t_critical * se
+    ci_upper = diff_mean + t_critical * se
+
+    wp_success = (wp_plans & paired).sum(axis=1)
+    np_success = (np_plans & paired).sum(axis=1)
+    pass_at_3_wp = _pass_at_k_array(n, wp_success, 3)
+    pass_at_3_np = _pass_at_k_array(n, np_success, 3)
+
+    results = {}
+    skipped = {}
+    for row, task_id in enumerate(task_ids):
+        if not valid[row]:
+            skipped[task_id] = f"Not enough paired trials: {int(n[row])}"
+            continue
+
+        mask = paired[row]
+        results[task_id] = StatisticalResults(
+            task_id=task_id,
+            n_pairs=int(n[row]),
+            wp_mean=float(wp_mean[row]),
+            wp_std=float(wp_std[row]),
+            wp_success_rate=float(wp_success[row] / n[row]),
+            wp_scores=wp[row, mask].tolist(),
+            np_mean=float(np_mean[row]),
+            np_std=float(np_std[row]),
+            np_success_rate=float(np_success[row] / n[row]),
+            np_scores=nop[row, mask].tolist(),
+            diff_mean=float(diff_mean[row]),
+            diff_std=float(diff_std[row]),
+            diffs=diff[row, mask].tolist(),
+            cohens_d=float(cohens_d[row]),
+            t_statistic=float(t_stat[row]),
+            p_value=float(p_value[row]),
+            ci_lower=float(ci_lower[row]),
+            ci_upper=float(ci_upper[row]),
+            pass_at_3_wp=float(pass_at_3_wp[row]),
+            pass_at_3_np=float(pass_at_3_np[row]),
+            missing_pairs=int(missing[row])
+        )
+
+    return results, skipped
+
+
+def calculate_all_statistics(
+        all_trials: Dict[str, List[TrialResult]],
+        use_numpy: bool = True) -> Tuple[Dict[str, StatisticalResults], Dict[str, str]]:
+    """全タスクの統計量を計算（NumPy があればベクトル版を使用）
+
+    Returns:
+        (task_id → StatisticalResults, スキップしたタスク ID → 理由)
+    """
+    if use_numpy and HAS_NUMPY:
+        return calculate_statistics_vectorized(all_trials)
+
+    results = {}
+    skipped = {}
+    for task_id, trials in all_trials.items():
+        try:
+            stats = calculate_statistics(trials)
+            stats.task_id = task_id
+            results[task_id] = stats
+        except ValueError as e:
+            skipped[task_id] = str(e)
+    return results, skipped
+
+
+def apply_resampling(stats_results: Dict[str, StatisticalResults], method: str,
+                     n_resamples: int = resampling.DEFAULT_RESAMPLES,
+                     seed: int = resampling.DEFAULT_SEED, workers: int = 1):
+    """p 値と 95% CI をリサンプリングの結果で置き換える（t 統計量・効果量はそのまま）"""
+    resampled = resampling.resample_paired(
+        {task_id: s.diffs for task_id, s in stats_results.items()},
+        method=method, n_resamples=n_resamples, seed=seed, workers=workers
+    )
+    for task_id, r in resampled.items():
+        stats = stats_results[task_id]
+        stats.p_value = r.p_value
+        stats.ci_lower = r.ci_lower
+        stats.ci_upper = r.ci_upper
+
+
+def sequential_test(diffs: List[float], min_effect: float = DEFAULT_MIN_EFFECT,
+                    alpha: float = SEQUENTIAL_ALPHA, beta: float = SEQUENTIAL_BETA,
+                    min_pairs: int = DEFAULT_MIN_PAIRS,
+                    max_pairs: Optional[int] = None) -> SequentialDecision:
+    """
+    ペア差分に対する逐次確率比検定（Wald の SPRT）
+
+    H0: 平均差 = 0 と H1: 平均差 = ±min_effect（両側を等確率で混合）を比較し、
+    対数尤度比が上側境界 log((1-β)/α) を超えたら「効果あり」、下側境界
+    log(β/(1-α)) を下回ったら「効果なし」で停止する。分散は差分の標本分散で代用する。
+    min_pairs 未満では判定しない。max_pairs に達したら判定がつかなくても停止する。
+    """
+    n = len(diffs)
+    upper = math.log((1 - beta) / alpha)
+    lower = math.log(beta / (1 - alpha))
+
+    diff_sum = sum(diffs)
+    diff_mean = diff_sum / n if n else 0.0
+    llr = 0.0
+    if n >= 2:
+        var_diff = sum((d - diff_mean) ** 2 for d in diffs) / (n - 1)
+        std_diff = math.sqrt(var_diff) if var_diff > 0 else 0.001  # ゼロ除算防止
+        # 正規分布の対数尤度比: (±δ·Σd - nδ²/2) / σ²
+        llr_pos = (min_effect * diff_sum - n * min_effect ** 2 / 2) / std_diff ** 2
+        llr_neg = (-min_effect * diff_sum - n * min_effect ** 2 / 2) / std_diff ** 2
+        # log(0.5·e^a + 0.5·e^b)（オーバーフロー防止）
+        m = max(llr_pos, llr_neg)
+        llr = m + math.log(0.5 * math.exp(llr_pos - m) + 0.5 * math.exp(llr_neg - m))
+
+    decision, reason = "continue", None
+    if n >= max(min_pairs, 2) and llr >= upper:
+        decision, reason = "stop", "effect"
+    elif n >= max(min_pairs, 2) and llr <= lower:
+        decision, reason = "stop", "no_effect"
+    elif max_pairs is not None and n >= max_pairs:
+        decision, reason = "stop", "max_iterations"
+
+    return SequentialDecision(
+        task_id="",  # 後で設定
+        n_pairs=n,
+        decision=decision,
+        reason=reason,
+        diff_mean=diff_mean,
+        log_likelihood_ratio=llr,
+        upper_bound=upper,
+        lower_bound=lower
+    )
+
+
+def sequential_check(results_dir: Path, task_id: str, workers: int = DEFAULT_LOAD_WORKERS,
+                     **kwargs) -> SequentialDecision:
+    """run ディレクトリの現時点の結果でタスクの逐次検定を行う
+
+    イテレーションごとに呼ばれる前提で、増分インデックスを使って新しい結果だけを読む。
+    kwargs は sequential_test にそのまま渡す。
+    """
+    accumulators, _ = update_stats_index(results_dir, workers)
+    acc = accumulators.get(task_id, TaskAccumulator(task_id))
+    paired_trials, _ = create_paired_trials(acc.trials())
+
+    decision = sequential_test([p.diff for p in paired_trials], **kwargs)
+    decision.task_id = task_id
+    return decision
+
+
+# === トライアルのプロファイル（trial-profiler.py） ===
+
+def load_profiles(results_dir: Path) -> Dict[str, List[dict]]:
+    """iter-N/profile.json をモードごとに読み込む（--profile なしの run では空）"""
+    profiles: Dict[str, List[dict]] = {}
+    for _, mode, _, grading_path in scan_grading_files(results_dir):
+        try:
+            with open(os.path.join(os.path.dirname(grading_path), PROFILE_FILE), 'r') as f:
+                profile = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            continue
+        if profile.get("wall_ms") is not None:
+            profiles.setdefault(mode, []).append(profile)
+    return profiles
+
+
+def summarize_profiles(profiles: Dict[str, List[dict]]) -> Dict[str, ModeProfile]:
+    """モードごとに壁時計時間の内訳・CPU 時間・ピーク RSS を集計"""
+    summary = {}
+    for mode, items in profiles.items():
+        n = len(items)
+        attributions = [p.get("attribution") or {} for p in items]
+        first_output = [p["time_to_first_output_ms"] for p in items if p.get("time_to_first_output_ms") is not None]
+        rusages = [p["rusage"] for p in items if p.get("rusage")]
+        summary[mode] = ModeProfile(
+            mode=mode,
+            trials=n,
+            timed_out=sum(1 for p in items if p.get("timed_out")),
+            wall_ms=sum(p["wall_ms"] for p in items) / n,
+            time_to_first_output_ms=sum(first_output) / len(first_output) if first_output else None,
+            hooks_ms=sum(a.get("hooks_ms", 0.0) for a in attributions) / n,
+            tools_ms=sum(a.get("tools_ms", 0.0) for a in attributions) / n,
+            model_ms=sum(a.get("model_ms", 0.0) for a in attributions) / n,
+            hook_count=sum(p.get("hooks", {}).get("count", 0) for p in items) / n,
+            tool_count=sum(p.get("tools", {}).get("count", 0) for p in items) / n,
+            cpu_ms=(sum(r["user_cpu_ms"] + r["system_cpu_ms"] for r in rusages) / len(rusages)
+                    if rusages else None),
+            max_rss_kb=max(r["max_rss_kb"] for r in rusages) if rusages else None,
+        )
+    return summary
+
+
+def profile_json(summary: Dict[str, ModeProfile]) -> Dict[str, dict]:
+    return {mode: {**{k: (round(v, 1) if isinstance(v, float) else v) for k, v in asdict(p).items()
+                      if k != "mode"},
+                   "hook_share": round(p.hook_share, 3)}
+            for mode, p in sorted(summary.items())}
+
+
+def _fmt_ms(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value / 1000:.1f}s"
+
+
+def format_profiles(summary: Dict[str, ModeProfile], markdown: bool = False) -> List[str]:
+    """プロファイル集計の表示行（Markdown 表またはコンソール）"""
+    lines = []
+    if markdown:
+        lines.append("## 時間の内訳（--profile）")
+        lines.append("")
+        lines.append("| モード | N | 壁時計 | 最初の出力 | フック | ツール | モデル | フック比率 | CPU | ピーク RSS |")
+        lines.append("|--------|---|--------|------------|--------|--------|--------|------------|-----|------------|")
+        for mode, p in sorted(summary.items()):
+            rss = "-" if p.max_rss_kb is None else f"{p.max_rss_kb / 1024:.0f} MiB"
+            lines.append(
+                f"| {mode} | {p.trials} | {_fmt_ms(p.wall_ms)} | {_fmt_ms(p.time_to_first_output_ms)} | "
+                f"{_fmt_ms(p.hooks_ms)} | {_fmt_ms(p.tools_ms)} | {_fmt_ms(p.model_ms)} | "
+                f"{p.hook_share * 100:.1f}% | {_fmt_ms(p.cpu_ms)} | {rss} |"
+            )
+        lines.append("")
+        lines.append("- 平均値（トライアルあたり）。ツール時間は PreToolUse 終了 → PostToolUse 開始で、"
+                     "フックが動く with-plugin のみ計測される")
+        lines.append("")
+    else:
+        lines.append("--- Profile (mean per trial) ---")
+        for mode, p in sorted(summary.items()):
+            lines.append(f"{mode}: N={p.trials} (timeouts: {p.timed_out})")
+            lines.append(f"  Wall: {_fmt_ms(p.wall_ms)}  first output: {_fmt_ms(p.time_to_first_output_ms)}")
+            lines.append(f"  Hooks: {_fmt_ms(p.hooks_ms)} ({p.hook_share * 100:.1f}%, {p.hook_count:.1f} calls)  "
+                         f"tools: {_fmt_ms(p.tools_ms)}  model: {_fmt_ms(p.model_ms)}")
+            if p.cpu_ms is not None:
+                lines.append(f"  CPU: {_fmt_ms(p.cpu_ms)}  peak RSS: {p.max_rss_kb / 1024:.0f} MiB")
+        lines.append("")
+    return lines
+
+
+# === 複数 run の推移分析 ===
+
+def run_metadata(run_dir: Path) -> dict:
+    """summary.json から run のメタ情報（git_commit / cli_version がなければ "unknown"）"""
+    try:
+        with open(Path(run_dir) / "summary.json", 'r') as f:
+            summary = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        summary = {}
+    metadata = {key: str(summary.get(key) or "unknown") for key in HISTORY_GROUP_KEYS}
+    metadata["run_id"] = summary.get("run_id", Path(run_dir).name)
+    return metadata
+
+
+def _run_fingerprint(run_dir: Path) -> Optional[dict]:
+    """run の集計が変わったかの判定用（ストアと summary.json の mtime・サイズ）
+
+    ストアがなければ None（キャッシュせず、run の増分インデックスから毎回集計する）。
+    """
+    key = {}
+    for name in (results_store.STORE_FILE, "summary.json"):
+        try:
+            st = os.stat(Path(run_dir) / name)
+        except FileNotFoundError:
+            return None
+        key[name] = [st.st_mtime_ns, st.st_size]
+    return key
+
+
+def run_aggregates(run_dir: Path, workers: int = DEFAULT_LOAD_WORKERS) -> Dict[str, dict]:
+    """run のタスクごとの十分統計量（ストアがあればストア、なければ増分インデックスから）"""
+    accumulators = load_store_accumulators(run_dir)
+    if accumulators is None:
+        accumulators, _ = update_stats_index(run_dir, workers)
+    return {task_id: sufficient_statistics(acc) for task_id, acc in accumulators.items()}
+
+
+def update_history_index(results_root: Path, workers: int = DEFAULT_LOAD_WORKERS,
+                         refresh: bool = False) -> Tuple[List[dict], Dict[str, int]]:
+    """results_root 直下の完了した run（summary.json がある）を集計し、インデックスを更新する
+
+    ストアのある run はストアと summary.json が前回から変わっていなければ
+    インデックスの集計をそのまま使い、トライアルのファイルは読まない。
+
+    Returns:
+        (run_id 順の [{"run_id", "metadata", "tasks": task_id → 十分統計量}],
+         {"cached", "computed"} の件数)
+    """
+    index_path = Path(results_root) / HISTORY_INDEX_FILE
+    try:
+        with open(index_path, 'r') as f:
+            index = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        index = {}
+    if refresh or index.get("version") != HISTORY_INDEX_VERSION:
+        index = {"version": HISTORY_INDEX_VERSION, "runs": {}}
+    old_runs = index.get("runs", {})
+
+    counts = {"cached": 0, "computed": 0}
+    runs = {}
+    for run_id, run_path in list_task_dirs(results_root):
+        if not os.path.isfile(os.path.join(run_path, "summary.json")):
+            continue
+        key = _run_fingerprint(run_path)
+        old = old_runs.get(run_id)
+        if key is not None and old is not None and old.get("key") == key:
+            runs[run_id] = old
+            counts["cached"] += 1
+            continue
+        runs[run_id] = {
+            "key": key,
+            "metadata": run_metadata(run_path),
+            "tasks": run_aggregates(Path(run_path), workers),
+        }
+        counts["computed"] += 1
+
+    index["runs"] = runs
+    save_stats_index(index_path, index)
+
+    return [{"run_id": run_id, **entry} for run_id, entry in sorted(runs.items())], counts
+
+
+def _metric_sums(summary: dict, metric: str) -> Tuple[int, float, float]:
+    """十分統計量から指標の (n, 和, 二乗和)"""
+    prefix = HISTORY_METRICS[metric][0]
+    return summary["n_pairs"], summary[f"{prefix}_sum"], summary[f"{prefix}_sumsq"]
+
+
+def compute_trends(runs: List[dict], metric: str = "diff") -> Dict[str, TaskTrend]:
+    """タスクごとに run 順（x = 0, 1, ...）に対する run 平均の最小二乗直線"""
+    points: Dict[str, List[Tuple[int, str, float]]] = {}
+    for x, run in enumerate(runs):
+        for task_id, summary in run["tasks"].items():
+            n, total, _ = _metric_sums(summary, metric)
+            if n > 0:
+                points.setdefault(task_id, []).append((x, run["run_id"], total / n))
+
+    trends = {}
+    for task_id, pts in sorted(points.items()):
+        xs = [p[0] for p in pts]
+        ys = [p[2] for p in pts]
+        x_mean = sum(xs) / len(xs)
+        y_mean = sum(ys) / len(ys)
+        sxx = sum((x - x_mean) ** 2 for x in xs)
+        slope = sum((x - x_mean) * (y - y_mean) for x, y in zip(xs, ys)) / sxx if sxx > 0 else 0.0
+        trends[task_id] = TaskTrend(
+            task_id=task_id,
+            n_runs=len(pts),
+            slope=slope,
+            intercept=y_mean - slope * x_mean,
+            latest=ys[-1],
+            run_ids=[p[1] for p in pts],
+            means=ys
+        )
+    return trends
+
+
+def welch_t_test(n1: int, sum1: float, sumsq1: float,
+                 n2: int, sum2: float, sumsq2: float) -> Tuple[float, float]:
+    """十分統計量から Welch の t 検定（両側）。(t 統計量, p 値)"""
+    if n1 < 2 or n2 < 2:
+        return 0.0, 1.0
+    mean1, mean2 = sum1 / n1, sum2 / n2
+    var1 = max(0.0, (sumsq1 - sum1 * sum1 / n1) / (n1 - 1))
+    var2 = max(0.0, (sumsq2 - sum2 * sum2 / n2) / (n2 - 1))
+    se2 = var1 / n1 + var2 / n2
+    if se2 <= 0:
+        if mean1 == mean2:
+            return 0.0, 1.0
+        # paired_t_test と同じく標準偏差 0.001 とみなす（t を有限に保ち、JSON に Infinity を出さない）
+        var1 = var2 = 0.001 ** 2
+        se2 = var1 / n1 + var2 / n2
+
+    t_stat = (mean1 - mean2) / math.sqrt(se2)
+    # Welch–Satterthwaite の自由度
+    df = se2 ** 2 / ((var1 / n1) ** 2 / (n1 - 1) + (var2 / n2) ** 2 / (n2 - 1))
+    if HAS_SCIPY:
+        p_value = float(2 * scipy_stats.t.sf(abs(t_stat), df))
+    else:
+        p_value = fallback_t_test_p_value(t_stat, int(df))
+    return t_stat, p_value
+
+
+def detect_regressions(runs: List[dict], metric: str = "diff", group_by: str = "git_commit",
+                       window: int = DEFAULT_HISTORY_WINDOW,
+                       alpha: float = SEQUENTIAL_ALPHA) -> List[VersionComparison]:
+    """バージョンごとに、そのバージョンより前の直近 window 件の run と比較
+
+    バージョンは run_id 順に最初に現れた順。各バージョンの全 run のペアをプールし、
+    基準側（別バージョンの直前 window 件の run）と Welch の t 検定で比較する。
+    平均が下がり p < alpha なら regression とする。
+    """
+    first_index: Dict[str, int] = {}
+    for i, run in enumerate(runs):
+        first_index.setdefault(run["metadata"][group_by], i)
+
+    comparisons = []
+    for version, start in sorted(first_index.items(), key=lambda item: item[1]):
+        baseline = [run for run in runs[:start] if run["metadata"][group_by] != version][-window:]
+        if not baseline:
+            continue
+        current = [run for run in runs if run["metadata"][group_by] == version]
+
+        task_ids = sorted({task_id for run in current for task_id in run["tasks"]})
+        for task_id in task_ids:
+            def pooled(selected: List[dict]) -> Tuple[int, float, float]:
+                sums = [_metric_sums(run["tasks"][task_id], metric)
+                        for run in selected if task_id in run["tasks"]]
+                return (sum(s[0] for s in sums), sum(s[1] for s in sums), sum(s[2] for s in sums))
+
+            n1, sum1, sumsq1 = pooled(current)
+            n0, sum0, sumsq0 = pooled(baseline)
+            if n1 == 0 or n0 == 0:
+                continue
+            t_stat, p_value = welch_t_test(n1, sum1, sumsq1, n0, sum0, sumsq0)
+            delta = sum1 / n1 - sum0 / n0
+            comparisons.append(VersionComparison(
+                task_id=task_id,
+                version=version,
+                runs=[run["run_id"] for run in current],
+                baseline_runs=[run["run_id"] for run in baseline],
+                n=n1,
+                mean=sum1 / n1,
+                baseline_n=n0,
+                baseline_mean=sum0 / n0,
+                delta=delta,
+                t_statistic=t_stat,
+                p_value=p_value,
+                regression=delta < 0 and p_value < alpha
+            ))
+    return comparisons
+
+
+def format_history(runs: List[dict], trends: Dict[str, TaskTrend],
+                   comparisons: List[VersionComparison], metric: str, group_by: str,
+                   window: int, alpha: float, markdown: bool = False) -> str:
+    """推移分析のコンソール / Markdown 出力"""
+    metric_label = HISTORY_METRICS[metric][1]
+    versions = list(dict.fromkeys(run["metadata"][group_by] for run in runs))
+    regressions = [c for c in comparisons if c.regression]
+    lines = []
+
+    if markdown:
+        lines.append("# Evals v3 推移レポート")
+        lines.append("")
+        lines.append(f"- **Run 数**: {len(runs)}（{runs[0]['run_id']} 〜 {runs[-1]['run_id']}）")
+        lines.append(f"- **バージョン数**: {len(versions)}（{group_by}）")
+        lines.append(f"- **指標**: {metric_label}")
+        lines.append(f"- **比較基準**: 直前 {window} run（Welch の t 検定, α={alpha}）")
+        lines.append(f"- **リグレッション**: {len(regressions)} 件")
+        lines.append("")
+        lines.append("## タスク別の推移")
+        lines.append("")
+        lines.append("| タスク | Run 数 | 傾き（/run） | 最新 run |")
+        lines.append("|--------|--------|--------------|----------|")
+        for t in trends.values():
+            lines.append(f"| {t.task_id} | {t.n_runs} | {t.slope:+.2f} | {t.latest:.1f} |")
+        lines.append("")
+        lines.append("## バージョン比較")
+        lines.append("")
+        lines.append("| バージョン | タスク | 平均 (n) | 基準 (n) | 差分 | p-value | 判定 |")
+        lines.append("|------------|--------|----------|----------|------|---------|------|")
+        for c in comparisons:
+            verdict = "**REGRESSION**" if c.regression else ("改善" if c.p_value < alpha else "-")
+            lines.append(f"| {c.version} | {c.task_id} | {c.mean:.1f} ({c.n}) | "
+                         f"{c.baseline_mean:.1f} ({c.baseline_n}) | {c.delta:+.1f} | "
+                         f"{c.p_value:.4f} | {verdict} |")
+        return "\n".join(lines)
+
+    lines.append("=== Longitudinal Analysis ===")
+    lines.append(f"Runs: {len(runs)} ({len(versions)} versions by {group_by})")
+    lines.append(f"Metric: {metric_label}")
+    lines.append("")
+    lines.append("--- Trends ---")
+    for t in trends.values():
+        lines.append(f"{t.task_id}: slope {t.slope:+.2f}/run over {t.n_runs} runs (latest {t.latest:.1f})")
+    lines.append("")
+    lines.append(f"--- Versions vs previous {window} runs (Welch t-test, alpha={alpha}) ---")
+    for c in comparisons:
+        flag = "  REGRESSION" if c.regression else ""
+        lines.append(f"{c.version} {c.task_id}: {c.mean:.1f} (n={c.n}) vs {c.baseline_mean:.1f} "
+                     f"(n={c.baseline_n}), diff {c.delta:+.1f}, p={c.p_value:.4f}{flag}")
+    lines.append("")
+    lines.append(f"Regressions: {len(regressions)}")
+    return "\n".join(lines)
+
+
 def interpret_cohens_d(d: float) -> str:
     """Cohen's d の解釈"""
     d = abs(d)
@@ -363,8 +1358,11 @@ def interpret_cohens_d(d: float) -> str:
         return "large"
 
 
-def generate_report(results: Dict[str, StatisticalResults], run_id: str, metadata: dict = None) -> str:
+def generate_report(results: Dict[str, StatisticalResults], run_id: str, metadata: dict = None,
+                    method: str = "ttest", n_resamples: Optional[int] = None,
+                    profiles: Optional[Dict[str, ModeProfile]] = None) -> str:
     """Markdown レポートを生成"""
+    method_label = STATISTICAL_METHODS[method][1]
     report = []
     report.append("# Evals v3 統計レポート")
     report.append("")
@@ -372,8 +1370,11 @@ def generate_report(results: Dict[str, StatisticalResults], run_id: str, metadat
     report.append("")
     report.append(f"- **Run ID**: {run_id}")
     report.append(f"- **タスク数**: {len(results)}")
-    report.append("- **統計手法**: 対応 t 検定（paired t-test）")
+    report.append(f"- **統計手法**: {method_label}")
+    if n_resamples:
+        report.append(f"- **リサンプル数**: {n_resamples}")
     report.append(f"- **scipy 使用**: {'Yes' if HAS_SCIPY else 'No (fallback)'}")
+    report.append(f"- **NumPy 使用**: {'Yes' if HAS_NUMPY else 'No (pure Python)'}")
 
     if metadata:
         if "git_commit" in metadata:
@@ -432,10 +1433,13 @@ def generate_report(results: Dict[str, StatisticalResults], run_id: str, metadat
         report.append(f"- **結論**: {sig_text}")
         report.append("")
 
+    if profiles:
+        report.extend(format_profiles(profiles, markdown=True))
+
     report.append("## 方法論")
     report.append("")
     report.append("- **実験デザイン**: 対応のある 2 条件比較（within-subjects）")
-    report.append("- **統計手法**: 対応 t 検定（paired t-test）")
+    report.append(f"- **統計手法**: {method_label}")
     report.append("- **効果量**: Cohen's d（差分の標準偏差で正規化）")
     report.append("- **pass@k**: Anthropic/OpenAI 標準式による計算")
     report.append("")
@@ -456,6 +1460,46 @@ def main():
                        help="Output in JSON format")
     parser.add_argument("--output", type=Path, default=None,
                        help="Output file path")
+    parser.add_argument("--workers", type=int, default=DEFAULT_LOAD_WORKERS,
+                       help=f"Threads for reading grading results (default: {DEFAULT_LOAD_WORKERS})")
+    parser.add_argument("--progress", action="store_true",
+                       help="Report loading progress on stderr")
+    parser.add_argument("--incremental", action="store_true",
+                       help=f"Read only new/changed results, using <results_dir>/{STATS_INDEX_FILE}")
+    parser.add_argument("--no-store", action="store_true",
+                       help=f"Ignore <results_dir>/{results_store.STORE_FILE} and read the JSON results")
+    parser.add_argument("--method", choices=list(STATISTICAL_METHODS), default="ttest",
+                       help="p-value / CI method (default: ttest)")
+    parser.add_argument("--resamples", type=int, default=resampling.DEFAULT_RESAMPLES,
+                       help=f"Resamples per task for bootstrap/permutation (default: {resampling.DEFAULT_RESAMPLES})")
+    parser.add_argument("--seed", type=int, default=resampling.DEFAULT_SEED,
+                       help=f"Random seed for resampling (default: {resampling.DEFAULT_SEED})")
+    parser.add_argument("--jobs", type=int, default=1,
+                       help="Worker processes for resampling (default: 1)")
+    parser.add_argument("--sequential-check", metavar="TASK_ID", default=None,
+                       help="Print the sequential test (SPRT) decision for one task as JSON and exit")
+    parser.add_argument("--min-effect", type=float, default=DEFAULT_MIN_EFFECT,
+                       help=f"Smallest mean score difference worth detecting (default: {DEFAULT_MIN_EFFECT})")
+    parser.add_argument("--alpha", type=float, default=SEQUENTIAL_ALPHA,
+                       help=f"Type I error rate for --sequential-check and --history (default: {SEQUENTIAL_ALPHA})")
+    parser.add_argument("--beta", type=float, default=SEQUENTIAL_BETA,
+                       help=f"Sequential test type II error rate (default: {SEQUENTIAL_BETA})")
+    parser.add_argument("--min-pairs", type=int, default=DEFAULT_MIN_PAIRS,
+                       help=f"Pairs required before stopping early (default: {DEFAULT_MIN_PAIRS})")
+    parser.add_argument("--max-pairs", type=int, default=None,
+                       help="Stop with reason max_iterations at this many pairs")
+    parser.add_argument("--history", action="store_true",
+                       help="Treat results_dir as a root of runs: per-task trends and version regressions")
+    parser.add_argument("--group-by", choices=HISTORY_GROUP_KEYS, default="git_commit",
+                       help="Run metadata that identifies a version for --history (default: git_commit)")
+    parser.add_argument("--metric", choices=list(HISTORY_METRICS), default="diff",
+                       help="Score tracked by --history (default: diff)")
+    parser.add_argument("--window", type=int, default=DEFAULT_HISTORY_WINDOW,
+                       help=f"Previous runs each version is compared against (default: {DEFAULT_HISTORY_WINDOW})")
+    parser.add_argument("--refresh-history", action="store_true",
+                       help=f"Rebuild <results_dir>/{HISTORY_INDEX_FILE} from scratch")
+    parser.add_argument("--fail-on-regression", action="store_true",
+                       help="Exit with status 2 if --history finds a regression")
 
     args = parser.parse_args()
 
@@ -463,32 +1507,102 @@ def main():
         print(f"Error: Results directory not found: {args.results_dir}", file=sys.stderr)
         sys.exit(1)
 
-    # 結果を読み込み
+    # 逐次検定（run-statistical-eval.sh --adaptive からイテレーションごとに呼ばれる）
+    if args.sequential_check:
+        decision = sequential_check(
+            args.results_dir, args.sequential_check, args.workers,
+            min_effect=args.min_effect, alpha=args.alpha, beta=args.beta,
+            min_pairs=args.min_pairs, max_pairs=args.max_pairs
+        )
+        print(json.dumps(asdict(decision), ensure_ascii=False))
+        return
+
+    # 複数 run の推移分析（results_dir は run の親ディレクトリ）
+    if args.history:
+        runs, counts = update_history_index(args.results_dir, args.workers, args.refresh_history)
+        print(f"  history index: {counts['cached']} cached, {counts['computed']} computed runs",
+              file=sys.stderr)
+        if not runs:
+            print("Error: No finished runs found", file=sys.stderr)
+            sys.exit(1)
+
+        trends = compute_trends(runs, args.metric)
+        comparisons = detect_regressions(runs, args.metric, args.group_by, args.window, args.alpha)
+        if args.json:
+            result = json.dumps({
+                "results_root": str(args.results_dir),
+                "group_by": args.group_by,
+                "metric": args.metric,
+                "window": args.window,
+                "alpha": args.alpha,
+                "runs": [{"run_id": run["run_id"], **{key: run["metadata"][key] for key in HISTORY_GROUP_KEYS}}
+                         for run in runs],
+                "trends": {task_id: asdict(t) for task_id, t in trends.items()},
+                "comparisons": [asdict(c) for c in comparisons],
+                "regressions": sum(c.regression for c in comparisons),
+            }, indent=2, ensure_ascii=False)
+        else:
+            result = format_history(runs, trends, comparisons, args.metric, args.group_by,
+                                    args.window, args.alpha, markdown=args.report)
+
+        if args.output:
+            args.output.write_text(result, encoding="utf-8")
+            print(f"Output written to: {args.output}", file=sys.stderr)
+        else:
+            print(result)
+        if args.fail_on_regression and any(c.regression for c in comparisons):
+            sys.exit(2)
+        return
+
+    # 結果を読み込み（タスクごとに逐次集計）
     print(f"Loading results from: {args.results_dir}", file=sys.stderr)
-    all_trials = load_trial_results(args.results_dir)
+
+    def report_progress(loaded: int, acc: TaskAccumulator):
+        if loaded % 100 == 0:
+            print(f"  loaded {loaded} trials ({acc.task_id}: n={acc.n_pairs}, "
+                  f"running diff {acc.diff_mean:+.1f})", file=sys.stderr)
+
+    if args.incremental:
+        accumulators, counts = update_stats_index(args.results_dir, args.workers)
+        print(f"  index: {counts['new']} new, {counts['changed']} changed, "
+              f"{counts['removed']} removed, {counts['unchanged']} unchanged"
+              + (f", {counts['unreadable']} unreadable" if counts['unreadable'] else ""),
+              file=sys.stderr)
+    else:
+        # ingest-results.py で作成したストアがあればそれを使う
+        accumulators = None if args.no_store else load_store_accumulators(args.results_dir)
+        if accumulators is not None:
+            print(f"  using store: {results_store.store_path(args.results_dir)}", file=sys.stderr)
+        else:
+            accumulators = accumulate_trial_results(args.results_dir, args.workers,
+                                                    report_progress if args.progress else None)
+    all_trials = {task_id: acc.trials() for task_id, acc in accumulators.items()}
 
     if not all_trials:
         print("Error: No trial results found", file=sys.stderr)
         sys.exit(1)
 
     # 統計分析
-    stats_results = {}
-    for task_id, trials in all_trials.items():
-        try:
-            stats = calculate_statistics(trials)
-            stats.task_id = task_id
-            stats_results[task_id] = stats
-        except ValueError as e:
-            print(f"Warning: Skipping {task_id}: {e}", file=sys.stderr)
+    stats_results, skipped = calculate_all_statistics(all_trials)
+    for task_id, reason in skipped.items():
+        print(f"Warning: Skipping {task_id}: {reason}", file=sys.stderr)
+
+    resampled = args.method != "ttest"
+    if resampled:
+        apply_resampling(stats_results, args.method, args.resamples, args.seed, args.jobs)
 
     # 出力
     run_id = args.results_dir.name
+    method_name, _, method_console = STATISTICAL_METHODS[args.method]
+    profiles = summarize_profiles(load_profiles(args.results_dir))
 
     if args.json:
         output = {
             "run_id": run_id,
-            "statistical_method": "paired_t_test",
+            "statistical_method": method_name,
             "scipy_available": HAS_SCIPY,
+            "numpy_available": HAS_NUMPY,
+            **({"resampling": {"resamples": args.resamples, "seed": args.seed}} if resampled else {}),
             "tasks": {
                 task_id: {
                     "n_pairs": s.n_pairs,
@@ -517,17 +1631,20 @@ def main():
                     }
                 }
                 for task_id, s in stats_results.items()
-            }
+            },
+            **({"profile": profile_json(profiles)} if profiles else {}),
         }
         result = json.dumps(output, indent=2, ensure_ascii=False)
     elif args.report:
-        result = generate_report(stats_results, run_id)
+        metadata = {key: value for key, value in run_metadata(args.results_dir).items() if value != "unknown"}
+        result = generate_report(stats_results, run_id, metadata=metadata, method=args.method,
+                                 n_resamples=args.resamples if resampled else None, profiles=profiles)
     else:
         # コンソール出力
         lines = []
         lines.append("=== Statistical Analysis Results ===")
         lines.append(f"Run ID: {run_id}")
-        lines.append(f"Method: Paired t-test (scipy: {HAS_SCIPY})")
+        lines.append(f"Method: {method_console} (scipy: {HAS_SCIPY})")
         lines.append("")
 
         for task_id, s in sorted(stats_results.items()):
@@ -554,6 +1671,8 @@ def main():
             lines.append(f"  Significant (α=0.05): {sig}")
             lines.append("")
 
+        if profiles:
+            lines.extend(format_profiles(profiles))
         result = "\n".join(lines)
 
     # 出力先
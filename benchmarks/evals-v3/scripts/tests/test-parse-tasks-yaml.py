@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+test-parse-tasks-yaml.py - Task Catalog Unit Tests
+
+Usage: python test-parse-tasks-yaml.py
+
+Exit codes:
+    0: All tests passed
+    1: One or more tests failed
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import json
+import tempfile
+import textwrap
+import unittest
+import subprocess
+from pathlib import Path
+from unittest import mock
+
+# parse_tasks_yaml をインポート（ハイフンをアンダースコアに変換）
+import importlib.util
+module_path: Path = Path(__file__).parent.parent / "parse-tasks-yaml.py"
+spec = importlib.util.spec_from_file_location("parse_tasks_yaml", module_path)
+if spec is None or spec.loader is None:
+    raise ImportError(f"Cannot load module from {module_path}")
+ptv = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(ptv)
+
+TASKS_FILE: Path = Path(__file__).parent.parent.parent / "tasks" / "vague-prompts.yaml"
+
+SAMPLE_YAML: str = textwrap.dedent("""\
+    tasks:
+      - id: T-01
+        name: first
+        prompt: "it's a \\"quoted\\" $HOME `prompt`"
+        simulated_answers:
+          - "yes"
+          - "no"
+        success_criteria:
+          plans_exists: true
+      - id: T-02
+        name: second
+        prompt: "plain"
+    """)
+
+
+class TestCatalogCache(unittest.TestCase):
+    """スナップショットキャッシュのテスト"""
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.yaml_file: Path = self.root / "tasks.yaml"
+        self.yaml_file.write_text(SAMPLE_YAML, encoding="utf-8")
+        self.cache_dir: Path = self.root / "cache"
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def load(self) -> dict:
+        return ptv.load_catalog(self.yaml_file, self.cache_dir)
+
+    def test_cache_hit_skips_parse(self) -> None:
+        """2 回目以降は YAML をパースしない"""
+        first: dict = self.load()
+        self.assertEqual(len(list(self.cache_dir.iterdir())), 1)
+        with mock.patch.object(ptv, "parse_yaml", side_effect=AssertionError("parsed")):
+            self.assertEqual(self.load(), first)
+
+    def test_touch_without_change_reuses_snapshot(self) -> None:
+        """mtime が変わっても内容が同じならパースしない"""
+        first: dict = self.load()
+        st = os.stat(self.yaml_file)
+        os.utime(self.yaml_file, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        with mock.patch.object(ptv, "parse_yaml", side_effect=AssertionError("parsed")):
+            self.assertEqual(self.load(), first)
+
+    def test_content_change_invalidates(self) -> None:
+        """内容が変われば再パースする"""
+        self.load()
+        self.yaml_file.write_text(SAMPLE_YAML.replace("plain", "changed prompt"), encoding="utf-8")
+        st = os.stat(self.yaml_file)
+        os.utime(self.yaml_file, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        self.assertEqual(self.load()["tasks"][1]["prompt"], "changed prompt")
+
+    def test_cached_equals_uncached(self) -> None:
+        """キャッシュの有無で結果は変わらない（実際のタスク定義）"""
+        cold: dict = ptv.load_catalog(TASKS_FILE, self.cache_dir)
+        warm: dict = ptv.load_catalog(TASKS_FILE, self.cache_dir)
+        direct: dict = ptv.load_catalog(TASKS_FILE, use_cache=False)
+        self.assertEqual(cold, warm)
+        self.assertEqual(direct, warm)
+
+    def test_no_cache_normalizes_like_snapshot(self) -> None:
+        """日付・文字列以外のキーも、キャッシュなしとスナップショット経由で同じ型になる"""
+        self.yaml_file.write_text(SAMPLE_YAML + "created: 2026-01-11\nlimits:\n  1: low\n", encoding="utf-8")
+        direct: dict = ptv.load_catalog(self.yaml_file, use_cache=False)
+        self.assertEqual((direct["created"], direct["limits"]), ("2026-01-11", {"1": "low"}))
+        self.assertEqual(self.load(), direct)
+        self.assertEqual(self.load(), direct)
+
+
+class TestExport(unittest.TestCase):
+    """--export-env / --export-json のテスト"""
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.yaml_file: Path = Path(self.tmp.name) / "tasks.yaml"
+        self.yaml_file.write_text(SAMPLE_YAML, encoding="utf-8")
+        self.cache_dir: Path = Path(self.tmp.name) / "cache"
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def run_parser(self, *args: str) -> str:
+        return subprocess.run(
+            [sys.executable, str(module_path), str(self.yaml_file), "--cache-dir", str(self.cache_dir), *args],
+            check=True, capture_output=True, text=True).stdout
+
+    def test_export_env_round_trip(self) -> None:
+        """bash で eval すると元の値がそのまま復元される"""
+        script: str = textwrap.dedent("""\
+            declare -A TASK_PROMPTS TASK_ANSWERS TASK_CRITERIA
+            eval "$(cat)"
+            printf '%s\\n' "${TASK_IDS[*]}" "${TASK_PROMPTS[T-01]}" "${TASK_ANSWERS[T-01]}" \\
+              "${TASK_CRITERIA[T-01]}" "${TASK_ANSWERS[T-02]}"
+            """)
+        out: str = subprocess.run(["bash", "-c", script], input=self.run_parser("--export-env"),
+                                  check=True, capture_output=True, text=True).stdout
+        self.assertEqual(out.split("\n")[:5], [
+            "T-01 T-02",
+            'it\'s a "quoted" $HOME `prompt`',
+            "yes|no",
+            '{"plans_exists": true}',
+            "",
+        ])
+
+    def test_export_json(self) -> None:
+        """全タスクを 1 回で JSON 出力"""
+        tasks: list = json.loads(self.run_parser("--export-json"))["tasks"]
+        self.assertEqual([t["id"] for t in tasks], ["T-01", "T-02"])
+        self.assertEqual(tasks[0]["answers"], ["yes", "no"])
+        self.assertEqual(tasks[1]["success_criteria"], {})
+
+    def test_task_file_has_answers(self) -> None:
+        """実際のタスク定義には全タスクにシミュレート回答がある"""
+        for task in ptv.load_catalog(TASKS_FILE, use_cache=False)["tasks"]:
+            self.assertTrue(task.get("simulated_answers"), task["id"])
+
+
+if __name__ == "__main__":
+    # テスト実行
+    loader = unittest.TestLoader()
+    suite = loader.loadTestsFromModule(sys.modules[__name__])
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    # 終了コード
+    sys.exit(0 if result.wasSuccessful() else 1)
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+test-process-supervisor.py - Process Supervisor Unit Tests
+
+Usage: python test-process-supervisor.py
+
+Exit codes:
+    0: All tests passed
+    1: One or more tests failed
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import json
+import time
+import tempfile
+import unittest
+import subprocess
+from pathlib import Path
+
+SCRIPTS_DIR: Path = Path(__file__).parent.parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+import process_supervisor
+from process_supervisor import supervise
+
+
+def python(code: str) -> list:
+    return [sys.executable, "-c", code]
+
+
+def pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    # 回収されていないゾンビは終了済みとみなす
+    try:
+        with open(f"/proc/{pid}/stat", "r") as f:
+            return f.read().split(")")[-1].split()[0] != "Z"
+    except FileNotFoundError:
+        return True
+
+
+class TestSupervise(unittest.TestCase):
+    """終了の検知・タイムアウト・プロセスグループの片付け"""
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.output: str = str(Path(self.tmp.name) / "claude-output.txt")
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_exact_duration(self) -> None:
+        """所要時間は秒単位に切り上げられず、終了をすぐに検知する"""
+        started: float = time.monotonic()
+        run = supervise(python("import time; print('ok', flush=True); time.sleep(0.3)"), self.output, timeout=30)
+        elapsed_ms: float = (time.monotonic() - started) * 1000
+        self.assertEqual((run.exit_code, run.timed_out, run.killed), (0, False, False))
+        self.assertGreaterEqual(run.duration_ms, 300)
+        self.assertLess(run.duration_ms, 900)
+        self.assertLess(elapsed_ms - run.duration_ms, 500)
+        self.assertLessEqual(run.time_to_first_output_ms, run.duration_ms)
+        self.assertEqual(Path(self.output).read_text(encoding="utf-8"), "ok\n")
+
+    def test_timeout_terminates(self) -> None:
+        """タイムアウトで SIGTERM、TIMEOUT 行を追記"""
+        run = supervise(python("import time; time.sleep(30)"), self.output, timeout=0.3)
+        self.assertTrue(run.timed_out)
+        self.assertFalse(run.killed)
+        self.assertEqual((run.signal, run.shell_exit_code), (15, 143))
+        self.assertLess(run.duration_ms, 2000)
+        self.assertTrue(Path(self.output).read_text(encoding="utf-8").endswith("TIMEOUT after 0.3s\n"))
+
+    def test_sigkill_escalation(self) -> None:
+        """SIGTERM を無視するプロセスは猶予のあと SIGKILL"""
+        code: str = ("import signal, time; signal.signal(signal.SIGTERM, signal.SIG_IGN); "
+                     "print('ready', flush=True); time.sleep(30)")
+        events: list = []
+        run = supervise(python(code), self.output, timeout=0.5, kill_grace=0.3,
+                        on_event=lambda name, fields: events.append(name))
+        self.assertTrue(run.timed_out and run.killed)
+        self.assertEqual(run.signal, 9)
+        self.assertLess(run.duration_ms, 3000)
+        self.assertEqual(events, ["process_start", "first_output", "timeout", "kill"])
+
+    def test_kills_leftover_grandchildren(self) -> None:
+        """終了後に残った孫プロセスもグループごと片付ける"""
+        code: str = ("import subprocess, sys; "
+                     "p = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)'], "
+                     "stdout=subprocess.DEVNULL); print(p.pid, flush=True)")
+        run = supervise(python(code), self.output, timeout=30)
+        grandchild: int = int(Path(self.output).read_text(encoding="utf-8").split()[0])
+        self.assertEqual(run.exit_code, 0)
+        self.assertTrue(run.orphans_killed)
+        for _ in range(50):
+            if not pid_alive(grandchild):
+                break
+            time.sleep(0.02)
+        self.assertFalse(pid_alive(grandchild))
+
+
+class TestCli(unittest.TestCase):
+    """run-statistical-eval.sh から呼ぶ CLI"""
+
+    def test_writes_timing_and_exit_code(self) -> None:
+        """stdin を子プロセスに渡し、終了コードと timing.json を返す"""
+        with tempfile.TemporaryDirectory() as tmp:
+            output: Path = Path(tmp) / "out.txt"
+            timing: Path = Path(tmp) / "timing.json"
+            proc = subprocess.run(
+                [sys.executable, str(SCRIPTS_DIR / "process_supervisor.py"), "--output", str(output),
+                 "--timing", str(timing), "--timeout", "30", "--",
+                 *python("import sys; sys.stdout.write(sys.stdin.read().upper()); sys.exit(2)")],
+                input="prompt", text=True)
+            self.assertEqual(proc.returncode, 2)
+            self.assertEqual(output.read_text(encoding="utf-8"), "PROMPT")
+            data: dict = json.loads(timing.read_text(encoding="utf-8"))
+            self.assertEqual((data["exit_code"], data["timed_out"]), (2, False))
+            self.assertIsInstance(data["duration_ms"], float)
+
+            missing = subprocess.run([sys.executable, str(SCRIPTS_DIR / "process_supervisor.py"),
+                                      "--output", str(output), "--", "no-such-command-xyz"],
+                                     capture_output=True, text=True)
+            self.assertEqual(missing.returncode, 127)
+
+
+if __name__ == "__main__":
+    # テスト実行
+    loader = unittest.TestLoader()
+    suite = loader.loadTestsFromModule(sys.modules[__name__])
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    # 終了コード
+    sys.exit(0 if result.wasSuccessful() else 1)
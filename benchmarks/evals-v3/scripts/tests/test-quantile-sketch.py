@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+test-quantile-sketch.py - DDSketch Quantile Sketch Unit Tests
+
+Usage: python test-quantile-sketch.py
+
+Exit codes:
+    0: All tests passed
+    1: One or more tests failed
+"""
+
+from __future__ import annotations
+
+import sys
+import json
+import random
+import unittest
+import importlib.util
+from pathlib import Path
+
+SCRIPTS_DIR: Path = Path(__file__).parent.parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+import quantile_sketch
+from quantile_sketch import DDSketch, SketchSet
+
+# evals-v2 の statistical-analysis.py（ハイフンを含むため importlib で読み込む）
+_spec = importlib.util.spec_from_file_location(
+    "statistical_analysis_v2", SCRIPTS_DIR.parent.parent / "evals-v2" / "scripts" / "statistical-analysis.py")
+v2 = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(v2)
+
+
+def exact_quantile(values: list, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+class TestDDSketch(unittest.TestCase):
+    """分位点の精度とマージのテスト"""
+
+    def setUp(self) -> None:
+        rng = random.Random(0)
+        self.values: list = [rng.lognormvariate(3, 1) for _ in range(5000)]
+
+    def test_relative_accuracy(self) -> None:
+        """分位点は相対誤差 α 以内"""
+        sketch = DDSketch(relative_accuracy=0.01)
+        for v in self.values:
+            sketch.add(v)
+        for q in (0.01, 0.5, 0.9, 0.99):
+            exact = exact_quantile(self.values, q)
+            self.assertLessEqual(abs(sketch.quantile(q) - exact) / exact, 0.01 + 1e-9, q)
+        self.assertEqual(sketch.quantile(0), min(self.values))
+        self.assertEqual(sketch.quantile(1), max(self.values))
+
+    def test_merge_equals_single_sketch(self) -> None:
+        """run ごとのスケッチを（JSON 経由で）結合しても全体のスケッチと同じ分位点"""
+        whole = DDSketch()
+        parts = [DDSketch() for _ in range(4)]
+        for i, v in enumerate(self.values):
+            whole.add(v)
+            parts[i % 4].add(v)
+
+        merged = DDSketch()
+        for part in parts:
+            merged.merge(DDSketch.from_dict(json.loads(json.dumps(part.to_dict()))))
+        for q in quantile_sketch.QUANTILES:
+            self.assertEqual(merged.quantile(q), whole.quantile(q))
+        self.assertEqual(len(merged), len(self.values))
+
+    def test_zero_negative_and_empty(self) -> None:
+        """0・負の値・空のスケッチ"""
+        sketch = DDSketch()
+        self.assertIsNone(sketch.quantile(0.5))
+        for v in (-10.0, 0.0, 0.0, 5.0):
+            sketch.add(v)
+        self.assertAlmostEqual(sketch.quantile(0.0), -10.0)
+        self.assertEqual(sketch.quantile(0.5), 0.0)
+        with self.assertRaises(ValueError):
+            sketch.merge(DDSketch(relative_accuracy=0.05))
+
+    def test_ignores_non_finite(self) -> None:
+        """NaN・±inf は数えない"""
+        sketch = DDSketch()
+        for v in (float("nan"), float("inf"), float("-inf"), 3.0):
+            sketch.add(v)
+        self.assertEqual(sketch.count, 1)
+        self.assertEqual((sketch.min, sketch.max, sketch.sum), (3.0, 3.0, 3.0))
+
+    def test_bin_limit(self) -> None:
+        """バケット数の上限を超えても上位の分位点は保たれる"""
+        sketch = DDSketch(max_bins=64)
+        for v in self.values:
+            sketch.add(v)
+        self.assertLessEqual(len(sketch.positive), 64)
+        exact = exact_quantile(self.values, 0.99)
+        self.assertLessEqual(abs(sketch.quantile(0.99) - exact) / exact, 0.01 + 1e-9)
+
+
+class TestSketchSet(unittest.TestCase):
+    """メトリクスのまとめと v2 レポートへの組み込み"""
+
+    def test_ignores_non_numeric(self) -> None:
+        """None・bool は数えない、値のないメトリクスは出力しない"""
+        sketches = SketchSet()
+        for v in (1, 2.5, None, True, "3"):
+            sketches.add("duration_seconds", v)
+        self.assertEqual(list(sketches.percentiles()), ["duration_seconds"])
+        self.assertEqual(sketches.percentiles()["duration_seconds"]["count"], 2)
+
+    def test_v2_report_sketches_merge(self) -> None:
+        """v2 レポートの分位点と、2 つのレポートを結合した分位点"""
+        rng = random.Random(1)
+        results: list = [v2.trial_from_data({"trial_id": i, "dimension": "ssot", "task_id": f"T-{i % 3}",
+                                             "success": True, "score": 1.0,
+                                             "duration_seconds": rng.uniform(10, 100),
+                                             "input_tokens": rng.randint(100, 1000)})
+                         for i in range(60)]
+        report: dict = v2.generate_report(results)
+        self.assertEqual(report["summary"]["percentiles"]["duration_seconds"]["count"], 60)
+        self.assertNotIn("estimated_cost_usd", report["summary"]["percentiles"])
+        self.assertEqual(report["by_task"]["T-0"]["percentiles"]["input_tokens"]["count"], 20)
+
+        zero_cost = v2.trial_from_data({"trial_id": 60, "task_id": "T-0", "estimated_cost_usd": 0,
+                                        "total_cost_usd": 1.0})
+        self.assertEqual(zero_cost.estimated_cost_usd, 0)
+        cost_p50: dict = v2.sketch_trials([zero_cost]).percentiles()["estimated_cost_usd"]
+        self.assertEqual((cost_p50["count"], cost_p50["p50"]), (1, 0.0))
+
+        merged: dict = v2.merge_report_sketches([report, json.loads(json.dumps(report))])
+        self.assertEqual(merged["summary"]["duration_seconds"]["count"], 120)
+        self.assertEqual(merged["summary"]["duration_seconds"]["p90"],
+                         report["summary"]["percentiles"]["duration_seconds"]["p90"])
+        self.assertEqual(merged["by_dimension"]["ssot"]["input_tokens"]["count"], 120)
+
+
+if __name__ == "__main__":
+    # テスト実行
+    loader = unittest.TestLoader()
+    suite = loader.loadTestsFromModule(sys.modules[__name__])
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    # 終了コード
+    sys.exit(0 if result.wasSuccessful() else 1)
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+test-resampling.py - Resampling Engine Unit Tests
+
+Usage: python test-resampling.py
+
+Exit codes:
+    0: All tests passed
+    1: One or more tests failed
+"""
+
+from __future__ import annotations
+
+import sys
+import random
+import unittest
+from pathlib import Path
+
+# resampling をインポート
+sys.path.insert(0, str(Path(__file__).parent.parent))
+import resampling
+
+# テストで使うリサンプル数（純 Python 版も現実的な時間で終わる値）
+N_RESAMPLES: int = 2000
+
+
+def gauss_sample(n: int, mu: float, sigma: float, seed: int) -> list:
+    rng = random.Random(seed)
+    return [rng.gauss(mu, sigma) for _ in range(n)]
+
+
+class TestPairedResampling(unittest.TestCase):
+    """対応のあるリサンプリングのテスト"""
+
+    def test_reproducible_with_seed(self) -> None:
+        """同じシードなら同じ結果、違うシードなら異なる結果"""
+        diffs: list = gauss_sample(20, 3.0, 5.0, seed=1)
+        a = resampling.resample_paired_one("VP-01", diffs, n_resamples=N_RESAMPLES, seed=7)
+        b = resampling.resample_paired_one("VP-01", diffs, n_resamples=N_RESAMPLES, seed=7)
+        c = resampling.resample_paired_one("VP-01", diffs, n_resamples=N_RESAMPLES, seed=8)
+
+        self.assertEqual(a, b)
+        self.assertNotEqual((a.ci_lower, a.ci_upper), (c.ci_lower, c.ci_upper))
+
+    def test_independent_of_worker_count(self) -> None:
+        """プロセスプールを使っても結果は同じ"""
+        diffs_by_task: dict = {f"VP-{i:02d}": gauss_sample(15, i, 4.0, seed=i) for i in range(6)}
+        serial: dict = resampling.resample_paired(diffs_by_task, method="permutation",
+                                                  n_resamples=N_RESAMPLES, workers=1)
+        parallel: dict = resampling.resample_paired(diffs_by_task, method="permutation",
+                                                    n_resamples=N_RESAMPLES, workers=3)
+        self.assertEqual(serial, parallel)
+
+    def test_strong_effect_is_significant(self) -> None:
+        """明確な差は有意、差がなければ有意にならない"""
+        for method in resampling.METHODS:
+            strong = resampling.resample_paired_one(
+                "VP-01", gauss_sample(20, 10.0, 3.0, seed=2), method=method, n_resamples=N_RESAMPLES)
+            null = resampling.resample_paired_one(
+                "VP-01", gauss_sample(20, 0.0, 3.0, seed=3), method=method, n_resamples=N_RESAMPLES)
+
+            self.assertLess(strong.p_value, 0.01, method)
+            self.assertGreater(null.p_value, 0.05, method)
+            self.assertLess(strong.ci_lower, strong.observed)
+            self.assertGreater(strong.ci_upper, strong.observed)
+            self.assertGreater(strong.ci_lower, 0)
+
+    def test_pure_python_agrees(self) -> None:
+        """純 Python 版も同程度の CI を返す"""
+        diffs: list = gauss_sample(20, 5.0, 4.0, seed=4)
+        entropy: list = resampling.task_seed(0, "VP-01")
+        python = resampling._paired_python(diffs, "bootstrap", N_RESAMPLES, 0.95, entropy)
+
+        self.assertLess(python.ci_lower, python.observed)
+        self.assertGreater(python.ci_upper, python.observed)
+        if resampling.HAS_NUMPY:
+            vectorized = resampling._paired_numpy(diffs, "bootstrap", N_RESAMPLES, 0.95, entropy)
+            self.assertAlmostEqual(python.ci_lower, vectorized.ci_lower, delta=0.5)
+            self.assertAlmostEqual(python.ci_upper, vectorized.ci_upper, delta=0.5)
+
+    def test_rejects_bad_input(self) -> None:
+        """未知の手法・ペア不足はエラー"""
+        with self.assertRaises(ValueError):
+            resampling.resample_paired_one("VP-01", [1.0, 2.0], method="jackknife")
+        with self.assertRaises(ValueError):
+            resampling.resample_paired_one("VP-01", [1.0])
+
+
+class TestIndependentResampling(unittest.TestCase):
+    """独立 2 群のリサンプリングのテスト"""
+
+    def test_difference_detected(self) -> None:
+        """平均差を検出し、CI が観測差を含む"""
+        a: list = gauss_sample(15, 0.7, 0.1, seed=5)
+        b: list = gauss_sample(15, 0.5, 0.1, seed=6)
+        for method in resampling.METHODS:
+            r = resampling.resample_independent(a, b, method=method, n_resamples=N_RESAMPLES)
+            self.assertLess(r.p_value, 0.01, method)
+            self.assertLess(r.ci_lower, r.observed)
+            self.assertGreater(r.ci_upper, r.observed)
+
+    def test_small_groups(self) -> None:
+        """どちらかが 2 件未満なら None"""
+        self.assertIsNone(resampling.resample_independent([1.0], [1.0, 2.0]))
+
+
+if __name__ == "__main__":
+    # テスト実行
+    loader = unittest.TestLoader()
+    suite = loader.loadTestsFromModule(sys.modules[__name__])
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    # 終了コード
+    sys.exit(0 if result.wasSuccessful() else 1)
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+test-results-store.py - Columnar Results Store Unit Tests
+
+Usage: python test-results-store.py
+
+Exit codes:
+    0: All tests passed
+    1: One or more tests failed
+"""
+
+from __future__ import annotations
+
+import sys
+import json
+import math
+import random
+import tempfile
+import unittest
+from pathlib import Path
+
+import importlib.util
+
+SCRIPTS_DIR: Path = Path(__file__).parent.parent
+
+
+def load_module(name: str, path: Path):
+    """ハイフンを含むファイル名のスクリプトをモジュールとして読み込む"""
+    spec = importlib.util.spec_from_file_location(name, path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Cannot load module from {path}")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+sa = load_module("statistical_analysis", SCRIPTS_DIR / "statistical-analysis.py")
+ingest = load_module("ingest_results", SCRIPTS_DIR / "ingest-results.py")
+v2 = load_module("statistical_analysis_v2",
+                 SCRIPTS_DIR.parent.parent / "evals-v2" / "scripts" / "statistical-analysis.py")
+import results_store
+
+
+def write_json(path: Path, data: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+
+
+def make_run(root: Path, seed: int, tasks=("VP-01", "VP-02"), n_iter: int = 4,
+             finished: bool = True) -> Path:
+    """grading-result.json を持つ statistical の run を作成"""
+    rng = random.Random(seed)
+    for task in tasks:
+        for mode in sa.MODES:
+            for i in range(1, n_iter + 1):
+                write_json(root / task / mode / f"iter-{i}" / "grading-result.json", {
+                    "timestamp": f"2026-01-14T10:00:{i:02d}+09:00",
+                    "code_grading": {
+                        "graders": {"plans_exists": {"value": rng.randint(0, 1), "weight": 2.0}},
+                        "normalized_score": round(rng.uniform(0, 100), 1),
+                    },
+                    "model_grading": {"normalized_score": round(rng.uniform(0, 100), 1)},
+                })
+    (root / "VP-99").mkdir()  # 結果のないタスク
+    events = [{"event": "run_start"}] + ([{"event": "run_end"}] if finished else [])
+    (root / "journal.jsonl").write_text("".join(json.dumps(e) + "\n" for e in events), encoding="utf-8")
+    return root
+
+
+class TestStoreFormat(unittest.TestCase):
+    """書き出し・memmap での読み込みのテスト"""
+
+    def test_round_trip(self) -> None:
+        """列・欠損値・元の JSON がそのまま戻る"""
+        rows: list = [
+            {"run_id": "r1", "source": "v2", "task": "タスク", "iteration": 3, "passed": True,
+             "score": 0.5, "record": {"score": 0.5, "nested": {"a": [1, 2]}}},
+            {"run_id": "r1", "source": "v2", "task": "T-2", "passed": None, "score": None},
+        ]
+        with tempfile.TemporaryDirectory() as tmp:
+            store = results_store.build_store(rows, {"run_id": "r1"})
+            results_store.write_store(store, results_store.store_path(tmp))
+            opened = results_store.open_store(tmp)
+
+            self.assertIsInstance(opened.columns["score"], results_store.numpy.memmap)
+            self.assertEqual(opened.columns["task"].tolist(), ["タスク", "T-2"])
+            self.assertEqual(opened.columns["iteration"].tolist(), [3, -1])
+            self.assertEqual(opened.columns["passed"].tolist(), [1, -1])
+            self.assertTrue(math.isnan(opened.columns["score"][1]))
+            self.assertEqual(opened.record(0), rows[0]["record"])
+            self.assertIsNone(opened.record(1))
+            self.assertEqual(opened.meta["n_rows"], 2)
+
+    def test_empty_store(self) -> None:
+        """0 行でも書き出して開ける"""
+        with tempfile.TemporaryDirectory() as tmp:
+            results_store.write_store(results_store.build_store([], {}), results_store.store_path(tmp))
+            self.assertEqual(len(results_store.open_store(tmp)), 0)
+
+
+class TestStatisticalRun(unittest.TestCase):
+    """statistical の run の ingest と v3 の読み込み"""
+
+    def test_store_matches_json_results(self) -> None:
+        """ストアから集計したトライアルは JSON から読み込んだものと同じ"""
+        with tempfile.TemporaryDirectory() as tmp:
+            run = make_run(Path(tmp), seed=1)
+            self.assertEqual(ingest.ingest_dir(run)[0], "ingested")
+
+            from_json: dict = sa.accumulate_trial_results(run, workers=2)
+            from_store: dict = sa.load_store_accumulators(run)
+            self.assertEqual(list(from_store), list(from_json))
+            for task_id in from_json:
+                self.assertEqual(from_store[task_id].trials(), from_json[task_id].trials())
+
+    def test_skip_unchanged_and_unfinished(self) -> None:
+        """未完了の run は対象外、変更がなければ作り直さない"""
+        with tempfile.TemporaryDirectory() as tmp:
+            run = make_run(Path(tmp), seed=2, finished=False)
+            self.assertEqual(ingest.ingest_dir(run), ("unfinished", None))
+            self.assertEqual(ingest.ingest_dir(run, include_unfinished=True)[0], "ingested")
+            self.assertEqual(ingest.ingest_dir(run, include_unfinished=True)[0], "up to date")
+            self.assertEqual(ingest.ingest_dir(run, include_unfinished=True, force=True)[0], "ingested")
+
+    def test_load_history(self) -> None:
+        """複数 run のストアを連結"""
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            for i, name in enumerate(["2026-01-01_00-00-00", "2026-02-01_00-00-00"]):
+                ingest.ingest_dir(make_run(root / name, seed=i, n_iter=2 + i))
+            make_run(root / "2026-03-01_00-00-00", seed=9)  # ストアなし
+
+            history = results_store.load_history(root)
+            self.assertEqual(len(history), 2 * 2 * 2 + 2 * 2 * 3)
+            self.assertEqual(sorted(history.meta["runs"]), ["2026-01-01_00-00-00", "2026-02-01_00-00-00"])
+            self.assertEqual(sorted(set(history.columns["run_id"].tolist())), sorted(history.meta["runs"]))
+
+
+class TestFlatResults(unittest.TestCase):
+    """フラットな結果（v2 / v3 / scorecard）の ingest"""
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        for i in range(1, 4):
+            write_json(self.root / f"trial-{i}.json", {
+                "trial_id": i, "dimension": "ssot", "task_id": f"T-{i}", "success": i != 2,
+                "score": i / 4, "duration_seconds": 10 * i, "code_grade": {"checks": [i]}, "model_grade": {}})
+        write_json(self.root / "VP-01_no-plugin_1_20260113-231802.json", {
+            "task_id": "VP-01", "mode": "no-plugin", "iteration": 1, "exit_code": 0,
+            "duration_seconds": 42, "grade": {"plans_exists": False, "score": 10}})
+        write_json(self.root / "plan-feature_1.json", {
+            "task": "plan-feature", "version": "with-plugin", "iteration": 1,
+            "grade": {"pass": True, "score": 0.9}, "estimated_cost_usd": 0.01})
+        write_json(self.root / "scorecard-20260101.json", {"meta": {}})
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_sources_classified(self) -> None:
+        """形式ごとに source と列が埋まる（scorecard 出力は読まない）"""
+        status, meta = ingest.ingest_dir(self.root)
+        self.assertEqual(status, "ingested")
+        self.assertEqual(meta["sources"], {"v2": 3, "v3-flat": 1, "scorecard": 1})
+
+        store = results_store.open_store(self.root, verify_flat=True)
+        by_source: dict = {row["source"]: row for row in store.rows()}
+        self.assertEqual((by_source["scorecard"]["mode"], by_source["scorecard"]["passed"]), ("with-plugin", 1))
+        self.assertEqual((by_source["v3-flat"]["score"], by_source["v3-flat"]["passed"]), (10.0, 0))
+
+    def test_zero_cost_is_kept(self) -> None:
+        """estimated_cost_usd が 0 なら欠損（NaN）ではなく 0 を記録する"""
+        write_json(self.root / "plan-feature_2.json", {
+            "task": "plan-feature", "version": "with-plugin", "iteration": 2,
+            "grade": {"pass": True, "score": 0.9}, "estimated_cost_usd": 0})
+        ingest.ingest_dir(self.root)
+        store = results_store.open_store(self.root, verify_flat=True)
+        costs: dict = {row["iteration"]: row["cost_usd"] for row in store.rows() if row["source"] == "scorecard"}
+        self.assertEqual(costs, {1: 0.01, 2: 0.0})
+
+    def keep_only_v2(self) -> None:
+        """v2 の結果ディレクトリ（v2 の JSON だけ）にする"""
+        for path in self.root.glob("*.json"):
+            if not path.name.startswith("trial-"):
+                path.unlink()
+
+    def test_v2_load_results_from_store(self) -> None:
+        """v2 の load_results はストアからでも同じ結果"""
+        self.keep_only_v2()
+        ingest.ingest_dir(self.root)
+        from_json: list = sorted(v2.load_results(str(self.root), use_store=False), key=lambda t: t.trial_id)
+        from_store: list = sorted(v2.load_results(str(self.root)), key=lambda t: t.trial_id)
+        self.assertEqual(from_store, from_json)
+
+    def test_stale_store_is_ignored(self) -> None:
+        """結果が追加されたら verify_flat でストアを使わない"""
+        self.keep_only_v2()
+        ingest.ingest_dir(self.root)
+        write_json(self.root / "trial-4.json", {"trial_id": 4, "task_id": "T-4", "score": 1.0})
+        self.assertIsNotNone(results_store.open_store(self.root))
+        self.assertIsNone(results_store.open_store(self.root, verify_flat=True))
+        self.assertEqual(len(v2.load_results(str(self.root))), 4)
+
+
+if __name__ == "__main__":
+    # テスト実行
+    loader = unittest.TestLoader()
+    suite = loader.loadTestsFromModule(sys.modules[__name__])
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    # 終了コード
+    sys.exit(0 if result.wasSuccessful() else 1)
@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+test-statistical-analysis.py - Statistical Analysis Unit Tests
+
+Usage: python test-statistical-analysis.py
+
+Exit codes:
+    0: All tests passed
+    1: One or more tests failed
+"""
+
+from __future__ import annotations
+
+import sys
+import json
+import math
+import random
+import tempfile
+import unittest
+from pathlib import Path
+
+# statistical_analysis をインポート（ハイフンをアンダースコアに変換）
+import importlib.util
+module_path: Path = Path(__file__).parent.parent / "statistical-analysis.py"
+spec = importlib.util.spec_from_file_location("statistical_analysis", module_path)
+if spec is None or spec.loader is None:
+    raise ImportError(f"Cannot load module from {module_path}")
+sa = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(sa)
+
+ingest_spec = importlib.util.spec_from_file_location("ingest_results", module_path.parent / "ingest-results.py")
+ingest = importlib.util.module_from_spec(ingest_spec)
+ingest_spec.loader.exec_module(ingest)
+
+# 浮動小数点比較の許容桁数
+PLACES: int = 9
+
+
+def make_trials(n_iter: int, seed: int, effect: float = 10.0,
+                drop: tuple = ()) -> list:
+    """合成トライアルを作成（drop に含まれるイテレーションは no-plugin を欠損させる）"""
+    rng = random.Random(seed)
+    trials: list = []
+    for i in range(1, n_iter + 1):
+        base: float = rng.uniform(20, 60)
+        trials.append(sa.TrialResult(i, "with-plugin", rng.random() < 0.7, 0.0, 0.0,
+                                     base + effect + rng.gauss(0, 5)))
+        if i not in drop:
+            trials.append(sa.TrialResult(i, "no-plugin", rng.random() < 0.2, 0.0, 0.0,
+                                         base + rng.gauss(0, 5)))
+    return trials
+
+
+def write_run_dir(root: Path, all_trials: dict) -> Path:
+    """トライアルを grading-result.json として run ディレクトリに書き出す"""
+    for task_id, trials in all_trials.items():
+        for t in trials:
+            iter_dir: Path = root / task_id / t.mode / f"iter-{t.iteration}"
+            (iter_dir / "src").mkdir(parents=True, exist_ok=True)
+            (iter_dir / "claude-output.txt").write_text("output", encoding="utf-8")
+            # code 60% + model 40% の合成で normalized_score を再現
+            data: dict = {
+                "code_grading": {
+                    "graders": {"plans_exists": {"value": 1 if t.plans_exists else 0}},
+                    "normalized_score": t.normalized_score
+                },
+                "model_grading": {"normalized_score": t.normalized_score}
+            }
+            (iter_dir / "grading-result.json").write_text(json.dumps(data), encoding="utf-8")
+    return root
+
+
+class TestStreamingLoader(unittest.TestCase):
+    """ストリーミングローダーのテスト"""
+
+    def test_scan_order_and_filtering(self) -> None:
+        """iter-N を数値順に列挙し、無関係なエントリは無視"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root: Path = write_run_dir(Path(tmpdir), {"VP-01": make_trials(12, seed=1)})
+            (root / "summary.json").write_text("{}", encoding="utf-8")
+            (root / "VP-01" / "with-plugin" / "iter-x").mkdir()
+            (root / "VP-01" / "with-plugin" / "iter-13").mkdir()  # grading 未完了
+
+            scanned: list = list(sa.scan_grading_files(root))
+            wp_iters: list = [it for _, mode, it, _ in scanned if mode == "with-plugin"]
+            self.assertEqual(wp_iters, list(range(1, 14)))
+
+            streamed: list = list(sa.stream_trial_results(root, workers=3))
+            self.assertEqual(len(streamed), 24)
+            self.assertEqual([t.iteration for _, t in streamed[:12]], list(range(1, 13)))
+
+    def test_load_matches_trials(self) -> None:
+        """読み込んだ結果から元と同じ統計量になる"""
+        all_trials: dict = {"VP-01": make_trials(8, seed=1), "VP-02": make_trials(6, seed=2, drop=(2,))}
+        with tempfile.TemporaryDirectory() as tmpdir:
+            loaded: dict = sa.load_trial_results(write_run_dir(Path(tmpdir), all_trials), workers=2)
+
+        for task_id, trials in all_trials.items():
+            expected = sa.calculate_statistics(trials)
+            actual = sa.calculate_statistics(loaded[task_id])
+            self.assertAlmostEqual(expected.diff_mean, actual.diff_mean, PLACES)
+            self.assertEqual(expected.missing_pairs, actual.missing_pairs)
+
+    def test_progress_and_accumulators(self) -> None:
+        """progress は 1 件ごとに呼ばれ、accumulator が経過値を持つ"""
+        trials: list = make_trials(5, seed=4)
+        calls: list = []
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root: Path = write_run_dir(Path(tmpdir), {"VP-01": trials})
+            (root / "VP-02").mkdir()
+            accumulators: dict = sa.accumulate_trial_results(
+                root, workers=2, progress=lambda n, acc: calls.append((n, acc.task_id)))
+
+        self.assertEqual([n for n, _ in calls], list(range(1, 11)))
+        self.assertEqual(set(accumulators), {"VP-01", "VP-02"})
+        expected = sa.calculate_statistics(trials)
+        self.assertEqual(accumulators["VP-01"].n_pairs, 5)
+        self.assertAlmostEqual(accumulators["VP-01"].diff_mean, expected.diff_mean, PLACES)
+
+
+class TestIncrementalIndex(unittest.TestCase):
+    """update_stats_index（増分集計）のテスト"""
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.trials: dict = {"VP-01": make_trials(6, seed=1), "VP-02": make_trials(4, seed=2)}
+        self.root: Path = write_run_dir(Path(self.tmp.name), self.trials)
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def stats(self, accumulators: dict) -> dict:
+        results, _ = sa.calculate_all_statistics(
+            {task_id: acc.trials() for task_id, acc in accumulators.items()}, use_numpy=False)
+        return results
+
+    def test_first_run_indexes_everything(self) -> None:
+        """初回は全件を読み込み、十分統計量を保存"""
+        accumulators, counts = sa.update_stats_index(self.root, workers=2)
+        self.assertEqual(counts["new"], 20)
+
+        index: dict = json.loads((self.root / sa.STATS_INDEX_FILE).read_text(encoding="utf-8"))
+        summary: dict = index["tasks"]["VP-01"]["summary"]
+        expected = sa.calculate_statistics(self.trials["VP-01"])
+        self.assertEqual(summary["n_pairs"], expected.n_pairs)
+        self.assertAlmostEqual(summary["diff_sum"] / summary["n_pairs"], expected.diff_mean, PLACES)
+
+    def test_second_run_reads_nothing(self) -> None:
+        """変更がなければファイルを読まずに同じ統計量"""
+        first, _ = sa.update_stats_index(self.root, workers=2)
+        second, counts = sa.update_stats_index(self.root, workers=2)
+
+        self.assertEqual(counts["unchanged"], 20)
+        self.assertEqual(counts["new"] + counts["changed"], 0)
+        self.assertEqual(self.stats(first)["VP-01"].p_value, self.stats(second)["VP-01"].p_value)
+
+    def test_new_changed_and_removed(self) -> None:
+        """追加・変更・削除を反映し、全件読み込みと一致"""
+        sa.update_stats_index(self.root, workers=2)
+
+        write_run_dir(self.root, {"VP-01": [
+            sa.TrialResult(7, "with-plugin", True, 0.0, 0.0, 90.0),
+            sa.TrialResult(7, "no-plugin", False, 0.0, 0.0, 10.0),
+        ]})
+        changed: Path = self.root / "VP-02" / "no-plugin" / "iter-1" / "grading-result.json"
+        changed.write_text(json.dumps({"code_grading": {"normalized_score": 99.0}}), encoding="utf-8")
+        (self.root / "VP-02" / "with-plugin" / "iter-4" / "grading-result.json").unlink()
+
+        accumulators, counts = sa.update_stats_index(self.root, workers=2)
+        self.assertEqual((counts["new"], counts["changed"], counts["removed"]), (2, 1, 1))
+
+        full: dict = self.stats(sa.accumulate_trial_results(self.root, workers=2))
+        incremental: dict = self.stats(accumulators)
+        for task_id in ["VP-01", "VP-02"]:
+            self.assertEqual(full[task_id].n_pairs, incremental[task_id].n_pairs)
+            self.assertAlmostEqual(full[task_id].diff_mean, incremental[task_id].diff_mean, PLACES)
+
+    def test_partial_file_retried(self) -> None:
+        """書き込み途中（壊れた JSON）のファイルは索引せず次回に再読込"""
+        broken: Path = self.root / "VP-01" / "with-plugin" / "iter-1" / "grading-result.json"
+        broken.write_text('{"code_grading": ', encoding="utf-8")
+        _, counts = sa.update_stats_index(self.root, workers=2)
+        self.assertEqual(counts["unreadable"], 1)
+
+        write_run_dir(self.root, {"VP-01": self.trials["VP-01"][:1]})
+        _, counts = sa.update_stats_index(self.root, workers=2)
+        self.assertEqual(counts["new"], 1)
+
+
+class TestTaskAccumulator(unittest.TestCase):
+    """TaskAccumulator のユニットテスト"""
+
+    def test_overwrite_updates_running_sums(self) -> None:
+        """同じイテレーションを上書きすると差分の和も置き換わる"""
+        acc = sa.TaskAccumulator("VP-01")
+        acc.add(sa.TrialResult(1, "with-plugin", True, 0.0, 0.0, 50.0))
+        self.assertEqual(acc.n_pairs, 0)
+        acc.add(sa.TrialResult(1, "no-plugin", False, 0.0, 0.0, 40.0))
+        self.assertEqual((acc.n_pairs, acc.diff_sum, acc.diff_sumsq), (1, 10.0, 100.0))
+        acc.add(sa.TrialResult(1, "no-plugin", False, 0.0, 0.0, 45.0))
+        self.assertEqual((acc.n_pairs, acc.diff_sum, acc.diff_sumsq), (1, 5.0, 25.0))
+        self.assertEqual(len(acc.trials()), 2)
+
+
+class TestPassAtK(unittest.TestCase):
+    """calculate_pass_at_k のユニットテスト"""
+
+    def test_edge_cases(self) -> None:
+        """境界条件"""
+        self.assertEqual(sa.calculate_pass_at_k(2, 0, 3), 0.0)
+        self.assertEqual(sa.calculate_pass_at_k(2, 1, 3), 1.0)
+        self.assertEqual(sa.calculate_pass_at_k(10, 0, 3), 0.0)
+        self.assertEqual(sa.calculate_pass_at_k(10, 10, 3), 1.0)
+
+    def test_formula(self) -> None:
+        """1 - C(n-c, k) / C(n, k)"""
+        self.assertAlmostEqual(sa.calculate_pass_at_k(10, 2, 3), 1 - (8 * 7 * 6) / (10 * 9 * 8))
+
+
+@unittest.skipUnless(sa.HAS_NUMPY, "numpy not installed")
+class TestVectorizedEngine(unittest.TestCase):
+    """NumPy ベクトル版と純 Python 版の一致を確認"""
+
+    def assert_same(self, expected, actual) -> None:
+        self.assertEqual(expected.n_pairs, actual.n_pairs)
+        self.assertEqual(expected.missing_pairs, actual.missing_pairs)
+        for field in ["wp_mean", "wp_std", "wp_success_rate", "np_mean", "np_std",
+                      "np_success_rate", "diff_mean", "diff_std", "cohens_d",
+                      "t_statistic", "p_value", "ci_lower", "ci_upper",
+                      "pass_at_3_wp", "pass_at_3_np"]:
+            self.assertAlmostEqual(getattr(expected, field), getattr(actual, field), PLACES, field)
+        for field in ["wp_scores", "np_scores", "diffs"]:
+            for e, a in zip(getattr(expected, field), getattr(actual, field)):
+                self.assertAlmostEqual(e, a, PLACES, field)
+
+    def test_matches_pure_python(self) -> None:
+        """タスクごとの calculate_statistics と同じ値"""
+        all_trials: dict = {
+            "VP-01": make_trials(20, seed=1),
+            "VP-02": make_trials(5, seed=2, effect=0.0),
+            "VP-03": make_trials(40, seed=3, drop=(3, 7, 11)),
+        }
+        vectorized, skipped = sa.calculate_statistics_vectorized(all_trials)
+        self.assertEqual(skipped, {})
+
+        for task_id, trials in all_trials.items():
+            self.assert_same(sa.calculate_statistics(trials), vectorized[task_id])
+            self.assertEqual(vectorized[task_id].task_id, task_id)
+
+    def test_zero_variance(self) -> None:
+        """差分の分散がゼロでも pure Python と同じ扱い"""
+        trials: list = []
+        for i in range(1, 4):
+            trials.append(sa.TrialResult(i, "with-plugin", True, 0.0, 0.0, 50.0))
+            trials.append(sa.TrialResult(i, "no-plugin", False, 0.0, 0.0, 40.0))
+        vectorized, _ = sa.calculate_statistics_vectorized({"VP-01": trials})
+        self.assert_same(sa.calculate_statistics(trials), vectorized["VP-01"])
+
+    def test_skips_tasks_without_pairs(self) -> None:
+        """ペアが 2 未満のタスクはスキップ"""
+        all_trials: dict = {
+            "VP-01": make_trials(10, seed=1),
+            "VP-02": make_trials(1, seed=2),
+            "VP-03": make_trials(4, seed=3, drop=(1, 2, 3)),
+        }
+        vectorized, skipped = sa.calculate_statistics_vectorized(all_trials)
+        python, python_skipped = sa.calculate_all_statistics(all_trials, use_numpy=False)
+
+        self.assertEqual(set(vectorized), {"VP-01"})
+        self.assertEqual(skipped, python_skipped)
+
+    def test_pass_at_k_array(self) -> None:
+        """ベクトル版 pass@k がスカラー版と一致"""
+        cases: list = [(n, c) for n in range(0, 12) for c in range(0, n + 1)]
+        n = sa.numpy.array([n for n, _ in cases])
+        c = sa.numpy.array([c for _, c in cases])
+        result = sa._pass_at_k_array(n, c, 3)
+        for (ni, ci), r in zip(cases, result):
+            self.assertAlmostEqual(sa.calculate_pass_at_k(ni, ci, 3), float(r), PLACES)
+
+
+class TestSequentialTest(unittest.TestCase):
+    """逐次検定（SPRT）のテスト"""
+
+    def test_stops_for_effect_and_no_effect(self) -> None:
+        """明確な差は効果あり、差がなければ効果なしで早期停止"""
+        rng = random.Random(0)
+        effect: sa.SequentialDecision = sa.sequential_test([rng.gauss(25, 10) for _ in range(10)])
+        null: sa.SequentialDecision = sa.sequential_test([rng.gauss(0, 10) for _ in range(15)])
+
+        self.assertEqual((effect.decision, effect.reason), ("stop", "effect"))
+        self.assertGreaterEqual(effect.log_likelihood_ratio, effect.upper_bound)
+        self.assertEqual((null.decision, null.reason), ("stop", "no_effect"))
+        self.assertLessEqual(null.log_likelihood_ratio, null.lower_bound)
+
+    def test_symmetric(self) -> None:
+        """負の効果も同じ尤度比で検出（両側）"""
+        diffs: list = [20.0, 25.0, 18.0, 30.0, 22.0]
+        pos: sa.SequentialDecision = sa.sequential_test(diffs)
+        neg: sa.SequentialDecision = sa.sequential_test([-d for d in diffs])
+        self.assertAlmostEqual(pos.log_likelihood_ratio, neg.log_likelihood_ratio, places=PLACES)
+
+    def test_min_and_max_pairs(self) -> None:
+        """min_pairs 未満では停止せず、max_pairs に達したら停止"""
+        early: sa.SequentialDecision = sa.sequential_test([30.0, 31.0, 29.0], min_pairs=5)
+        self.assertEqual((early.decision, early.reason), ("continue", None))
+
+        undecided: sa.SequentialDecision = sa.sequential_test([5.0, -3.0, 12.0, 0.0, 9.0], max_pairs=5)
+        self.assertEqual((undecided.decision, undecided.reason), ("stop", "max_iterations"))
+
+    def test_check_reads_run_dir(self) -> None:
+        """sequential_check は run ディレクトリからタスクの差分を集計する"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root: Path = write_run_dir(Path(tmpdir), {
+                "VP-01": make_trials(8, seed=1, effect=30.0),
+                "VP-02": make_trials(3, seed=2),
+            })
+            decision: sa.SequentialDecision = sa.sequential_check(root, "VP-01", workers=2)
+            self.assertEqual(decision.task_id, "VP-01")
+            self.assertEqual((decision.n_pairs, decision.reason), (8, "effect"))
+
+            missing: sa.SequentialDecision = sa.sequential_check(root, "VP-09", workers=2)
+            self.assertEqual((missing.n_pairs, missing.decision), (0, "continue"))
+
+
+class TestHistory(unittest.TestCase):
+    """複数 run の推移分析のテスト"""
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        # commit a: 効果 +15 の run を 3 つ、commit b: 効果 0 の run を 2 つ
+        for i, (commit, effect) in enumerate([("a", 15.0)] * 3 + [("b", 0.0)] * 2):
+            run: Path = write_run_dir(self.root / f"2026-01-0{i + 1}_00-00-00",
+                                      {"VP-01": make_trials(10, seed=i, effect=effect),
+                                       "VP-02": make_trials(10, seed=10 + i, effect=10.0)})
+            summary: dict = {"run_id": run.name, "git_commit": commit, "cli_version": "2.0.0"}
+            (run / "summary.json").write_text(json.dumps(summary), encoding="utf-8")
+            if i == 0:
+                ingest.ingest_dir(run)  # ストアのある run はインデックスにキャッシュされる
+        (self.root / "2026-01-09_00-00-00").mkdir()  # 未完了の run（summary.json なし）
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_detects_regression(self) -> None:
+        """効果が下がったバージョンだけをリグレッションとする"""
+        runs, counts = sa.update_history_index(self.root, workers=2)
+        self.assertEqual([r["run_id"][:10] for r in runs],
+                         ["2026-01-01", "2026-01-02", "2026-01-03", "2026-01-04", "2026-01-05"])
+
+        comparisons: list = sa.detect_regressions(runs, window=10)
+        by_task: dict = {c.task_id: c for c in comparisons}
+        self.assertEqual([c.version for c in comparisons], ["b", "b"])
+        self.assertEqual(by_task["VP-01"].baseline_n, 30)
+        self.assertTrue(by_task["VP-01"].regression)
+        self.assertLess(by_task["VP-01"].delta, -10)
+        self.assertFalse(by_task["VP-02"].regression)
+
+        trends: dict = sa.compute_trends(runs)
+        self.assertLess(trends["VP-01"].slope, 0)
+        self.assertEqual(trends["VP-01"].n_runs, 5)
+
+    def test_index_reuses_runs_with_store(self) -> None:
+        """ストアと summary.json が変わらない run は再集計しない"""
+        _, first = sa.update_history_index(self.root, workers=2)
+        _, second = sa.update_history_index(self.root, workers=2)
+        self.assertEqual(first, {"cached": 0, "computed": 5})
+        self.assertEqual(second, {"cached": 1, "computed": 4})
+        _, refreshed = sa.update_history_index(self.root, workers=2, refresh=True)
+        self.assertEqual(refreshed, {"cached": 0, "computed": 5})
+
+    def test_welch_matches_direct_computation(self) -> None:
+        """十分統計量からの Welch 検定は値から直接計算したものと同じ"""
+        a: list = [1.0, 2.0, 4.0, 7.0]
+        b: list = [3.0, 5.0, 6.0, 9.0, 12.0]
+        t_stat, p_value = sa.welch_t_test(len(a), sum(a), sum(x * x for x in a),
+                                          len(b), sum(b), sum(x * x for x in b))
+        ma, mb = sum(a) / len(a), sum(b) / len(b)
+        va = sum((x - ma) ** 2 for x in a) / (len(a) - 1)
+        vb = sum((x - mb) ** 2 for x in b) / (len(b) - 1)
+        self.assertAlmostEqual(t_stat, (ma - mb) / math.sqrt(va / len(a) + vb / len(b)), places=PLACES)
+        self.assertTrue(0 < p_value < 1)
+        self.assertEqual(sa.welch_t_test(1, 1.0, 1.0, 5, 5.0, 9.0), (0.0, 1.0))
+
+    def test_welch_zero_variance_is_finite(self) -> None:
+        """どちらも分散 0 で平均が違っても t は有限（JSON に Infinity を出さない）"""
+        t_stat, p_value = sa.welch_t_test(3, 3.0, 3.0, 4, 8.0, 16.0)
+        self.assertTrue(math.isfinite(t_stat))
+        self.assertLess(t_stat, 0)
+        self.assertLess(p_value, 0.05)
+        json.dumps({"t_statistic": t_stat, "p_value": p_value}, allow_nan=False)
+        self.assertEqual(sa.welch_t_test(3, 3.0, 3.0, 4, 4.0, 4.0), (0.0, 1.0))
+
+
+if __name__ == "__main__":
+    # テスト実行
+    loader = unittest.TestLoader()
+    suite = loader.loadTestsFromModule(sys.modules[__name__])
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    # 終了コード
+    sys.exit(0 if result.wasSuccessful() else 1)
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+test-trial-profiler.py - Trial Profiler Unit Tests
+
+Usage: python test-trial-profiler.py
+
+Exit codes:
+    0: All tests passed
+    1: One or more tests failed
+"""
+
+from __future__ import annotations
+
+import sys
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+# trial_profiler / statistical_analysis をインポート（ハイフンをアンダースコアに変換）
+import importlib.util
+SCRIPTS_DIR: Path = Path(__file__).parent.parent
+
+
+def load_module(name: str, filename: str):
+    spec = importlib.util.spec_from_file_location(name, SCRIPTS_DIR / filename)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Cannot load module from {SCRIPTS_DIR / filename}")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+tp = load_module("trial_profiler", "trial-profiler.py")
+sa = load_module("statistical_analysis", "statistical-analysis.py")
+
+
+def hook(ts: float, duration: float, script: str, hook_event: str = None, tool_use_id: str = None) -> dict:
+    event: dict = {"event": "hook", "ts": ts, "duration_ms": duration, "script": script}
+    if hook_event:
+        event.update({"hook_event": hook_event, "tool_name": "Bash", "tool_use_id": tool_use_id})
+    return event
+
+
+class TestRunProfiled(unittest.TestCase):
+    """子プロセスの実行とイベント記録"""
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.output: str = str(self.root / "claude-output.txt")
+        self.events: str = str(self.root / "profile-events.jsonl")
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_records_output_and_exit(self) -> None:
+        """出力をファイルに書き、開始・最初の出力・終了（rusage 付き）を記録"""
+        code: str = ("import os, sys, json; print('hello'); "
+                     f"open(os.environ['{tp.PROFILE_LOG_ENV}'], 'a').write(json.dumps("
+                     "{'event': 'hook', 'ts': 0, 'duration_ms': 1, 'script': 'child'}) + '\\n'); sys.exit(3)")
+        exit_code: int = tp.run_profiled([sys.executable, "-c", code], self.output, self.events, timeout=30)
+        self.assertEqual(exit_code, 3)
+        self.assertEqual(Path(self.output).read_text(encoding="utf-8"), "hello\n")
+
+        events: list = tp.read_events(self.events)
+        self.assertEqual([e["event"] for e in events], ["process_start", "first_output", "hook", "process_exit"])
+        profile: dict = tp.build_profile(events)
+        self.assertEqual((profile["exit_code"], profile["timed_out"], profile["hooks"]["count"]), (3, False, 1))
+        self.assertGreater(profile["rusage"]["max_rss_kb"], 0)
+        self.assertLessEqual(profile["time_to_first_output_ms"], profile["wall_ms"])
+
+    def test_timeout(self) -> None:
+        """タイムアウトで子プロセスを終了し、TIMEOUT 行とシグナルを記録"""
+        code: str = "import time; time.sleep(30)"
+        exit_code: int = tp.run_profiled([sys.executable, "-c", code], self.output, self.events, timeout=0.5)
+        self.assertEqual(exit_code, 128 + 15)
+        self.assertIn("TIMEOUT after 0.5s", Path(self.output).read_text(encoding="utf-8"))
+        profile: dict = tp.build_profile(tp.read_events(self.events))
+        self.assertTrue(profile["timed_out"])
+        self.assertEqual(profile["signal"], 15)
+        self.assertLess(profile["wall_ms"], 10_000)
+
+
+class TestBuildProfile(unittest.TestCase):
+    """フック・ツール・モデルへの時間の振り分け"""
+
+    def test_attribution(self) -> None:
+        """重なったフックは和集合、ツールは Pre の終了 → Post の開始"""
+        events: list = [
+            {"event": "process_start", "ts": 1000.0, "command": ["claude"]},
+            hook(1100.0, 50.0, "session-init"),
+            hook(1120.0, 50.0, "usage-tracker"),  # session-init と 30ms 重なる
+            hook(1200.0, 20.0, "pretooluse-guard", "PreToolUse", "toolu_1"),
+            hook(1720.0, 30.0, "posttooluse-log", "PostToolUse", "toolu_1"),
+            hook(1800.0, 10.0, "pretooluse-guard", "PreToolUse", "toolu_2"),  # Post なし（中断）
+            {"event": "process_exit", "ts": 3000.0, "elapsed_ms": 2000.0, "exit_code": 0,
+             "signal": None, "timed_out": False, "rusage": None},
+        ]
+        profile: dict = tp.build_profile(events)
+        self.assertEqual(profile["hooks"]["wall_ms"], 130.0)
+        self.assertEqual(profile["hooks"]["total_ms"], 160.0)
+        self.assertEqual(profile["tools"]["by_name"]["Bash"], {"count": 2, "timed": 1, "total_ms": 500.0})
+        self.assertEqual(profile["attribution"], {"hooks_ms": 130.0, "tools_ms": 500.0, "model_ms": 1370.0})
+        self.assertEqual(profile["hooks"]["by_script"]["pretooluse-guard"]["count"], 2)
+
+
+class TestSummarizeProfiles(unittest.TestCase):
+    """statistical-analysis.py でのモードごとの集計"""
+
+    def test_reads_profiles_from_run_dir(self) -> None:
+        """iter-N/profile.json を読み、profile.json のないトライアルは数えない"""
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            for mode, iteration, wall, hooks_ms in (("with-plugin", 1, 1000.0, 100.0),
+                                                    ("with-plugin", 2, 3000.0, 500.0),
+                                                    ("no-plugin", 1, 2000.0, 0.0),
+                                                    ("no-plugin", 2, None, None)):
+                iter_dir: Path = root / "VP-01" / mode / f"iter-{iteration}"
+                iter_dir.mkdir(parents=True)
+                (iter_dir / "grading-result.json").write_text("{}", encoding="utf-8")
+                if wall is None:
+                    continue
+                profile: dict = {"wall_ms": wall, "time_to_first_output_ms": 100.0, "timed_out": False,
+                                 "rusage": {"max_rss_kb": int(wall), "user_cpu_ms": 10.0, "system_cpu_ms": 5.0},
+                                 "hooks": {"count": 4}, "tools": {"count": 1},
+                                 "attribution": {"hooks_ms": hooks_ms, "tools_ms": 0.0,
+                                                 "model_ms": wall - hooks_ms}}
+                (iter_dir / sa.PROFILE_FILE).write_text(json.dumps(profile), encoding="utf-8")
+
+            summary: dict = sa.summarize_profiles(sa.load_profiles(root))
+        wp = summary["with-plugin"]
+        self.assertEqual((wp.trials, wp.wall_ms, wp.hooks_ms, wp.max_rss_kb), (2, 2000.0, 300.0, 3000))
+        self.assertAlmostEqual(wp.hook_share, 0.15)
+        self.assertEqual(summary["no-plugin"].trials, 1)
+        self.assertEqual(sa.profile_json(summary)["with-plugin"]["cpu_ms"], 15.0)
+        self.assertIn("## 時間の内訳（--profile）", "\n".join(sa.format_profiles(summary, markdown=True)))
+
+
+if __name__ == "__main__":
+    # テスト実行
+    loader = unittest.TestLoader()
+    suite = loader.loadTestsFromModule(sys.modules[__name__])
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    # 終了コード
+    sys.exit(0 if result.wasSuccessful() else 1)
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+trial-profiler.py - トライアルのトレース計測
+
+Claude CLI を子プロセスとして実行し、出力をファイルに書きながら
+タイムスタンプ付きのイベント（profile-events.jsonl）を記録する。終了後に
+イベントを集約して profile.json を書き出す。run-statistical-eval.sh --profile から使う。
+
+記録するイベント（1 行 1 JSON、ts はエポックミリ秒）:
+  process_start  子プロセスの起動
+  first_output   stdout/stderr の最初のバイト
+  hook           ハーネスのフック 1 回分（scripts/run-script.js が CLAUDE_HARNESS_PROFILE_LOG に追記。
+                 PreToolUse / PostToolUse では tool_name と tool_use_id も記録）
+  timeout        タイムアウトでプロセスグループに SIGTERM
+  kill           猶予を過ぎても終わらずに SIGKILL
+  process_exit   終了コード・シグナル・rusage（ピーク RSS、CPU 時間）
+
+profile.json の attribution は壁時計時間の内訳:
+  hooks_ms  フックの実行時間（同時に走るフックは重複を除いた和集合）
+  tools_ms  ツールの実行時間（同じ tool_use_id の PreToolUse 終了 → PostToolUse 開始）
+  model_ms  残り（モデルの応答待ち・CLI 自身の処理）
+
+使用法:
+  echo "$prompt" | python trial-profiler.py --output claude-output.txt --profile profile.json \\
+      --events profile-events.jsonl --timeout 180 -- claude -p --dangerously-skip-permissions
+
+終了コード: 子プロセスの終了コード（シグナルで終了した場合は 128 + シグナル番号）
+"""
+
+import os
+import sys
+import json
+import time
+import signal
+import argparse
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# 子プロセスの監視（同じディレクトリの process_supervisor.py）
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from process_supervisor import DEFAULT_KILL_GRACE, supervise
+
+PROFILE_VERSION = 1
+# フックに計測ログの出力先を伝える環境変数（scripts/run-script.js が読む）
+PROFILE_LOG_ENV = "CLAUDE_HARNESS_PROFILE_LOG"
+
+
+def now_ms() -> float:
+    return time.time() * 1000.0
+
+
+def append_event(events_file: str, event: dict):
+    """イベントを 1 行追記（1 回の write なのでフックと同時に書いても行は混ざらない）"""
+    line = json.dumps(event, ensure_ascii=False) + "\n"
+    with open(events_file, "a", encoding="utf-8") as f:
+        f.write(line)
+
+
+def read_events(events_file: str) -> List[dict]:
+    """profile-events.jsonl を読み込み（壊れた行は無視）"""
+    events = []
+    try:
+        with open(events_file, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    events.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+    except FileNotFoundError:
+        pass
+    return events
+
+
+def run_profiled(command: List[str], output_file: str, events_file: str, timeout: float,
+                 kill_grace: float = DEFAULT_KILL_GRACE) -> int:
+    """子プロセスを process_supervisor で実行してイベントを記録し、終了コードを返す"""
+    env = dict(os.environ)
+    env[PROFILE_LOG_ENV] = os.path.abspath(events_file)
+
+    def on_event(name: str, fields: dict):
+        append_event(events_file, {"event": name, "ts": now_ms(), **fields})
+
+    run = supervise(command, output_file, timeout, kill_grace, env=env, on_event=on_event)
+    append_event(events_file, {
+        "event": "process_exit",
+        "ts": now_ms(),
+        "elapsed_ms": run.duration_ms,
+        "exit_code": run.exit_code,
+        "signal": run.signal,
+        "timed_out": run.timed_out,
+        "killed": run.killed,
+        "rusage": run.rusage,
+    })
+    return run.shell_exit_code
+
+
+def _union_ms(intervals: List[Tuple[float, float]]) -> float:
+    """区間の和集合の長さ"""
+    total = 0.0
+    current_start, current_end = None, None
+    for start, end in sorted(intervals):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                total += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        total += current_end - current_start
+    return total
+
+
+def build_profile(events: List[dict]) -> dict:
+    """イベント列を profile.json の内容に集約"""
+    by_type: Dict[str, List[dict]] = {}
+    for event in events:
+        by_type.setdefault(event.get("event", ""), []).append(event)
+
+    start = (by_type.get("process_start") or [{}])[0]
+    exit_event = (by_type.get("process_exit") or [{}])[-1]
+    first_output = (by_type.get("first_output") or [None])[0]
+    wall_ms = exit_event.get("elapsed_ms")
+
+    # フック（スクリプト別）
+    hooks = by_type.get("hook", [])
+    by_script: Dict[str, dict] = {}
+    intervals = []
+    for hook in hooks:
+        name = hook.get("script", "unknown")
+        duration = float(hook.get("duration_ms", 0.0))
+        stats = by_script.setdefault(name, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+        stats["count"] += 1
+        stats["total_ms"] += duration
+        stats["max_ms"] = max(stats["max_ms"], duration)
+        if "ts" in hook:
+            intervals.append((hook["ts"], hook["ts"] + duration))
+    hooks_ms = _union_ms(intervals)
+
+    # ツール呼び出し（フックから見えたもの。tool_use_id ごとに Pre の終了 → Post の開始）
+    pre_end: Dict[str, float] = {}
+    post_start: Dict[str, float] = {}
+    tool_names: Dict[str, str] = {}
+    for hook in hooks:
+        tool_use_id = hook.get("tool_use_id")
+        if not tool_use_id:
+            continue
+        tool_names.setdefault(tool_use_id, hook.get("tool_name") or "unknown")
+        if hook.get("hook_event") == "PreToolUse":
+            end = hook["ts"] + float(hook.get("duration_ms", 0.0))
+            pre_end[tool_use_id] = max(pre_end.get(tool_use_id, end), end)
+        elif hook.get("hook_event") == "PostToolUse":
+            post_start[tool_use_id] = min(post_start.get(tool_use_id, hook["ts"]), hook["ts"])
+
+    by_tool: Dict[str, dict] = {}
+    tools_ms = 0.0
+    for tool_use_id, name in tool_names.items():
+        stats = by_tool.setdefault(name, {"count": 0, "timed": 0, "total_ms": 0.0})
+        stats["count"] += 1
+        if tool_use_id in pre_end and tool_use_id in post_start:
+            elapsed = max(0.0, post_start[tool_use_id] - pre_end[tool_use_id])
+            stats["timed"] += 1
+            stats["total_ms"] += elapsed
+            tools_ms += elapsed
+
+    attribution = None
+    if wall_ms is not None:
+        attribution = {
+            "hooks_ms": round(hooks_ms, 1),
+            "tools_ms": round(tools_ms, 1),
+            "model_ms": round(max(0.0, wall_ms - hooks_ms - tools_ms), 1),
+        }
+
+    return {
+        "profile_version": PROFILE_VERSION,
+        "started_at": (datetime.fromtimestamp(start["ts"] / 1000, timezone.utc).isoformat(timespec="milliseconds")
+                       if "ts" in start else None),
+        "command": start.get("command"),
+        "wall_ms": wall_ms,
+        "time_to_first_output_ms": first_output["elapsed_ms"] if first_output else None,
+        "exit_code": exit_event.get("exit_code"),
+        "signal": exit_event.get("signal"),
+        "timed_out": exit_event.get("timed_out", False),
+        "killed": exit_event.get("killed", False),
+        "rusage": exit_event.get("rusage"),
+        "hooks": {
+            "count": len(hooks),
+            "total_ms": round(sum(s["total_ms"] for s in by_script.values()), 1),
+            "wall_ms": round(hooks_ms, 1),
+            "by_script": {name: {**s, "total_ms": round(s["total_ms"], 1), "max_ms": round(s["max_ms"], 1)}
+                          for name, s in sorted(by_script.items())},
+        },
+        "tools": {
+            "count": len(tool_names),
+            "total_ms": round(tools_ms, 1),
+            "by_name": {name: {**s, "total_ms": round(s["total_ms"], 1)} for name, s in sorted(by_tool.items())},
+        },
+        "attribution": attribution,
+        "events": len(events),
+    }
+
+
+def write_profile(profile: dict, profile_file: str):
+    tmp_path = f"{profile_file}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(profile, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, profile_file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a trial command and record a timestamped profile")
+    parser.add_argument("--output", required=True, help="File for the combined stdout/stderr of the command")
+    parser.add_argument("--profile", required=True, help="Aggregated profile.json to write")
+    parser.add_argument("--events", required=True, help="Event stream (JSONL) shared with the hooks")
+    parser.add_argument("--timeout", type=float, default=180, help="Seconds before the process group is terminated")
+    parser.add_argument("--kill-grace", type=float, default=DEFAULT_KILL_GRACE,
+                        help=f"Seconds between SIGTERM and SIGKILL (default: {DEFAULT_KILL_GRACE:g})")
+    parser.add_argument("command", nargs=argparse.REMAINDER, help="Command to run (after --)")
+
+    args = parser.parse_args()
+    command = args.command[1:] if args.command[:1] == ["--"] else args.command
+    if not command:
+        parser.error("no command given")
+
+    # 前回の残骸は捨てる（イベントはこのトライアルのものだけ）
+    if os.path.exists(args.events):
+        os.remove(args.events)
+
+    # SIGTERM で止められても子プロセスのグループを片付け、profile.json を書く
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(128 + signum))
+    try:
+        exit_code = run_profiled(command, args.output, args.events, args.timeout, args.kill_grace)
+    except FileNotFoundError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(127)
+    finally:
+        write_profile(build_profile(read_events(args.events)), args.profile)
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
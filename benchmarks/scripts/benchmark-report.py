@@ -0,0 +1,875 @@
+#!/usr/bin/env python3
+"""
+benchmark-report.py - ベンチマーク結果の集計エンジン
+
+benchmarks/results/*.json を 1 回だけ読み込み、1 パスで全メトリクス
+（成功率、trace 観測値、grade、トークン・コスト、所要時間、タスク別内訳）を集計して
+analyze-results.sh のレポートと generate-scorecard.sh の Scorecard を出力する。
+evals-v3/scripts/ingest-results.py で作成したストア（.results-store.npz）が
+最新ならそれを読み、なければ JSON をスレッドで並列に読み込む。
+
+使用法:
+  python benchmark-report.py <results_dir> --report <report.md>
+  python benchmark-report.py <results_dir> --scorecard-dir <dir> [--filter 20260111] [--verbose]
+  python benchmark-report.py <results_dir> --report <report.md> --scorecard-dir <dir>   # 両方を 1 回で
+  python benchmark-report.py --merge-scorecards scorecard-a.json scorecard-b.json       # 複数 run の分位点
+
+出力:
+  - --report: バージョン別・タスク別の Markdown レポート（analyze-results.sh）
+  - --scorecard-dir: scorecard-{timestamp}.json / .md（generate-scorecard.sh）
+  - --merge-scorecards: モード別・タスク別の p50/p90/p99（JSON）
+
+所要時間・トークン数・コストの分位点は quantile_sketch.py（DDSketch）で算出し、
+スケッチ自体を Scorecard JSON の "sketches" に保存する（run をまたいで結合できる）。
+"""
+
+import os
+import sys
+import json
+import argparse
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from statistics import median, mean
+from typing import List, Dict, Any, Optional, Tuple
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_PLUGIN_ROOT = os.path.dirname(os.path.dirname(SCRIPT_DIR))
+
+# 列指向ストア・分位点スケッチ（evals-v3 と共用）
+sys.path.insert(0, os.path.join(os.path.dirname(SCRIPT_DIR), "evals-v3", "scripts"))
+import results_store
+from quantile_sketch import QUANTILES, SketchSet, quantile_label
+
+DEFAULT_LOAD_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# 結果として読まないファイル（このスクリプト自身の出力）
+EXCLUDED_PREFIXES = ("scorecard", "report")
+
+# レポートのバージョン（ファイル名 <task>_<version>_*.json）とタスクの並び
+REPORT_VERSIONS = ("latest", "no-plugin", "v2.4.0", "v2.3.1", "v2.0.0")
+REPORT_TASKS = ("plan-feature", "impl-utility", "impl-test", "impl-refactor", "review-security", "review-quality")
+
+# Scorecard のモードとタスク
+SCORECARD_MODES = ("with_plugin", "no_plugin")
+SUITE_TASKS = (
+    "plan-feature", "impl-utility", "impl-test", "impl-refactor",
+    "review-security", "review-quality", "multi-file-refactor", "skill-routing"
+)
+
+
+# ======================================
+# 読み込み
+# ======================================
+
+def _read_json(filepath: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(filepath, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (json.JSONDecodeError, IOError) as e:
+        print(f"Warning: {filepath} の読み込みに失敗: {e}", file=sys.stderr)
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def load_results_from_store(results_dir: str, filter_pattern: str) -> Optional[List[Dict[str, Any]]]:
+    """ingest-results.py で作成したストアから読み込み（ストアがなければ None）"""
+    store = results_store.open_store(results_dir, verify_flat=True)
+    if store is None:
+        return None
+
+    results = []
+    names = store.columns["path"].tolist()
+    for i in (store.columns["source"] == "scorecard").nonzero()[0].tolist():
+        if filter_pattern and filter_pattern not in names[i]:
+            continue
+        data = store.record(i)
+        data["_filepath"] = os.path.join(results_dir, names[i])
+        results.append(data)
+    return results
+
+
+def list_result_files(results_dir: str, filter_pattern: str = "") -> List[str]:
+    """results_dir 直下の結果 JSON（名前順、scorecard/report は除外）"""
+    try:
+        with os.scandir(results_dir) as entries:
+            return sorted(e.path for e in entries
+                          if e.is_file() and e.name.endswith(".json")
+                          and not e.name.startswith(EXCLUDED_PREFIXES)
+                          and (not filter_pattern or filter_pattern in e.name))
+    except FileNotFoundError:
+        return []
+
+
+def load_results(results_dir: str, filter_pattern: str = "", use_store: bool = True,
+                 workers: int = DEFAULT_LOAD_WORKERS) -> List[Dict[str, Any]]:
+    """結果 JSON を 1 件 1 回だけ読み込み（ストアがあればストアから）"""
+    if use_store:
+        results = load_results_from_store(results_dir, filter_pattern)
+        if results is not None:
+            return results
+
+    paths = list_result_files(results_dir, filter_pattern)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        loaded = list(executor.map(_read_json, paths))
+
+    results = []
+    for filepath, data in zip(paths, loaded):
+        if data is not None:
+            data["_filepath"] = filepath
+            results.append(data)
+    return results
+
+
+# ======================================
+# 集計（1 パス）
+# ======================================
+
+def scorecard_mode(r: Dict[str, Any]) -> Optional[str]:
+    """Scorecard のモード（with_plugin / no_plugin、どちらでもなければ None）"""
+    version = r.get("version", "")
+    if "with-plugin" in version or r.get("with_plugin", False):
+        return "with_plugin"
+    if "no-plugin" in version or not r.get("with_plugin", True):
+        return "no_plugin"
+    return None
+
+
+def report_keys(filename: str) -> Tuple[List[str], List[str]]:
+    """ファイル名 <task>_<version>_*.json から (該当バージョン, 該当タスク)"""
+    versions = [v for v in REPORT_VERSIONS if f"_{v}_" in filename]
+    tasks = [t for t in REPORT_TASKS if filename.startswith(f"{t}_")]
+    return versions, tasks
+
+
+def estimated_cost(r: Dict[str, Any]) -> Optional[float]:
+    """推定コスト（estimated_cost_usd、なければ total_cost_usd。jq の // と同じく 0 はそのまま使う）"""
+    cost = r.get("estimated_cost_usd")
+    return r.get("total_cost_usd") if cost is None else cost
+
+
+class GroupStats:
+    """1 グループ（バージョン・モード・タスク）の集計。add() で 1 件ずつ加える"""
+
+    def __init__(self):
+        self.count = 0
+        self.success = 0
+        # trace 有効時の観測メトリクス
+        self.trace = 0
+        self.tool_use = 0
+        self.task_tool_use = 0
+        self.subagent_type = 0
+        # grader（outcome/transcript）
+        self.graded = 0
+        self.grade_pass = 0
+        self.grade_scores: List[float] = []
+        self.durations: List[float] = []
+        # トークン/コスト（推定値）。token_* は tokens が記録された trial のみ
+        self.costs: List[float] = []
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.token_trials = 0
+        self.token_input = 0
+        self.token_output = 0
+        # 所要時間・トークン・コストの分位点（DDSketch）
+        self.sketches = SketchSet()
+
+    def add(self, r: Dict[str, Any]):
+        self.count += 1
+        if r.get("success") is True:
+            self.success += 1
+
+        if r.get("trace_enabled") is True:
+            self.trace += 1
+            self.tool_use += r.get("tool_use_count") or 0
+            self.task_tool_use += r.get("task_tool_use_count") or 0
+            self.subagent_type += r.get("subagent_type_count") or 0
+
+        # grade が {} でも採点済みとして数える（select(.grade != null) と同じ）
+        grade = r.get("grade")
+        if grade is not None:
+            self.graded += 1
+            if grade.get("pass", False):
+                self.grade_pass += 1
+            score = grade.get("score")
+            if isinstance(score, (int, float)) and not isinstance(score, bool):
+                self.grade_scores.append(score)
+
+        duration = r.get("duration_seconds")
+        if duration is not None:
+            self.durations.append(float(duration))
+            self.sketches.add("duration_seconds", duration)
+
+        cost = estimated_cost(r)
+        if cost is not None:
+            self.costs.append(float(cost))
+            self.sketches.add("estimated_cost_usd", cost)
+
+        inp = r.get("input_tokens", 0) or 0
+        out = r.get("output_tokens", 0) or 0
+        self.input_tokens += inp
+        self.output_tokens += out
+        if inp or out:
+            self.token_trials += 1
+            self.token_input += inp
+            self.token_output += out
+            self.sketches.add("input_tokens", inp)
+            self.sketches.add("output_tokens", out)
+
+    def scorecard_stats(self) -> Dict[str, Any]:
+        """Scorecard の統計"""
+        if not self.count:
+            return {
+                "total_trials": 0,
+                "pass_rate": 0.0,
+                "grade_score_avg": 0.0,
+                "duration_median_seconds": 0.0,
+                "estimated_cost_median_usd": 0.0,
+                "input_tokens_avg": 0,
+                "output_tokens_avg": 0,
+                "percentiles": {}
+            }
+
+        return {
+            "total_trials": self.count,
+            "graded_trials": self.graded,
+            "pass_count": self.grade_pass,
+            "pass_rate": self.grade_pass / self.graded if self.graded > 0 else 0.0,
+            "grade_score_avg": mean(self.grade_scores) if self.grade_scores else 0.0,
+            "duration_median_seconds": median(self.durations) if self.durations else 0.0,
+            "duration_avg_seconds": mean(self.durations) if self.durations else 0.0,
+            "estimated_cost_median_usd": median(self.costs) if self.costs else 0.0,
+            "estimated_cost_total_usd": sum(self.costs) if self.costs else 0.0,
+            "input_tokens_avg": int(self.token_input / self.token_trials) if self.token_trials else 0,
+            "output_tokens_avg": int(self.token_output / self.token_trials) if self.token_trials else 0,
+            "percentiles": self.sketches.percentiles()
+        }
+
+
+class BenchmarkAnalysis:
+    """全結果の集計。各結果を 1 回だけ見て、両レポートのグループに振り分ける"""
+
+    def __init__(self, results: List[Dict[str, Any]]):
+        self.total = len(results)
+        self.timestamps: List[str] = []
+        self.by_version: Dict[str, GroupStats] = {}
+        self.by_task_version: Dict[Tuple[str, str], GroupStats] = {}
+        self.by_mode: Dict[str, GroupStats] = {mode: GroupStats() for mode in SCORECARD_MODES}
+        self.by_mode_task: Dict[Tuple[str, str], GroupStats] = {}
+        self.trials: List[Dict[str, Any]] = []
+
+        for r in results:
+            self.add(r)
+
+    def add(self, r: Dict[str, Any]):
+        timestamp = r.get("timestamp")
+        if timestamp:
+            self.timestamps.append(str(timestamp))
+
+        # analyze-results.sh: ファイル名のバージョン・タスク
+        versions, tasks = report_keys(os.path.basename(r.get("_filepath", "")))
+        for version in versions:
+            self.by_version.setdefault(version, GroupStats()).add(r)
+            for task in tasks:
+                self.by_task_version.setdefault((task, version), GroupStats()).add(r)
+
+        # generate-scorecard.sh: version / with_plugin によるモードと task
+        mode = scorecard_mode(r)
+        if mode is not None:
+            self.by_mode[mode].add(r)
+            task = r.get("task")
+            if task in SUITE_TASKS:
+                self.by_mode_task.setdefault((mode, task), GroupStats()).add(r)
+
+        self.trials.append(extract_trial(r))
+
+    def task_stats(self, mode: str) -> List[Dict[str, Any]]:
+        """モードのタスク別統計（SUITE_TASKS の順）"""
+        task_results = []
+        for task in SUITE_TASKS:
+            group = self.by_mode_task.get((mode, task))
+            if group is None:
+                continue
+            stats = group.scorecard_stats()
+            stats["task"] = task
+            task_results.append(stats)
+        return task_results
+
+    def sketches(self) -> Dict[str, Any]:
+        """Scorecard に保存するスケッチ（モード別・モード×タスク別）"""
+        return {
+            mode: {
+                "all": self.by_mode[mode].sketches.to_dict(),
+                "tasks": {task: g.sketches.to_dict()
+                          for (m, task), g in sorted(self.by_mode_task.items()) if m == mode}
+            }
+            for mode in SCORECARD_MODES
+        }
+
+
+def merge_scorecard_sketches(scorecards: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """複数の Scorecard（run）のスケッチを結合して分位点を再計算"""
+    merged: Dict[str, Any] = {}
+    for mode in SCORECARD_MODES:
+        overall = SketchSet(metrics=())
+        tasks: Dict[str, SketchSet] = {}
+        for scorecard in scorecards:
+            sketches = scorecard.get("sketches", {}).get(mode, {})
+            overall.merge(SketchSet.from_dict(sketches.get("all", {})))
+            for task, data in sketches.get("tasks", {}).items():
+                tasks.setdefault(task, SketchSet(metrics=())).merge(SketchSet.from_dict(data))
+        merged[mode] = {
+            "percentiles": overall.percentiles(),
+            "tasks": {task: tasks[task].percentiles() for task in sorted(tasks)}
+        }
+    return merged
+
+
+def extract_trial(r: Dict[str, Any]) -> Dict[str, Any]:
+    """trial の詳細を抽出"""
+    version = r.get("version", "")
+    mode = "with-plugin" if ("with-plugin" in version or r.get("with_plugin", False)) else "no-plugin"
+
+    trial = {
+        "task": r.get("task", "unknown"),
+        "mode": mode,
+        "iteration": r.get("iteration", 1),
+        "timestamp": r.get("timestamp", ""),
+        "duration_seconds": r.get("duration_seconds", 0),
+        "exit_code": r.get("exit_code", -1),
+        "success": r.get("success", False)
+    }
+
+    grade = r.get("grade")
+    if grade is not None:
+        trial["pass"] = grade.get("pass", False)
+        trial["score"] = grade.get("score", 0)
+        trial["checks"] = grade.get("checks", [])
+        trial["error"] = grade.get("error")
+    else:
+        trial["pass"] = None
+        trial["score"] = None
+        trial["checks"] = []
+
+    trial["input_tokens"] = r.get("input_tokens", 0)
+    trial["output_tokens"] = r.get("output_tokens", 0)
+    trial["estimated_cost_usd"] = estimated_cost(r)
+
+    return trial
+
+
+# ======================================
+# analyze-results.sh のレポート
+# ======================================
+
+def _fmt_number(value: float) -> str:
+    """JSON の数値をそのまま表示（整数なら小数点なし）"""
+    return str(int(value)) if float(value).is_integer() else str(value)
+
+
+def _avg(total: float, n: int, digits: int) -> str:
+    return f"{total / n:.{digits}f}" if n else "N/A"
+
+
+def _fmt_percentiles(p: Optional[Dict[str, Any]], fmt: str, unit: str = "") -> str:
+    """"p50 / p90 / p99" の表示（値がなければ N/A）"""
+    if not p:
+        return "N/A"
+    return " / ".join(f"{p[quantile_label(q)]:{fmt}}{unit}" for q in QUANTILES)
+
+
+def version_section(version: str, g: GroupStats) -> List[str]:
+    """バージョン別サマリーの 1 節"""
+    avg_tool_use = _avg(g.tool_use, g.trace, 2)
+    avg_task_tool_use = _avg(g.task_tool_use, g.trace, 2)
+    avg_subagent_type = _avg(g.subagent_type, g.trace, 2)
+
+    grade_pass_rate = f"{g.grade_pass * 100 / g.graded:.1f}" if g.graded else "N/A"
+    avg_grade_score = _avg(sum(g.grade_scores), len(g.grade_scores), 3)
+
+    total_cost = sum(g.costs)
+    avg_input_tokens = avg_output_tokens = avg_cost = "N/A"
+    if g.count and g.input_tokens > 0:
+        avg_input_tokens = str(g.input_tokens // g.count)
+        avg_output_tokens = str(g.output_tokens // g.count)
+        avg_cost = f"{total_cost / g.count:.4f}"
+
+    if g.durations:
+        durations = sorted(g.durations)
+        median_duration = _fmt_number(durations[len(durations) // 2])
+        min_duration = _fmt_number(durations[0])
+        max_duration = _fmt_number(durations[-1])
+        avg_duration = f"{sum(durations) / len(durations):.2f}"
+    else:
+        median_duration = min_duration = max_duration = avg_duration = "N/A"
+    percentiles = g.sketches.percentiles()
+    labels = " / ".join(quantile_label(q) for q in QUANTILES)
+
+    return [
+        f"### {version}",
+        "",
+        "| メトリクス | 値 |",
+        "|-----------|-----|",
+        f"| 実行数 | {g.count} |",
+        f"| 成功率 | {g.success * 100 / g.count:.1f}% ({g.success}/{g.count}) |",
+        f"| 平均所要時間 | {avg_duration}秒 |",
+        f"| 中央値 | {median_duration}秒 |",
+        f"| 最小/最大 | {min_duration}秒 / {max_duration}秒 |",
+        f"| 所要時間 {labels} | {_fmt_percentiles(percentiles.get('duration_seconds'), '.1f', '秒')} |",
+        f"| trace 有効 | {g.trace} / {g.count} |",
+        f"| tool_use 平均（traceのみ） | {avg_tool_use} |",
+        f"| Task tool 検出平均（traceのみ） | {avg_task_tool_use} |",
+        f"| subagent_type 検出平均（traceのみ） | {avg_subagent_type} |",
+        f"| grade あり | {g.graded} / {g.count} |",
+        f"| grade pass | {grade_pass_rate}% ({g.grade_pass}/{g.graded}) |",
+        f"| grade score avg | {avg_grade_score} |",
+        f"| 平均 input tokens | {avg_input_tokens} |",
+        f"| 平均 output tokens | {avg_output_tokens} |",
+        f"| input tokens {labels} | {_fmt_percentiles(percentiles.get('input_tokens'), '.0f')} |",
+        f"| output tokens {labels} | {_fmt_percentiles(percentiles.get('output_tokens'), '.0f')} |",
+        f"| 推定コスト平均 (USD) | ${avg_cost} |",
+        f"| 推定コスト合計 (USD) | ${total_cost:.4f} |",
+        f"| 推定コスト {labels} (USD) | {_fmt_percentiles(percentiles.get('estimated_cost_usd'), '.4f')} |",
+        "",
+    ]
+
+
+def generate_report_md(analysis: BenchmarkAnalysis, generated_at: Optional[str] = None) -> str:
+    """analyze-results.sh の Markdown レポートを生成"""
+    generated_at = generated_at or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    timestamps = sorted(analysis.timestamps)
+    period = f"{timestamps[0]} - {timestamps[-1]}" if timestamps else "N/A"
+
+    lines = [
+        "# Claude harness ベンチマークレポート",
+        "",
+        f"生成日時: {generated_at}",
+        "",
+        "## 概要",
+        "",
+        "| メトリクス | 値 |",
+        "|-----------|-----|",
+        f"| 総実行数 | {analysis.total} |",
+        f"| 分析期間 | {period} |",
+        "",
+        "---",
+        "",
+        "## バージョン別サマリー",
+        "",
+    ]
+    for version in REPORT_VERSIONS:
+        if version in analysis.by_version:
+            lines.extend(version_section(version, analysis.by_version[version]))
+
+    # タスク別統計
+    lines.extend(["", "---", "", "## タスク別パフォーマンス", ""])
+    for task in REPORT_TASKS:
+        versions = [v for v in REPORT_VERSIONS if (task, v) in analysis.by_task_version]
+        if not versions:
+            continue
+        lines.extend([
+            f"### {task}",
+            "",
+            "| バージョン | 平均時間(秒) | p50 / p90 / p99(秒) | 成功率 |",
+            "|-----------|-------------|---------------------|--------|",
+        ])
+        for version in versions:
+            g = analysis.by_task_version[(task, version)]
+            avg_duration = _avg(sum(g.durations), len(g.durations), 2)
+            p = _fmt_percentiles(g.sketches.percentiles().get("duration_seconds"), ".1f")
+            lines.append(f"| {version} | {avg_duration} | {p} | {g.success * 100 / g.count:.1f}% |")
+        lines.append("")
+
+    # 比較分析
+    lines.extend(["", "---", "", "## バージョン間比較", "", "### latest vs no-plugin", ""])
+    latest = analysis.by_version.get("latest")
+    noplugin = analysis.by_version.get("no-plugin")
+    if latest and latest.durations and noplugin and noplugin.durations:
+        latest_avg = mean(latest.durations)
+        noplugin_avg = mean(noplugin.durations)
+        lines.extend([
+            "| メトリクス | latest | no-plugin | 改善率 |",
+            "|-----------|--------|-----------|--------|",
+        ])
+        if noplugin_avg:
+            improvement = (noplugin_avg - latest_avg) * 100 / noplugin_avg
+            lines.extend([
+                f"| 平均所要時間 | {latest_avg:.2f}秒 | {noplugin_avg:.2f}秒 | {improvement:.1f}% |",
+                "",
+            ])
+            if round(improvement, 1) > 0:
+                lines.append(f"**結論**: プラグインにより {improvement:.1f}% の時間短縮を確認")
+            elif round(improvement, 1) < 0:
+                lines.append(f"**結論**: プラグインにより {-improvement:.1f}% の時間増加（オーバーヘッド）")
+            else:
+                lines.append("**結論**: 有意な差なし")
+        else:
+            lines.extend([f"| 平均所要時間 | {latest_avg:.2f}秒 | {noplugin_avg:.2f}秒 | N/A% |", ""])
+    else:
+        lines.append("比較データが不足しています。両バージョンでベンチマークを実行してください。")
+
+    # フッター
+    lines.extend([
+        "",
+        "---",
+        "",
+        "## 注意事項",
+        "",
+        "- 所要時間はネットワーク状況により変動します",
+        "- API呼び出しのレイテンシは Anthropic サーバーの負荷に依存します",
+        "- 複数回実行して中央値を参照することを推奨します",
+        "",
+        "---",
+        "",
+        "*Generated by Claude harness Benchmark Suite*",
+    ])
+    return "\n".join(lines) + "\n"
+
+
+# ======================================
+# generate-scorecard.sh の Scorecard
+# ======================================
+
+def get_harness_version(plugin_root: str) -> str:
+    """VERSION ファイルからバージョンを取得"""
+    version_file = os.path.join(plugin_root, "VERSION")
+    if os.path.isfile(version_file):
+        with open(version_file, "r") as f:
+            return f.read().strip()
+    return "unknown"
+
+
+def get_harness_commit(plugin_root: str) -> str:
+    """git commit hash を取得"""
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=plugin_root,
+            capture_output=True,
+            text=True,
+            timeout=5
+        )
+        if result.returncode == 0:
+            return result.stdout.strip()
+    except Exception:
+        pass
+    return "unknown"
+
+
+def get_os_info() -> tuple:
+    """OS 情報を取得"""
+    try:
+        result = subprocess.run(
+            ["uname", "-s"],
+            capture_output=True,
+            text=True,
+            timeout=5
+        )
+        os_name = result.stdout.strip() if result.returncode == 0 else "unknown"
+
+        result = subprocess.run(
+            ["uname", "-r"],
+            capture_output=True,
+            text=True,
+            timeout=5
+        )
+        os_version = result.stdout.strip() if result.returncode == 0 else "unknown"
+
+        return os_name, os_version
+    except Exception:
+        return "unknown", "unknown"
+
+
+def calculate_comparison(with_plugin: Dict[str, Any], no_plugin: Dict[str, Any]) -> Dict[str, Any]:
+    """比較統計を計算"""
+    comparison = {}
+
+    # 成功率の差分
+    comparison["pass_rate_diff"] = with_plugin["pass_rate"] - no_plugin["pass_rate"]
+
+    # 所要時間の改善率
+    if no_plugin["duration_median_seconds"] > 0:
+        improvement = (no_plugin["duration_median_seconds"] - with_plugin["duration_median_seconds"]) / no_plugin["duration_median_seconds"] * 100
+        comparison["duration_improvement_pct"] = round(improvement, 1)
+    else:
+        comparison["duration_improvement_pct"] = 0.0
+
+    # コストの改善率
+    if no_plugin["estimated_cost_median_usd"] > 0:
+        improvement = (no_plugin["estimated_cost_median_usd"] - with_plugin["estimated_cost_median_usd"]) / no_plugin["estimated_cost_median_usd"] * 100
+        comparison["cost_improvement_pct"] = round(improvement, 1)
+    else:
+        comparison["cost_improvement_pct"] = 0.0
+
+    # Grade Score の差分
+    comparison["grade_score_diff"] = with_plugin["grade_score_avg"] - no_plugin["grade_score_avg"]
+
+    return comparison
+
+
+def build_scorecard(analysis: BenchmarkAnalysis, filter_pattern: str = "",
+                    plugin_root: str = DEFAULT_PLUGIN_ROOT) -> Dict[str, Any]:
+    """JSON 形式の Scorecard を生成"""
+    wp_stats = analysis.by_mode["with_plugin"].scorecard_stats()
+    np_stats = analysis.by_mode["no_plugin"].scorecard_stats()
+    comparison = calculate_comparison(wp_stats, np_stats)
+
+    # 実際の試行数を計算（各タスクの最大イテレーション番号）
+    trials = analysis.trials
+    actual_trials = max([t.get("iteration", 1) for t in trials], default=1) if trials else 0
+
+    # メタ情報
+    os_name, os_version = get_os_info()
+    meta = {
+        "suite_version": "v1",
+        "suite_id": "workflow-v1",
+        "harness_version": get_harness_version(plugin_root),
+        "harness_commit": get_harness_commit(plugin_root),
+        "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "os": os_name,
+        "os_version": os_version,
+        "cost_assumption": "sonnet_3_5_input_3_per_mtok_output_15_per_mtok",
+        "trials": actual_trials,
+        "filter": filter_pattern if filter_pattern else None
+    }
+
+    return {
+        "meta": meta,
+        "summary": {
+            "with_plugin": wp_stats,
+            "no_plugin": np_stats,
+            "comparison": comparison
+        },
+        "tasks": {
+            "with_plugin": analysis.task_stats("with_plugin"),
+            "no_plugin": analysis.task_stats("no_plugin")
+        },
+        "trials": trials,
+        # 複数 run の結合用（merge_scorecard_sketches / --merge-scorecards）
+        "sketches": analysis.sketches()
+    }
+
+
+def generate_scorecard_md(scorecard: Dict[str, Any]) -> str:
+    """Markdown 形式の Scorecard を生成"""
+    meta = scorecard["meta"]
+    summary = scorecard["summary"]
+    wp = summary["with_plugin"]
+    np = summary["no_plugin"]
+    comp = summary["comparison"]
+
+    lines = []
+    lines.append("# Claude harness Scorecard")
+    lines.append("")
+    lines.append(f"生成日時: {meta['generated_at']}")
+    lines.append("")
+    lines.append("---")
+    lines.append("")
+    lines.append("## メタ情報")
+    lines.append("")
+    lines.append("| 項目 | 値 |")
+    lines.append("|------|-----|")
+    lines.append(f"| Suite Version | {meta['suite_version']} |")
+    lines.append(f"| Harness Version | {meta['harness_version']} |")
+    lines.append(f"| Commit | {meta['harness_commit']} |")
+    lines.append(f"| OS | {meta['os']} {meta['os_version']} |")
+    lines.append(f"| Trials | {meta['trials']} |")
+    lines.append(f"| コスト前提 | {meta['cost_assumption']} |")
+    lines.append("")
+    lines.append("> **注意**: 推定コストは参考値であり、実際の請求額ではありません。")
+    lines.append("")
+    lines.append("---")
+    lines.append("")
+    lines.append("## サマリー")
+    lines.append("")
+    lines.append("| 指標 | with-plugin | no-plugin | 差分 |")
+    lines.append("|------|-------------|-----------|------|")
+    lines.append(f"| Trial 数 | {wp['total_trials']} | {np['total_trials']} | - |")
+    lines.append(f"| 成功率 | {wp['pass_rate']*100:.1f}% | {np['pass_rate']*100:.1f}% | {comp['pass_rate_diff']*100:+.1f}% |")
+    lines.append(f"| Grade Score 平均 | {wp['grade_score_avg']:.3f} | {np['grade_score_avg']:.3f} | {comp['grade_score_diff']:+.3f} |")
+    lines.append(f"| 所要時間（中央値） | {wp['duration_median_seconds']:.1f}s | {np['duration_median_seconds']:.1f}s | {comp['duration_improvement_pct']:+.1f}% |")
+    lines.append(f"| 推定コスト（中央値） | ${wp['estimated_cost_median_usd']:.4f} | ${np['estimated_cost_median_usd']:.4f} | {comp['cost_improvement_pct']:+.1f}% |")
+    lines.append(f"| Input Tokens 平均 | {wp['input_tokens_avg']:,} | {np['input_tokens_avg']:,} | - |")
+    lines.append(f"| Output Tokens 平均 | {wp['output_tokens_avg']:,} | {np['output_tokens_avg']:,} | - |")
+    lines.append("")
+    lines.append("### 結論")
+    lines.append("")
+
+    if comp["pass_rate_diff"] > 0.1:
+        lines.append(f"- **成功率**: プラグインにより **{comp['pass_rate_diff']*100:.1f}%** 向上")
+    elif comp["pass_rate_diff"] < -0.1:
+        lines.append(f"- **成功率**: プラグインにより {abs(comp['pass_rate_diff'])*100:.1f}% 低下")
+    else:
+        lines.append("- **成功率**: 有意な差なし")
+
+    if comp["duration_improvement_pct"] > 5:
+        lines.append(f"- **所要時間**: プラグインにより **{comp['duration_improvement_pct']:.1f}%** 短縮")
+    elif comp["duration_improvement_pct"] < -5:
+        lines.append(f"- **所要時間**: プラグインにより {abs(comp['duration_improvement_pct']):.1f}% 増加（オーバーヘッド）")
+    else:
+        lines.append("- **所要時間**: 有意な差なし")
+
+    lines.append("")
+    lines.append("### 分位点（p50 / p90 / p99）")
+    lines.append("")
+    lines.append("| 指標 | with-plugin | no-plugin |")
+    lines.append("|------|-------------|-----------|")
+    for metric, label, fmt in (("duration_seconds", "所要時間 (s)", ".1f"),
+                               ("input_tokens", "Input Tokens", ".0f"),
+                               ("output_tokens", "Output Tokens", ".0f"),
+                               ("estimated_cost_usd", "推定コスト (USD)", ".4f")):
+        wp_p = _fmt_percentiles(wp.get("percentiles", {}).get(metric), fmt)
+        np_p = _fmt_percentiles(np.get("percentiles", {}).get(metric), fmt)
+        lines.append(f"| {label} | {wp_p} | {np_p} |")
+
+    lines.append("")
+    lines.append("---")
+    lines.append("")
+    lines.append("## タスク別詳細")
+    lines.append("")
+
+    # タスク別テーブル
+    wp_tasks = {t["task"]: t for t in scorecard["tasks"].get("with_plugin", [])}
+    np_tasks = {t["task"]: t for t in scorecard["tasks"].get("no_plugin", [])}
+    all_tasks = set(wp_tasks.keys()) | set(np_tasks.keys())
+
+    if all_tasks:
+        lines.append("| Task | Mode | Pass Rate | Grade Avg | Duration |")
+        lines.append("|------|------|-----------|-----------|----------|")
+
+        for task in sorted(all_tasks):
+            if task in wp_tasks:
+                t = wp_tasks[task]
+                lines.append(f"| {task} | with-plugin | {t['pass_rate']*100:.0f}% | {t['grade_score_avg']:.3f} | {t['duration_median_seconds']:.1f}s |")
+            if task in np_tasks:
+                t = np_tasks[task]
+                lines.append(f"| {task} | no-plugin | {t['pass_rate']*100:.0f}% | {t['grade_score_avg']:.3f} | {t['duration_median_seconds']:.1f}s |")
+
+        lines.append("")
+
+    lines.append("---")
+    lines.append("")
+    lines.append("## 失敗した Trial")
+    lines.append("")
+
+    failed_trials = [t for t in scorecard["trials"] if t.get("pass") == False]
+    if failed_trials:
+        lines.append("| Task | Mode | Iteration | Score | Error |")
+        lines.append("|------|------|-----------|-------|-------|")
+        for t in failed_trials[:20]:  # 最大20件
+            error = t.get("error", "")[:50] if t.get("error") else "-"
+            lines.append(f"| {t['task']} | {t['mode']} | {t['iteration']} | {t.get('score', 0):.3f} | {error} |")
+        lines.append("")
+    else:
+        lines.append("*失敗した Trial はありません*")
+        lines.append("")
+
+    lines.append("---")
+    lines.append("")
+    lines.append("## 再現手順")
+    lines.append("")
+    lines.append("```bash")
+    lines.append("# Suite 実行")
+    lines.append("./benchmarks/scripts/run-isolated-benchmark.sh --task <task> --with-plugin")
+    lines.append("./benchmarks/scripts/run-isolated-benchmark.sh --task <task>")
+    lines.append("")
+    lines.append("# Scorecard 生成")
+    lines.append("./benchmarks/scripts/generate-scorecard.sh")
+    lines.append("```")
+    lines.append("")
+    lines.append("---")
+    lines.append("")
+    lines.append("*Generated by Claude harness Scorecard Generator*")
+
+    return "\n".join(lines)
+
+
+def write_scorecard(scorecard: Dict[str, Any], output_dir: str) -> Tuple[str, str]:
+    """scorecard-{timestamp}.json / .md を書き出し、そのパスを返す"""
+    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    json_path = os.path.join(output_dir, f"scorecard-{timestamp}.json")
+    md_path = os.path.join(output_dir, f"scorecard-{timestamp}.md")
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    with open(json_path, "w") as f:
+        json.dump(scorecard, f, indent=2, ensure_ascii=False)
+
+    with open(md_path, "w") as f:
+        f.write(generate_scorecard_md(scorecard))
+
+    return json_path, md_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ベンチマーク結果のレポート・Scorecard 生成")
+    parser.add_argument("results_dir", nargs="?", help="結果ディレクトリ（benchmarks/results）")
+    parser.add_argument("--report", metavar="FILE", help="analyze-results.sh のレポートの出力先")
+    parser.add_argument("--scorecard-dir", metavar="DIR", help="Scorecard（JSON/Markdown）の出力ディレクトリ")
+    parser.add_argument("--filter", default="", help="ファイル名パターンでフィルタ（例: 20260111）")
+    parser.add_argument("--plugin-root", default=DEFAULT_PLUGIN_ROOT, help="プラグインのルート（VERSION / git）")
+    parser.add_argument("--no-store", action="store_true",
+                        help="ingest-results.py のストアを使わず JSON を読む")
+    parser.add_argument("--workers", type=int, default=DEFAULT_LOAD_WORKERS,
+                        help=f"JSON 読み込みのスレッド数（デフォルト: {DEFAULT_LOAD_WORKERS}）")
+    parser.add_argument("--merge-scorecards", nargs="+", metavar="SCORECARD",
+                        help="保存済み Scorecard（JSON）のスケッチを結合して分位点を出力")
+    parser.add_argument("--verbose", action="store_true", help="詳細ログを表示")
+
+    args = parser.parse_args()
+
+    # 複数 run の Scorecard の分位点を結合（結果の再読み込みは不要）
+    if args.merge_scorecards:
+        scorecards = []
+        for path in args.merge_scorecards:
+            with open(path, "r", encoding="utf-8") as f:
+                scorecards.append(json.load(f))
+        print(json.dumps(merge_scorecard_sketches(scorecards), indent=2, ensure_ascii=False))
+        return
+
+    if not args.results_dir or not (args.report or args.scorecard_dir):
+        parser.error("<results_dir> と --report / --scorecard-dir、または --merge-scorecards を指定してください")
+
+    # 結果読み込み（1 回だけ）
+    results = load_results(args.results_dir, args.filter, use_store=not args.no_store, workers=args.workers)
+    if not results:
+        print("Error: 結果ファイルが見つかりません", file=sys.stderr)
+        print(f"  対象: {args.results_dir}/*.json", file=sys.stderr)
+        if args.filter:
+            print(f"  フィルタ: {args.filter}", file=sys.stderr)
+        print("先にベンチマークを実行してください: ./scripts/run-benchmark.sh", file=sys.stderr)
+        sys.exit(1)
+
+    if args.verbose:
+        print(f"読み込み: {len(results)} 件の結果", file=sys.stderr)
+
+    analysis = BenchmarkAnalysis(results)
+
+    if args.verbose:
+        print(f"  with-plugin: {analysis.by_mode['with_plugin'].count} 件", file=sys.stderr)
+        print(f"  no-plugin: {analysis.by_mode['no_plugin'].count} 件", file=sys.stderr)
+
+    if args.report:
+        print(f"分析対象: {analysis.total} 件の結果ファイル")
+        with open(args.report, "w") as f:
+            f.write(generate_report_md(analysis))
+
+    if args.scorecard_dir:
+        scorecard = build_scorecard(analysis, args.filter, args.plugin_root)
+        json_path, md_path = write_scorecard(scorecard, args.scorecard_dir)
+
+        wp_stats = scorecard["summary"]["with_plugin"]
+        np_stats = scorecard["summary"]["no_plugin"]
+        comparison = scorecard["summary"]["comparison"]
+        print(f"✓ Scorecard を生成しました")
+        print(f"  JSON: {json_path}")
+        print(f"  Markdown: {md_path}")
+        print("")
+        print("=== サマリー ===")
+        print(f"with-plugin: 成功率 {wp_stats['pass_rate']*100:.1f}%, Grade {wp_stats['grade_score_avg']:.3f}, 時間 {wp_stats['duration_median_seconds']:.1f}s")
+        print(f"no-plugin:   成功率 {np_stats['pass_rate']*100:.1f}%, Grade {np_stats['grade_score_avg']:.3f}, 時間 {np_stats['duration_median_seconds']:.1f}s")
+        print(f"差分: 成功率 {comparison['pass_rate_diff']*100:+.1f}%, 時間 {comparison['duration_improvement_pct']:+.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+test-benchmark-report.py - Benchmark Report Engine Unit Tests
+
+Usage: python test-benchmark-report.py
+
+Exit codes:
+    0: All tests passed
+    1: One or more tests failed
+"""
+
+from __future__ import annotations
+
+import sys
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# benchmark_report をインポート（ハイフンをアンダースコアに変換）
+import importlib.util
+module_path: Path = Path(__file__).parent.parent / "benchmark-report.py"
+spec = importlib.util.spec_from_file_location("benchmark_report", module_path)
+if spec is None or spec.loader is None:
+    raise ImportError(f"Cannot load module from {module_path}")
+br = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(br)
+
+
+def write_result(root: Path, name: str, **fields) -> None:
+    data: dict = {"task": name.split("_")[0], "iteration": 1, "timestamp": "20260111-100000",
+                  "duration_seconds": 10, "success": True, **fields}
+    (root / f"{name}.json").write_text(json.dumps(data), encoding="utf-8")
+
+
+class TestBenchmarkReport(unittest.TestCase):
+    """1 パス集計とレポート出力のテスト"""
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        write_result(self.root, "plan-feature_latest_1_a", version="latest", duration_seconds=30,
+                     trace_enabled=True, tool_use_count=4, input_tokens=100, output_tokens=10,
+                     estimated_cost_usd=0.5, grade={"pass": True, "score": 0.8})
+        write_result(self.root, "plan-feature_latest_2_b", version="latest", iteration=2, duration_seconds=10,
+                     success=False, trace_enabled=False, input_tokens=300, output_tokens=30,
+                     estimated_cost_usd=0.25, grade={"pass": False, "score": 0.2, "error": "missing"})
+        write_result(self.root, "plan-feature_no-plugin_1_c", version="no-plugin", duration_seconds=20)
+        write_result(self.root, "impl-test_with-plugin_1_d", version="with-plugin", duration_seconds=40,
+                     grade={"pass": True, "score": 1.0})
+        (self.root / "scorecard-20260101.json").write_text("{}", encoding="utf-8")
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def analyze(self) -> br.BenchmarkAnalysis:
+        return br.BenchmarkAnalysis(br.load_results(str(self.root), use_store=False))
+
+    def test_reads_each_file_once(self) -> None:
+        """scorecard 出力を除く各結果を 1 回だけ読む"""
+        with mock.patch.object(br, "_read_json", wraps=br._read_json) as read:
+            analysis = self.analyze()
+        self.assertEqual(analysis.total, 4)
+        self.assertEqual(sorted(Path(c.args[0]).name for c in read.call_args_list),
+                         sorted(p.name for p in self.root.glob("*_*.json")))
+
+    def test_groups(self) -> None:
+        """バージョン・タスク・モードの各グループに振り分けられる"""
+        analysis = self.analyze()
+        latest = analysis.by_version["latest"]
+        self.assertEqual((latest.count, latest.success, latest.trace, latest.tool_use), (2, 1, 1, 4))
+        self.assertEqual((latest.graded, latest.grade_pass), (2, 1))
+        self.assertEqual(analysis.by_task_version[("plan-feature", "no-plugin")].count, 1)
+        self.assertNotIn("with-plugin", analysis.by_version)
+
+        stats = analysis.by_mode["with_plugin"].scorecard_stats()
+        self.assertEqual((stats["total_trials"], stats["pass_rate"]), (1, 1.0))
+        self.assertEqual(analysis.by_mode["no_plugin"].scorecard_stats()["total_trials"], 1)
+        self.assertEqual([t["task"] for t in analysis.task_stats("with_plugin")], ["impl-test"])
+
+    def test_empty_grade_and_zero_cost(self) -> None:
+        """grade が {} でも採点済み、estimated_cost_usd が 0 なら total_cost_usd を使わない"""
+        write_result(self.root, "plan-feature_latest_3_e", version="latest", iteration=3,
+                     estimated_cost_usd=0, total_cost_usd=9.0, grade={})
+        analysis = self.analyze()
+        latest = analysis.by_version["latest"]
+        self.assertEqual((latest.graded, latest.grade_pass), (3, 1))
+        self.assertEqual(sorted(latest.costs), [0.0, 0.25, 0.5])
+
+        trial: dict = br.extract_trial({"estimated_cost_usd": 0, "total_cost_usd": 9.0, "grade": {}})
+        self.assertEqual((trial["estimated_cost_usd"], trial["pass"], trial["score"]), (0, False, 0))
+
+    def test_report(self) -> None:
+        """analyze-results.sh のレポートの主要な値"""
+        report: str = br.generate_report_md(self.analyze(), generated_at="2026-01-11 10:00:00")
+        self.assertIn("| 総実行数 | 4 |", report)
+        self.assertIn("| 成功率 | 50.0% (1/2) |", report)
+        self.assertIn("| 中央値 | 30秒 |", report)
+        self.assertIn("| tool_use 平均（traceのみ） | 4.00 |", report)
+        self.assertIn("| 平均 input tokens | 200 |", report)
+        self.assertIn("| 推定コスト合計 (USD) | $0.7500 |", report)
+        self.assertIn("| 平均所要時間 | 20.00秒 | 20.00秒 | 0.0% |", report)
+        self.assertIn("**結論**: 有意な差なし", report)
+
+    def test_scorecard(self) -> None:
+        """Scorecard の JSON/Markdown を書き出す"""
+        with mock.patch.object(br, "get_os_info", return_value=("Linux", "6.0")):
+            scorecard: dict = br.build_scorecard(self.analyze(), plugin_root=str(self.root))
+        json_path, md_path = br.write_scorecard(scorecard, str(self.root / "out"))
+        self.assertEqual(json.loads(Path(json_path).read_text(encoding="utf-8"))["meta"]["trials"], 2)
+        self.assertEqual(len(scorecard["trials"]), 4)
+        self.assertIn("| plan-feature | no-plugin | 2 | 0.200 | missing |", Path(md_path).read_text(encoding="utf-8"))
+
+    def test_scorecard_percentiles_merge(self) -> None:
+        """Scorecard の分位点と、保存したスケッチを複数 run で結合した分位点"""
+        with mock.patch.object(br, "get_os_info", return_value=("Linux", "6.0")):
+            scorecard: dict = br.build_scorecard(self.analyze(), plugin_root=str(self.root))
+        percentiles: dict = scorecard["summary"]["with_plugin"]["percentiles"]
+        self.assertAlmostEqual(percentiles["duration_seconds"]["p50"], 40, delta=40 * 0.01)
+        self.assertNotIn("input_tokens", percentiles)
+
+        saved: dict = json.loads(json.dumps(scorecard))
+        merged: dict = br.merge_scorecard_sketches([saved, saved])
+        self.assertEqual(merged["with_plugin"]["percentiles"]["duration_seconds"]["count"], 2)
+        self.assertEqual(merged["with_plugin"]["tasks"]["impl-test"]["duration_seconds"]["count"], 2)
+        self.assertEqual(merged["no_plugin"]["percentiles"]["duration_seconds"]["count"], 2)
+
+
+if __name__ == "__main__":
+    # テスト実行
+    loader = unittest.TestLoader()
+    suite = loader.loadTestsFromModule(sys.modules[__name__])
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    # 終了コード
+    sys.exit(0 if result.wasSuccessful() else 1)
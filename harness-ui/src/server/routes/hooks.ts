@@ -1,6 +1,7 @@
 import { Hono } from 'hono'
 import { analyzeHooks, getProjectRoot } from '../services/analyzer.ts'
 import { validateProjectPath } from '../services/file-reader.ts'
+import { getHookLatency } from '../services/hook-latency.ts'
 
 const app = new Hono()
 
@@ -28,4 +29,29 @@ app.get('/', async (c) => {
   }
 })
 
+app.get('/latency', async (c) => {
+  try {
+    const userProject = c.req.query('project')
+    const defaultRoot = getProjectRoot()
+
+    // Validate project path to prevent path traversal attacks
+    const projectRoot = userProject
+      ? validateProjectPath(userProject, defaultRoot) ?? defaultRoot
+      : defaultRoot
+
+    const latency = await getHookLatency(projectRoot)
+    return c.json(latency)
+  } catch (error) {
+    console.error('Hook latency fetch failed:', error)
+    return c.json(
+      {
+        available: false,
+        hooks: [],
+        message: 'フックのレイテンシの取得に失敗しました'
+      },
+      500
+    )
+  }
+})
+
 export default app
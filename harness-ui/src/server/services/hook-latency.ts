@@ -0,0 +1,134 @@
+import { join } from 'path'
+import type { HookLatencyStats, HookLatencyResponse } from '../../shared/types.ts'
+
+/**
+ * Ring buffer written by scripts/run-script.js (format: scripts/hook-latency.js)
+ */
+const RING_FILE = '.claude/state/hook-latency.ring'
+const MAGIC = 'HKLT'
+const FORMAT_VERSION = 1
+const HEADER_BYTES = 16
+const RECORD_BYTES = 64
+const NAME_OFFSET = 20
+
+const FLAG_OVER_BUDGET = 2
+const FLAG_FAST_PATH = 4
+
+interface LatencySample {
+  ts: number
+  hook: string
+  wallMs: number
+  cpuMs: number | null
+  exitCode: number
+  flags: number
+}
+
+/**
+ * Decode all samples in the ring buffer (oldest first)
+ */
+export function decodeLatencyRing(buffer: ArrayBuffer): LatencySample[] {
+  if (buffer.byteLength < HEADER_BYTES) return []
+  const view = new DataView(buffer)
+  const bytes = new Uint8Array(buffer)
+  const magic = String.fromCharCode(...bytes.subarray(0, 4))
+  if (magic !== MAGIC || view.getUint16(4, true) !== FORMAT_VERSION || view.getUint16(6, true) !== RECORD_BYTES) {
+    return []
+  }
+  const capacity = view.getUint32(8, true)
+  const next = view.getUint32(12, true)
+  if (capacity === 0) return []
+
+  const decoder = new TextDecoder()
+  const count = Math.min(next, capacity)
+  const samples: LatencySample[] = []
+  for (let i = next - count; i < next; i++) {
+    const offset = HEADER_BYTES + (i % capacity) * RECORD_BYTES
+    if (offset + RECORD_BYTES > buffer.byteLength) continue
+    const nameBytes = bytes.subarray(offset + NAME_OFFSET, offset + RECORD_BYTES)
+    const nameEnd = nameBytes.indexOf(0)
+    const hook = decoder.decode(nameEnd === -1 ? nameBytes : nameBytes.subarray(0, nameEnd))
+    const ts = view.getFloat64(offset, true)
+    if (!hook || !(ts > 0)) continue
+    const cpuMs = view.getFloat32(offset + 12, true)
+    samples.push({
+      ts,
+      hook,
+      wallMs: view.getFloat32(offset + 8, true),
+      cpuMs: Number.isNaN(cpuMs) ? null : cpuMs,
+      exitCode: view.getInt16(offset + 16, true),
+      flags: view.getUint8(offset + 18)
+    })
+  }
+  return samples
+}
+
+/**
+ * Nearest-rank percentile of an ascending array
+ */
+function percentile(sorted: number[], p: number): number {
+  if (sorted.length === 0) return 0
+  const rank = Math.ceil((p / 100) * sorted.length)
+  return sorted[Math.min(sorted.length, Math.max(1, rank)) - 1] ?? 0
+}
+
+function round(value: number): number {
+  return Math.round(value * 10) / 10
+}
+
+/**
+ * Per-hook latency statistics (sorted by p95, slowest first)
+ */
+export function summarizeLatency(samples: LatencySample[]): HookLatencyStats[] {
+  const byHook = new Map<string, LatencySample[]>()
+  for (const sample of samples) {
+    const list = byHook.get(sample.hook) ?? []
+    list.push(sample)
+    byHook.set(sample.hook, list)
+  }
+
+  const stats: HookLatencyStats[] = []
+  for (const [hook, list] of byHook) {
+    const wall = list.map((s) => s.wallMs).sort((a, b) => a - b)
+    const cpu = list.flatMap((s) => (s.cpuMs === null ? [] : [s.cpuMs])).sort((a, b) => a - b)
+    const last = list[list.length - 1] as LatencySample
+    stats.push({
+      hook,
+      count: list.length,
+      p50Ms: round(percentile(wall, 50)),
+      p95Ms: round(percentile(wall, 95)),
+      maxMs: round(wall[wall.length - 1] ?? 0),
+      cpuP50Ms: cpu.length > 0 ? round(percentile(cpu, 50)) : null,
+      overBudget: list.filter((s) => s.flags & FLAG_OVER_BUDGET).length,
+      fastPath: list.filter((s) => s.flags & FLAG_FAST_PATH).length,
+      errors: list.filter((s) => s.exitCode !== 0).length,
+      lastRunAt: new Date(last.ts).toISOString()
+    })
+  }
+  return stats.sort((a, b) => b.p95Ms - a.p95Ms)
+}
+
+/**
+ * Read hook latency statistics from project
+ */
+export async function getHookLatency(projectRoot: string): Promise<HookLatencyResponse> {
+  try {
+    const file = Bun.file(join(projectRoot, RING_FILE))
+    if (!(await file.exists())) {
+      return {
+        available: false,
+        hooks: [],
+        message: 'フックのレイテンシはまだ記録されていません。フックが run-script.js 経由で実行されると自動的に記録されます。'
+      }
+    }
+
+    const hooks = summarizeLatency(decodeLatencyRing(await file.arrayBuffer()))
+    return { available: hooks.length > 0, hooks }
+  } catch (error) {
+    console.error('Failed to read hook latency:', error)
+    return {
+      available: false,
+      hooks: [],
+      message: `フックのレイテンシの読み込みに失敗しました: ${error instanceof Error ? error.message : 'Unknown error'}`
+    }
+  }
+}
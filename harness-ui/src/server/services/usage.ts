@@ -2,16 +2,133 @@ import { join } from 'path'
 import type { UsageData, UsageEntry, HookUsageEntry, UsageResponse, CleanupSuggestions } from '../../shared/types.ts'
 
 const USAGE_FILE = '.claude/state/harness-usage.json'
+const EVENTS_FILE = '.claude/state/harness-usage.events.jsonl'
+const RETIRED_SUFFIX = '.retired'
+
+type UsageEventType = 'skill' | 'command' | 'agent' | 'hook'
+
+interface UsageEvent {
+  ts?: string
+  type?: UsageEventType
+  name?: string
+  blocked?: boolean
+}
+
+interface EventLogState {
+  offset?: number
+  retiredOffset?: number | null
+}
+
+const SECTIONS: Record<UsageEventType, 'skills' | 'commands' | 'agents' | 'hooks'> = {
+  skill: 'skills',
+  command: 'commands',
+  agent: 'agents',
+  hook: 'hooks'
+}
+
+/**
+ * Fold one usage event into the aggregate (same rules as scripts/record-usage.js)
+ */
+function applyEvent(data: UsageData, event: UsageEvent): void {
+  if (!event || !event.type || !Object.hasOwn(SECTIONS, event.type) || typeof event.name !== 'string' || !event.name) {
+    return
+  }
+  const ts = typeof event.ts === 'string' ? event.ts : null
+
+  if (event.type === 'hook') {
+    const entry = data.hooks[event.name] ??= { triggered: 0, blocked: 0, lastTriggered: null }
+    entry.triggered += 1
+    if (event.blocked) {
+      entry.blocked += 1
+    }
+    if (ts && (!entry.lastTriggered || ts > entry.lastTriggered)) {
+      entry.lastTriggered = ts
+    }
+  } else {
+    const section = data[SECTIONS[event.type] as 'skills' | 'commands' | 'agents']
+    const entry = section[event.name] ??= { count: 0, lastUsed: null }
+    entry.count += 1
+    if (ts && (!entry.lastUsed || ts > entry.lastUsed)) {
+      entry.lastUsed = ts
+    }
+  }
+}
+
+/**
+ * Fold the complete lines of an event log file starting at a byte offset
+ */
+async function foldEventLog(data: UsageData, path: string, offset: number): Promise<void> {
+  const file = Bun.file(path)
+  if (!(await file.exists())) {
+    return
+  }
+  const buffer = Buffer.from(await file.arrayBuffer())
+  const start = offset > buffer.length ? 0 : offset
+  const end = buffer.lastIndexOf(10) + 1
+  if (end <= start) {
+    return
+  }
+  for (const line of buffer.toString('utf-8', start, end).split('\n')) {
+    if (!line) continue
+    try {
+      applyEvent(data, JSON.parse(line) as UsageEvent)
+    } catch {
+      // Skip malformed lines
+    }
+  }
+}
+
+/**
+ * Read the compacted usage view: harness-usage.json plus events not yet folded into it.
+ * Read-only; compaction itself is left to scripts/record-usage.js.
+ */
+async function readUsageData(projectRoot: string): Promise<UsageData | null> {
+  const usageFile = Bun.file(join(projectRoot, USAGE_FILE))
+  const eventsPath = join(projectRoot, EVENTS_FILE)
+  const retiredPath = eventsPath + RETIRED_SUFFIX
+
+  const [hasUsage, hasEvents, hasRetired] = await Promise.all([
+    usageFile.exists(),
+    Bun.file(eventsPath).exists(),
+    Bun.file(retiredPath).exists()
+  ])
+  if (!hasUsage && !hasEvents && !hasRetired) {
+    return null
+  }
+
+  const stored = hasUsage
+    ? await usageFile.json() as Partial<UsageData> & { eventLog?: EventLogState }
+    : {}
+  const data: UsageData = {
+    version: stored.version || '1.0.0',
+    updatedAt: stored.updatedAt || new Date().toISOString(),
+    skills: stored.skills || {},
+    commands: stored.commands || {},
+    agents: stored.agents || {},
+    hooks: stored.hooks || {}
+  }
+
+  const log = stored.eventLog || {}
+  let offset = log.offset || 0
+  if (hasRetired) {
+    // Without retiredOffset, the saved offset still refers to the retired file
+    const hasRetiredOffset = log.retiredOffset !== undefined && log.retiredOffset !== null
+    await foldEventLog(data, retiredPath, hasRetiredOffset ? log.retiredOffset as number : offset)
+    if (!hasRetiredOffset) {
+      offset = 0
+    }
+  }
+  await foldEventLog(data, eventsPath, offset)
+  return data
+}
 
 /**
  * Read usage data from project
  */
 export async function getUsageData(projectRoot: string): Promise<UsageResponse> {
-  const usagePath = join(projectRoot, USAGE_FILE)
-
   try {
-    const file = Bun.file(usagePath)
-    if (!(await file.exists())) {
+    const data = await readUsageData(projectRoot)
+    if (!data) {
       return {
         available: false,
         data: null,
@@ -24,8 +141,6 @@ export async function getUsageData(projectRoot: string): Promise<UsageResponse>
       }
     }
 
-    const data = await file.json() as UsageData
-
     // Calculate top items (sorted by usage count, descending)
     const sortByCount = (a: [string, UsageEntry], b: [string, UsageEntry]) =>
       (b[1].count || 0) - (a[1].count || 0)
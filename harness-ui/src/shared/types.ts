@@ -156,6 +156,25 @@ export interface HooksResponse {
   count: number
 }
 
+export interface HookLatencyStats {
+  hook: string
+  count: number
+  p50Ms: number
+  p95Ms: number
+  maxMs: number
+  cpuP50Ms: number | null
+  overBudget: number
+  fastPath: number
+  errors: number
+  lastRunAt: string
+}
+
+export interface HookLatencyResponse {
+  available: boolean
+  hooks: HookLatencyStats[]
+  message?: string
+}
+
 // claude-mem Types
 export interface Observation {
   id: number
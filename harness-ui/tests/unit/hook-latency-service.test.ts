@@ -0,0 +1,111 @@
+import { describe, test, expect, beforeEach, afterEach } from 'bun:test'
+import { getHookLatency, decodeLatencyRing } from '../../src/server/services/hook-latency.ts'
+import { mkdtemp, rm, mkdir } from 'node:fs/promises'
+import { tmpdir } from 'node:os'
+import { join } from 'node:path'
+
+interface RingSample {
+  hook: string
+  wallMs: number
+  cpuMs?: number
+  exitCode?: number
+  flags?: number
+}
+
+/**
+ * Build a ring buffer in the format written by scripts/hook-latency.js
+ */
+function buildRing(samples: RingSample[], capacity = 1024): ArrayBuffer {
+  const used = Math.min(samples.length, capacity)
+  const buffer = new ArrayBuffer(16 + used * 64)
+  const view = new DataView(buffer)
+  const bytes = new Uint8Array(buffer)
+  bytes.set(new TextEncoder().encode('HKLT'), 0)
+  view.setUint16(4, 1, true)
+  view.setUint16(6, 64, true)
+  view.setUint32(8, capacity, true)
+  view.setUint32(12, samples.length, true)
+  samples.forEach((sample, i) => {
+    const offset = 16 + (i % capacity) * 64
+    view.setFloat64(offset, Date.UTC(2026, 0, 1, 0, 0, i), true)
+    view.setFloat32(offset + 8, sample.wallMs, true)
+    view.setFloat32(offset + 12, sample.cpuMs ?? NaN, true)
+    view.setInt16(offset + 16, sample.exitCode ?? 0, true)
+    view.setUint8(offset + 18, sample.flags ?? 0)
+    bytes.fill(0, offset + 20, offset + 64)
+    bytes.set(new TextEncoder().encode(sample.hook), offset + 20)
+  })
+  return buffer
+}
+
+describe('getHookLatency', () => {
+  let tempDir: string
+
+  beforeEach(async () => {
+    tempDir = await mkdtemp(join(tmpdir(), 'hook-latency-test-'))
+    await mkdir(join(tempDir, '.claude', 'state'), { recursive: true })
+  })
+
+  afterEach(async () => {
+    await rm(tempDir, { recursive: true, force: true })
+  })
+
+  test('returns unavailable when ring file does not exist', async () => {
+    const result = await getHookLatency(tempDir)
+
+    expect(result.available).toBe(false)
+    expect(result.hooks).toEqual([])
+    expect(result.message).toContain('まだ記録されていません')
+  })
+
+  test('computes p50/p95 per hook', async () => {
+    const samples: RingSample[] = []
+    for (let i = 1; i <= 20; i++) {
+      samples.push({ hook: 'pretooluse-guard', wallMs: i * 10, cpuMs: i })
+    }
+    samples.push({ hook: 'session-init', wallMs: 2500, exitCode: 1, flags: 2 })
+    samples.push({ hook: 'session-init', wallMs: 900, flags: 4 })
+
+    await Bun.write(join(tempDir, '.claude', 'state', 'hook-latency.ring'), buildRing(samples))
+
+    const result = await getHookLatency(tempDir)
+
+    expect(result.available).toBe(true)
+    expect(result.hooks.map((h) => h.hook)).toEqual(['session-init', 'pretooluse-guard'])
+
+    const guard = result.hooks[1]
+    expect(guard?.count).toBe(20)
+    expect(guard?.p50Ms).toBe(100)
+    expect(guard?.p95Ms).toBe(190)
+    expect(guard?.maxMs).toBe(200)
+    expect(guard?.cpuP50Ms).toBe(10)
+
+    const init = result.hooks[0]
+    expect(init?.count).toBe(2)
+    expect(init?.p95Ms).toBe(2500)
+    expect(init?.cpuP50Ms).toBeNull()
+    expect(init?.overBudget).toBe(1)
+    expect(init?.fastPath).toBe(1)
+    expect(init?.errors).toBe(1)
+  })
+
+  test('keeps only the newest samples after the ring wraps', () => {
+    const samples: RingSample[] = []
+    for (let i = 1; i <= 6; i++) {
+      samples.push({ hook: `hook-${i}`, wallMs: i })
+    }
+
+    const decoded = decodeLatencyRing(buildRing(samples, 4))
+
+    expect(decoded.map((s) => s.hook)).toEqual(['hook-3', 'hook-4', 'hook-5', 'hook-6'])
+  })
+
+  test('ignores files with an unknown format', async () => {
+    await Bun.write(join(tempDir, '.claude', 'state', 'hook-latency.ring'), 'not a ring buffer')
+
+    const result = await getHookLatency(tempDir)
+
+    expect(result.available).toBe(false)
+    expect(result.hooks).toEqual([])
+  })
+})
@@ -363,4 +363,58 @@ describe('edge cases', () => {
     // They're active but just missing a date
     expect(result.cleanup?.unusedSkills).toHaveLength(0)
   })
+
+  test('folds pending events that are not yet compacted', async () => {
+    const statePath = join(tempDir, '.claude', 'state')
+    const compacted = JSON.stringify({ v: 1, ts: '2024-01-01T00:00:00.000Z', type: 'skill', name: 'impl' }) + '\n'
+    const usageData = {
+      version: '1.0.0',
+      updatedAt: '2024-01-01T00:00:00.000Z',
+      skills: { 'impl': { count: 1, lastUsed: '2024-01-01T00:00:00.000Z' } },
+      commands: {},
+      agents: {},
+      hooks: {},
+      eventLog: { offset: Buffer.byteLength(compacted) }
+    }
+    const pending = [
+      { v: 1, ts: '2024-02-01T00:00:00.000Z', type: 'skill', name: 'impl' },
+      { v: 1, ts: '2024-02-02T00:00:00.000Z', type: 'hook', name: 'pretooluse-guard', blocked: true },
+      { v: 1, ts: '2024-02-03T00:00:00.000Z', type: 'unknown', name: 'ignored' }
+    ].map((event) => JSON.stringify(event) + '\n').join('')
+
+    await Bun.write(join(statePath, 'harness-usage.json'), JSON.stringify(usageData))
+    // The last line is still being written and must not be counted
+    await Bun.write(
+      join(statePath, 'harness-usage.events.jsonl'),
+      compacted + pending + '{"v":1,"type":"skill","na'
+    )
+
+    const result = await getUsageData(tempDir)
+
+    expect(result.available).toBe(true)
+    expect(result.data?.skills['impl']).toEqual({ count: 2, lastUsed: '2024-02-01T00:00:00.000Z' })
+    expect(result.data?.hooks['pretooluse-guard']).toEqual({
+      triggered: 1,
+      blocked: 1,
+      lastTriggered: '2024-02-02T00:00:00.000Z'
+    })
+    expect(Object.keys(result.data?.skills || {})).toEqual(['impl'])
+  })
+
+  test('reads events when only the event log exists', async () => {
+    const statePath = join(tempDir, '.claude', 'state')
+    await Bun.write(
+      join(statePath, 'harness-usage.events.jsonl.retired'),
+      JSON.stringify({ v: 1, ts: '2024-01-01T00:00:00.000Z', type: 'agent', name: 'reviewer' }) + '\n'
+    )
+    await Bun.write(
+      join(statePath, 'harness-usage.events.jsonl'),
+      JSON.stringify({ v: 1, ts: '2024-01-02T00:00:00.000Z', type: 'agent', name: 'reviewer' }) + '\n'
+    )
+
+    const result = await getUsageData(tempDir)
+
+    expect(result.available).toBe(true)
+    expect(result.topAgents).toEqual([['reviewer', { count: 2, lastUsed: '2024-01-02T00:00:00.000Z' }]])
+  })
 })
@@ -0,0 +1,354 @@
+#!/usr/bin/env node
+/**
+ * hook-daemon.js
+ * 常駐フックサーバー（任意）
+ *
+ * 目的:
+ * - ツール呼び出しごとのフックで node → bash → jq × N のプロセス起動を避ける
+ * - 状態ファイル（.claude/state/*.json）のパース結果をメモリに保持して使い回す
+ *
+ * run-script.js はソケットがあればフックをここに送り、
+ * JavaScript 実装（hook-handlers.js）のないフック・デーモンが応答しない場合は
+ * 従来どおり bash スクリプトを実行する。
+ *
+ * 使用方法:
+ *   node hook-daemon.js start     # バックグラウンドで起動
+ *   node hook-daemon.js stop
+ *   node hook-daemon.js status
+ *   node hook-daemon.js serve     # フォアグラウンドで起動（デバッグ用）
+ *
+ * ソケット:
+ *   CLAUDE_HARNESS_HOOK_SOCKET があればそのパス、なければ
+ *   <自分専用のディレクトリ>/claude-harness-hooks-<プラグインのパスのハッシュ>.sock
+ *   （プラグインのコピーごとに別のデーモン）。Windows では使わない。
+ *   自分専用のディレクトリは $XDG_RUNTIME_DIR、なければ <tmpdir>/claude-harness-<uid>（0700）。
+ *   接続・削除の前に、ソケットであること・所有者が自分であることを確認する。
+ *
+ * プロトコル: 1 接続 1 リクエスト、改行区切りの JSON
+ *   → {"script": "pretooluse-guard", "args": [], "input": "<stdin>", "cwd": "...", "env": {...}}
+ *   ← {"handled": true, "stdout": "...", "stderr": "", "exit_code": 0, "cpu_ms": 0.4}
+ *      {"handled": false}（JavaScript 実装なし → bash にフォールバック）
+ */
+
+const { spawn } = require('child_process');
+const crypto = require('crypto');
+const path = require('path');
+const net = require('net');
+const fs = require('fs');
+const os = require('os');
+
+// フック入力以外にハンドラーへ渡す環境変数
+const FORWARDED_ENV = ['CLAUDE_CODE_HARNESS_LANG', 'CC_HARNESS_PHASE0_LOG', 'CC_HARNESS_TOOL_EVENTS_GZIP'];
+
+// 最後のリクエストからこの時間が過ぎたら終了
+const IDLE_TIMEOUT_MS = 60 * 60 * 1000;
+
+// 1 リクエストの上限（フック入力の大きな Write も収まる大きさ）
+const MAX_REQUEST_BYTES = 64 * 1024 * 1024;
+
+/**
+ * 自分だけが読み書きできるディレクトリか
+ */
+function isPrivateDir(dir) {
+  try {
+    const stat = fs.lstatSync(dir);
+    return stat.isDirectory() && stat.uid === process.getuid() && (stat.mode & 0o077) === 0;
+  } catch (e) {
+    return false;
+  }
+}
+
+/**
+ * ソケットを置く自分専用のディレクトリ（用意できなければ null）
+ */
+function socketDir() {
+  const runtimeDir = process.env.XDG_RUNTIME_DIR;
+  if (runtimeDir && isPrivateDir(runtimeDir)) {
+    return runtimeDir;
+  }
+  const dir = path.join(os.tmpdir(), `claude-harness-${process.getuid()}`);
+  try {
+    fs.mkdirSync(dir, { mode: 0o700 });
+  } catch (e) {
+    // 既にある（所有者・権限は下で確認）
+  }
+  return isPrivateDir(dir) ? dir : null;
+}
+
+/**
+ * デーモンのソケットパス（Windows・自分専用のディレクトリがない場合は null）
+ */
+function socketPath() {
+  if (process.env.CLAUDE_HARNESS_HOOK_SOCKET) {
+    return process.env.CLAUDE_HARNESS_HOOK_SOCKET;
+  }
+  if (process.platform === 'win32') {
+    return null;
+  }
+  const dir = socketDir();
+  if (!dir) {
+    return null;
+  }
+  const rootHash = crypto.createHash('sha1').update(__dirname).digest('hex').slice(0, 8);
+  return path.join(dir, `claude-harness-hooks-${rootHash}.sock`);
+}
+
+/**
+ * 自分のデーモンのソケットか（ソケットであり、所有者が自分）
+ * 共有ディレクトリに他のユーザーが置いたソケット・ファイルには接続も削除もしない
+ */
+function isOwnSocket(socket) {
+  let stat;
+  try {
+    stat = fs.lstatSync(socket);
+  } catch (e) {
+    return false;
+  }
+  if (typeof process.getuid !== 'function') {
+    // Windows（名前付きパイプ）は所有者を確認できない
+    return true;
+  }
+  return stat.isSocket() && stat.uid === process.getuid();
+}
+
+/**
+ * デーモンに 1 リクエストを送る
+ * callback(err, response)。接続できない・timeoutMs 以内に応答がない場合は err
+ */
+function request(socket, payload, timeoutMs, callback) {
+  let done = false;
+  const chunks = [];
+  const finish = (err, response) => {
+    if (done) return;
+    done = true;
+    conn.destroy();
+    callback(err, response);
+  };
+
+  const conn = net.createConnection(socket);
+  conn.setTimeout(timeoutMs, () => finish(new Error('hook daemon timed out')));
+  conn.on('error', (err) => finish(err));
+  conn.on('connect', () => conn.write(JSON.stringify(payload) + '\n'));
+  conn.on('data', (chunk) => chunks.push(chunk));
+  conn.on('end', () => {
+    try {
+      finish(null, JSON.parse(Buffer.concat(chunks).toString('utf8')));
+    } catch (e) {
+      finish(new Error('invalid response from hook daemon'));
+    }
+  });
+}
+
+/**
+ * リクエスト 1 件を処理して応答を返す
+ */
+function handle(handlers, message) {
+  if (message.command === 'ping') {
+    return { ok: true, pid: process.pid, scripts: Object.keys(handlers) };
+  }
+  const handler = handlers[message.script];
+  if (!handler) {
+    return { handled: false };
+  }
+  try {
+    const cpuStart = process.cpuUsage();
+    const result = handler({
+      input: message.input || '',
+      args: message.args || [],
+      cwd: message.cwd || process.cwd(),
+      env: message.env || {},
+    });
+    const cpu = process.cpuUsage(cpuStart);
+    return {
+      handled: true,
+      stdout: result.stdout,
+      stderr: result.stderr,
+      exit_code: result.exitCode,
+      cpu_ms: (cpu.user + cpu.system) / 1000,
+    };
+  } catch (e) {
+    // ハンドラーの例外は bash 版に任せる（フックの判定を落とさない）
+    return { handled: false, error: e.message };
+  }
+}
+
+/**
+ * フォアグラウンドで待ち受ける
+ */
+function serve(socket) {
+  const { HANDLERS } = require('./hook-handlers');
+  let idleTimer = null;
+
+  const server = net.createServer((conn) => {
+    const chunks = [];
+    let size = 0;
+    let responded = false;
+    conn.on('data', (chunk) => {
+      if (responded) return;
+      chunks.push(chunk);
+      size += chunk.length;
+      if (size > MAX_REQUEST_BYTES) {
+        responded = true;
+        conn.end(JSON.stringify({ handled: false, error: 'request too large' }) + '\n');
+        return;
+      }
+      if (chunk.indexOf(10) === -1) return;
+      responded = true;
+
+      resetIdleTimer();
+      let response;
+      let message = null;
+      try {
+        message = JSON.parse(Buffer.concat(chunks).toString('utf8'));
+        response = handle(HANDLERS, message);
+      } catch (e) {
+        response = { handled: false, error: 'invalid request' };
+      }
+      conn.end(JSON.stringify(response) + '\n', () => {
+        if (message && message.command === 'shutdown') {
+          shutdown();
+        }
+      });
+    });
+    conn.on('error', () => {});
+  });
+
+  function resetIdleTimer() {
+    if (idleTimer) clearTimeout(idleTimer);
+    idleTimer = setTimeout(shutdown, IDLE_TIMEOUT_MS);
+    idleTimer.unref();
+  }
+
+  function shutdown() {
+    server.close();
+    if (isOwnSocket(socket)) {
+      try {
+        fs.unlinkSync(socket);
+      } catch (e) {
+        // 既に削除済み
+      }
+    }
+    process.exit(0);
+  }
+
+  server.on('error', (err) => {
+    console.error(`hook-daemon: ${err.message}`);
+    process.exit(1);
+  });
+
+  // 前回のデーモンが残したソケット（応答しない）は削除してから待ち受ける
+  // 自分のソケット以外（通常ファイル・他のユーザーのソケット）は削除しない
+  if (isOwnSocket(socket)) {
+    try {
+      fs.unlinkSync(socket);
+    } catch (e) {
+      // なし
+    }
+  } else if (fs.existsSync(socket)) {
+    console.error(`hook-daemon: ${socket} exists and is not our socket; refusing to replace it`);
+    process.exit(1);
+  }
+  const previousUmask = process.umask(0o077);
+  server.listen(socket, () => {
+    process.umask(previousUmask);
+    resetIdleTimer();
+    console.log(`hook-daemon: listening on ${socket} (pid ${process.pid})`);
+  });
+  process.on('SIGTERM', shutdown);
+  process.on('SIGINT', shutdown);
+}
+
+function ping(socket, callback) {
+  if (!isOwnSocket(socket)) {
+    callback(null);
+    return;
+  }
+  request(socket, { command: 'ping' }, 1000, (err, response) => callback(err ? null : response));
+}
+
+/**
+ * バックグラウンドで起動し、応答するまで待つ
+ */
+function start(socket) {
+  ping(socket, (running) => {
+    if (running) {
+      console.log(`hook-daemon: already running (pid ${running.pid})`);
+      return;
+    }
+    const child = spawn(process.execPath, [__filename, 'serve'], {
+      detached: true,
+      stdio: 'ignore',
+      env: process.env,
+    });
+    child.unref();
+
+    let attempts = 0;
+    const wait = () => {
+      ping(socket, (response) => {
+        if (response) {
+          console.log(`hook-daemon: started (pid ${response.pid}, socket ${socket})`);
+          return;
+        }
+        if (++attempts >= 50) {
+          console.error('hook-daemon: failed to start');
+          process.exit(1);
+        }
+        setTimeout(wait, 50);
+      });
+    };
+    setTimeout(wait, 50);
+  });
+}
+
+function main() {
+  const command = process.argv[2];
+  const socket = socketPath();
+
+  if (!socket) {
+    console.error('hook-daemon: no private socket directory on this platform (set CLAUDE_HARNESS_HOOK_SOCKET to override)');
+    process.exit(1);
+  }
+
+  switch (command) {
+    case 'serve':
+      serve(socket);
+      break;
+    case 'start':
+      start(socket);
+      break;
+    case 'stop':
+      if (!isOwnSocket(socket)) {
+        console.log('hook-daemon: not running');
+        break;
+      }
+      request(socket, { command: 'shutdown' }, 1000, (err) => {
+        console.log(err ? 'hook-daemon: not running' : 'hook-daemon: stopped');
+      });
+      break;
+    case 'status':
+      ping(socket, (running) => {
+        if (running) {
+          console.log(`hook-daemon: running (pid ${running.pid}, socket ${socket})`);
+          console.log(`  scripts: ${running.scripts.join(', ')}`);
+        } else {
+          console.log('hook-daemon: not running');
+          process.exitCode = 1;
+        }
+      });
+      break;
+    default:
+      console.error('Usage: node hook-daemon.js <start|stop|status|serve>');
+      process.exit(1);
+  }
+}
+
+if (require.main === module) {
+  main();
+}
+
+module.exports = {
+  FORWARDED_ENV,
+  socketPath,
+  isOwnSocket,
+  request,
+};
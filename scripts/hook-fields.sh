@@ -0,0 +1,182 @@
+#!/bin/bash
+# hook-fields.sh
+# フック入力（stdin JSON）と状態ファイルから必要なフィールドを 1 プロセスで抽出する
+#
+# 使用方法:
+#   source "${SCRIPT_DIR}/hook-fields.sh"
+#   eval "$(printf '%s' "$INPUT" | hook_fields \
+#     TOOL_NAME=.tool_name \
+#     FILE_PATH=.tool_input.file_path \
+#     CMD_NAME=.tool_input.command//.tool_input.name \
+#     PROMPT_SEQ=@session.prompt_seq//0 \
+#     LSP_AVAILABLE=@tooling-policy.lsp.available//false)"
+#
+# フィールド指定: 変数名=式[//式...]
+#   .a.b         フック入力（stdin）の .a.b
+#   @name.a.b    .claude/state/name.json の .a.b（ファイルがなければ null）
+#   それ以外     リテラル（既定値）
+#   jq の // と同じく、null / false なら次の式を使う。すべて該当しなければ空文字
+#   先頭に # を付けると値の長さ（jq の length と同じ。配列・文字列・オブジェクトは要素数、
+#   数値は絶対値、該当なし・真偽値は 0）。例: SKILLS_USED_COUNT=#@session-skills-used.used
+#
+# 出力: 変数名='値' の行（eval 用、シェル安全にクォート済み）
+#   文字列はそのまま、配列は要素を改行区切り、数値・真偽値・オブジェクトは JSON 表記
+#
+# jq 1.6 以上（--rawfile / $ARGS を使う）がなければ python3、
+# どちらもなければ何も出力しない（呼び出し側の初期値のまま）
+
+HOOK_FIELDS_STATE_DIR=".claude/state"
+
+_HOOK_FIELDS_JQ='
+def count:
+  if type == "null" or type == "boolean" then 0 else length end;
+def render:
+  if type == "string" then .
+  elif type == "array" then map(if type == "string" then . else tojson end) | join("\n")
+  else tojson end;
+def lookup($doc; $path):
+  if $path == "" then $doc
+  else ($path | split(".") | map(select(. != ""))) as $keys | (try ($doc | getpath($keys)) catch null)
+  end;
+def evaluate($input; $files):
+  if startswith(".") then lookup($input; .[1:])
+  elif startswith("@") then
+    (.[1:] | index(".")) as $dot
+    | (if $dot == null then [.[1:], ""] else [.[1:$dot + 1], .[$dot + 2:]] end) as [$name, $path]
+    | (try ($files[$name] | fromjson) catch null) as $doc
+    | lookup($doc; $path)
+  else . end;
+
+(try fromjson catch null) as $input
+| $ARGS.named as $files
+| $ARGS.positional[]
+| index("=") as $eq
+| select($eq != null)
+| .[:$eq] as $var
+| select($var | test("^[A-Za-z_][A-Za-z0-9_]*$"))
+| .[$eq + 1:] as $exprs
+| ($exprs | startswith("#")) as $count
+| ([(if $count then $exprs[1:] else $exprs end) | split("//")[] | evaluate($input; $files) | select(. != null and . != false)] | first) as $value
+| "\($var)=\(if $count then $value | count | tojson else $value // "" | render end | @sh)"
+'
+
+_HOOK_FIELDS_PY='
+import json, re, shlex, sys
+
+def load(text):
+    try:
+        return json.loads(text)
+    except Exception:
+        return None
+
+def lookup(doc, path):
+    for key in [k for k in path.split(".") if k]:
+        if isinstance(doc, dict):
+            doc = doc.get(key)
+        elif isinstance(doc, list) and key.isdigit() and int(key) < len(doc):
+            doc = doc[int(key)]
+        else:
+            return None
+    return doc
+
+def evaluate(expr, payload, state_dir, cache):
+    if expr.startswith("."):
+        return lookup(payload, expr[1:])
+    if expr.startswith("@"):
+        name, _, path = expr[1:].partition(".")
+        if name not in cache:
+            try:
+                with open(f"{state_dir}/{name}.json", encoding="utf-8") as f:
+                    cache[name] = load(f.read())
+            except OSError:
+                cache[name] = None
+        return lookup(cache[name], path)
+    return expr
+
+def count(value):
+    if value is None or isinstance(value, bool):
+        return 0
+    if isinstance(value, (int, float)):
+        value = abs(value)
+        return int(value) if float(value).is_integer() else value
+    return len(value)
+
+def render(value):
+    if isinstance(value, str):
+        return value
+    if isinstance(value, list):
+        return "\n".join(v if isinstance(v, str) else json.dumps(v, ensure_ascii=False) for v in value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+payload = load(sys.stdin.read())
+state_dir, specs = sys.argv[1], sys.argv[2:]
+cache = {}
+for spec in specs:
+    var, eq, exprs = spec.partition("=")
+    if not eq or not re.match(r"^[A-Za-z_][A-Za-z0-9_]*$", var):
+        continue
+    counting = exprs.startswith("#")
+    found = None
+    for expr in (exprs[1:] if counting else exprs).split("//"):
+        result = evaluate(expr, payload, state_dir, cache)
+        if result is not None and result is not False:
+            found = result
+            break
+    if counting:
+        value = render(count(found))
+    else:
+        value = "" if found is None else render(found)
+    print(f"{var}={shlex.quote(value)}")
+'
+
+# jq が 1.6 以上か（結果はシェルごとにキャッシュ）
+_hook_fields_jq_usable() {
+  if [ -z "${_HOOK_FIELDS_JQ_USABLE:-}" ]; then
+    _HOOK_FIELDS_JQ_USABLE="false"
+    local version
+    if version="$(jq --version 2>/dev/null)" && [[ "$version" =~ ^jq-([0-9]+)\.([0-9]+) ]]; then
+      if [ "${BASH_REMATCH[1]}" -gt 1 ] || { [ "${BASH_REMATCH[1]}" -eq 1 ] && [ "${BASH_REMATCH[2]}" -ge 6 ]; }; then
+        _HOOK_FIELDS_JQ_USABLE="true"
+      fi
+    fi
+  fi
+  [ "$_HOOK_FIELDS_JQ_USABLE" = "true" ]
+}
+
+# フィールドを抽出して 変数名='値' の行を出力
+# 引数: フィールド指定（変数名=式）...
+# stdin: フック入力 JSON（なければ空でよい）
+hook_fields() {
+  if _hook_fields_jq_usable; then
+    # 参照される状態ファイルだけを jq に渡す
+    local -a file_args=()
+    local seen=" "
+    local spec expr name file
+    for spec in "$@"; do
+      expr="${spec#*=}"
+      expr="${expr#\#}"
+      while [ -n "$expr" ]; do
+        case "$expr" in
+          @*)
+            name="${expr#@}"
+            name="${name%%.*}"
+            name="${name%%//*}"
+            file="$HOOK_FIELDS_STATE_DIR/$name.json"
+            if [[ "$seen" != *" $name "* ]] && [ -r "$file" ]; then
+              file_args+=(--rawfile "$name" "$file")
+            fi
+            seen="$seen$name "
+            ;;
+        esac
+        [[ "$expr" == *//* ]] || break
+        expr="${expr#*//}"
+      done
+    done
+    jq -rRs ${file_args[@]+"${file_args[@]}"} "$_HOOK_FIELDS_JQ" --args "$@" 2>/dev/null
+  elif command -v python3 >/dev/null 2>&1; then
+    python3 -c "$_HOOK_FIELDS_PY" "$HOOK_FIELDS_STATE_DIR" "$@" 2>/dev/null
+  else
+    cat >/dev/null
+  fi
+  return 0
+}
@@ -0,0 +1,588 @@
+/**
+ * hook-handlers.js
+ * hook-daemon.js が常駐プロセス内で実行するフックの JavaScript 実装
+ *
+ * 対象はツール呼び出しごとに走るフック（bash 版と同じ入出力・同じ状態ファイル）:
+ *   - pretooluse-guard         (PreToolUse: Write|Edit|Bash)
+ *   - posttooluse-log-toolname (PostToolUse: *)
+ *
+ * 状態ファイル（.claude/state/*.json 等）はパスごとに mtime・サイズをキーにして
+ * パース結果をキャッシュし、変更されたときだけ読み直す。
+ *
+ * ハンドラーの形:
+ *   handler({ input, args, cwd, env }) → { stdout, stderr, exitCode }
+ *   input はフック入力（stdin）の文字列、cwd は run-script.js のカレントディレクトリ
+ */
+
+const path = require('path');
+const fs = require('fs');
+const zlib = require('zlib');
+const { appendUsageEvent } = require('./record-usage');
+
+const STATE_DIR = path.join('.claude', 'state');
+
+// ===== 状態ファイルのキャッシュ =====
+
+const jsonCache = new Map();
+
+/**
+ * JSON ファイルを読み込む（変更がなければキャッシュを返す）
+ * ファイルがなければ undefined、パースできなければ null
+ */
+function readJsonCached(file) {
+  let stat;
+  try {
+    stat = fs.statSync(file, { bigint: true });
+  } catch (e) {
+    jsonCache.delete(file);
+    return undefined;
+  }
+  const key = `${stat.mtimeNs}:${stat.size}`;
+  const cached = jsonCache.get(file);
+  if (cached && cached.key === key) {
+    return cached.value;
+  }
+  let value = null;
+  try {
+    value = JSON.parse(fs.readFileSync(file, 'utf8'));
+  } catch (e) {
+    // 壊れたファイルは jq のエラーと同じく「値なし」として扱う
+  }
+  jsonCache.set(file, { key, value });
+  return value;
+}
+
+/**
+ * JSON を書き出す（jq と同じ 2 スペースインデント + 改行、一時ファイル経由で置き換え）
+ */
+function writeJson(file, value) {
+  const tmp = `${file}.${process.pid}.tmp`;
+  fs.writeFileSync(tmp, JSON.stringify(value, null, 2) + '\n');
+  fs.renameSync(tmp, file);
+  jsonCache.delete(file);
+}
+
+/**
+ * jq -r '<expr> // <default>' の出力と同じ文字列（null / false は既定値）
+ */
+function jqText(value, fallback) {
+  if (value === undefined || value === null || value === false) return fallback;
+  return typeof value === 'string' ? value : JSON.stringify(value);
+}
+
+function isObject(value) {
+  return value !== null && typeof value === 'object' && !Array.isArray(value);
+}
+
+function dig(obj, keys) {
+  let value = obj;
+  for (const key of keys) {
+    if (value === null || typeof value !== 'object') return undefined;
+    value = value[key];
+  }
+  return value;
+}
+
+function parseInput(input) {
+  try {
+    const data = JSON.parse(input);
+    return isObject(data) ? data : {};
+  } catch (e) {
+    return {};
+  }
+}
+
+function utcTimestamp() {
+  return new Date().toISOString().replace(/\.\d{3}Z$/, 'Z');
+}
+
+/**
+ * bash の case パターン（*, ?, [...]）を正規表現に変換（* は / にもマッチ）
+ */
+function globToRegExpSource(pattern) {
+  let source = '';
+  for (let i = 0; i < pattern.length; i++) {
+    const c = pattern[i];
+    if (c === '*') {
+      source += '.*';
+    } else if (c === '?') {
+      source += '.';
+    } else if (c === '[') {
+      const end = pattern.indexOf(']', i + 2);
+      if (end === -1) {
+        source += '\\[';
+      } else {
+        let cls = pattern.slice(i + 1, end).replace(/\\/g, '\\\\');
+        if (cls[0] === '!') cls = '^' + cls.slice(1);
+        source += `[${cls}]`;
+        i = end;
+      }
+    } else {
+      source += c.replace(/[.+^${}()|\\\/]/g, '\\$&');
+    }
+  }
+  return source;
+}
+
+function globMatcher(patterns) {
+  return new RegExp(`^(?:${patterns.map(globToRegExpSource).join('|')})$`);
+}
+
+// ===== pretooluse-guard =====
+
+const GUARD_MESSAGES = {
+  en: {
+    deny_path_traversal: (arg) => `Blocked: path traversal in file_path (${arg})`,
+    ask_write_outside_project: (arg) => `Confirm: writing outside project directory (${arg})`,
+    deny_protected_path: (arg) => `Blocked: protected path (${arg})`,
+    deny_sudo: () => 'Blocked: sudo is not allowed via Claude Code hooks',
+    ask_git_push: (arg) => `Confirm: git push requested (${arg})`,
+    ask_rm_rf: (arg) => `Confirm: rm -rf requested (${arg})`,
+    deny_git_commit_no_review: () => 'Blocked: Run /harness-review before committing. After review approval, run git commit again.',
+  },
+  ja: {
+    deny_path_traversal: (arg) => `ブロック: パストラバーサルの疑い（file_path: ${arg}）`,
+    ask_write_outside_project: (arg) => `確認: プロジェクト外への書き込み（file_path: ${arg}）`,
+    deny_protected_path: (arg) => `ブロック: 保護対象パスへの操作（path: ${arg}）`,
+    deny_sudo: () => 'ブロック: sudo はフック経由では許可していません',
+    ask_git_push: (arg) => `確認: git push を実行しようとしています（command: ${arg}）`,
+    ask_rm_rf: (arg) => `確認: rm -rf を実行しようとしています（command: ${arg}）`,
+    deny_git_commit_no_review: () => 'ブロック: コミット前に /harness-review を実行してください。レビュー後、再度 git commit を実行できます。',
+  },
+};
+
+function guardMessage(env, key, arg = '') {
+  const lang = env.CLAUDE_CODE_HARNESS_LANG || 'ja';
+  const messages = lang === 'en' ? GUARD_MESSAGES.en : GUARD_MESSAGES.ja;
+  return messages[key] ? messages[key](arg) : `${key} ${arg}`;
+}
+
+const TEST_QUALITY_GUIDELINE = `【テスト品質ガイドライン】
+- it.skip() / test.skip() への変更禁止
+- アサーションの削除・緩和禁止
+- eslint-disable コメントの追加禁止`;
+
+const IMPL_QUALITY_GUIDELINE = `【実装品質ガイドライン】
+- テスト期待値のハードコード禁止
+- スタブ・モック・空実装禁止
+- 意味のあるロジックを実装すること`;
+
+const SKILLS_GATE_MESSAGE = (skills) => `[Skills Gate] コード編集前にスキルを使用してください。
+
+このプロジェクトでは Skills Gate が有効です。
+コード変更前に Skill ツールで適切なスキルを呼び出してください。
+
+利用可能なスキル: ${skills}
+
+例: Skill ツールで 'impl' や 'review' を呼び出す
+
+スキルを使用後、再度 Write/Edit を実行してください。`;
+
+const LSP_POLICY_MESSAGE = `[LSP Policy] コード変更前にLSPツールを使って影響範囲を分析してください。
+
+推奨LSPツール:
+- Go-to-definition でシンボルの定義を確認
+- Find-references で使用箇所を確認
+- Diagnostics で型エラーを検出
+
+LSPツールを使って変更の影響範囲を把握してから、再度 Write/Edit を実行してください。`;
+
+// pretooluse-guard.sh の case パターンと同じ
+const TEST_PATH = globMatcher([
+  'tests/*', 'test/*', '__tests__/*', '*.spec.ts', '*.spec.tsx', '*.spec.js', '*.spec.jsx',
+  '*.test.ts', '*.test.tsx', '*.test.js', '*.test.jsx',
+]);
+const IMPL_PATH = globMatcher([
+  'src/*.ts', 'src/*.tsx', 'src/*.js', 'src/*.jsx', 'lib/*.ts', 'lib/*.tsx', 'lib/*.js', 'lib/*.jsx',
+]);
+const PROTECTED_PATH = globMatcher([
+  '.git/*', '*/.git/*', '.env', '.env.*', '*/.env', '*/.env.*', 'secrets/*', '*/secrets/*',
+  '*.pem', '*.key', '*id_rsa*', '*id_ed25519*', '*/.ssh/*',
+  '.claude/state/path-rules.cache', '*/.claude/state/path-rules.cache',
+]);
+const DEFAULT_EXCLUDED_PATH = globMatcher([
+  '*.md', '*.txt', '*.json', '.claude/*', 'docs/*', 'templates/*', 'benchmarks/*',
+]);
+
+const SUDO_COMMAND = /(^|\s)sudo(\s|$)/im;
+const GIT_COMMIT_COMMAND = /(^|\s)git\s+commit(\s|$)/im;
+const GIT_PUSH_COMMAND = /(^|\s)git\s+push(\s|$)/im;
+const RM_RF_COMMAND = /(^|\s)rm\s+-rf(\s|$)/im;
+const COMMIT_GUARD_DISABLED = /commit_guard:[ \t]*false/;
+
+// path-utils.sh の normalize_path / is_absolute_path / is_path_under
+function normalizePath(p) {
+  if (!p) return '';
+  p = p.replace(/\\/g, '/');
+  p = p.startsWith('//') ? '//' + p.slice(2).replace(/\/+/g, '/') : p.replace(/\/+/g, '/');
+  if (p.length > 1 && !/^[A-Za-z]:\/$/.test(p)) {
+    p = p.replace(/\/$/, '');
+  }
+  return p;
+}
+
+function isAbsolutePath(p) {
+  return p.startsWith('/') || /^[A-Za-z]:[\\/]/.test(p) || /^[\\/][\\/]/.test(p);
+}
+
+function isPathUnder(child, parent) {
+  const withSlash = parent.endsWith('/') ? parent : parent + '/';
+  return (child + '/').startsWith(withSlash) || child === withSlash.slice(0, -1);
+}
+
+function isPathTraversal(p) {
+  return p === '..' || p.startsWith('../') || p.includes('/../') || p.endsWith('/..');
+}
+
+function decision(permissionDecision, reason, additionalContext) {
+  const output = {
+    hookSpecificOutput: {
+      hookEventName: 'PreToolUse',
+      permissionDecision,
+      permissionDecisionReason: reason,
+    },
+  };
+  if (additionalContext) {
+    output.hookSpecificOutput.additionalContext = additionalContext;
+  }
+  return { stdout: JSON.stringify(output) + '\n', stderr: '', exitCode: 0 };
+}
+
+/**
+ * ブロックを usage のイベントログに記録（1 行追記のみ、子プロセスは起動しない）
+ */
+function recordBlocked(cwd) {
+  try {
+    appendUsageEvent('hook', 'pretooluse-guard', { blocked: true }, cwd);
+  } catch (e) {
+    // 記録の失敗でフックの判定を落とさない
+  }
+}
+
+function deny(cwd, reason) {
+  recordBlocked(cwd);
+  return decision('deny', reason);
+}
+
+const PASS = { stdout: '', stderr: '', exitCode: 0 };
+
+/**
+ * skills-policy.json の除外設定（ファイルの mtime が変わるまで再利用）
+ */
+const exclusionCache = new Map();
+
+function compiledExclusions(policyFile) {
+  const policy = readJsonCached(policyFile);
+  const cached = exclusionCache.get(policyFile);
+  if (cached && cached.policy === policy) {
+    return cached.compiled;
+  }
+  const gate = dig(policy, ['skills_gate']) || {};
+  const paths = (Array.isArray(gate.exclude_paths) ? gate.exclude_paths : [])
+    .filter((p) => typeof p === 'string' && p);
+  const compiled = {
+    // case "$path" in $pattern*) と同じく前方一致
+    prefix: paths.length ? new RegExp(`^(?:${paths.map((p) => globToRegExpSource(p) + '.*').join('|')})$`) : null,
+    // *.ext の形は拡張子として後方一致
+    suffixes: paths.filter((p) => p.startsWith('*.')).map((p) => p.slice(1)),
+    extensions: new Set((Array.isArray(gate.exclude_extensions) ? gate.exclude_extensions : [])
+      .filter((e) => typeof e === 'string' && e)),
+  };
+  exclusionCache.set(policyFile, { policy, compiled });
+  return compiled;
+}
+
+function isExcludedPath(relPath, policyFile) {
+  if (DEFAULT_EXCLUDED_PATH.test(relPath)) return true;
+  if (readJsonCached(policyFile) === undefined) return false;
+  const { prefix, suffixes, extensions } = compiledExclusions(policyFile);
+  if (prefix && prefix.test(relPath)) return true;
+  if (suffixes.some((ext) => relPath.endsWith(ext))) return true;
+  const dot = relPath.lastIndexOf('.');
+  return extensions.has('.' + (dot === -1 ? relPath : relPath.slice(dot + 1)));
+}
+
+function guardWriteEdit(filePath, cwdField, cwd, env) {
+  if (!filePath) return PASS;
+
+  if (isPathTraversal(filePath)) {
+    return deny(cwd, guardMessage(env, 'deny_path_traversal', filePath));
+  }
+
+  const normFilePath = normalizePath(filePath);
+  const normCwd = normalizePath(cwdField);
+
+  if (normCwd && isAbsolutePath(normFilePath) && !isPathUnder(normFilePath, normCwd)) {
+    return decision('ask', guardMessage(env, 'ask_write_outside_project', filePath));
+  }
+
+  let relPath = normFilePath;
+  if (normCwd && isPathUnder(normFilePath, normCwd)) {
+    const cwdWithSlash = normCwd.replace(/\/$/, '') + '/';
+    if (normFilePath.startsWith(cwdWithSlash)) {
+      relPath = normFilePath.slice(cwdWithSlash.length);
+    }
+  }
+
+  if (PROTECTED_PATH.test(relPath)) {
+    return deny(cwd, guardMessage(env, 'deny_protected_path', relPath));
+  }
+
+  const stateDir = path.join(cwd, STATE_DIR);
+
+  // Skills Gate: skills-config.json が enabled=true のときだけ
+  const skillsConfig = readJsonCached(path.join(stateDir, 'skills-config.json'));
+  if (jqText(dig(skillsConfig, ['enabled']), 'false') === 'true'
+      && !isExcludedPath(relPath, path.join(stateDir, 'skills-policy.json'))) {
+    const used = dig(readJsonCached(path.join(stateDir, 'session-skills-used.json')), ['used']);
+    // jq の .used | length と同じ（数値は絶対値、真偽値・なしは 0）
+    let usedCount = 0;
+    if (Array.isArray(used) || typeof used === 'string') usedCount = used.length;
+    else if (typeof used === 'number') usedCount = Math.abs(used);
+    else if (used && typeof used === 'object') usedCount = Object.keys(used).length;
+    if (!(Number.isInteger(usedCount) && usedCount > 0)) {
+      const skills = dig(skillsConfig, ['skills']);
+      let available = 'impl, review';
+      if (skills === undefined || skills === null || skills === false) {
+        available = '';
+      } else if (Array.isArray(skills) && skills.every((s) => typeof s === 'string')) {
+        available = skills.join(', ');
+      }
+      return deny(cwd, SKILLS_GATE_MESSAGE(available));
+    }
+  }
+
+  // LSP Gate: セマンティック変更時に LSP 使用を推奨
+  const session = readJsonCached(path.join(stateDir, 'session.json'));
+  const toolingPolicy = readJsonCached(path.join(stateDir, 'tooling-policy.json'));
+  if (session !== undefined && toolingPolicy !== undefined) {
+    const currentPromptSeq = jqText(dig(session, ['prompt_seq']), '0');
+    const intent = jqText(dig(session, ['intent']), 'literal');
+    const lspAvailable = jqText(dig(toolingPolicy, ['lsp', 'available']), 'false');
+    const lspLastUsedSeq = jqText(dig(toolingPolicy, ['lsp', 'last_used_prompt_seq']), '0');
+    const fileExt = filePath.slice(filePath.lastIndexOf('.') + 1);
+    const lspAvailableForExt = jqText(dig(toolingPolicy, ['lsp', 'available_by_ext', fileExt]), 'false');
+
+    if (intent === 'semantic' && lspAvailable === 'true' && lspAvailableForExt === 'true'
+        && lspLastUsedSeq !== currentPromptSeq) {
+      return deny(cwd, LSP_POLICY_MESSAGE);
+    }
+  }
+
+  // すべてのガードを通過: ファイルパスに応じたガイドラインを返す
+  if (TEST_PATH.test(relPath)) return decision('', '', TEST_QUALITY_GUIDELINE);
+  if (IMPL_PATH.test(relPath)) return decision('', '', IMPL_QUALITY_GUIDELINE);
+  return PASS;
+}
+
+function guardBash(command, cwd, env) {
+  if (!command) return PASS;
+
+  if (SUDO_COMMAND.test(command)) {
+    return deny(cwd, guardMessage(env, 'deny_sudo'));
+  }
+
+  // Commit Guard: レビュー完了前のコミットをブロック
+  if (GIT_COMMIT_COMMAND.test(command)) {
+    let commitGuardEnabled = true;
+    try {
+      const config = fs.readFileSync(path.join(cwd, '.claude-code-harness.config.yaml'), 'utf8');
+      if (COMMIT_GUARD_DISABLED.test(config)) commitGuardEnabled = false;
+    } catch (e) {
+      // 設定ファイルなし = 有効
+    }
+
+    if (commitGuardEnabled) {
+      const review = readJsonCached(path.join(cwd, STATE_DIR, 'review-approved.json'));
+      const approvedAt = jqText(dig(review, ['approved_at']), '');
+      if (!(approvedAt && dig(review, ['judgment']) === 'APPROVE')) {
+        return deny(cwd, guardMessage(env, 'deny_git_commit_no_review'));
+      }
+    }
+  }
+
+  if (GIT_PUSH_COMMAND.test(command)) {
+    return decision('ask', guardMessage(env, 'ask_git_push', command));
+  }
+
+  if (RM_RF_COMMAND.test(command)) {
+    return decision('ask', guardMessage(env, 'ask_rm_rf', command));
+  }
+
+  return PASS;
+}
+
+function pretooluseGuard({ input, cwd, env }) {
+  if (!input) return PASS;
+  const data = parseInput(input);
+  const toolName = jqText(data.tool_name, '');
+  const toolInput = data.tool_input;
+
+  if (toolName === 'Write' || toolName === 'Edit') {
+    return guardWriteEdit(jqText(dig(toolInput, ['file_path']), ''), jqText(data.cwd, ''), cwd, env);
+  }
+  if (toolName === 'Bash') {
+    return guardBash(jqText(dig(toolInput, ['command']), ''), cwd, env);
+  }
+  return PASS;
+}
+
+// ===== posttooluse-log-toolname =====
+
+const TOOL_EVENTS_MAX_SIZE_BYTES = 262144;  // 256KB
+const TOOL_EVENTS_MAX_GENERATIONS = 5;
+const ROTATE_LOCK_STALE_MS = 60000;
+
+/**
+ * サイドカーのカウンター（"<bytes> <lines>"）を読む。なければ今のログから作り直す
+ */
+function readLogCounter(countFile, logFile) {
+  try {
+    const match = /^(\d+) (\d+)$/.exec(fs.readFileSync(countFile, 'utf8').trim());
+    if (match) return { bytes: Number(match[1]), lines: Number(match[2]) };
+  } catch (e) {
+    // カウンターなし
+  }
+  return measureLog(logFile);
+}
+
+function measureLog(logFile) {
+  let content;
+  try {
+    content = fs.readFileSync(logFile);
+  } catch (e) {
+    return { bytes: 0, lines: 0 };
+  }
+  let lines = 0;
+  for (let i = 0; i < content.length; i++) {
+    if (content[i] === 10) lines++;
+  }
+  return { bytes: content.length, lines };
+}
+
+function rotateLog(logFile, env) {
+  for (const ext of ['', '.gz']) {
+    fs.rmSync(`${logFile}.${TOOL_EVENTS_MAX_GENERATIONS}${ext}`, { force: true });
+    for (let i = TOOL_EVENTS_MAX_GENERATIONS - 1; i >= 1; i--) {
+      if (fs.existsSync(`${logFile}.${i}${ext}`)) fs.renameSync(`${logFile}.${i}${ext}`, `${logFile}.${i + 1}${ext}`);
+    }
+  }
+  if (!fs.existsSync(logFile)) return;
+  fs.renameSync(logFile, `${logFile}.1`);
+  if (env.CC_HARNESS_TOOL_EVENTS_GZIP === '1') {
+    fs.writeFileSync(`${logFile}.1.gz`, zlib.gzipSync(fs.readFileSync(`${logFile}.1`)));
+    fs.unlinkSync(`${logFile}.1`);
+  }
+}
+
+/**
+ * カウンターが上限を超えたときだけ呼ぶ。実際のサイズを確かめてからローテーションする
+ */
+function rotateIfFull(logFile, lockDir, counter, env) {
+  try {
+    fs.mkdirSync(lockDir);
+  } catch (e) {
+    // 他のプロセスがローテーション中。古いロックは削除して次回に任せる
+    try {
+      if (Date.now() - fs.statSync(lockDir).mtimeMs > ROTATE_LOCK_STALE_MS) fs.rmdirSync(lockDir);
+    } catch (err) {
+      // 既に削除済み
+    }
+    return counter;
+  }
+  try {
+    const actual = measureLog(logFile);
+    if (actual.bytes < TOOL_EVENTS_MAX_SIZE_BYTES) {
+      // 別のプロセスがローテーション済み → カウンターを実際の値に合わせる
+      return actual;
+    }
+    rotateLog(logFile, env);
+    return { bytes: 0, lines: 0 };
+  } finally {
+    fs.rmdirSync(lockDir);
+  }
+}
+
+function appendToolEvent(stateDir, entry, env) {
+  const logFile = path.join(stateDir, 'tool-events.jsonl');
+  const countFile = path.join(stateDir, 'tool-events.count');
+  let counter = readLogCounter(countFile, logFile);
+  if (counter.bytes >= TOOL_EVENTS_MAX_SIZE_BYTES) {
+    counter = rotateIfFull(logFile, path.join(stateDir, 'tool-events.rotate.lock'), counter, env);
+  }
+  const line = JSON.stringify(entry) + '\n';
+  fs.appendFileSync(logFile, line);
+  fs.writeFileSync(countFile, `${counter.bytes + Buffer.byteLength(line)} ${counter.lines + 1}\n`);
+}
+
+function posttooluseLogToolname({ input, cwd, env }) {
+  const stateDir = path.join(cwd, STATE_DIR);
+  fs.mkdirSync(stateDir, { recursive: true });
+
+  if (!input) return PASS;
+  const data = parseInput(input);
+  const toolName = jqText(data.tool_name, '');
+  const sessionId = jqText(data.session_id, '');
+  if (!toolName) return PASS;
+
+  const session = readJsonCached(path.join(stateDir, 'session.json'));
+  const promptSeqValue = session === undefined ? 0 : dig(session, ['prompt_seq']);
+  const promptSeq = typeof promptSeqValue === 'number' ? promptSeqValue : Number(jqText(promptSeqValue, '0')) || 0;
+
+  // LSP 追跡（tool_name に lsp を含むツール）
+  if (/lsp/i.test(toolName)) {
+    const policyFile = path.join(stateDir, 'tooling-policy.json');
+    const policy = readJsonCached(policyFile);
+    if (isObject(policy)) {
+      const updated = JSON.parse(JSON.stringify(policy));
+      if (!isObject(updated.lsp)) updated.lsp = {};
+      updated.lsp.last_used_prompt_seq = promptSeq;
+      updated.lsp.last_used_tool_name = toolName;
+      updated.lsp.used_since_last_prompt = true;
+      writeJson(policyFile, updated);
+    }
+  }
+
+  // Phase0 ログ収集（CC_HARNESS_PHASE0_LOG=1 のときのみ）
+  if (env.CC_HARNESS_PHASE0_LOG === '1') {
+    appendToolEvent(stateDir, {
+      v: 1,
+      ts: utcTimestamp(),
+      session_id: sessionId,
+      prompt_seq: promptSeq,
+      hook_event_name: 'PostToolUse',
+      tool_name: toolName,
+      tool_input_bytes: Buffer.byteLength(jqText(data.tool_input, '')),
+      duration_ms: typeof data.duration_ms === 'number' && data.duration_ms >= 0 ? data.duration_ms : null,
+    }, env);
+  }
+
+  // Skill 追跡（セッション単位でスキル使用を記録）
+  if (toolName === 'Skill') {
+    const usedFile = path.join(stateDir, 'session-skills-used.json');
+    let used = readJsonCached(usedFile);
+    if (used === undefined) {
+      used = { used: [], session_start: utcTimestamp() };
+    }
+    if (isObject(used)) {
+      const updated = JSON.parse(JSON.stringify(used));
+      updated.used = [...(Array.isArray(updated.used) ? updated.used : []),
+        jqText(dig(data, ['tool_input', 'skill']), 'unknown')];
+      updated.last_used = utcTimestamp();
+      writeJson(usedFile, updated);
+    }
+  }
+
+  return PASS;
+}
+
+const HANDLERS = {
+  'pretooluse-guard': pretooluseGuard,
+  'posttooluse-log-toolname': posttooluseLogToolname,
+};
+
+module.exports = {
+  HANDLERS,
+  readJsonCached,
+  globToRegExpSource,
+};
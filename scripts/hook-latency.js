@@ -0,0 +1,328 @@
+#!/usr/bin/env node
+/**
+ * hook-latency.js
+ * フックのレイテンシ計測（リングバッファ）とソフトな時間予算
+ *
+ * run-script.js がフック 1 回ごとに wall time・子プロセスの CPU 時間・終了コードを
+ * .claude/state/hook-latency.ring に記録する。ファイルは固定長レコードのリングバッファで、
+ * 最新 RING_CAPACITY 件だけを保持する（サイズは一定）。
+ *
+ * 使用方法:
+ *   node hook-latency.js report          # フックごとの p50 / p95
+ *   node hook-latency.js report --json
+ *
+ * ファイル形式（リトルエンディアン）:
+ *   ヘッダー 16 バイト: "HKLT" | version u16 | レコード長 u16 | 容量 u32 | 書き込み総数 u32
+ *   レコード 64 バイト: 開始時刻 f64 (epoch ms) | wall f32 (ms) | CPU f32 (ms, 不明なら NaN) |
+ *                       終了コード i16 | フラグ u8 | 予約 u8 | フック名 44 バイト（UTF-8, NUL 埋め）
+ *   同時に書き込んだフックが同じスロットを使うと 1 件失われることがある（統計用なので許容）
+ *
+ * 時間予算（ソフト）:
+ *   wall time は node の起動を含むため、DEFAULT_BUDGETS は実測の p95 に余裕を持たせた値にしている
+ *   （Linux で pretooluse-guard ほか 1 ツール呼び出しごとのフックが p95 約 190ms、session-init が約 610ms）。
+ *   .claude/state/hook-budgets.json で上書きできる
+ *     {"default_ms": 2000, "hooks": {"session-init": {"budget_ms": 1500, "on_exceed": "fast-path"}}}
+ *   on_exceed:
+ *     warn       直近 WARN_STREAK 回続けて予算を超えたら stderr に警告（既定。1 回だけの遅延では警告しない）
+ *     fast-path  直近 FAST_PATH_STREAK 回続けて超えていたら、次回からは
+ *                CLAUDE_HARNESS_HOOK_FAST_PATH=1 でスクリプトを実行する
+ *                （対応するスクリプトは任意の処理を省略する。未対応なら何も変わらない。
+ *                  FAST_PATH_PROBE_INTERVAL 回ごとに通常パスで実行して回復を確かめる）
+ */
+
+const fs = require('fs');
+const path = require('path');
+
+const STATE_DIR = path.join('.claude', 'state');
+const RING_FILE_NAME = 'hook-latency.ring';
+const BUDGETS_FILE_NAME = 'hook-budgets.json';
+
+const MAGIC = 'HKLT';
+const FORMAT_VERSION = 1;
+const HEADER_BYTES = 16;
+const RECORD_BYTES = 64;
+const NAME_BYTES = 44;
+const RING_CAPACITY = 1024;
+
+const FLAG_DAEMON = 1;
+const FLAG_OVER_BUDGET = 2;
+const FLAG_FAST_PATH = 4;
+
+// hooks.json の timeout（10〜30 秒）とは別の、体感に効く目安
+const DEFAULT_BUDGET_MS = 2000;
+const DEFAULT_BUDGETS = {
+  'pretooluse-guard': 1000,
+  'posttooluse-log-toolname': 1000,
+  'userprompt-inject-policy': 1000,
+  'userprompt-track-command': 1000,
+  'session-init': 3000,
+};
+const WARN_STREAK = 3;
+const FAST_PATH_STREAK = 3;
+const FAST_PATH_PROBE_INTERVAL = 20;
+
+/**
+ * フック名（スクリプト名 + 第 1 引数。例: "subagent-tracker start"）
+ */
+function hookName(scriptName, scriptArgs = []) {
+  return scriptArgs.length > 0 ? `${scriptName} ${scriptArgs[0]}` : scriptName;
+}
+
+function ringPath(projectRoot = process.cwd()) {
+  return path.join(projectRoot, STATE_DIR, RING_FILE_NAME);
+}
+
+function writeHeader(fd, capacity, next) {
+  const header = Buffer.alloc(HEADER_BYTES);
+  header.write(MAGIC, 0, 'latin1');
+  header.writeUInt16LE(FORMAT_VERSION, 4);
+  header.writeUInt16LE(RECORD_BYTES, 6);
+  header.writeUInt32LE(capacity, 8);
+  header.writeUInt32LE(next, 12);
+  fs.writeSync(fd, header, 0, HEADER_BYTES, 0);
+}
+
+function parseHeader(buffer) {
+  if (buffer.length < HEADER_BYTES || buffer.toString('latin1', 0, 4) !== MAGIC) return null;
+  if (buffer.readUInt16LE(4) !== FORMAT_VERSION || buffer.readUInt16LE(6) !== RECORD_BYTES) return null;
+  const capacity = buffer.readUInt32LE(8);
+  if (capacity === 0) return null;
+  return { capacity, next: buffer.readUInt32LE(12) };
+}
+
+function encodeSample(sample) {
+  const record = Buffer.alloc(RECORD_BYTES);
+  record.writeDoubleLE(sample.ts, 0);
+  record.writeFloatLE(sample.wallMs, 8);
+  record.writeFloatLE(typeof sample.cpuMs === 'number' ? sample.cpuMs : NaN, 12);
+  record.writeInt16LE(Math.max(-32768, Math.min(32767, sample.exitCode | 0)), 16);
+  record.writeUInt8(sample.flags || 0, 18);
+  // 途中で UTF-8 の文字が切れないよう、収まる文字までを書く
+  let name = sample.hook;
+  while (Buffer.byteLength(name) > NAME_BYTES) name = name.slice(0, -1);
+  record.write(name, 20, NAME_BYTES, 'utf8');
+  return record;
+}
+
+function decodeSample(buffer, offset) {
+  const ts = buffer.readDoubleLE(offset);
+  const nameEnd = buffer.indexOf(0, offset + 20);
+  const end = nameEnd === -1 || nameEnd > offset + RECORD_BYTES ? offset + RECORD_BYTES : nameEnd;
+  const hook = buffer.toString('utf8', offset + 20, end);
+  if (!hook || !(ts > 0)) return null;
+  const cpuMs = buffer.readFloatLE(offset + 12);
+  const flags = buffer.readUInt8(offset + 18);
+  return {
+    ts,
+    hook,
+    wallMs: buffer.readFloatLE(offset + 8),
+    cpuMs: Number.isNaN(cpuMs) ? null : cpuMs,
+    exitCode: buffer.readInt16LE(offset + 16),
+    daemon: (flags & FLAG_DAEMON) !== 0,
+    overBudget: (flags & FLAG_OVER_BUDGET) !== 0,
+    fastPath: (flags & FLAG_FAST_PATH) !== 0,
+  };
+}
+
+/**
+ * サンプルを 1 件記録（.claude/state がなければ何もしない）
+ */
+function recordSample(sample, projectRoot = process.cwd()) {
+  const file = ringPath(projectRoot);
+  if (!fs.existsSync(path.dirname(file))) return;
+
+  let fd;
+  try {
+    fd = fs.openSync(file, 'r+');
+  } catch (e) {
+    if (e.code !== 'ENOENT') throw e;
+    try {
+      fd = fs.openSync(file, 'wx+');
+      writeHeader(fd, RING_CAPACITY, 0);
+    } catch (err) {
+      // 別のプロセスが同時に作成した → 今回は記録しない
+      if (fd !== undefined) fs.closeSync(fd);
+      return;
+    }
+  }
+
+  try {
+    const buffer = Buffer.alloc(HEADER_BYTES);
+    fs.readSync(fd, buffer, 0, HEADER_BYTES, 0);
+    let header = parseHeader(buffer);
+    if (!header) {
+      // 壊れている・形式が違う → 作り直す
+      fs.ftruncateSync(fd, 0);
+      writeHeader(fd, RING_CAPACITY, 0);
+      header = { capacity: RING_CAPACITY, next: 0 };
+    }
+    const slot = header.next % header.capacity;
+    fs.writeSync(fd, encodeSample(sample), 0, RECORD_BYTES, HEADER_BYTES + slot * RECORD_BYTES);
+    const next = Buffer.alloc(4);
+    next.writeUInt32LE((header.next + 1) >>> 0);
+    fs.writeSync(fd, next, 0, 4, 12);
+  } finally {
+    fs.closeSync(fd);
+  }
+}
+
+/**
+ * リングバッファのサンプルを古い順に返す（ファイルがなければ空配列）
+ */
+function readSamples(projectRoot = process.cwd()) {
+  let buffer;
+  try {
+    buffer = fs.readFileSync(ringPath(projectRoot));
+  } catch (e) {
+    return [];
+  }
+  const header = parseHeader(buffer);
+  if (!header) return [];
+  const count = Math.min(header.next, header.capacity);
+  const samples = [];
+  for (let i = header.next - count; i < header.next; i++) {
+    const offset = HEADER_BYTES + (i % header.capacity) * RECORD_BYTES;
+    if (offset + RECORD_BYTES > buffer.length) continue;
+    const sample = decodeSample(buffer, offset);
+    if (sample) samples.push(sample);
+  }
+  return samples;
+}
+
+/**
+ * フックの時間予算（.claude/state/hook-budgets.json があれば上書き）
+ */
+function loadBudget(hook, projectRoot = process.cwd()) {
+  const scriptName = hook.split(' ')[0];
+  const budget = {
+    budgetMs: DEFAULT_BUDGETS[hook] || DEFAULT_BUDGETS[scriptName] || DEFAULT_BUDGET_MS,
+    onExceed: 'warn',
+  };
+  let config;
+  try {
+    config = JSON.parse(fs.readFileSync(path.join(projectRoot, STATE_DIR, BUDGETS_FILE_NAME), 'utf8'));
+  } catch (e) {
+    return budget;
+  }
+  if (!config || typeof config !== 'object') return budget;
+
+  if (typeof config.default_ms === 'number' && !(hook in DEFAULT_BUDGETS) && !(scriptName in DEFAULT_BUDGETS)) {
+    budget.budgetMs = config.default_ms;
+  }
+  const hooks = config.hooks || {};
+  const entry = hooks[hook] !== undefined ? hooks[hook] : hooks[scriptName];
+  if (typeof entry === 'number') {
+    budget.budgetMs = entry;
+  } else if (entry && typeof entry === 'object') {
+    if (typeof entry.budget_ms === 'number') budget.budgetMs = entry.budget_ms;
+    if (entry.on_exceed === 'warn' || entry.on_exceed === 'fast-path') budget.onExceed = entry.on_exceed;
+  }
+  return budget;
+}
+
+/**
+ * 直近 WARN_STREAK 回（今回の記録を含む）が続けて予算を超えていれば true
+ */
+function isRepeatedlyOverBudget(hook, projectRoot = process.cwd()) {
+  const recent = readSamples(projectRoot).filter((s) => s.hook === hook).slice(-WARN_STREAK);
+  return recent.length === WARN_STREAK && recent.every((s) => s.overBudget);
+}
+
+/**
+ * 通常パスの直近 FAST_PATH_STREAK 回が続けて予算を超えていれば true
+ * 高速パスが FAST_PATH_PROBE_INTERVAL 回続いたら、回復したかを見るため 1 回は通常パスで実行する
+ */
+function shouldUseFastPath(hook, budget, projectRoot = process.cwd()) {
+  if (budget.onExceed !== 'fast-path') return false;
+  const samples = readSamples(projectRoot).filter((s) => s.hook === hook);
+
+  let fastRun = 0;
+  for (let i = samples.length - 1; i >= 0 && samples[i].fastPath; i--) fastRun++;
+  if (fastRun >= FAST_PATH_PROBE_INTERVAL) return false;
+
+  const normal = samples.filter((s) => !s.fastPath).slice(-FAST_PATH_STREAK);
+  return normal.length === FAST_PATH_STREAK && normal.every((s) => s.overBudget);
+}
+
+/**
+ * 昇順に並べた配列の p パーセンタイル（nearest-rank）
+ */
+function percentile(sorted, p) {
+  if (sorted.length === 0) return null;
+  const rank = Math.ceil((p / 100) * sorted.length);
+  return sorted[Math.min(sorted.length, Math.max(1, rank)) - 1];
+}
+
+function round(value) {
+  return value === null ? null : Math.round(value * 10) / 10;
+}
+
+/**
+ * フックごとの集計（件数・p50 / p95・CPU・予算超過・失敗）
+ */
+function summarize(samples) {
+  const byHook = new Map();
+  for (const sample of samples) {
+    if (!byHook.has(sample.hook)) byHook.set(sample.hook, []);
+    byHook.get(sample.hook).push(sample);
+  }
+  const summary = {};
+  for (const [hook, list] of [...byHook.entries()].sort((a, b) => a[0].localeCompare(b[0]))) {
+    const wall = list.map((s) => s.wallMs).sort((a, b) => a - b);
+    const cpu = list.filter((s) => s.cpuMs !== null).map((s) => s.cpuMs).sort((a, b) => a - b);
+    summary[hook] = {
+      count: list.length,
+      p50_ms: round(percentile(wall, 50)),
+      p95_ms: round(percentile(wall, 95)),
+      max_ms: round(wall[wall.length - 1]),
+      cpu_p50_ms: round(percentile(cpu, 50)),
+      over_budget: list.filter((s) => s.overBudget).length,
+      fast_path: list.filter((s) => s.fastPath).length,
+      errors: list.filter((s) => s.exitCode !== 0).length,
+      last_ts: new Date(list[list.length - 1].ts).toISOString(),
+    };
+  }
+  return summary;
+}
+
+function main() {
+  const args = process.argv.slice(2);
+  if (args[0] !== 'report') {
+    console.error('Usage: node hook-latency.js report [--json]');
+    process.exit(1);
+  }
+  const summary = summarize(readSamples());
+  if (args.includes('--json')) {
+    console.log(JSON.stringify(summary, null, 2));
+    return;
+  }
+  const hooks = Object.keys(summary);
+  if (hooks.length === 0) {
+    console.log('[hook-latency] まだ記録がありません');
+    return;
+  }
+  const width = Math.max(...hooks.map((h) => h.length), 4);
+  console.log(`${'hook'.padEnd(width)}  ${'count'.padStart(5)}  ${'p50'.padStart(8)}  ${'p95'.padStart(8)}  ${'budget'.padStart(8)}  over`);
+  for (const hook of hooks) {
+    const s = summary[hook];
+    const budget = loadBudget(hook).budgetMs;
+    console.log(`${hook.padEnd(width)}  ${String(s.count).padStart(5)}  ${`${s.p50_ms}ms`.padStart(8)}  ${`${s.p95_ms}ms`.padStart(8)}  ${`${budget}ms`.padStart(8)}  ${s.over_budget}`);
+  }
+}
+
+if (require.main === module) {
+  main();
+}
+
+module.exports = {
+  FLAG_DAEMON,
+  FLAG_OVER_BUDGET,
+  FLAG_FAST_PATH,
+  hookName,
+  recordSample,
+  readSamples,
+  loadBudget,
+  isRepeatedlyOverBudget,
+  shouldUseFastPath,
+  summarize,
+};
@@ -7,6 +7,7 @@
 # Input: stdin JSON (Claude Code hooks)
 # Output:
 #   - .claude/state/tool-events.jsonl にJSONL追記 (Phase0ログ有効時のみ)
+#     256KB でローテーション（.1〜.5、CC_HARNESS_TOOL_EVENTS_GZIP=1 なら .N.gz）
 #   - .claude/state/tooling-policy.json 更新 (LSP関連ツール検出時、常に)
 #
 # 制御: CC_HARNESS_PHASE0_LOG=1 がある時のみログ収集を実行
@@ -15,98 +16,115 @@
 
 set +e
 
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+# shellcheck source=./hook-fields.sh
+source "$SCRIPT_DIR/hook-fields.sh"
+
 # ===== 定数 =====
 STATE_DIR=".claude/state"
 LOG_FILE="${STATE_DIR}/tool-events.jsonl"
-LOCK_FILE="${STATE_DIR}/tool-events.lock"
-SESSION_FILE="${STATE_DIR}/session.json"
+# ログのバイト数・行数（"<bytes> <lines>"）。毎回 stat / wc -l しないためのサイドカー
+COUNT_FILE="${STATE_DIR}/tool-events.count"
+ROTATE_LOCK="${STATE_DIR}/tool-events.rotate.lock"
 MAX_SIZE_BYTES=262144  # 256KB
-MAX_LINES=2000
 MAX_GENERATIONS=5
 
 # ===== ユーティリティ =====
 
-# ロックを取得（flock優先、なければmkdirロック）
-acquire_lock() {
-  local lockfile="$1"
-  local timeout=5
-  local waited=0
-
-  # flock が使えるなら flock を使う
-  if command -v flock >/dev/null 2>&1; then
-    exec 200>"$lockfile"
-    flock -w "$timeout" 200 || return 1
-    return 0
+# 現在時刻（UTC ISO8601）を変数に設定（bash 4.2 以降は date を起動しない）
+utc_now() {
+  if [ "${BASH_VERSINFO[0]}" -gt 4 ] || { [ "${BASH_VERSINFO[0]}" -eq 4 ] && [ "${BASH_VERSINFO[1]}" -ge 2 ]; }; then
+    TZ=UTC printf -v "$1" '%(%Y-%m-%dT%H:%M:%SZ)T' -1
+  else
+    printf -v "$1" '%s' "$(date -u +%Y-%m-%dT%H:%M:%SZ 2>/dev/null)"
   fi
-
-  # flock が無いなら mkdir ロック（原子的）
-  while ! mkdir "$lockfile" 2>/dev/null; do
-    sleep 0.1
-    waited=$((waited + 1))
-    if [ "$waited" -ge $((timeout * 10)) ]; then
-      return 1
-    fi
-  done
-  return 0
 }
 
-# ロックを解放
-release_lock() {
-  local lockfile="$1"
-
-  if command -v flock >/dev/null 2>&1; then
-    exec 200>&-
-  else
-    rmdir "$lockfile" 2>/dev/null || true
-  fi
+# 文字列のバイト数を変数に設定
+byte_length() {
+  local LC_ALL=C
+  printf -v "$1" '%s' "${#2}"
 }
 
-# ローテーション実行
+# ローテーション実行（.1 → .2 → ... → .MAX_GENERATIONS、gzip 済みの世代も同様）
 rotate_log() {
   local logfile="$1"
+  local i ext
 
-  # 最古を削除
-  [ -f "${logfile}.${MAX_GENERATIONS}" ] && rm -f "${logfile}.${MAX_GENERATIONS}"
+  for ext in "" ".gz"; do
+    # 最古を削除
+    rm -f "${logfile}.${MAX_GENERATIONS}${ext}"
 
-  # 順にリネーム（.4 → .5, .3 → .4, ...）
-  for i in $(seq $((MAX_GENERATIONS - 1)) -1 1); do
-    [ -f "${logfile}.${i}" ] && mv "${logfile}.${i}" "${logfile}.$((i + 1))"
+    # 順にリネーム（.4 → .5, .3 → .4, ...）
+    for ((i = MAX_GENERATIONS - 1; i >= 1; i--)); do
+      [ -f "${logfile}.${i}${ext}" ] && mv "${logfile}.${i}${ext}" "${logfile}.$((i + 1))${ext}"
+    done
   done
 
-  # 現行を .1 へ
+  # 現行を .1 へ（CC_HARNESS_TOOL_EVENTS_GZIP=1 なら圧縮して .1.gz）
   [ -f "$logfile" ] && mv "$logfile" "${logfile}.1"
-
-  # 新しいログファイルを作成
-  touch "$logfile"
+  if [ "${CC_HARNESS_TOOL_EVENTS_GZIP:-0}" = "1" ] && [ -f "${logfile}.1" ] && command -v gzip >/dev/null 2>&1; then
+    gzip -f "${logfile}.1"
+  fi
 }
 
-# ローテーションが必要かチェック
-needs_rotation() {
-  local logfile="$1"
-
-  [ ! -f "$logfile" ] && return 1
+# サイドカーのカウンターが上限を超えたときだけ呼ぶ
+# 実際のサイズを確かめてからローテーションし、LOG_BYTES / LOG_LINES を更新する
+rotate_if_full() {
+  if ! mkdir "$ROTATE_LOCK" 2>/dev/null; then
+    # 他のプロセスがローテーション中。1 分以上残っているロックは削除して次回に任せる
+    if [ -n "$(find "$ROTATE_LOCK" -maxdepth 0 -mmin +1 2>/dev/null)" ]; then
+      rmdir "$ROTATE_LOCK" 2>/dev/null
+    fi
+    return 0
+  fi
 
-  # サイズチェック
   local size
-  if command -v stat >/dev/null 2>&1; then
-    # macOS/BSD
-    size=$(stat -f%z "$logfile" 2>/dev/null || stat -c%s "$logfile" 2>/dev/null || echo 0)
+  size=$(wc -c < "$LOG_FILE" 2>/dev/null || echo 0)
+  if [ "${size// /}" -ge "$MAX_SIZE_BYTES" ]; then
+    rotate_log "$LOG_FILE"
+    LOG_BYTES=0
+    LOG_LINES=0
   else
-    size=$(wc -c < "$logfile" 2>/dev/null || echo 0)
+    # 別のプロセスがローテーション済み → カウンターを実際の値に合わせる
+    LOG_BYTES=${size// /}
+    LOG_LINES=$(wc -l < "$LOG_FILE" 2>/dev/null || echo 0)
+    LOG_LINES=${LOG_LINES// /}
   fi
 
-  if [ "$size" -ge "$MAX_SIZE_BYTES" ]; then
-    return 0
+  rmdir "$ROTATE_LOCK" 2>/dev/null
+  return 0
+}
+
+# ログに 1 行追記し、サイドカーのカウンターを進める
+# カウンターは目安（同時に書き込むと取りこぼすことがある）で、ローテーション時に実測して補正する
+append_tool_event() {
+  local entry="$1"
+  local entry_bytes
+  byte_length entry_bytes "$entry"
+
+  LOG_BYTES=""
+  LOG_LINES=""
+  [ -f "$COUNT_FILE" ] && read -r LOG_BYTES LOG_LINES < "$COUNT_FILE"
+  if ! [[ "$LOG_BYTES" =~ ^[0-9]+$ && "$LOG_LINES" =~ ^[0-9]+$ ]]; then
+    # カウンターがない・壊れている → 今のログから作り直す
+    LOG_BYTES=0
+    LOG_LINES=0
+    if [ -f "$LOG_FILE" ]; then
+      LOG_BYTES=$(wc -c < "$LOG_FILE" 2>/dev/null || echo 0)
+      LOG_LINES=$(wc -l < "$LOG_FILE" 2>/dev/null || echo 0)
+      LOG_BYTES=${LOG_BYTES// /}
+      LOG_LINES=${LOG_LINES// /}
+    fi
   fi
 
-  # 行数チェック
-  local lines
-  lines=$(wc -l < "$logfile" 2>/dev/null || echo 0)
-  if [ "$lines" -ge "$MAX_LINES" ]; then
-    return 0
+  if [ "$LOG_BYTES" -ge "$MAX_SIZE_BYTES" ]; then
+    rotate_if_full
   fi
 
-  return 1
+  # 1 行は 1 回の write（O_APPEND）で書かれるので、ロックなしでも行は混ざらない
+  printf '%s\n' "$entry" >> "$LOG_FILE"
+  printf '%s %s\n' "$((LOG_BYTES + entry_bytes + 1))" "$((LOG_LINES + 1))" > "$COUNT_FILE"
 }
 
 # ===== メイン処理 =====
@@ -124,44 +142,28 @@ if [ -z "$INPUT" ]; then
   exit 0
 fi
 
-# JSON から必要なフィールドを抽出（jq優先、なければpython3）
+# フック入力と session.json の prompt_seq を 1 回のパースで抽出
 TOOL_NAME=""
 SESSION_ID=""
+SKILL_NAME="unknown"
+TOOL_INPUT=""
+DURATION_MS=""
+PROMPT_SEQ=0
 
-if command -v jq >/dev/null 2>&1; then
-  TOOL_NAME="$(echo "$INPUT" | jq -r '.tool_name // empty' 2>/dev/null)"
-  SESSION_ID="$(echo "$INPUT" | jq -r '.session_id // empty' 2>/dev/null)"
-elif command -v python3 >/dev/null 2>&1; then
-  eval "$(echo "$INPUT" | python3 - <<'PY' 2>/dev/null
-import json, shlex, sys
-try:
-    data = json.load(sys.stdin)
-except Exception:
-    data = {}
-tool_name = data.get("tool_name") or ""
-session_id = data.get("session_id") or ""
-print(f"TOOL_NAME={shlex.quote(tool_name)}")
-print(f"SESSION_ID={shlex.quote(session_id)}")
-PY
-)"
-fi
+eval "$(printf '%s' "$INPUT" | hook_fields \
+  TOOL_NAME=.tool_name \
+  SESSION_ID=.session_id \
+  SKILL_NAME=.tool_input.skill//unknown \
+  TOOL_INPUT=.tool_input \
+  DURATION_MS=.duration_ms \
+  PROMPT_SEQ=@session.prompt_seq//0)"
 
 # tool_name が無ければスキップ
 [ -z "$TOOL_NAME" ] && exit 0
 
-# prompt_seq を session.json から取得
-PROMPT_SEQ=0
-if [ -f "$SESSION_FILE" ]; then
-  if command -v jq >/dev/null 2>&1; then
-    PROMPT_SEQ="$(jq -r '.prompt_seq // 0' "$SESSION_FILE" 2>/dev/null)"
-  elif command -v python3 >/dev/null 2>&1; then
-    PROMPT_SEQ="$(python3 -c "import json; print(json.load(open('$SESSION_FILE')).get('prompt_seq', 0))" 2>/dev/null || echo 0)"
-  fi
-fi
-
 # ===== LSP追跡（常に実行、matcher依存を回避） =====
 # LSP関連ツールを検出（tool_nameに "lsp" または "LSP" が含まれる場合）
-if echo "$TOOL_NAME" | grep -iq "lsp"; then
+if [[ "$TOOL_NAME" == *[lL][sS][pP]* ]]; then
   TOOLING_POLICY_FILE="${STATE_DIR}/tooling-policy.json"
   if [ -f "$TOOLING_POLICY_FILE" ]; then
     temp_file=$(mktemp)
@@ -189,31 +191,14 @@ fi
 
 # ===== Phase0ログ収集（CC_HARNESS_PHASE0_LOG=1 の時のみ） =====
 if [ "${CC_HARNESS_PHASE0_LOG:-0}" = "1" ]; then
-  # タイムスタンプ（UTC ISO8601）
-  TIMESTAMP=$(date -u +%Y-%m-%dT%H:%M:%SZ 2>/dev/null || echo "")
-
-  # JSONL エントリ作成（最小フィールドのみ）
-  JSONL_ENTRY=$(cat <<EOF
-{"v":1,"ts":"$TIMESTAMP","session_id":"$SESSION_ID","prompt_seq":$PROMPT_SEQ,"hook_event_name":"PostToolUse","tool_name":"$TOOL_NAME"}
-EOF
-  )
-
-  # ロック取得
-  if ! acquire_lock "$LOCK_FILE"; then
-    # ロックが取れなければスキップ（失敗しても問題ない）
-    exit 0
-  fi
+  utc_now TIMESTAMP
 
-  # ローテーションチェック
-  if needs_rotation "$LOG_FILE"; then
-    rotate_log "$LOG_FILE"
-  fi
+  # ツール入力のサイズ（バイト）と所要時間（フック入力にあれば）
+  byte_length TOOL_INPUT_BYTES "$TOOL_INPUT"
+  [[ "$DURATION_MS" =~ ^[0-9]+(\.[0-9]+)?$ ]] || DURATION_MS=null
 
-  # ログ追記（原子的でないが、ロックで保護されている）
-  echo "$JSONL_ENTRY" >> "$LOG_FILE"
-
-  # ロック解放
-  release_lock "$LOCK_FILE"
+  # JSONL エントリ作成
+  append_tool_event "{\"v\":1,\"ts\":\"$TIMESTAMP\",\"session_id\":\"$SESSION_ID\",\"prompt_seq\":$PROMPT_SEQ,\"hook_event_name\":\"PostToolUse\",\"tool_name\":\"$TOOL_NAME\",\"tool_input_bytes\":$TOOL_INPUT_BYTES,\"duration_ms\":$DURATION_MS}"
 fi
 
 
@@ -229,13 +214,7 @@ if [ "$TOOL_NAME" = "Skill" ]; then
   fi
   
   if command -v jq >/dev/null 2>&1; then
-    # スキル名を tool_input から取得
-    SKILL_NAME=""
-    if [ -n "$INPUT" ]; then
-      SKILL_NAME=$(echo "$INPUT" | jq -r '.tool_input.skill // "unknown"' 2>/dev/null)
-    fi
-    
-    # used 配列に追加
+    # used 配列に追加（スキル名は冒頭で抽出済み）
     temp_file=$(mktemp)
     jq --arg skill "$SKILL_NAME" \
        --arg ts "$(date -u +%Y-%m-%dT%H:%M:%SZ)" \
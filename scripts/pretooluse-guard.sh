@@ -39,6 +39,11 @@ else
   }
 fi
 
+# shellcheck source=./hook-fields.sh
+source "$SCRIPT_DIR/hook-fields.sh"
+# shellcheck source=./usage-events.sh
+source "$SCRIPT_DIR/usage-events.sh"
+
 detect_lang() {
   # Default to Japanese for this harness (can be overridden).
   # - CLAUDE_CODE_HARNESS_LANG=en で英語
@@ -96,30 +101,12 @@ FILE_PATH=""
 COMMAND=""
 CWD=""
 
-if command -v jq >/dev/null 2>&1; then
-  TOOL_NAME="$(echo "$INPUT" | jq -r '.tool_name // empty' 2>/dev/null)"
-  FILE_PATH="$(echo "$INPUT" | jq -r '.tool_input.file_path // empty' 2>/dev/null)"
-  COMMAND="$(echo "$INPUT" | jq -r '.tool_input.command // empty' 2>/dev/null)"
-  CWD="$(echo "$INPUT" | jq -r '.cwd // empty' 2>/dev/null)"
-elif command -v python3 >/dev/null 2>&1; then
-  eval "$(echo "$INPUT" | python3 - <<'PY' 2>/dev/null
-import json, shlex, sys
-try:
-    data = json.load(sys.stdin)
-except Exception:
-    data = {}
-tool_name = data.get("tool_name") or ""
-cwd = data.get("cwd") or ""
-tool_input = data.get("tool_input") or {}
-file_path = tool_input.get("file_path") or ""
-command = tool_input.get("command") or ""
-print(f"TOOL_NAME={shlex.quote(tool_name)}")
-print(f"CWD={shlex.quote(cwd)}")
-print(f"FILE_PATH={shlex.quote(file_path)}")
-print(f"COMMAND={shlex.quote(command)}")
-PY
-)"
-fi
+# フック入力を 1 回だけパースして必要なフィールドを取り出す
+eval "$(printf '%s' "$INPUT" | hook_fields \
+  TOOL_NAME=.tool_name \
+  FILE_PATH=.tool_input.file_path \
+  COMMAND=.tool_input.command \
+  CWD=.cwd)"
 
 [ -z "$TOOL_NAME" ] && exit 0
 
@@ -162,11 +149,8 @@ PY
 }
 
 emit_deny() {
-  # Record hook blocking event (non-blocking, fire-and-forget)
-  local SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
-  if [ -x "$SCRIPT_DIR/record-usage.js" ] && command -v node >/dev/null 2>&1; then
-    node "$SCRIPT_DIR/record-usage.js" hook pretooluse-guard --blocked 2>/dev/null &
-  fi
+  # Record hook blocking event (a single appended line, no node process)
+  record_usage_event hook pretooluse-guard --blocked
   emit_decision "deny" "$1"
 }
 emit_ask() { emit_decision "ask" "$1"; }
@@ -187,27 +171,17 @@ IMPL_QUALITY_GUIDELINE="【実装品質ガイドライン】
 # ファイルパスに応じたガイドラインを返す
 # 引数: $1 = ファイルパス（相対または絶対）
 # 戻り値: ガイドライン文字列（該当なしの場合は空）
+# 前提: load_path_rules 済み
 get_guideline_for_path() {
   local path="$1"
 
-  # テストファイルパターン
-  case "$path" in
-    tests/*|test/*|__tests__/*|*.spec.ts|*.spec.tsx|*.spec.js|*.spec.jsx|*.test.ts|*.test.tsx|*.test.js|*.test.jsx)
-      echo "$TEST_QUALITY_GUIDELINE"
-      return 0
-      ;;
-  esac
-
-  # 実装ファイルパターン
-  case "$path" in
-    src/*.ts|src/*.tsx|src/*.js|src/*.jsx|lib/*.ts|lib/*.tsx|lib/*.js|lib/*.jsx)
-      echo "$IMPL_QUALITY_GUIDELINE"
-      return 0
-      ;;
-  esac
-
-  # 該当なし
-  echo ""
+  if [[ "$path" =~ $TEST_PATH_RE ]]; then
+    echo "$TEST_QUALITY_GUIDELINE"
+  elif [[ "$path" =~ $IMPL_PATH_RE ]]; then
+    echo "$IMPL_QUALITY_GUIDELINE"
+  else
+    echo ""
+  fi
 }
 
 # additionalContext 付きで approve を出力
@@ -228,17 +202,159 @@ is_path_traversal() {
   return 1
 }
 
-is_protected_path() {
-  local p="$1"
-  case "$p" in
-    .git/*|*/.git/*) return 0 ;;
-    .env|.env.*|*/.env|*/.env.*) return 0 ;;
-    secrets/*|*/secrets/*) return 0 ;;
-    *.pem|*.key|*id_rsa*|*id_ed25519*|*/.ssh/*) return 0 ;;
-  esac
-  return 1
+# ===== パスルール =====
+# case 文のパターン（glob）で書いたルールを、起動時に 1 つずつ評価するのではなく
+# パス種別ごとに 1 つの正規表現へコンパイルする。
+# 保護パス・ガイドラインの正規表現はスクリプト内の glob から毎回作る（ファイルから読まない）。
+# skills-policy.json を含む Skills Gate の除外だけを .claude/state/ にスナップショットとして保存し、
+# skills-policy.json・このスクリプトより新しく、内容が妥当な間は再利用する。
+
+PROTECTED_PATH_GLOBS=(
+  '.git/*' '*/.git/*'
+  '.env' '.env.*' '*/.env' '*/.env.*'
+  'secrets/*' '*/secrets/*'
+  '*.pem' '*.key' '*id_rsa*' '*id_ed25519*' '*/.ssh/*'
+  '.claude/state/path-rules.cache' '*/.claude/state/path-rules.cache'
+)
+TEST_PATH_GLOBS=(
+  'tests/*' 'test/*' '__tests__/*'
+  '*.spec.ts' '*.spec.tsx' '*.spec.js' '*.spec.jsx'
+  '*.test.ts' '*.test.tsx' '*.test.js' '*.test.jsx'
+)
+IMPL_PATH_GLOBS=(
+  'src/*.ts' 'src/*.tsx' 'src/*.js' 'src/*.jsx'
+  'lib/*.ts' 'lib/*.tsx' 'lib/*.js' 'lib/*.jsx'
+)
+# Skills Gate のデフォルト除外（ドキュメント・設定ファイル、.claude/ と docs/ 等の配下）
+DEFAULT_EXCLUDED_GLOBS=(
+  '*.md' '*.txt' '*.json'
+  '.claude/*'
+  'docs/*' 'templates/*' 'benchmarks/*'
+)
+
+PATH_RULES_VERSION="pretooluse-guard path rules v2"
+PATH_RULES_FILE=".claude/state/path-rules.cache"
+SKILLS_POLICY_FILE=".claude/state/skills-policy.json"
+
+# glob（case 文のパターン）を ERE に変換して GLOB_ERE に設定
+glob_to_ere() {
+  local glob="$1"
+  local c pre cls
+  local i=0
+  GLOB_ERE=""
+  while [ "$i" -lt "${#glob}" ]; do
+    c="${glob:i:1}"
+    case "$c" in
+      '*') GLOB_ERE+='.*' ;;
+      '?') GLOB_ERE+='.' ;;
+      '[')
+        pre="${glob:i+2}"
+        pre="${pre%%]*}"
+        if [ "$pre" != "${glob:i+2}" ]; then
+          cls="${glob:i+1:${#pre}+1}"
+          [[ "$cls" == '!'* ]] && cls="^${cls:1}"
+          GLOB_ERE+="[$cls]"
+          i=$((i + ${#pre} + 2))
+        else
+          GLOB_ERE+='\['
+        fi
+        ;;
+      '.'|'^'|'$'|'+'|'('|')'|'{'|'}'|'|'|'\') GLOB_ERE+="\\$c" ;;
+      *) GLOB_ERE+="$c" ;;
+    esac
+    i=$((i + 1))
+  done
+}
+
+# glob の一覧を完全一致の正規表現 1 つにまとめて GLOB_ERE に設定
+globs_to_ere() {
+  local alternatives="" glob
+  for glob in "$@"; do
+    glob_to_ere "$glob"
+    alternatives+="${alternatives:+|}$GLOB_ERE"
+  done
+  GLOB_ERE="^($alternatives)\$"
+}
+
+# スクリプト内の glob だけから作るパスルール（ポリシーに依存しない）
+compile_fixed_path_rules() {
+  globs_to_ere "${PROTECTED_PATH_GLOBS[@]}"
+  PROTECTED_PATH_RE="$GLOB_ERE"
+  globs_to_ere "${TEST_PATH_GLOBS[@]}"
+  TEST_PATH_RE="$GLOB_ERE"
+  globs_to_ere "${IMPL_PATH_GLOBS[@]}"
+  IMPL_PATH_RE="$GLOB_ERE"
+  # Skills Gate の除外はデフォルトの除外から始まる
+  globs_to_ere "${DEFAULT_EXCLUDED_GLOBS[@]}"
+  DEFAULT_EXCLUDED_PREFIX="${GLOB_ERE%)\$}"
+}
+
+# skills-policy.json を含めて Skills Gate の除外をコンパイルし、スナップショットに保存
+# 前提: compile_fixed_path_rules 済み
+compile_skills_exclusions() {
+  local policy_state="$1"
+  local exclude_paths="" exclude_exts=""
+  if [ "$policy_state" = "policy" ]; then
+    eval "$(hook_fields </dev/null \
+      exclude_paths=@skills-policy.skills_gate.exclude_paths \
+      exclude_exts=@skills-policy.skills_gate.exclude_extensions)"
+  fi
+
+  local excluded="$DEFAULT_EXCLUDED_PREFIX"
+  local line
+  while IFS= read -r line; do
+    [ -z "$line" ] && continue
+    # case "$path" in $pattern*) と同じく前方一致（"*.sh" なら ".sh" を含むパスすべて）
+    glob_to_ere "$line"
+    excluded+="|$GLOB_ERE.*"
+  done <<< "$exclude_paths"
+  while IFS= read -r line; do
+    # ".${path##*.}" = ext と同じく、最後の "." 以降（"." がなければパス全体）と一致
+    [[ "$line" =~ ^\.[^./*?[]+$ ]] || continue
+    glob_to_ere "${line:1}"
+    excluded+="|(.*\\.)?$GLOB_ERE"
+  done <<< "$exclude_exts"
+  SKILLS_EXCLUDED_RE="$excluded)\$"
+
+  [ -d "${PATH_RULES_FILE%/*}" ] || return 0
+  local tmp="$PATH_RULES_FILE.$$"
+  if printf '%s %s\n%s\n' "$PATH_RULES_VERSION" "$policy_state" "$SKILLS_EXCLUDED_RE" > "$tmp" 2>/dev/null; then
+    mv -f "$tmp" "$PATH_RULES_FILE" 2>/dev/null || rm -f "$tmp"
+  fi
+  return 0
+}
+
+# パスルールを読み込む（除外のスナップショットが新しければファイル読み込みのみ、プロセス起動なし）
+load_path_rules() {
+  compile_fixed_path_rules
+
+  local policy_state="nopolicy"
+  [ -f "$SKILLS_POLICY_FILE" ] && policy_state="policy"
+
+  if [ -f "$PATH_RULES_FILE" ] && [ "$PATH_RULES_FILE" -nt "${BASH_SOURCE[0]}" ] \
+     && { [ "$policy_state" = "nopolicy" ] || [ "$PATH_RULES_FILE" -nt "$SKILLS_POLICY_FILE" ]; }; then
+    local header="" cached=""
+    {
+      IFS= read -r header
+      IFS= read -r cached
+    } < "$PATH_RULES_FILE"
+    # デフォルトの除外から始まり、正規表現として正しいものだけを使う
+    if [ "$header" = "$PATH_RULES_VERSION $policy_state" ] \
+       && [[ "$cached" == "$DEFAULT_EXCLUDED_PREFIX"*')$' ]]; then
+      local rc=0
+      [[ "" =~ $cached ]] || rc=$?
+      if [ "$rc" -ne 2 ]; then
+        SKILLS_EXCLUDED_RE="$cached"
+        return 0
+      fi
+    fi
+  fi
+  compile_skills_exclusions "$policy_state"
 }
 
+is_protected_path() {
+  [[ "$1" =~ $PROTECTED_PATH_RE ]]
+}
 
 if [ "$TOOL_NAME" = "Write" ] || [ "$TOOL_NAME" = "Edit" ]; then
   [ -z "$FILE_PATH" ] && exit 0
@@ -265,141 +381,74 @@ if [ "$TOOL_NAME" = "Write" ] || [ "$TOOL_NAME" = "Edit" ]; then
   REL_PATH="$NORM_FILE_PATH"
   if [ -n "$NORM_CWD" ] && is_path_under "$NORM_FILE_PATH" "$NORM_CWD"; then
     # Remove the CWD prefix to get relative path
-    local cwd_with_slash="${NORM_CWD%/}/"
-    if [[ "$NORM_FILE_PATH" == "$cwd_with_slash"* ]]; then
-      REL_PATH="${NORM_FILE_PATH#$cwd_with_slash}"
+    CWD_WITH_SLASH="${NORM_CWD%/}/"
+    if [[ "$NORM_FILE_PATH" == "$CWD_WITH_SLASH"* ]]; then
+      REL_PATH="${NORM_FILE_PATH#"$CWD_WITH_SLASH"}"
     fi
   fi
 
+  load_path_rules
+
   if is_protected_path "$REL_PATH"; then
     emit_deny "$(msg deny_protected_path "$REL_PATH")"
     exit 0
   fi
 
   # ===== LSP/Skills ゲート (Phase0+) =====
-  STATE_DIR=".claude/state"
-  SESSION_FILE="$STATE_DIR/session.json"
-  TOOLING_POLICY_FILE="$STATE_DIR/tooling-policy.json"
-  SKILLS_POLICY_FILE="$STATE_DIR/skills-policy.json"
-  SKILLS_CONFIG_FILE="$STATE_DIR/skills-config.json"
-  SESSION_SKILLS_USED_FILE="$STATE_DIR/session-skills-used.json"
-
-  # デフォルト除外パターン（policy file がなくても適用）
-  is_default_excluded() {
-    local path="$1"
-    # .md, .txt, .json ファイルは常に除外（ドキュメント・設定ファイル）
-    case "$path" in
-      *.md|*.txt|*.json) return 0 ;;
-    esac
-    # .claude/ 配下は常に除外
-    case "$path" in
-      .claude/*) return 0 ;;
-    esac
-    # docs/, templates/, benchmarks/ は常に除外
-    case "$path" in
-      docs/*|templates/*|benchmarks/*) return 0 ;;
-    esac
-    return 1
-  }
-
-  # 除外パスチェック関数
-  is_excluded_path() {
-    local path="$1"
-    local policy_file="$2"
-
-    # まずデフォルト除外をチェック
-    is_default_excluded "$path" && return 0
-
-    # policy file がなければデフォルトのみで判定終了
-    [ ! -f "$policy_file" ] && return 1
-
-    if command -v jq >/dev/null 2>&1; then
-      # skills_gate.exclude_paths をチェック
-      local exclude_paths
-      exclude_paths=$(jq -r '.skills_gate.exclude_paths[]? // empty' "$policy_file" 2>/dev/null)
-
-      while IFS= read -r pattern; do
-        [ -z "$pattern" ] && continue
-        case "$path" in
-          $pattern*) return 0 ;;
-        esac
-        case "$pattern" in
-          \*.*)
-            local ext="${pattern#\*}"
-            [[ "$path" == *"$ext" ]] && return 0
-            ;;
-        esac
-      done <<< "$exclude_paths"
-
-      # exclude_extensions をチェック
-      local exclude_exts
-      exclude_exts=$(jq -r '.skills_gate.exclude_extensions[]? // empty' "$policy_file" 2>/dev/null)
-      local file_ext=".${path##*.}"
-
-      while IFS= read -r ext; do
-        [ -z "$ext" ] && continue
-        [ "$file_ext" = "$ext" ] && return 0
-      done <<< "$exclude_exts"
-    fi
+  # ゲートが参照する状態ファイル（.claude/state/ の skills-config / session-skills-used /
+  # session / tooling-policy）はまとめて 1 回でパースする
+  # （skills-policy.json の除外パスは load_path_rules でコンパイル済み）
+  FILE_EXT="${FILE_PATH##*.}"
+  LSP_EXT_FIELD="LSP_AVAILABLE_FOR_EXT=false"
+  if [[ "$FILE_EXT" =~ ^[A-Za-z0-9_+-]+$ ]]; then
+    LSP_EXT_FIELD="LSP_AVAILABLE_FOR_EXT=@tooling-policy.lsp.available_by_ext.${FILE_EXT}//false"
+  fi
 
-    return 1
-  }
+  SKILLS_GATE_ACTIVE="false"
+  AVAILABLE_SKILLS=""
+  SKILLS_USED_COUNT=0
+  CURRENT_PROMPT_SEQ=0
+  INTENT="literal"
+  LSP_AVAILABLE="false"
+  LSP_LAST_USED_SEQ=0
+  LSP_AVAILABLE_FOR_EXT="false"
+  eval "$(hook_fields </dev/null \
+    SKILLS_GATE_ACTIVE=@skills-config.enabled//false \
+    AVAILABLE_SKILLS=@skills-config.skills \
+    SKILLS_USED_COUNT=#@session-skills-used.used \
+    CURRENT_PROMPT_SEQ=@session.prompt_seq//0 \
+    INTENT=@session.intent//literal \
+    LSP_AVAILABLE=@tooling-policy.lsp.available//false \
+    LSP_LAST_USED_SEQ=@tooling-policy.lsp.last_used_prompt_seq//0 \
+    "$LSP_EXT_FIELD")"
 
   # ===== Skills Gate: セッション単位でスキル使用をチェック =====
   # skills-config.json が存在し、enabled=true の場合のみゲートを適用
-  if [ -f "$SKILLS_CONFIG_FILE" ]; then
-    if command -v jq >/dev/null 2>&1; then
-      SKILLS_GATE_ACTIVE=$(jq -r '.enabled // false' "$SKILLS_CONFIG_FILE" 2>/dev/null || echo "false")
-      
-      if [ "$SKILLS_GATE_ACTIVE" = "true" ]; then
-        # 除外パスチェック
-        if is_excluded_path "$REL_PATH" "$SKILLS_POLICY_FILE"; then
-          : # 除外パス → スキップ
-        else
-          # session-skills-used.json をチェック
-          SKILL_USED_THIS_SESSION="false"
-          if [ -f "$SESSION_SKILLS_USED_FILE" ]; then
-            USED_COUNT=$(jq -r '.used | length' "$SESSION_SKILLS_USED_FILE" 2>/dev/null || echo "0")
-            if [ "$USED_COUNT" -gt 0 ]; then
-              SKILL_USED_THIS_SESSION="true"
-            fi
-          fi
-          
-          if [ "$SKILL_USED_THIS_SESSION" = "false" ]; then
-            # スキル未使用 → ブロック
-            AVAILABLE_SKILLS=$(jq -r '.skills // [] | join(", ")' "$SKILLS_CONFIG_FILE" 2>/dev/null || echo "impl, review")
-            DENY_MSG="[Skills Gate] コード編集前にスキルを使用してください。
+  if [ "$SKILLS_GATE_ACTIVE" = "true" ]; then
+    # 除外パスチェック（デフォルト除外 + skills-policy.json の exclude_paths / exclude_extensions）
+    if [[ "$REL_PATH" =~ $SKILLS_EXCLUDED_RE ]]; then
+      : # 除外パス → スキップ
+    elif ! [ "$SKILLS_USED_COUNT" -gt 0 ] 2>/dev/null; then
+      # session-skills-used.json の used が空（.used | length が 0）→ スキル未使用 → ブロック
+      DENY_MSG="[Skills Gate] コード編集前にスキルを使用してください。
 
 このプロジェクトでは Skills Gate が有効です。
 コード変更前に Skill ツールで適切なスキルを呼び出してください。
 
-利用可能なスキル: ${AVAILABLE_SKILLS}
+利用可能なスキル: ${AVAILABLE_SKILLS//$'\n'/, }
 
 例: Skill ツールで 'impl' や 'review' を呼び出す
 
 スキルを使用後、再度 Write/Edit を実行してください。"
-            emit_deny "$DENY_MSG"
-            exit 0
-          fi
-        fi
-      fi
+      emit_deny "$DENY_MSG"
+      exit 0
     fi
   fi
 
   # ===== LSP Gate: セマンティック変更時にLSP使用を推奨 =====
-  if [ -f "$SESSION_FILE" ] && [ -f "$TOOLING_POLICY_FILE" ]; then
-    if command -v jq >/dev/null 2>&1; then
-      CURRENT_PROMPT_SEQ=$(jq -r '.prompt_seq // 0' "$SESSION_FILE" 2>/dev/null || echo 0)
-      INTENT=$(jq -r '.intent // "literal"' "$SESSION_FILE" 2>/dev/null || echo "literal")
-      LSP_AVAILABLE=$(jq -r '.lsp.available // false' "$TOOLING_POLICY_FILE" 2>/dev/null || echo false)
-      LSP_LAST_USED_SEQ=$(jq -r '.lsp.last_used_prompt_seq // 0' "$TOOLING_POLICY_FILE" 2>/dev/null || echo 0)
-
-      FILE_EXT="${FILE_PATH##*.}"
-      LSP_AVAILABLE_FOR_EXT=$(jq -r ".lsp.available_by_ext[\"$FILE_EXT\"] // false" "$TOOLING_POLICY_FILE" 2>/dev/null || echo false)
-
-      if [ "$INTENT" = "semantic" ] && [ "$LSP_AVAILABLE" = "true" ] && [ "$LSP_AVAILABLE_FOR_EXT" = "true" ]; then
-        if [ "$LSP_LAST_USED_SEQ" != "$CURRENT_PROMPT_SEQ" ]; then
-          DENY_MSG="[LSP Policy] コード変更前にLSPツールを使って影響範囲を分析してください。
+  if [ "$INTENT" = "semantic" ] && [ "$LSP_AVAILABLE" = "true" ] && [ "$LSP_AVAILABLE_FOR_EXT" = "true" ]; then
+    if [ "$LSP_LAST_USED_SEQ" != "$CURRENT_PROMPT_SEQ" ]; then
+      DENY_MSG="[LSP Policy] コード変更前にLSPツールを使って影響範囲を分析してください。
 
 推奨LSPツール:
 - Go-to-definition でシンボルの定義を確認
@@ -407,10 +456,8 @@ if [ "$TOOL_NAME" = "Write" ] || [ "$TOOL_NAME" = "Edit" ]; then
 - Diagnostics で型エラーを検出
 
 LSPツールを使って変更の影響範囲を把握してから、再度 Write/Edit を実行してください。"
-          emit_deny "$DENY_MSG"
-          exit 0
-        fi
-      fi
+      emit_deny "$DENY_MSG"
+      exit 0
     fi
   fi
 
@@ -450,12 +497,13 @@ if [ "$TOOL_NAME" = "Bash" ]; then
       # レビュー承認状態をチェック
       REVIEW_APPROVED="false"
       if [ -f "$REVIEW_STATE_FILE" ]; then
-        if command -v jq >/dev/null 2>&1; then
-          APPROVED_AT=$(jq -r '.approved_at // empty' "$REVIEW_STATE_FILE" 2>/dev/null)
-          JUDGMENT=$(jq -r '.judgment // empty' "$REVIEW_STATE_FILE" 2>/dev/null)
-          if [ -n "$APPROVED_AT" ] && [ "$JUDGMENT" = "APPROVE" ]; then
-            REVIEW_APPROVED="true"
-          fi
+        APPROVED_AT=""
+        JUDGMENT=""
+        eval "$(hook_fields </dev/null \
+          APPROVED_AT=@review-approved.approved_at \
+          JUDGMENT=@review-approved.judgment)"
+        if [ -n "$APPROVED_AT" ] && [ "$JUDGMENT" = "APPROVE" ]; then
+          REVIEW_APPROVED="true"
         fi
       fi
 
@@ -11,17 +11,51 @@
  * Example:
  *   node record-usage.js skill impl
  *   node record-usage.js hook test-quality-guard --blocked
+ *
+ * 記録は .claude/state/harness-usage.events.jsonl への 1 行追記のみ（O_APPEND、ロックなし）。
+ * 並列のサブエージェントが同時に記録してもカウントを失わない。
+ * harness-usage.json への集計は --report / --cleanup / --compact の実行時
+ * （またはログが大きくなったとき）にまとめて行う。
  */
 
 const fs = require('fs');
 const path = require('path');
 
-// Usage file location - project-local
-const USAGE_FILE = path.join(process.cwd(), '.claude', 'state', 'harness-usage.json');
+// Usage files - project-local
+//   harness-usage.json               集計済みの使用状況（compactUsage が更新）
+//   harness-usage.events.jsonl       未集計のイベント（1 行 1 イベント、O_APPEND で追記のみ）
+//   harness-usage.events.jsonl.retired  ローテーションした直後のイベントログ（次回の集計で削除）
+const STATE_DIR = path.join('.claude', 'state');
+const USAGE_FILE_NAME = 'harness-usage.json';
+const EVENTS_FILE_NAME = 'harness-usage.events.jsonl';
+const RETIRED_SUFFIX = '.retired';
+const LOCK_FILE_NAME = 'harness-usage.lock';
 
 // Schema version for future migrations
 const SCHEMA_VERSION = '1.0';
 
+// 集計済みのイベントログがこのサイズを超えたらローテーション
+const EVENTS_ROTATE_BYTES = 256 * 1024;
+
+// この時間より古いロックは異常終了した集計のものとみなす
+const STALE_LOCK_MS = 10 * 1000;
+
+const VALID_TYPES = ['skill', 'command', 'agent', 'hook'];
+
+/**
+ * Paths of the usage files for a project
+ */
+function usagePaths(projectRoot = process.cwd()) {
+  const dir = path.join(projectRoot, STATE_DIR);
+  return {
+    dir,
+    usage: path.join(dir, USAGE_FILE_NAME),
+    events: path.join(dir, EVENTS_FILE_NAME),
+    retired: path.join(dir, EVENTS_FILE_NAME + RETIRED_SUFFIX),
+    lock: path.join(dir, LOCK_FILE_NAME)
+  };
+}
+
 /**
  * Initialize empty usage data
  */
@@ -32,17 +66,18 @@ function createEmptyUsage() {
     skills: {},
     commands: {},
     agents: {},
-    hooks: {}
+    hooks: {},
+    eventLog: { offset: 0 }
   };
 }
 
 /**
- * Load usage data from file
+ * Load the compacted usage data from file
  */
-function loadUsage() {
+function loadUsage(paths = usagePaths()) {
   try {
-    if (fs.existsSync(USAGE_FILE)) {
-      const data = JSON.parse(fs.readFileSync(USAGE_FILE, 'utf-8'));
+    if (fs.existsSync(paths.usage)) {
+      const data = JSON.parse(fs.readFileSync(paths.usage, 'utf-8'));
       // Ensure all required sections exist
       return {
         version: data.version || SCHEMA_VERSION,
@@ -50,7 +85,8 @@ function loadUsage() {
         skills: data.skills || {},
         commands: data.commands || {},
         agents: data.agents || {},
-        hooks: data.hooks || {}
+        hooks: data.hooks || {},
+        eventLog: data.eventLog || { offset: 0 }
       };
     }
   } catch (err) {
@@ -61,21 +97,181 @@ function loadUsage() {
 }
 
 /**
- * Save usage data to file
+ * Save usage data to file (atomically)
+ */
+function saveUsage(usage, paths = usagePaths()) {
+  fs.mkdirSync(paths.dir, { recursive: true });
+  usage.updatedAt = new Date().toISOString();
+  const tmp = `${paths.usage}.${process.pid}.tmp`;
+  fs.writeFileSync(tmp, JSON.stringify(usage, null, 2), 'utf-8');
+  fs.renameSync(tmp, paths.usage);
+}
+
+/**
+ * Fold one usage event into the aggregate
+ */
+function applyEvent(usage, event) {
+  if (!event || !VALID_TYPES.includes(event.type) || typeof event.name !== 'string' || !event.name) {
+    return;
+  }
+  const section = usage[event.type + 's']; // skill -> skills, etc.
+  const ts = typeof event.ts === 'string' ? event.ts : null;
+
+  if (event.type === 'hook') {
+    // Hooks have triggered/blocked counts
+    const entry = section[event.name] || (section[event.name] = { triggered: 0, blocked: 0, lastTriggered: null });
+    entry.triggered += 1;
+    if (event.blocked) {
+      entry.blocked += 1;
+    }
+    if (ts && (!entry.lastTriggered || ts > entry.lastTriggered)) {
+      entry.lastTriggered = ts;
+    }
+  } else {
+    // Skills, commands, agents have count/lastUsed
+    const entry = section[event.name] || (section[event.name] = { count: 0, lastUsed: null });
+    entry.count += 1;
+    if (ts && (!entry.lastUsed || ts > entry.lastUsed)) {
+      entry.lastUsed = ts;
+    }
+  }
+}
+
+/**
+ * Fold the complete lines of an event log starting at offset
+ * Returns the offset just after the last complete line
  */
-function saveUsage(usage) {
+function foldEventLog(usage, file, offset) {
+  let buffer;
   try {
-    // Ensure directory exists
-    const dir = path.dirname(USAGE_FILE);
-    if (!fs.existsSync(dir)) {
-      fs.mkdirSync(dir, { recursive: true });
+    buffer = fs.readFileSync(file);
+  } catch (err) {
+    return offset;
+  }
+  if (offset > buffer.length) {
+    // 別のファイルに置き換わっている（手動で削除された等）→ 先頭から
+    offset = 0;
+  }
+  const end = buffer.lastIndexOf(10) + 1;
+  if (end <= offset) {
+    return offset;
+  }
+  for (const line of buffer.toString('utf-8', offset, end).split('\n')) {
+    if (!line) continue;
+    try {
+      applyEvent(usage, JSON.parse(line));
+    } catch (err) {
+      // 壊れた行は読み飛ばす
     }
+  }
+  return end;
+}
+
+/**
+ * Fold all pending events into usage (in memory)
+ * Returns the event log offsets after folding
+ */
+function foldPendingEvents(usage, paths) {
+  const log = usage.eventLog || { offset: 0 };
+  let offset = log.offset || 0;
+  let retiredOffset = null;
+  if (fs.existsSync(paths.retired)) {
+    // retiredOffset がない = ローテーション直後に集計が中断した → offset は retired 側のもの
+    const start = log.retiredOffset !== undefined && log.retiredOffset !== null ? log.retiredOffset : offset;
+    retiredOffset = foldEventLog(usage, paths.retired, start);
+    if (log.retiredOffset === undefined || log.retiredOffset === null) {
+      offset = 0;
+    }
+  }
+  offset = foldEventLog(usage, paths.events, offset);
+  return { offset, retiredOffset };
+}
 
-    usage.updatedAt = new Date().toISOString();
-    fs.writeFileSync(USAGE_FILE, JSON.stringify(usage, null, 2), 'utf-8');
+/**
+ * Acquire the compaction lock (only compactions take it; recording never does)
+ */
+function acquireLock(paths) {
+  try {
+    fs.writeFileSync(paths.lock, String(process.pid), { flag: 'wx' });
+    return true;
   } catch (err) {
-    console.error(`[record-usage] Error saving usage file: ${err.message}`);
-    process.exit(1);
+    try {
+      if (Date.now() - fs.statSync(paths.lock).mtimeMs > STALE_LOCK_MS) {
+        fs.unlinkSync(paths.lock);
+        fs.writeFileSync(paths.lock, String(process.pid), { flag: 'wx' });
+        return true;
+      }
+    } catch (e) {
+      // 他のプロセスが先に取得した
+    }
+    return false;
+  }
+}
+
+/**
+ * Record one usage event: a single O_APPEND write, no read-modify-write
+ */
+function appendUsageEvent(type, name, options = {}, projectRoot = process.cwd()) {
+  const paths = usagePaths(projectRoot);
+  const event = { v: 1, ts: new Date().toISOString(), type, name };
+  if (type === 'hook' && options.blocked) {
+    event.blocked = true;
+  }
+  fs.mkdirSync(paths.dir, { recursive: true });
+  fs.appendFileSync(paths.events, JSON.stringify(event) + '\n', { flag: 'a' });
+  // レポートを読む人がいなくてもログが大きくなりすぎないよう、ここでも集計する
+  if (fs.statSync(paths.events).size >= EVENTS_ROTATE_BYTES) {
+    compactUsage(projectRoot);
+  }
+}
+
+/**
+ * Fold the event log into harness-usage.json and return the compacted view
+ *
+ * 別のプロセスが集計中なら、ファイルは更新せずにメモリ上で集計した結果を返す。
+ */
+function compactUsage(projectRoot = process.cwd()) {
+  const paths = usagePaths(projectRoot);
+  const hasEvents = fs.existsSync(paths.events) || fs.existsSync(paths.retired);
+  if (!hasEvents || !acquireLock(paths)) {
+    const usage = loadUsage(paths);
+    if (hasEvents) {
+      foldPendingEvents(usage, paths);
+    }
+    return usage;
+  }
+
+  try {
+    const usage = loadUsage(paths);
+    const log = foldPendingEvents(usage, paths);
+    const hadRetired = log.retiredOffset !== null;
+
+    // 集計結果を先に保存してからログを片付ける（途中で止まっても二重に数えない）
+    usage.eventLog = hadRetired ? { offset: log.offset, retiredOffset: log.retiredOffset } : { offset: log.offset };
+    saveUsage(usage, paths);
+    if (hadRetired) {
+      // ローテーション済みのログ（書き込み中のプロセスはもういない）を集計し終えた
+      fs.unlinkSync(paths.retired);
+    }
+
+    if (log.offset >= EVENTS_ROTATE_BYTES) {
+      if (hadRetired) {
+        usage.eventLog = { offset: log.offset };
+        saveUsage(usage, paths);
+      }
+      // 改名の直前に開かれた追記がまだ届くことがあるので、
+      // retired は次回の集計で残りを読んでから削除する
+      fs.renameSync(paths.events, paths.retired);
+      usage.eventLog = { offset: 0, retiredOffset: foldEventLog(usage, paths.retired, log.offset) };
+      saveUsage(usage, paths);
+    }
+    return usage;
+  } finally {
+    try {
+      fs.unlinkSync(paths.lock);
+    } catch (err) {
+      // 既に削除済み
+    }
   }
 }
 
@@ -88,37 +284,18 @@ function recordUsage(type, name, options = {}) {
     process.exit(1);
   }
 
-  const validTypes = ['skill', 'command', 'agent', 'hook'];
-  if (!validTypes.includes(type)) {
-    console.error(`[record-usage] Error: Invalid type "${type}". Must be one of: ${validTypes.join(', ')}`);
+  if (!VALID_TYPES.includes(type)) {
+    console.error(`[record-usage] Error: Invalid type "${type}". Must be one of: ${VALID_TYPES.join(', ')}`);
     process.exit(1);
   }
 
-  const usage = loadUsage();
-  const section = type + 's'; // skill -> skills, etc.
-  const now = new Date().toISOString();
-
-  if (type === 'hook') {
-    // Hooks have triggered/blocked counts
-    if (!usage[section][name]) {
-      usage[section][name] = { triggered: 0, blocked: 0, lastTriggered: null };
-    }
-    usage[section][name].triggered += 1;
-    usage[section][name].lastTriggered = now;
-    if (options.blocked) {
-      usage[section][name].blocked += 1;
-    }
-  } else {
-    // Skills, commands, agents have count/lastUsed
-    if (!usage[section][name]) {
-      usage[section][name] = { count: 0, lastUsed: null };
-    }
-    usage[section][name].count += 1;
-    usage[section][name].lastUsed = now;
+  try {
+    appendUsageEvent(type, name, options);
+  } catch (err) {
+    console.error(`[record-usage] Error recording usage: ${err.message}`);
+    process.exit(1);
   }
 
-  saveUsage(usage);
-
   // Output success for logging
   console.log(`[record-usage] Recorded ${type}: ${name}`);
 }
@@ -126,8 +303,7 @@ function recordUsage(type, name, options = {}) {
 /**
  * Get cleanup suggestions based on usage data
  */
-function getCleanupSuggestions() {
-  const usage = loadUsage();
+function getCleanupSuggestions(usage = compactUsage()) {
   const suggestions = {
     unusedSkills: [],
     unusedCommands: [],
@@ -183,7 +359,7 @@ function getCleanupSuggestions() {
  * Get full usage report
  */
 function getUsageReport() {
-  const usage = loadUsage();
+  const usage = compactUsage();
 
   // Sort by usage count (descending)
   const sortByCount = (a, b) => (b[1].count || b[1].triggered || 0) - (a[1].count || a[1].triggered || 0);
@@ -195,29 +371,46 @@ function getUsageReport() {
     commands: Object.entries(usage.commands).sort(sortByCount),
     agents: Object.entries(usage.agents).sort(sortByCount),
     hooks: Object.entries(usage.hooks).sort(sortByCount),
-    cleanup: getCleanupSuggestions()
+    cleanup: getCleanupSuggestions(usage)
   };
 }
 
 // Main execution
-const args = process.argv.slice(2);
+function main() {
+  const args = process.argv.slice(2);
+
+  if (args.length === 0) {
+    console.error('Usage: node record-usage.js <type> <name> [--blocked]');
+    console.error('       node record-usage.js --report');
+    console.error('       node record-usage.js --cleanup');
+    console.error('       node record-usage.js --compact');
+    process.exit(1);
+  }
 
-if (args.length === 0) {
-  console.error('Usage: node record-usage.js <type> <name> [--blocked]');
-  console.error('       node record-usage.js --report');
-  console.error('       node record-usage.js --cleanup');
-  process.exit(1);
+  if (args[0] === '--report') {
+    console.log(JSON.stringify(getUsageReport(), null, 2));
+  } else if (args[0] === '--cleanup') {
+    console.log(JSON.stringify(getCleanupSuggestions(), null, 2));
+  } else if (args[0] === '--compact') {
+    compactUsage();
+  } else {
+    const type = args[0];
+    const name = args[1];
+    const options = {
+      blocked: args.includes('--blocked')
+    };
+    recordUsage(type, name, options);
+  }
 }
 
-if (args[0] === '--report') {
-  console.log(JSON.stringify(getUsageReport(), null, 2));
-} else if (args[0] === '--cleanup') {
-  console.log(JSON.stringify(getCleanupSuggestions(), null, 2));
-} else {
-  const type = args[0];
-  const name = args[1];
-  const options = {
-    blocked: args.includes('--blocked')
-  };
-  recordUsage(type, name, options);
+if (require.main === module) {
+  main();
 }
+
+module.exports = {
+  EVENTS_FILE_NAME,
+  appendUsageEvent,
+  compactUsage,
+  getCleanupSuggestions,
+  getUsageReport
+};
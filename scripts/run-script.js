@@ -14,15 +14,45 @@
  *
  * hooks.json での使用:
  *   "command": "node ${CLAUDE_PLUGIN_ROOT}/scripts/run-script.js session-init"
+ *
+ * 常駐フックサーバー:
+ *   hook-daemon.js が起動していれば（自分が所有するソケットがあれば）フックをそちらに送り、
+ *   bash を起動しない。JavaScript 実装のないフック・デーモンが応答しない場合は
+ *   従来どおり bash スクリプトを実行する
+ *
+ * 計測モード:
+ *   環境変数 CLAUDE_HARNESS_PROFILE_LOG が設定されていれば、フック 1 回ごとに
+ *   実行時間・終了コード（PreToolUse/PostToolUse では tool_name, tool_use_id も）を
+ *   1 行の JSON としてそのファイルに追記する
+ *   （benchmarks/evals-v3/scripts/trial-profiler.py が集計）
+ *
+ * レイテンシ計測:
+ *   .claude/state があれば、フック 1 回ごとに wall time（node の起動を含む）・
+ *   子プロセスの CPU 時間・終了コードを .claude/state/hook-latency.ring に記録し、
+ *   フックごとのソフトな時間予算を超えたら警告・高速パスに切り替える（hook-latency.js）
  */
 
 const { spawn } = require('child_process');
 const path = require('path');
 const fs = require('fs');
+const hookDaemon = require('./hook-daemon');
+const hookLatency = require('./hook-latency');
 
 // プラットフォーム検出
 const isWindows = process.platform === 'win32';
 
+// 計測ログの出力先（未設定なら計測しない）
+const profileLog = process.env.CLAUDE_HARNESS_PROFILE_LOG;
+
+// デーモンの応答を待つ上限（超えたら bash スクリプトにフォールバック）
+const DAEMON_TIMEOUT_MS = 3000;
+
+// /proc/self/stat の CPU 時間の単位（Linux の USER_HZ）
+const CLOCK_TICKS_PER_SEC = 100;
+
+// node の起動時刻（wall time はここから測る）
+const hookStartedAt = Date.now() - process.uptime() * 1000;
+
 /**
  * Windows パスを MSYS/Git Bash 形式に変換
  * C:\Users\foo → /c/Users/foo
@@ -71,6 +101,85 @@ function findBash() {
   return 'bash';
 }
 
+/**
+ * stdin を最後まで読み込む（デーモンへの送信、計測モードでの tool_name 等の取り出し用）
+ */
+function readStdin(callback) {
+  if (process.stdin.isTTY) {
+    callback(null);
+    return;
+  }
+  const chunks = [];
+  process.stdin.on('data', (chunk) => chunks.push(chunk));
+  process.stdin.on('end', () => callback(Buffer.concat(chunks)));
+  process.stdin.on('error', () => callback(Buffer.concat(chunks)));
+}
+
+/**
+ * フック 1 回分の計測イベントを追記（1 回の write なので並行するフックと行は混ざらない）
+ */
+function appendProfileEvent(scriptName, scriptArgs, input, startedAt, startHr, exitCode, viaDaemon = false, cpuMs = null) {
+  const event = {
+    event: 'hook',
+    ts: startedAt,
+    duration_ms: Math.round(Number(process.hrtime.bigint() - startHr) / 1e4) / 100,
+    script: scriptName,
+    args: scriptArgs,
+    exit_code: exitCode,
+  };
+  if (cpuMs !== null) event.cpu_ms = cpuMs;
+  if (viaDaemon) event.daemon = true;
+  try {
+    const payload = JSON.parse(input.toString('utf8'));
+    if (payload.hook_event_name) event.hook_event = payload.hook_event_name;
+    if (payload.tool_name) event.tool_name = payload.tool_name;
+    if (payload.tool_use_id) event.tool_use_id = payload.tool_use_id;
+  } catch (e) {
+    // JSON 以外の入力は付加情報なし
+  }
+  try {
+    fs.appendFileSync(profileLog, JSON.stringify(event) + '\n');
+  } catch (e) {
+    // 計測の失敗でフックを失敗させない
+  }
+}
+
+/**
+ * 終了した子プロセスの CPU 時間の累計（ms）。/proc のない環境では null
+ * （/proc/self/stat の cutime + cstime。node が wait した子プロセスの分だけ増える）
+ */
+function childCpuMs() {
+  if (process.platform !== 'linux') return null;
+  try {
+    const stat = fs.readFileSync('/proc/self/stat', 'utf8');
+    const fields = stat.slice(stat.lastIndexOf(')') + 2).split(' ');
+    return (Number(fields[13]) + Number(fields[14])) * (1000 / CLOCK_TICKS_PER_SEC);
+  } catch (e) {
+    return null;
+  }
+}
+
+/**
+ * フック 1 回分のレイテンシを記録し、予算を超えていれば警告する
+ */
+function recordLatency(hook, exitCode, { cpuMs = null, viaDaemon = false } = {}) {
+  const wallMs = process.uptime() * 1000;
+  try {
+    const overBudget = wallMs > hook.budget.budgetMs;
+    let flags = 0;
+    if (viaDaemon) flags |= hookLatency.FLAG_DAEMON;
+    if (overBudget) flags |= hookLatency.FLAG_OVER_BUDGET;
+    if (hook.fastPath) flags |= hookLatency.FLAG_FAST_PATH;
+    hookLatency.recordSample({ ts: hookStartedAt, hook: hook.name, wallMs, cpuMs, exitCode, flags });
+    // 1 回だけの遅延（node の起動・ディスクのキャッシュ）では警告しない
+    if (overBudget && hookLatency.isRepeatedlyOverBudget(hook.name)) {
+      process.stderr.write(`[hook-latency] ${hook.name}: ${Math.round(wallMs)}ms (budget ${hook.budget.budgetMs}ms)\n`);
+    }
+  } catch (e) {
+    // 計測の失敗でフックを失敗させない
+  }
+}
+
 /**
  * メイン処理
  */
@@ -126,7 +235,28 @@ function main() {
     }
   }
 
+  // 時間予算（超え続けているフックは高速パスで実行）
+  const hook = { name: hookLatency.hookName(scriptName, scriptArgs) };
+  hook.budget = hookLatency.loadBudget(hook.name);
+  hook.fastPath = hookLatency.shouldUseFastPath(hook.name, hook.budget);
+  if (hook.fastPath) {
+    env.CLAUDE_HARNESS_HOOK_FAST_PATH = '1';
+  }
+
+  // 常駐フックサーバーが動いていればそちらで処理
+  const daemonSocket = hookDaemon.socketPath();
+  if (daemonSocket && hookDaemon.isOwnSocket(daemonSocket)) {
+    readStdin((input) => runViaDaemon(daemonSocket, bashPath, bashScriptPath, scriptName, scriptArgs, env, input, hook));
+    return;
+  }
+
+  if (profileLog) {
+    readStdin((input) => runBuffered(bashPath, bashScriptPath, scriptName, scriptArgs, env, input, hook));
+    return;
+  }
+
   // bash スクリプトを実行
+  const cpuStart = childCpuMs();
   const child = spawn(bashPath, [bashScriptPath, ...scriptArgs], {
     env,
     stdio: 'inherit',  // stdin/stdout/stderr を透過的に転送
@@ -142,10 +272,79 @@ function main() {
   });
 
   child.on('exit', (code, signal) => {
-    if (signal) {
-      process.exit(1);
+    const exitCode = signal ? 1 : (code || 0);
+    const cpuEnd = childCpuMs();
+    recordLatency(hook, exitCode, { cpuMs: cpuStart === null || cpuEnd === null ? null : cpuEnd - cpuStart });
+    process.exit(exitCode);
+  });
+}
+
+/**
+ * デーモンにフックを送り、応答を stdout/stderr・終了コードとして返す
+ * （未対応のフック・接続できない場合は読み込んだ stdin で bash スクリプトを実行）
+ */
+function runViaDaemon(socket, bashPath, bashScriptPath, scriptName, scriptArgs, env, input, hook) {
+  const startedAt = Date.now();
+  const startHr = process.hrtime.bigint();
+  const forwardedEnv = {};
+  for (const key of hookDaemon.FORWARDED_ENV) {
+    if (process.env[key] !== undefined) forwardedEnv[key] = process.env[key];
+  }
+  const payload = {
+    script: scriptName,
+    args: scriptArgs,
+    input: input ? input.toString('utf8') : '',
+    cwd: process.cwd(),
+    env: forwardedEnv,
+  };
+
+  hookDaemon.request(socket, payload, DAEMON_TIMEOUT_MS, (err, response) => {
+    if (err || !response || !response.handled) {
+      runBuffered(bashPath, bashScriptPath, scriptName, scriptArgs, env, input, hook);
+      return;
+    }
+    const exitCode = response.exit_code || 0;
+    const cpuMs = typeof response.cpu_ms === 'number' ? response.cpu_ms : null;
+    if (profileLog) {
+      appendProfileEvent(scriptName, scriptArgs, input || Buffer.alloc(0), startedAt, startHr, exitCode, true, cpuMs);
+    }
+    recordLatency(hook, exitCode, { cpuMs, viaDaemon: true });
+    if (response.stderr) process.stderr.write(response.stderr);
+    process.stdout.write(response.stdout || '', () => process.exit(exitCode));
+  });
+}
+
+/**
+ * 読み込み済みの stdin を子に渡して実行（終了時にレイテンシを記録、計測モードではイベントも追記）
+ */
+function runBuffered(bashPath, bashScriptPath, scriptName, scriptArgs, env, input, hook) {
+  const startedAt = Date.now();
+  const startHr = process.hrtime.bigint();
+  const cpuStart = childCpuMs();
+  const child = spawn(bashPath, [bashScriptPath, ...scriptArgs], {
+    env,
+    stdio: [input === null ? 'inherit' : 'pipe', 'inherit', 'inherit'],
+    shell: false,
+  });
+  if (input !== null) {
+    child.stdin.on('error', () => {});  // 入力を読まずに終了するスクリプト
+    child.stdin.end(input);
+  }
+
+  child.on('error', (err) => {
+    console.error(`Failed to execute bash: ${err.message}`);
+    process.exit(1);
+  });
+
+  child.on('exit', (code, signal) => {
+    const exitCode = signal ? 1 : (code || 0);
+    const cpuEnd = childCpuMs();
+    const cpuMs = cpuStart === null || cpuEnd === null ? null : cpuEnd - cpuStart;
+    if (profileLog) {
+      appendProfileEvent(scriptName, scriptArgs, input || Buffer.alloc(0), startedAt, startHr, exitCode, false, cpuMs);
     }
-    process.exit(code || 0);
+    recordLatency(hook, exitCode, { cpuMs });
+    process.exit(exitCode);
   });
 }
 
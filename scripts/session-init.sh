@@ -9,6 +9,9 @@
 #
 # 出力: JSON形式で hookSpecificOutput.additionalContext に情報を出力
 #       → Claude Code が system-reminder として表示
+#
+# 高速パス: CLAUDE_HARNESS_HOOK_FAST_PATH=1（run-script.js が時間予算の超過時に設定）のときは
+#           プラグインキャッシュ同期とテンプレート更新チェックを省略する
 
 set -euo pipefail
 
@@ -50,9 +53,9 @@ EOF
 fi
 
 # ===== Hook 使用状況記録 =====
-if [ -x "$SCRIPT_DIR/record-usage.js" ] && command -v node >/dev/null 2>&1; then
-  node "$SCRIPT_DIR/record-usage.js" hook session-init 2>/dev/null &
-fi
+# shellcheck source=./usage-events.sh
+source "$SCRIPT_DIR/usage-events.sh"
+record_usage_event hook session-init
 
 # 出力メッセージを蓄積する変数
 OUTPUT=""
@@ -61,8 +64,10 @@ add_line() {
   OUTPUT="${OUTPUT}$1\n"
 }
 
+FAST_PATH="${CLAUDE_HARNESS_HOOK_FAST_PATH:-0}"
+
 # ===== Step 1: プラグインキャッシュ同期 =====
-if [ -f "$SCRIPT_DIR/sync-plugin-cache.sh" ]; then
+if [ "$FAST_PATH" != "1" ] && [ -f "$SCRIPT_DIR/sync-plugin-cache.sh" ]; then
   # 同期処理は静かに実行
   bash "$SCRIPT_DIR/sync-plugin-cache.sh" >/dev/null 2>&1 || true
 fi
@@ -105,7 +110,7 @@ fi
 TEMPLATE_INFO=""
 TEMPLATE_TRACKER="$SCRIPT_DIR/template-tracker.sh"
 
-if [ -f "$TEMPLATE_TRACKER" ] && [ -f "$SCRIPT_DIR/../templates/template-registry.json" ]; then
+if [ "$FAST_PATH" != "1" ] && [ -f "$TEMPLATE_TRACKER" ] && [ -f "$SCRIPT_DIR/../templates/template-registry.json" ]; then
   # generated-files.json がない場合は初期化
   if [ ! -f "${STATE_DIR}/generated-files.json" ]; then
     bash "$TEMPLATE_TRACKER" init >/dev/null 2>&1 || true
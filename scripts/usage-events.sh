@@ -0,0 +1,55 @@
+#!/bin/bash
+# usage-events.sh
+# 使用状況イベントを .claude/state/harness-usage.events.jsonl に 1 行追記する
+#
+# 使用方法:
+#   source "${SCRIPT_DIR}/usage-events.sh"
+#   record_usage_event skill impl
+#   record_usage_event hook pretooluse-guard --blocked
+#
+# record-usage.js と同じ形式の行を >>（O_APPEND）で書くだけで、node は起動しない。
+# harness-usage.json への集計は record-usage.js（--report / --cleanup / --compact）が行う。
+
+USAGE_EVENTS_FILE=".claude/state/harness-usage.events.jsonl"
+USAGE_EVENTS_COMPACT_BYTES=262144
+_USAGE_EVENTS_SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+
+# イベントを 1 件記録（失敗してもフックは止めない）
+# 引数: 種別（skill / command / agent / hook）, 名前, [--blocked]
+record_usage_event() {
+  local type="$1"
+  local name="$2"
+  local blocked="${3:-}"
+
+  [ -z "$type" ] && return 0
+  [ -z "$name" ] && return 0
+
+  local dir="${USAGE_EVENTS_FILE%/*}"
+  [ -d "$dir" ] || mkdir -p "$dir" 2>/dev/null || return 0
+
+  # JSON 文字列としてエスケープ（制御文字は除去）
+  name="${name//\\/\\\\}"
+  name="${name//\"/\\\"}"
+  name="${name//[[:cntrl:]]/}"
+
+  local extra=""
+  if [ "$type" = "hook" ] && [ "$blocked" = "--blocked" ]; then
+    extra=',"blocked":true'
+  fi
+
+  local ts
+  ts="$(date -u +%Y-%m-%dT%H:%M:%S.000Z 2>/dev/null)"
+  # 呼び出し側が set -e でも、追記の失敗（ディスクフル・権限など）でフックを止めない
+  { printf '{"v":1,"ts":"%s","type":"%s","name":"%s"%s}\n' "$ts" "$type" "$name" "$extra"; } \
+    2>/dev/null >> "$USAGE_EVENTS_FILE" || true
+
+  # ときどきサイズを確認し、大きくなっていればバックグラウンドで集計する
+  if [ $((RANDOM % 64)) -eq 0 ] && command -v node >/dev/null 2>&1; then
+    local size
+    size="$(wc -c < "$USAGE_EVENTS_FILE" 2>/dev/null || echo 0)"
+    if [ "${size// /}" -ge "$USAGE_EVENTS_COMPACT_BYTES" ] 2>/dev/null; then
+      node "$_USAGE_EVENTS_SCRIPT_DIR/record-usage.js" --compact >/dev/null 2>&1 &
+    fi
+  fi
+  return 0
+}
@@ -23,19 +23,27 @@ if ! command -v jq &>/dev/null; then
 fi
 
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
-RECORD_USAGE="$SCRIPT_DIR/record-usage.js"
+# shellcheck source=./hook-fields.sh
+source "$SCRIPT_DIR/hook-fields.sh"
+# shellcheck source=./usage-events.sh
+source "$SCRIPT_DIR/usage-events.sh"
 
 # Read input from stdin (Claude Code hook format)
 INPUT=$(cat)
 
-# Extract tool name and input from the hook input
-TOOL_NAME=$(echo "$INPUT" | jq -r '.tool_name // empty' 2>/dev/null || echo "")
-TOOL_INPUT=$(echo "$INPUT" | jq -r '.tool_input // empty' 2>/dev/null || echo "")
+# Extract every field we may need from the hook input in a single parse
+HOOK_TOOL_NAME=""
+SKILL_NAME=""
+CMD_NAME=""
+AGENT_TYPE=""
+eval "$(printf '%s' "$INPUT" | hook_fields \
+  HOOK_TOOL_NAME=.tool_name \
+  SKILL_NAME=.tool_input.skill \
+  CMD_NAME=.tool_input.command//.tool_input.name \
+  AGENT_TYPE=.tool_input.subagent_type)"
 
-# If we can't parse, try environment variables
-if [ -z "$TOOL_NAME" ]; then
-  TOOL_NAME="${TOOL_NAME:-}"
-fi
+# If we can't parse, fall back to the TOOL_NAME environment variable
+TOOL_NAME="${HOOK_TOOL_NAME:-${TOOL_NAME:-}}"
 
 # Early exit if no tool name
 if [ -z "$TOOL_NAME" ]; then
@@ -46,30 +54,24 @@ fi
 # Track based on tool type
 case "$TOOL_NAME" in
   Skill)
-    # Extract skill name from tool input
-    SKILL_NAME=$(echo "$TOOL_INPUT" | jq -r '.skill // empty' 2>/dev/null || echo "")
     if [ -n "$SKILL_NAME" ]; then
       # Extract base skill name (e.g., "impl" from "claude-code-harness:impl")
-      BASE_NAME=$(echo "$SKILL_NAME" | sed 's/.*://')
-      node "$RECORD_USAGE" skill "$BASE_NAME" 2>/dev/null || true
+      BASE_NAME="${SKILL_NAME##*:}"
+      record_usage_event skill "$BASE_NAME"
     fi
     ;;
 
   SlashCommand)
-    # Extract command name from tool input
-    CMD_NAME=$(echo "$TOOL_INPUT" | jq -r '.command // .name // empty' 2>/dev/null || echo "")
     if [ -n "$CMD_NAME" ]; then
       # Remove leading slash if present
-      BASE_NAME=$(echo "$CMD_NAME" | sed 's/^\///')
-      node "$RECORD_USAGE" command "$BASE_NAME" 2>/dev/null || true
+      BASE_NAME="${CMD_NAME#/}"
+      record_usage_event command "$BASE_NAME"
     fi
     ;;
 
   Task)
-    # Extract agent type from tool input
-    AGENT_TYPE=$(echo "$TOOL_INPUT" | jq -r '.subagent_type // empty' 2>/dev/null || echo "")
     if [ -n "$AGENT_TYPE" ]; then
-      node "$RECORD_USAGE" agent "$AGENT_TYPE" 2>/dev/null || true
+      record_usage_event agent "$AGENT_TYPE"
     fi
     ;;
 esac
@@ -8,6 +8,10 @@
 
 set +e
 
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+# shellcheck source=./hook-fields.sh
+source "$SCRIPT_DIR/hook-fields.sh"
+
 # ===== 定数 =====
 STATE_DIR=".claude/state"
 SESSION_FILE="${STATE_DIR}/session.json"
@@ -15,52 +19,6 @@ TOOLING_POLICY_FILE="${STATE_DIR}/tooling-policy.json"
 
 # ===== ユーティリティ =====
 
-# JSONから値を抽出（jq優先、なければpython3）
-json_get() {
-  local json="$1"
-  local key="$2"
-  local default="${3:-}"
-
-  if command -v jq >/dev/null 2>&1; then
-    echo "$json" | jq -r "$key // \"$default\"" 2>/dev/null || echo "$default"
-  elif command -v python3 >/dev/null 2>&1; then
-    echo "$json" | python3 -c "import json,sys; data=json.load(sys.stdin); keys='$key'.strip('.').split('.'); val=data;
-for k in keys: val=val.get(k) if isinstance(val,dict) else None
-print(val if val is not None else '$default')" 2>/dev/null || echo "$default"
-  else
-    echo "$default"
-  fi
-}
-
-# JSONファイルから値を抽出
-json_file_get() {
-  local file="$1"
-  local key="$2"
-  local default="${3:-0}"
-
-  if [ ! -f "$file" ]; then
-    echo "$default"
-    return
-  fi
-
-  if command -v jq >/dev/null 2>&1; then
-    jq -r "$key // $default" "$file" 2>/dev/null || echo "$default"
-  elif command -v python3 >/dev/null 2>&1; then
-    python3 -c "import json
-with open('$file', 'r') as f:
-    data = json.load(f)
-keys = '$key'.strip('.').split('.')
-val = data
-for k in keys:
-    val = val.get(k) if isinstance(val, dict) else None
-    if val is None:
-        break
-print(val if val is not None else '$default')" 2>/dev/null || echo "$default"
-  else
-    echo "$default"
-  fi
-}
-
 # JSONファイルを更新（原子的）
 json_file_update() {
   local file="$1"
@@ -100,11 +58,16 @@ fi
 
 [ -z "$INPUT" ] && exit 0
 
-# prompt を抽出（必要に応じて）
-PROMPT=$(json_get "$INPUT" ".prompt" "")
+# prompt・現在の prompt_seq・LSP 可用性を 1 回のパースで抽出
+PROMPT=""
+CURRENT_PROMPT_SEQ=0
+LSP_AVAILABLE="false"
+eval "$(printf '%s' "$INPUT" | hook_fields \
+  PROMPT=.prompt \
+  CURRENT_PROMPT_SEQ=@session.prompt_seq//0 \
+  LSP_AVAILABLE=@tooling-policy.lsp.available//false)"
 
 # prompt_seq をインクリメント
-CURRENT_PROMPT_SEQ=$(json_file_get "$SESSION_FILE" ".prompt_seq" "0")
 NEW_PROMPT_SEQ=$((CURRENT_PROMPT_SEQ + 1))
 
 # semantic/literal判定（キーワードベース）
@@ -114,9 +77,6 @@ if echo "$PROMPT" | grep -qiE "$SEMANTIC_KEYWORDS"; then
   INTENT="semantic"
 fi
 
-# LSP可用性の確認
-LSP_AVAILABLE=$(json_file_get "$TOOLING_POLICY_FILE" ".lsp.available" "false")
-
 # session.json を更新（prompt_seq、intent）
 if command -v jq >/dev/null 2>&1; then
   json_file_update "$SESSION_FILE" ".prompt_seq = $NEW_PROMPT_SEQ | .intent = \"$INTENT\""
@@ -12,7 +12,8 @@ set +e
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 STATE_DIR=".claude/state"
 PENDING_DIR="${STATE_DIR}/pending-skills"
-RECORD_USAGE="$SCRIPT_DIR/record-usage.js"
+# shellcheck source=./usage-events.sh
+source "$SCRIPT_DIR/usage-events.sh"
 
 # Skill必須コマンド一覧
 # これらのコマンドはSkill toolを使うことが期待される
@@ -63,8 +64,8 @@ if [[ "$FIRST_LINE" =~ ^/([a-zA-Z0-9_:/-]+) ]]; then
   fi
 
   # コマンド使用を記録
-  if [ -f "$RECORD_USAGE" ] && [ -n "$COMMAND_NAME" ]; then
-    node "$RECORD_USAGE" command "$COMMAND_NAME" 2>/dev/null || true
+  if [ -n "$COMMAND_NAME" ]; then
+    record_usage_event command "$COMMAND_NAME"
   fi
 
   # Skill必須コマンドかチェック
@@ -0,0 +1,348 @@
+#!/bin/bash
+# test-hook-daemon.sh
+# 常駐フックサーバーのテスト
+#
+# テスト対象:
+# - scripts/hook-daemon.js (起動・停止・run-script.js からの転送)
+# - scripts/hook-handlers.js (bash 版と同じ出力・同じ状態ファイル)
+# - scripts/run-script.js (デーモンが応答しない場合の bash フォールバック)
+
+set -euo pipefail
+
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+PROJECT_ROOT="$(cd "$SCRIPT_DIR/.." && pwd)"
+SCRIPTS="$PROJECT_ROOT/scripts"
+
+# テスト結果カウンター
+TESTS_RUN=0
+TESTS_PASSED=0
+TESTS_FAILED=0
+
+# カラー出力
+RED='\033[0;31m'
+GREEN='\033[0;32m'
+YELLOW='\033[1;33m'
+NC='\033[0m'
+
+if ! command -v node >/dev/null 2>&1 || ! command -v jq >/dev/null 2>&1; then
+  echo -e "${YELLOW}Skipped: node and jq are required${NC}"
+  exit 0
+fi
+
+WORK_DIR="$(mktemp -d)"
+export CLAUDE_HARNESS_HOOK_SOCKET="$WORK_DIR/hooks.sock"
+cleanup() {
+  node "$SCRIPTS/hook-daemon.js" stop >/dev/null 2>&1 || true
+  rm -rf "$WORK_DIR"
+}
+trap cleanup EXIT
+
+# テスト関数
+run_test() {
+  local test_name="$1"
+  local test_func="$2"
+
+  TESTS_RUN=$((TESTS_RUN + 1))
+  echo -n "  Testing: $test_name... "
+
+  if $test_func; then
+    echo -e "${GREEN}PASSED${NC}"
+    TESTS_PASSED=$((TESTS_PASSED + 1))
+  else
+    echo -e "${RED}FAILED${NC}"
+    TESTS_FAILED=$((TESTS_FAILED + 1))
+  fi
+}
+
+# 空のプロジェクトディレクトリを作成
+new_project() {
+  local dir="$WORK_DIR/$1"
+  rm -rf "$dir"
+  mkdir -p "$dir/.claude/state"
+  echo "$dir"
+}
+
+# bash 版とデーモン経由で同じ入力を処理し、stdout を比較
+# 引数: プロジェクトディレクトリ, スクリプト名, 入力 JSON
+same_output() {
+  local dir="$1"
+  local script="$2"
+  local input="$3"
+  local expected actual
+
+  expected="$(cd "$dir" && echo "$input" | bash "$SCRIPTS/$script.sh" 2>/dev/null)"
+  actual="$(cd "$dir" && echo "$input" | node "$SCRIPTS/run-script.js" "$script")"
+  if [ "$expected" != "$actual" ]; then
+    echo ""
+    echo "    input:    $input"
+    echo "    bash:     $expected"
+    echo "    daemon:   $actual"
+    return 1
+  fi
+  return 0
+}
+
+guard_input() {
+  local tool="$1"
+  local key="$2"
+  local value="$3"
+  local cwd="$4"
+  jq -nc --arg tool "$tool" --arg key "$key" --arg value "$value" --arg cwd "$cwd" \
+    '{tool_name: $tool, tool_input: {($key): $value}, cwd: $cwd}'
+}
+
+# ==================================================
+# Test 1: デーモンの起動と状態確認
+# ==================================================
+test_daemon_starts() {
+  node "$SCRIPTS/hook-daemon.js" start >/dev/null || return 1
+  node "$SCRIPTS/hook-daemon.js" status | grep -q "pretooluse-guard"
+}
+
+# ==================================================
+# Test 2: pretooluse-guard (Write/Edit) が bash 版と一致
+# ==================================================
+test_guard_write_edit_matches_bash() {
+  local dir
+  dir="$(new_project guard-write)"
+  local path
+  for path in "src/index.ts" "$dir/src/index.ts" "$dir/tests/a.test.ts" "README.md" "/etc/hosts" \
+              "../outside.ts" "$dir/.env" ".git/config" "keys/server.pem" "lib/util.js"; do
+    same_output "$dir" pretooluse-guard "$(guard_input Write file_path "$path" "$dir")" || return 1
+    same_output "$dir" pretooluse-guard "$(guard_input Edit file_path "$path" "$dir")" || return 1
+  done
+  CLAUDE_CODE_HARNESS_LANG=en same_output "$dir" pretooluse-guard "$(guard_input Write file_path "/etc/hosts" "$dir")"
+}
+
+# ==================================================
+# Test 3: pretooluse-guard (Bash) が bash 版と一致
+# ==================================================
+test_guard_bash_matches_bash() {
+  local dir
+  dir="$(new_project guard-bash)"
+  local command
+  for command in "ls -la" "sudo rm x" "git push origin main" "rm -rf build" "git commit -m wip" \
+                 "echo ok && git  push"; do
+    same_output "$dir" pretooluse-guard "$(guard_input Bash command "$command" "$dir")" || return 1
+  done
+
+  # レビュー承認済みならコミットを通す
+  echo '{"approved_at":"2026-01-01T00:00:00Z","judgment":"APPROVE"}' > "$dir/.claude/state/review-approved.json"
+  same_output "$dir" pretooluse-guard "$(guard_input Bash command "git commit -m wip" "$dir")"
+}
+
+# ==================================================
+# Test 4: Skills Gate / LSP Gate が bash 版と一致（状態ファイルの更新も反映）
+# ==================================================
+test_guard_gates_match_bash() {
+  local dir
+  dir="$(new_project guard-gates)"
+  echo '{"enabled": true, "skills": ["impl", "review"]}' > "$dir/.claude/state/skills-config.json"
+  echo '{"skills_gate": {"exclude_paths": ["scripts/", "*.sh"], "exclude_extensions": [".yml"]}}' \
+    > "$dir/.claude/state/skills-policy.json"
+
+  local path
+  for path in "src/app.ts" "scripts/build.ts" "tools/run.sh" "ci.yml" "docs/guide.ts"; do
+    same_output "$dir" pretooluse-guard "$(guard_input Write file_path "$path" "$dir")" || return 1
+  done
+
+  # used の長さ（.used | length）で判定する: {} や 0 は未使用としてブロック
+  local used
+  for used in '{}' '0' '""' '{"impl": true}' '-2'; do
+    echo "{\"used\": $used}" > "$dir/.claude/state/session-skills-used.json"
+    same_output "$dir" pretooluse-guard "$(guard_input Write file_path "src/app.ts" "$dir")" || return 1
+  done
+  for used in '{}' '0'; do
+    echo "{\"used\": $used}" > "$dir/.claude/state/session-skills-used.json"
+    (cd "$dir" && guard_input Write file_path "src/app.ts" "$dir" | bash "$SCRIPTS/pretooluse-guard.sh") \
+      | jq -e '.hookSpecificOutput.permissionDecision == "deny"' >/dev/null || return 1
+  done
+
+  # スキル使用後はゲートを通過（キャッシュされた状態ファイルが更新される）
+  echo '{"used": ["impl"]}' > "$dir/.claude/state/session-skills-used.json"
+  same_output "$dir" pretooluse-guard "$(guard_input Write file_path "src/app.ts" "$dir")" || return 1
+
+  echo '{"prompt_seq": 3, "intent": "semantic"}' > "$dir/.claude/state/session.json"
+  echo '{"lsp": {"available": true, "available_by_ext": {"ts": true}, "last_used_prompt_seq": 2}}' \
+    > "$dir/.claude/state/tooling-policy.json"
+  same_output "$dir" pretooluse-guard "$(guard_input Write file_path "src/app.ts" "$dir")" || return 1
+  same_output "$dir" pretooluse-guard "$(guard_input Write file_path "src/app.py" "$dir")"
+}
+
+# ==================================================
+# Test 5: posttooluse-log-toolname の状態ファイル更新が bash 版と一致
+# ==================================================
+test_log_toolname_state_matches_bash() {
+  local bash_dir daemon_dir
+  bash_dir="$(new_project log-bash)"
+  daemon_dir="$(new_project log-daemon)"
+
+  local dir
+  for dir in "$bash_dir" "$daemon_dir"; do
+    echo '{"prompt_seq": 7}' > "$dir/.claude/state/session.json"
+    echo '{"lsp": {"available": true}}' > "$dir/.claude/state/tooling-policy.json"
+  done
+
+  local input
+  for input in '{"tool_name":"mcp__lsp__hover","session_id":"s1"}' \
+               '{"tool_name":"Skill","session_id":"s1","tool_input":{"skill":"impl"},"duration_ms":42}' \
+               '{"tool_name":"Skill","session_id":"s1","tool_input":{"skill":"réview"}}'; do
+    (cd "$bash_dir" && echo "$input" | CC_HARNESS_PHASE0_LOG=1 bash "$SCRIPTS/posttooluse-log-toolname.sh")
+    (cd "$daemon_dir" && echo "$input" | CC_HARNESS_PHASE0_LOG=1 node "$SCRIPTS/run-script.js" posttooluse-log-toolname)
+  done
+
+  local file filter
+  for file in tooling-policy.json session-skills-used.json tool-events.jsonl tool-events.count; do
+    filter='del(.session_start?, .last_used?, .ts?)'
+    if ! diff <(jq -c "$filter" "$bash_dir/.claude/state/$file") \
+              <(jq -c "$filter" "$daemon_dir/.claude/state/$file") >/dev/null; then
+      echo ""
+      echo "    Error: $file differs"
+      return 1
+    fi
+  done
+  return 0
+}
+
+# ==================================================
+# Test 6: tool-events.jsonl のローテーション（サイズのみ、bash 版と一致）
+# ==================================================
+test_log_toolname_rotation() {
+  local bash_dir daemon_dir dir
+  bash_dir="$(new_project rotate-bash)"
+  daemon_dir="$(new_project rotate-daemon)"
+  for dir in "$bash_dir" "$daemon_dir"; do
+    # 行数が多くても小さければローテーションしない
+    seq 3000 | sed 's/.*/{"v":1}/' > "$dir/.claude/state/tool-events.jsonl"
+  done
+  (cd "$bash_dir" && echo '{"tool_name":"Read"}' | CC_HARNESS_PHASE0_LOG=1 bash "$SCRIPTS/posttooluse-log-toolname.sh")
+  (cd "$daemon_dir" && echo '{"tool_name":"Read"}' | CC_HARNESS_PHASE0_LOG=1 node "$SCRIPTS/run-script.js" posttooluse-log-toolname)
+
+  local line
+  for dir in "$bash_dir" "$daemon_dir"; do
+    [ ! -e "$dir/.claude/state/tool-events.jsonl.1" ] || return 1
+    [ "$(cut -d' ' -f2 "$dir/.claude/state/tool-events.count")" -eq 3001 ] || return 1
+
+    # カウンターが上限に達したら、次の追記の前にローテーションする
+    line="$(printf '%0262144d' 0)"
+    echo "$line" >> "$dir/.claude/state/tool-events.jsonl"
+    echo "$(( $(wc -c < "$dir/.claude/state/tool-events.jsonl") )) 3002" > "$dir/.claude/state/tool-events.count"
+  done
+  (cd "$bash_dir" && echo '{"tool_name":"Read"}' | CC_HARNESS_PHASE0_LOG=1 bash "$SCRIPTS/posttooluse-log-toolname.sh")
+  (cd "$daemon_dir" && echo '{"tool_name":"Read"}' | CC_HARNESS_PHASE0_LOG=1 node "$SCRIPTS/run-script.js" posttooluse-log-toolname)
+
+  for dir in "$bash_dir" "$daemon_dir"; do
+    [ "$(wc -l < "$dir/.claude/state/tool-events.jsonl.1")" -eq 3002 ] || return 1
+    [ "$(wc -l < "$dir/.claude/state/tool-events.jsonl")" -eq 1 ] || return 1
+    jq -e '.tool_name == "Read"' "$dir/.claude/state/tool-events.jsonl" >/dev/null || return 1
+    [ "$(cat "$dir/.claude/state/tool-events.count")" = "$(wc -c < "$dir/.claude/state/tool-events.jsonl" | tr -d ' ') 1" ] || return 1
+  done
+  return 0
+}
+
+# ==================================================
+# Test 7: 圧縮を有効にするとローテーションした世代を gzip で残す
+# ==================================================
+test_log_toolname_gzip_rotation() {
+  command -v gzip >/dev/null 2>&1 || return 0
+  local bash_dir daemon_dir dir
+  bash_dir="$(new_project gzip-bash)"
+  daemon_dir="$(new_project gzip-daemon)"
+  for dir in "$bash_dir" "$daemon_dir"; do
+    echo '{"v":1,"gen":2}' | gzip > "$dir/.claude/state/tool-events.jsonl.1.gz"
+    printf '%0262144d\n' 0 > "$dir/.claude/state/tool-events.jsonl"
+  done
+  (cd "$bash_dir" && echo '{"tool_name":"Read"}' | CC_HARNESS_PHASE0_LOG=1 CC_HARNESS_TOOL_EVENTS_GZIP=1 \
+    bash "$SCRIPTS/posttooluse-log-toolname.sh")
+  (cd "$daemon_dir" && echo '{"tool_name":"Read"}' | CC_HARNESS_PHASE0_LOG=1 CC_HARNESS_TOOL_EVENTS_GZIP=1 \
+    node "$SCRIPTS/run-script.js" posttooluse-log-toolname)
+
+  for dir in "$bash_dir" "$daemon_dir"; do
+    [ ! -e "$dir/.claude/state/tool-events.jsonl.1" ] || return 1
+    [ "$(gzip -dc "$dir/.claude/state/tool-events.jsonl.1.gz" | wc -c)" -eq 262145 ] || return 1
+    [ "$(gzip -dc "$dir/.claude/state/tool-events.jsonl.2.gz")" = '{"v":1,"gen":2}' ] || return 1
+  done
+  return 0
+}
+
+# ==================================================
+# Test 8: デーモンが応答しなければ bash 版にフォールバック
+# ==================================================
+test_fallback_without_daemon() {
+  local dir
+  dir="$(new_project fallback)"
+  local input
+  input="$(guard_input Bash command "sudo ls" "$dir")"
+
+  # 応答しないソケット（通常ファイル）
+  touch "$WORK_DIR/stale.sock"
+  local output
+  output="$(cd "$dir" && echo "$input" | CLAUDE_HARNESS_HOOK_SOCKET="$WORK_DIR/stale.sock" \
+    node "$SCRIPTS/run-script.js" pretooluse-guard)"
+  echo "$output" | jq -e '.hookSpecificOutput.permissionDecision == "deny"' >/dev/null
+}
+
+# ==================================================
+# Test 9: ソケットでないファイルは置き換えない
+# ==================================================
+test_refuses_foreign_path() {
+  local target="$WORK_DIR/not-a-socket"
+  echo "keep" > "$target"
+  if CLAUDE_HARNESS_HOOK_SOCKET="$target" timeout 5 node "$SCRIPTS/hook-daemon.js" serve >/dev/null 2>&1; then
+    return 1
+  fi
+  [ "$(cat "$target")" = "keep" ] || return 1
+  ! CLAUDE_HARNESS_HOOK_SOCKET="$target" node "$SCRIPTS/hook-daemon.js" status >/dev/null
+}
+
+# ==================================================
+# Test 10: 停止するとソケットが削除される
+# ==================================================
+test_daemon_stops() {
+  node "$SCRIPTS/hook-daemon.js" stop >/dev/null || return 1
+  sleep 0.2
+  [ ! -e "$CLAUDE_HARNESS_HOOK_SOCKET" ] || return 1
+  ! node "$SCRIPTS/hook-daemon.js" status >/dev/null
+}
+
+# ==================================================
+# メイン実行
+# ==================================================
+echo ""
+echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
+echo " Hook Daemon テスト"
+echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
+echo ""
+
+echo "  [Daemon]"
+run_test "hook-daemon.js が起動する" test_daemon_starts
+
+echo ""
+echo "  [pretooluse-guard]"
+run_test "Write/Edit の判定が bash 版と一致する" test_guard_write_edit_matches_bash
+run_test "Bash の判定が bash 版と一致する" test_guard_bash_matches_bash
+run_test "Skills Gate / LSP Gate が bash 版と一致する" test_guard_gates_match_bash
+
+echo ""
+echo "  [posttooluse-log-toolname]"
+run_test "状態ファイルの更新が bash 版と一致する" test_log_toolname_state_matches_bash
+run_test "tool-events.jsonl をサイズでローテーションする" test_log_toolname_rotation
+run_test "ローテーションした世代を gzip で残す" test_log_toolname_gzip_rotation
+
+echo ""
+echo "  [Fallback]"
+run_test "デーモンが応答しなければ bash 版を実行する" test_fallback_without_daemon
+run_test "ソケットでないファイルは置き換えない" test_refuses_foreign_path
+run_test "停止するとソケットが削除される" test_daemon_stops
+
+echo ""
+echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
+echo " テスト結果: $TESTS_PASSED/$TESTS_RUN passed"
+echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
+echo ""
+
+if [ "$TESTS_FAILED" -gt 0 ]; then
+  exit 1
+fi
+
+exit 0
@@ -0,0 +1,216 @@
+#!/bin/bash
+# test-hook-fields.sh
+# フィールド抽出ヘルパーのテスト
+#
+# テスト対象:
+# - scripts/hook-fields.sh (jq 版と python3 版が同じ値を返す・eval しても安全)
+# - scripts/usage-tracker.sh / userprompt-inject-policy.sh (抽出結果の利用)
+
+set -euo pipefail
+
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+PROJECT_ROOT="$(cd "$SCRIPT_DIR/.." && pwd)"
+SCRIPTS="$PROJECT_ROOT/scripts"
+
+# テスト結果カウンター
+TESTS_RUN=0
+TESTS_PASSED=0
+TESTS_FAILED=0
+
+# カラー出力
+RED='\033[0;31m'
+GREEN='\033[0;32m'
+YELLOW='\033[1;33m'
+NC='\033[0m'
+
+if ! command -v jq >/dev/null 2>&1 || ! command -v python3 >/dev/null 2>&1; then
+  echo -e "${YELLOW}Skipped: jq and python3 are required${NC}"
+  exit 0
+fi
+
+# shellcheck source=../scripts/hook-fields.sh
+source "$SCRIPTS/hook-fields.sh"
+
+WORK_DIR="$(mktemp -d)"
+trap 'rm -rf "$WORK_DIR"' EXIT
+mkdir -p "$WORK_DIR/.claude/state"
+cd "$WORK_DIR"
+
+# jq のない PATH（python3 版の確認用）
+NO_JQ_BIN="$WORK_DIR/bin"
+mkdir -p "$NO_JQ_BIN"
+ln -s "$(python3 -c 'import sys; print(sys.executable)')" "$NO_JQ_BIN/python3"
+ln -s "$(command -v cat)" "$NO_JQ_BIN/cat"
+
+# jq 1.5 の PATH（--rawfile / $ARGS がない）
+OLD_JQ_BIN="$WORK_DIR/old-jq-bin"
+mkdir -p "$OLD_JQ_BIN"
+ln -s "$(python3 -c 'import sys; print(sys.executable)')" "$OLD_JQ_BIN/python3"
+ln -s "$(command -v cat)" "$OLD_JQ_BIN/cat"
+printf '%s\n' '#!/bin/sh' \
+  '[ "$1" = "--version" ] && { echo "jq-1.5"; exit 0; }' \
+  'echo "jq: Unknown option: $1" >&2' \
+  'exit 2' > "$OLD_JQ_BIN/jq"
+chmod +x "$OLD_JQ_BIN/jq"
+
+INPUT='{"tool_name":"Write","tool_input":{"file_path":"a'"'"'b $(touch pwned) \"q\"\nline2","name":"/deploy"},"list":["x","y",3],"n":1.5}'
+FIELDS=(
+  TOOL_NAME=.tool_name
+  FILE_PATH=.tool_input.file_path
+  CMD_NAME=.tool_input.command//.tool_input.name
+  LIST=.list
+  NUM=.n
+  PROMPT_SEQ=@session.prompt_seq//0
+  LSP_TS=@tooling-policy.lsp.available_by_ext.ts//false
+  MISSING=@no-such-file.value//fallback
+  BROKEN=@broken.value//0
+  EMPTY=.no.such.key
+  LIST_COUNT=#.list
+  OBJ_COUNT=#.tool_input
+  NUM_COUNT=#.n
+  MISSING_COUNT=#.no.such.key
+)
+
+# 抽出した変数を 1 行ずつ出力
+dump_fields() {
+  local var
+  for var in TOOL_NAME FILE_PATH CMD_NAME LIST NUM PROMPT_SEQ LSP_TS MISSING BROKEN EMPTY \
+             LIST_COUNT OBJ_COUNT NUM_COUNT MISSING_COUNT; do
+    printf '%s=[%s]\n' "$var" "${!var-UNSET}"
+  done
+}
+
+extract_with_jq() {
+  (eval "$(printf '%s' "$INPUT" | hook_fields "${FIELDS[@]}")"; dump_fields)
+}
+
+extract_with_python() {
+  (_HOOK_FIELDS_JQ_USABLE=""; eval "$(printf '%s' "$INPUT" | PATH="$NO_JQ_BIN" hook_fields "${FIELDS[@]}")"; dump_fields)
+}
+
+extract_with_old_jq() {
+  (_HOOK_FIELDS_JQ_USABLE=""; eval "$(printf '%s' "$INPUT" | PATH="$OLD_JQ_BIN" hook_fields "${FIELDS[@]}")"; dump_fields)
+}
+
+# テスト関数
+run_test() {
+  local test_name="$1"
+  local test_func="$2"
+
+  TESTS_RUN=$((TESTS_RUN + 1))
+  echo -n "  Testing: $test_name... "
+
+  if $test_func; then
+    echo -e "${GREEN}PASSED${NC}"
+    TESTS_PASSED=$((TESTS_PASSED + 1))
+  else
+    echo -e "${RED}FAILED${NC}"
+    TESTS_FAILED=$((TESTS_FAILED + 1))
+  fi
+}
+
+# ==================================================
+# Test 1: 入力と状態ファイルから値を取り出す
+# ==================================================
+test_extracts_values() {
+  echo '{"prompt_seq": 4}' > .claude/state/session.json
+  echo '{"lsp": {"available_by_ext": {"ts": true}}}' > .claude/state/tooling-policy.json
+  echo 'not json' > .claude/state/broken.json
+
+  local expected
+  expected="TOOL_NAME=[Write]
+FILE_PATH=[a'b \$(touch pwned) \"q\"
+line2]
+CMD_NAME=[/deploy]
+LIST=[x
+y
+3]
+NUM=[1.5]
+PROMPT_SEQ=[4]
+LSP_TS=[true]
+MISSING=[fallback]
+BROKEN=[0]
+EMPTY=[]
+LIST_COUNT=[3]
+OBJ_COUNT=[2]
+NUM_COUNT=[1.5]
+MISSING_COUNT=[0]"
+  [ "$(extract_with_jq)" = "$expected" ] || { echo ""; extract_with_jq; return 1; }
+  [ ! -e pwned ]
+}
+
+# ==================================================
+# Test 2: python3 版が jq 版と同じ値を返す
+# ==================================================
+test_python_matches_jq() {
+  [ "$(extract_with_python)" = "$(extract_with_jq)" ]
+}
+
+# ==================================================
+# Test 3: jq 1.5 では python3 版を使う
+# ==================================================
+test_old_jq_uses_python() {
+  [ "$(extract_with_old_jq)" = "$(extract_with_jq)" ]
+}
+
+# ==================================================
+# Test 4: 不正な変数名・壊れた入力は無視する
+# ==================================================
+test_ignores_invalid() {
+  local output
+  output="$(printf 'not json' | hook_fields 'bad-name=.x' 'A=.tool_name' 'B=.x//default')"
+  [ "$output" = "A=''
+B='default'" ]
+}
+
+# ==================================================
+# Test 5: usage-tracker.sh が抽出した値で記録する
+# ==================================================
+test_usage_tracker_records() {
+  local output
+  output="$(echo '{"tool_name":"Skill","tool_input":{"skill":"claude-code-harness:impl"}}' \
+    | bash "$SCRIPTS/usage-tracker.sh")"
+  [ "$output" = '{"continue":true}' ] || return 1
+  node "$SCRIPTS/record-usage.js" --compact >/dev/null || return 1
+  jq -e '.skills.impl.count == 1' .claude/state/harness-usage.json >/dev/null
+}
+
+# ==================================================
+# Test 6: userprompt-inject-policy.sh が prompt_seq を進める
+# ==================================================
+test_inject_policy_increments_seq() {
+  echo '{"prompt_seq": 4}' > .claude/state/session.json
+  echo '{"lsp": {"available": true}}' > .claude/state/tooling-policy.json
+  local output
+  output="$(echo '{"prompt":"関数をリファクタして"}' | bash "$SCRIPTS/userprompt-inject-policy.sh")"
+  echo "$output" | jq -e '.hookSpecificOutput.additionalContext | contains("Enforced")' >/dev/null || return 1
+  jq -e '.prompt_seq == 5 and .intent == "semantic"' .claude/state/session.json >/dev/null
+}
+
+# ==================================================
+# メイン実行
+# ==================================================
+echo ""
+echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
+echo " Hook Fields テスト"
+echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
+echo ""
+
+run_test "入力と状態ファイルから値を取り出す" test_extracts_values
+run_test "python3 版が jq 版と同じ値を返す" test_python_matches_jq
+run_test "jq 1.5 では python3 版を使う" test_old_jq_uses_python
+run_test "不正な変数名・壊れた入力は無視する" test_ignores_invalid
+run_test "usage-tracker.sh が抽出した値で記録する" test_usage_tracker_records
+run_test "userprompt-inject-policy.sh が prompt_seq を進める" test_inject_policy_increments_seq
+
+echo ""
+echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
+echo " テスト結果: $TESTS_PASSED/$TESTS_RUN passed"
+echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
+echo ""
+
+if [ "$TESTS_FAILED" -gt 0 ]; then
+  exit 1
+fi
+
+exit 0
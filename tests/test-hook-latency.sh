@@ -0,0 +1,182 @@
+#!/bin/bash
+# test-hook-latency.sh
+# フックのレイテンシ計測と時間予算のテスト
+#
+# テスト対象:
+# - scripts/run-script.js (フック 1 回ごとの記録・予算超過時の警告と高速パス)
+# - scripts/hook-latency.js (リングバッファ・集計)
+
+set -euo pipefail
+
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+PROJECT_ROOT="$(cd "$SCRIPT_DIR/.." && pwd)"
+SCRIPTS="$PROJECT_ROOT/scripts"
+
+# テスト結果カウンター
+TESTS_RUN=0
+TESTS_PASSED=0
+TESTS_FAILED=0
+
+# カラー出力
+RED='\033[0;31m'
+GREEN='\033[0;32m'
+YELLOW='\033[1;33m'
+NC='\033[0m'
+
+if ! command -v node >/dev/null 2>&1 || ! command -v jq >/dev/null 2>&1; then
+  echo -e "${YELLOW}Skipped: node and jq are required${NC}"
+  exit 0
+fi
+
+WORK_DIR="$(mktemp -d)"
+trap 'rm -rf "$WORK_DIR"' EXIT
+# デーモンを使わない（bash スクリプトの実行を計測する）
+export CLAUDE_HARNESS_HOOK_SOCKET="$WORK_DIR/none.sock"
+STATE_DIR="$WORK_DIR/.claude/state"
+RING_FILE="$STATE_DIR/hook-latency.ring"
+mkdir -p "$STATE_DIR"
+cd "$WORK_DIR"
+
+# テスト関数
+run_test() {
+  local test_name="$1"
+  local test_func="$2"
+
+  TESTS_RUN=$((TESTS_RUN + 1))
+  echo -n "  Testing: $test_name... "
+
+  if $test_func; then
+    echo -e "${GREEN}PASSED${NC}"
+    TESTS_PASSED=$((TESTS_PASSED + 1))
+  else
+    echo -e "${RED}FAILED${NC}"
+    TESTS_FAILED=$((TESTS_FAILED + 1))
+  fi
+}
+
+guard() {
+  echo '{"tool_name":"Bash","tool_input":{"command":"ls"}}' | node "$SCRIPTS/run-script.js" pretooluse-guard
+}
+
+session_init() {
+  echo '{}' | node "$SCRIPTS/run-script.js" session-init
+}
+
+# フックごとの集計値
+stat_of() {
+  node "$SCRIPTS/hook-latency.js" report --json | jq -r --arg hook "$1" ".[\$hook].$2"
+}
+
+# ==================================================
+# Test 1: フック 1 回ごとに記録する
+# ==================================================
+test_records_each_invocation() {
+  guard >/dev/null 2>&1 || return 1
+  guard >/dev/null 2>&1 || return 1
+  [ -f "$RING_FILE" ] || return 1
+  [ "$(stat_of pretooluse-guard count)" -eq 2 ] || return 1
+  [ "$(stat_of pretooluse-guard errors)" -eq 0 ] || return 1
+  # wall time は node の起動を含むので 0 より大きい
+  jq -en --argjson p50 "$(stat_of pretooluse-guard p50_ms)" '$p50 > 0' >/dev/null
+}
+
+# ==================================================
+# Test 2: 予算を 3 回続けて超えたら警告する（出力は変えない）
+# ==================================================
+test_warns_over_budget() {
+  local expected over_before stderr_file="$WORK_DIR/stderr"
+  # 予算を超えない状態で期待する出力を取る
+  echo '{"hooks": {"pretooluse-guard": 60000}}' > "$STATE_DIR/hook-budgets.json"
+  expected="$(guard 2>/dev/null)"
+  over_before="$(stat_of pretooluse-guard over_budget)"
+
+  echo '{"hooks": {"pretooluse-guard": 1}}' > "$STATE_DIR/hook-budgets.json"
+  local i
+  for i in 1 2; do
+    [ "$(guard 2>"$stderr_file")" = "$expected" ] || return 1
+    ! grep -q '\[hook-latency\]' "$stderr_file" || return 1
+  done
+  [ "$(guard 2>"$stderr_file")" = "$expected" ] || return 1
+  grep -q '\[hook-latency\] pretooluse-guard: .*ms (budget 1ms)' "$stderr_file" || return 1
+  [ "$(stat_of pretooluse-guard over_budget)" -eq $((over_before + 3)) ]
+}
+
+# ==================================================
+# Test 3: fast-path の予算を超え続けたら高速パスで実行する
+# ==================================================
+test_degrades_to_fast_path() {
+  echo '{"hooks": {"session-init": {"budget_ms": 1, "on_exceed": "fast-path"}}}' > "$STATE_DIR/hook-budgets.json"
+  local i
+  for i in 1 2 3; do
+    session_init >/dev/null 2>&1 || return 1
+  done
+  [ "$(stat_of session-init fast_path)" -eq 0 ] || return 1
+
+  session_init >/dev/null 2>&1 || return 1
+  [ "$(stat_of session-init fast_path)" -eq 1 ] || return 1
+
+  # warn（既定）なら高速パスにしない
+  echo '{"hooks": {"session-init": 1}}' > "$STATE_DIR/hook-budgets.json"
+  session_init >/dev/null 2>&1 || return 1
+  [ "$(stat_of session-init fast_path)" -eq 1 ]
+}
+
+# ==================================================
+# Test 4: リングバッファは最新 1024 件だけを保持する（サイズ一定）
+# ==================================================
+test_ring_keeps_latest() {
+  local size_before
+  node -e '
+    const latency = require(process.argv[1]);
+    for (let i = 0; i < 1100; i++) {
+      latency.recordSample({ ts: Date.now(), hook: "synthetic", wallMs: i, cpuMs: null, exitCode: 0, flags: 0 });
+    }
+  ' "$SCRIPTS/hook-latency.js" || return 1
+  size_before="$(wc -c < "$RING_FILE" | tr -d ' ')"
+  [ "$size_before" -eq $((16 + 1024 * 64)) ] || return 1
+
+  [ "$(stat_of synthetic count)" -eq 1024 ] || return 1
+  [ "$(stat_of synthetic max_ms)" = "1099" ] || return 1
+  # 他のフックの古い記録は押し出される
+  [ "$(stat_of pretooluse-guard count)" = "null" ] || return 1
+
+  guard >/dev/null 2>&1 || return 1
+  [ "$(wc -c < "$RING_FILE" | tr -d ' ')" -eq "$size_before" ]
+}
+
+# ==================================================
+# Test 5: .claude/state がなければ記録しない
+# ==================================================
+test_skips_without_state_dir() {
+  local dir="$WORK_DIR/plain"
+  mkdir -p "$dir"
+  (cd "$dir" && guard >/dev/null 2>&1) || return 1
+  [ ! -e "$dir/.claude" ]
+}
+
+# ==================================================
+# メイン実行
+# ==================================================
+echo ""
+echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
+echo " Hook Latency テスト"
+echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
+echo ""
+
+run_test "フック 1 回ごとに記録する" test_records_each_invocation
+run_test "予算を 3 回続けて超えたら警告する" test_warns_over_budget
+run_test "予算を超え続けたら高速パスで実行する" test_degrades_to_fast_path
+run_test "リングバッファは最新 1024 件だけを保持する" test_ring_keeps_latest
+run_test ".claude/state がなければ記録しない" test_skips_without_state_dir
+
+echo ""
+echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
+echo " テスト結果: $TESTS_PASSED/$TESTS_RUN passed"
+echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
+echo ""
+
+if [ "$TESTS_FAILED" -gt 0 ]; then
+  exit 1
+fi
+
+exit 0
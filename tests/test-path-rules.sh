@@ -0,0 +1,195 @@
+#!/bin/bash
+# test-path-rules.sh
+# pretooluse-guard.sh のパスルール（コンパイル済みスナップショット）のテスト
+#
+# テスト対象:
+# - 保護パス・Skills Gate の除外・ガイドラインの判定
+# - .claude/state/path-rules.cache の作成・再利用・無効化
+# - 書き換えられたスナップショットで保護パスが緩まないこと
+
+set -euo pipefail
+
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+PROJECT_ROOT="$(cd "$SCRIPT_DIR/.." && pwd)"
+GUARD="$PROJECT_ROOT/scripts/pretooluse-guard.sh"
+
+# テスト結果カウンター
+TESTS_RUN=0
+TESTS_PASSED=0
+TESTS_FAILED=0
+
+# カラー出力
+RED='\033[0;31m'
+GREEN='\033[0;32m'
+YELLOW='\033[1;33m'
+NC='\033[0m'
+
+if ! command -v jq >/dev/null 2>&1; then
+  echo -e "${YELLOW}Skipped: jq is required${NC}"
+  exit 0
+fi
+
+WORK_DIR="$(mktemp -d)"
+trap 'rm -rf "$WORK_DIR"' EXIT
+STATE_DIR="$WORK_DIR/.claude/state"
+RULES_FILE="$STATE_DIR/path-rules.cache"
+POLICY_FILE="$STATE_DIR/skills-policy.json"
+mkdir -p "$STATE_DIR"
+cd "$WORK_DIR"
+
+# Skills Gate を有効にし、スキル未使用の状態にする
+echo '{"enabled": true, "skills": ["impl"]}' > "$STATE_DIR/skills-config.json"
+echo '{"skills_gate": {"exclude_paths": ["scripts/", "gen/[!x]?/"], "exclude_extensions": [".yml", ".c++"]}}' > "$POLICY_FILE"
+
+# Write に対する判定（deny / ask / context / pass）
+decide() {
+  local output
+  output="$(jq -nc --arg p "$1" --arg cwd "$WORK_DIR" '{tool_name: "Write", tool_input: {file_path: $p}, cwd: $cwd}' \
+    | bash "$GUARD" 2>/dev/null)"
+  if [ -z "$output" ]; then
+    echo "pass"
+  else
+    echo "$output" | jq -r '(.hookSpecificOutput.permissionDecision // "") | if . == "" then "context" else . end'
+  fi
+}
+
+# 期待どおりの判定か
+expect() {
+  local path="$1"
+  local expected="$2"
+  local actual
+  actual="$(decide "$path")"
+  if [ "$actual" != "$expected" ]; then
+    echo ""
+    echo "    $path: expected $expected, got $actual"
+    return 1
+  fi
+}
+
+# テスト関数
+run_test() {
+  local test_name="$1"
+  local test_func="$2"
+
+  TESTS_RUN=$((TESTS_RUN + 1))
+  echo -n "  Testing: $test_name... "
+
+  if $test_func; then
+    echo -e "${GREEN}PASSED${NC}"
+    TESTS_PASSED=$((TESTS_PASSED + 1))
+  else
+    echo -e "${RED}FAILED${NC}"
+    TESTS_FAILED=$((TESTS_FAILED + 1))
+  fi
+}
+
+# ==================================================
+# Test 1: glob と同じ判定をする
+# ==================================================
+test_matches_globs() {
+  expect ".env" deny || return 1
+  expect "config/.env.local" deny || return 1
+  expect "keys/server.pem" deny || return 1
+  expect "README.md" pass || return 1
+  expect "docs/guide.ts" pass || return 1
+  expect "scripts/build.ts" pass || return 1
+  expect "gen/ab/out.ts" pass || return 1
+  expect "gen/xb/out.ts" deny || return 1
+  expect "ci.yml" pass || return 1
+  expect "main.c++" pass || return 1
+  expect "main.cpp" deny || return 1
+  expect "src/app.ts" deny
+}
+
+# ==================================================
+# Test 2: スナップショットを作成する
+# ==================================================
+test_writes_snapshot() {
+  [ -f "$RULES_FILE" ] || return 1
+  [ "$(head -1 "$RULES_FILE")" = "pretooluse-guard path rules v2 policy" ] || return 1
+  [ "$(wc -l < "$RULES_FILE")" -eq 2 ]
+}
+
+# ==================================================
+# Test 3: ポリシーが変わらなければスナップショットを再利用する
+# ==================================================
+test_reuses_snapshot() {
+  # 除外の正規表現に src/ を足しても、そのまま使われる
+  local rewritten
+  rewritten="$(awk 'NR == 2 { sub(/\)\$$/, "|src/.*)$") } { print }' "$RULES_FILE")"
+  printf '%s\n' "$rewritten" > "$RULES_FILE"
+  expect "src/app.ts" context
+}
+
+# ==================================================
+# Test 4: ポリシーを更新するとコンパイルし直す
+# ==================================================
+test_recompiles_on_policy_change() {
+  sleep 0.01
+  echo '{"skills_gate": {"exclude_paths": ["src/"]}}' > "$POLICY_FILE"
+  expect "src/app.ts" context || return 1
+  expect "scripts/build.ts" deny || return 1
+
+  rm -f "$POLICY_FILE"
+  expect "src/app.ts" deny || return 1
+  [ "$(head -1 "$RULES_FILE")" = "pretooluse-guard path rules v2 nopolicy" ]
+}
+
+# ==================================================
+# Test 5: .claude/state がなくても判定できる（スナップショットは作らない）
+# ==================================================
+test_works_without_state_dir() {
+  local dir="$WORK_DIR/plain"
+  mkdir -p "$dir"
+  local output
+  output="$(cd "$dir" && jq -nc --arg cwd "$dir" '{tool_name: "Write", tool_input: {file_path: "tests/a.test.ts"}, cwd: $cwd}' \
+    | bash "$GUARD" 2>/dev/null)"
+  echo "$output" | jq -e '.hookSpecificOutput.additionalContext | contains("テスト品質")' >/dev/null || return 1
+  [ ! -e "$dir/.claude" ]
+}
+
+# ==================================================
+# Test 6: 書き換えられたスナップショットで保護パスが緩まない
+# ==================================================
+test_ignores_forged_snapshot() {
+  # 旧形式（保護パスの正規表現を含む）に似せたスナップショット
+  printf '%s\n' "pretooluse-guard path rules v2 nopolicy" '^(NOPE)$' '^.*$' '^(NOPE)$' '^(NOPE)$' > "$RULES_FILE"
+  touch -d '+1 hour' "$RULES_FILE" 2>/dev/null || true
+  expect ".env" deny || return 1
+  expect ".git/config" deny || return 1
+  expect "home/.ssh/id_rsa" deny || return 1
+  # デフォルトの除外から始まらない正規表現は使わず、作り直す
+  expect "src/app.ts" deny || return 1
+  [ "$(wc -l < "$RULES_FILE")" -eq 2 ] || return 1
+  # スナップショット自体への書き込みも保護する
+  expect ".claude/state/path-rules.cache" deny || return 1
+  expect "$RULES_FILE" deny
+}
+
+# ==================================================
+# メイン実行
+# ==================================================
+echo ""
+echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
+echo " Path Rules テスト"
+echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
+echo ""
+
+run_test "glob と同じ判定をする" test_matches_globs
+run_test "スナップショットを作成する" test_writes_snapshot
+run_test "ポリシーが変わらなければスナップショットを再利用する" test_reuses_snapshot
+run_test "ポリシーを更新するとコンパイルし直す" test_recompiles_on_policy_change
+run_test ".claude/state がなくても判定できる" test_works_without_state_dir
+run_test "書き換えられたスナップショットで保護パスが緩まない" test_ignores_forged_snapshot
+
+echo ""
+echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
+echo " テスト結果: $TESTS_PASSED/$TESTS_RUN passed"
+echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
+echo ""
+
+if [ "$TESTS_FAILED" -gt 0 ]; then
+  exit 1
+fi
+
+exit 0
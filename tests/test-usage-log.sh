@@ -0,0 +1,188 @@
+#!/bin/bash
+# test-usage-log.sh
+# 使用状況のイベントログ（追記のみ）と集計のテスト
+#
+# テスト対象:
+# - scripts/usage-events.sh (bash からの追記)
+# - scripts/record-usage.js (並列記録・集計・ローテーション)
+
+set -euo pipefail
+
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+PROJECT_ROOT="$(cd "$SCRIPT_DIR/.." && pwd)"
+SCRIPTS="$PROJECT_ROOT/scripts"
+RECORD_USAGE="$SCRIPTS/record-usage.js"
+
+# テスト結果カウンター
+TESTS_RUN=0
+TESTS_PASSED=0
+TESTS_FAILED=0
+
+# カラー出力
+RED='\033[0;31m'
+GREEN='\033[0;32m'
+YELLOW='\033[1;33m'
+NC='\033[0m'
+
+if ! command -v node >/dev/null 2>&1 || ! command -v jq >/dev/null 2>&1; then
+  echo -e "${YELLOW}Skipped: node and jq are required${NC}"
+  exit 0
+fi
+
+# shellcheck source=../scripts/usage-events.sh
+source "$SCRIPTS/usage-events.sh"
+
+WORK_DIR="$(mktemp -d)"
+trap 'rm -rf "$WORK_DIR"' EXIT
+STATE_DIR="$WORK_DIR/.claude/state"
+USAGE_FILE="$STATE_DIR/harness-usage.json"
+EVENTS_FILE="$STATE_DIR/harness-usage.events.jsonl"
+mkdir -p "$STATE_DIR"
+cd "$WORK_DIR"
+
+# テスト関数
+run_test() {
+  local test_name="$1"
+  local test_func="$2"
+
+  TESTS_RUN=$((TESTS_RUN + 1))
+  echo -n "  Testing: $test_name... "
+
+  if $test_func; then
+    echo -e "${GREEN}PASSED${NC}"
+    TESTS_PASSED=$((TESTS_PASSED + 1))
+  else
+    echo -e "${RED}FAILED${NC}"
+    TESTS_FAILED=$((TESTS_FAILED + 1))
+  fi
+}
+
+# 集計結果の値が期待どおりか
+# 引数: jq フィルタ, 期待値
+expect_usage() {
+  local actual
+  actual="$(jq -c "$1" "$USAGE_FILE")"
+  if [ "$actual" != "$2" ]; then
+    echo ""
+    echo "    $1: expected $2, got $actual"
+    return 1
+  fi
+}
+
+# ==================================================
+# Test 1: 並列に記録してもカウントを失わない
+# ==================================================
+test_parallel_records() {
+  local i
+  for i in $(seq 20); do
+    node "$RECORD_USAGE" skill impl >/dev/null &
+    (record_usage_event skill impl) &
+  done
+  wait
+
+  [ ! -e "$USAGE_FILE" ] || return 1
+  node "$RECORD_USAGE" --compact >/dev/null || return 1
+  expect_usage '.skills.impl.count' 40
+}
+
+# ==================================================
+# Test 2: 集計済みのイベントは二度数えない
+# ==================================================
+test_compaction_is_incremental() {
+  record_usage_event hook pretooluse-guard --blocked
+  record_usage_event command 'say "hi"\now'
+  node "$RECORD_USAGE" --compact >/dev/null || return 1
+  node "$RECORD_USAGE" --compact >/dev/null || return 1
+
+  expect_usage '.skills.impl.count' 40 || return 1
+  expect_usage '.hooks["pretooluse-guard"] | [.triggered, .blocked]' '[1,1]' || return 1
+  expect_usage '.commands | keys' '["say \"hi\"\\now"]' || return 1
+  expect_usage '.eventLog.offset' "$(wc -c < "$EVENTS_FILE" | tr -d ' ')"
+}
+
+# ==================================================
+# Test 3: 書きかけの行は次の集計まで残す
+# ==================================================
+test_partial_line_is_deferred() {
+  printf '{"v":1,"ts":"2026-01-01T00:00:00.000Z","type":"agent",' >> "$EVENTS_FILE"
+  node "$RECORD_USAGE" --compact >/dev/null || return 1
+  expect_usage '.agents' '{}' || return 1
+
+  printf '"name":"reviewer"}\n' >> "$EVENTS_FILE"
+  node "$RECORD_USAGE" --compact >/dev/null || return 1
+  expect_usage '.agents.reviewer.count' 1
+}
+
+# ==================================================
+# Test 4: ログが大きくなるとローテーションする
+# ==================================================
+test_rotation() {
+  local line='{"v":1,"ts":"2026-01-01T00:00:00.000Z","type":"skill","name":"review"}'
+  local i
+  for i in $(seq 4000); do
+    echo "$line"
+  done >> "$EVENTS_FILE"
+
+  node "$RECORD_USAGE" skill review >/dev/null || return 1
+  [ -f "$EVENTS_FILE.retired" ] || return 1
+  expect_usage '.skills.review.count' 4001 || return 1
+
+  # ローテーション直前に開かれた追記は次の集計で拾う
+  echo "$line" >> "$EVENTS_FILE.retired"
+  record_usage_event skill review
+  node "$RECORD_USAGE" --compact >/dev/null || return 1
+  [ ! -e "$EVENTS_FILE.retired" ] || return 1
+  expect_usage '.skills.review.count' 4003 || return 1
+  expect_usage '.skills.impl.count' 40
+}
+
+# ==================================================
+# Test 5: --report は未集計のイベントも含める
+# ==================================================
+test_report_includes_pending() {
+  record_usage_event agent reviewer
+  local report
+  report="$(node "$RECORD_USAGE" --report)"
+  echo "$report" | jq -e '.agents[] | select(.[0] == "reviewer") | .[1].count == 2' >/dev/null
+}
+
+# ==================================================
+# Test 6: 追記に失敗しても set -e のフックを止めない
+# ==================================================
+test_append_failure_is_ignored() {
+  local dir="$WORK_DIR/broken"
+  mkdir -p "$dir/.claude/state/harness-usage.events.jsonl"
+  local stderr_file="$WORK_DIR/stderr"
+  (cd "$dir" && bash -c 'set -euo pipefail; source "$1"; record_usage_event skill impl; echo done' _ \
+    "$SCRIPTS/usage-events.sh") > "$WORK_DIR/stdout" 2>"$stderr_file" || return 1
+  [ "$(cat "$WORK_DIR/stdout")" = "done" ] || return 1
+  [ ! -s "$stderr_file" ]
+}
+
+# ==================================================
+# メイン実行
+# ==================================================
+echo ""
+echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
+echo " Usage Log テスト"
+echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
+echo ""
+
+run_test "並列に記録してもカウントを失わない" test_parallel_records
+run_test "集計済みのイベントは二度数えない" test_compaction_is_incremental
+run_test "書きかけの行は次の集計まで残す" test_partial_line_is_deferred
+run_test "ログが大きくなるとローテーションする" test_rotation
+run_test "--report は未集計のイベントも含める" test_report_includes_pending
+run_test "追記に失敗しても set -e のフックを止めない" test_append_failure_is_ignored
+
+echo ""
+echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
+echo " テスト結果: $TESTS_PASSED/$TESTS_RUN passed"
+echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
+echo ""
+
+if [ "$TESTS_FAILED" -gt 0 ]; then
+  exit 1
+fi
+
+exit 0